@@ -4,7 +4,7 @@ Combines all API endpoints and provides versioned routing.
 """
 
 from fastapi import APIRouter
-from app.api import webhooks, audit
+from app.api import webhooks, audit, admin, analytics, realtime
 
 # Create main API router (prefix will be added in main.py)
 api_router = APIRouter()
@@ -12,6 +12,9 @@ api_router = APIRouter()
 # Include sub-routers
 api_router.include_router(webhooks.router)
 api_router.include_router(audit.router)
+api_router.include_router(admin.router)
+api_router.include_router(analytics.router)
+api_router.include_router(realtime.router)
 
 
 @api_router.get("/")
@@ -27,6 +30,7 @@ async def api_info():
             "webhooks": {
                 "github": "/api/v1/webhooks/github",
                 "events": "/api/v1/webhooks/github/events",
+                "stats": "/api/v1/webhooks/github/stats",
                 "test": "/api/v1/webhooks/github/test"
             },
             "audit": {
@@ -34,6 +38,19 @@ async def api_info():
                 "repositories": "/api/v1/audit/repositories", 
                 "events": "/api/v1/audit/events",
                 "analytics": "/api/v1/audit/analytics/summary"
+            },
+            "analytics": {
+                "snapshots": "/api/v1/analytics/snapshots",
+                "query": "/api/v1/analytics/query"
+            },
+            "realtime": {
+                "events": "/api/v1/realtime/events",
+                "websocket": "/api/v1/realtime/ws",
+                "stats": "/api/v1/realtime/stats"
+            },
+            "admin": {
+                "db_statements": "/api/v1/admin/db/statements",
+                "profiles": "/api/v1/admin/profiles"
             }
         },
         "documentation": {
@@ -0,0 +1,92 @@
+"""
+Administrative API endpoints for operational diagnostics.
+Exposes in-process SQL statement statistics collected by the engine event hooks
+and request profiles written by the profiling middleware.
+"""
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import FileResponse
+from typing import Dict, Any
+from datetime import datetime, timezone
+import logging
+
+from app.core.config import get_settings
+from app.core.db_instrumentation import statement_stats
+from app.core.profiler import list_profiles, resolve_profile
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+@router.get("/db/statements")
+async def list_statement_stats(
+    limit: int = Query(50, ge=1, le=500, description="Number of statement fingerprints to return"),
+    order_by: str = Query(
+        "total_seconds",
+        pattern="^(total_seconds|calls|max_seconds|mean_seconds|rows)$",
+        description="Sort key"
+    )
+) -> Dict[str, Any]:
+    """
+    SQL statement statistics aggregated by fingerprint.
+    Literals and bind parameters are normalized away, so each entry is one
+    query shape with its call count, total/mean/max latency and rows.
+    Statistics are per worker process and reset on restart.
+    """
+    settings = get_settings()
+    return {
+        "fingerprints_tracked": len(statement_stats),
+        "slow_query_ms": settings.DB_SLOW_QUERY_MS,
+        "explain_sample_rate": settings.DB_EXPLAIN_SAMPLE_RATE,
+        "statements": statement_stats.top(limit=limit, order_by=order_by)
+    }
+
+
+@router.delete("/db/statements")
+async def reset_statement_stats():
+    """
+    Reset the aggregated SQL statement statistics, e.g. before a load test.
+    """
+    statement_stats.reset()
+    logger.info("SQL statement statistics reset")
+    return {"status": "reset"}
+
+
+@router.get("/profiles")
+async def list_request_profiles(
+    limit: int = Query(50, ge=1, le=500, description="Number of profiles to return")
+) -> Dict[str, Any]:
+    """
+    Recent request profiles written by the profiling middleware, newest first.
+    Profiling is opt-in via PROFILING_ENABLED.
+    """
+    settings = get_settings()
+    profiles = list_profiles()
+    return {
+        "profiling_enabled": settings.PROFILING_ENABLED,
+        "sample_rate": settings.PROFILING_SAMPLE_RATE,
+        "total": len(profiles),
+        "profiles": [
+            {
+                "name": path.name,
+                "size_bytes": path.stat().st_size,
+                "created_at": datetime.fromtimestamp(path.stat().st_mtime, timezone.utc).isoformat(),
+                "download": f"/api/v1/admin/profiles/{path.name}"
+            }
+            for path in profiles[:limit]
+        ]
+    }
+
+
+@router.get("/profiles/{name}")
+async def download_request_profile(name: str):
+    """
+    Download a profile. Speedscope files open at https://www.speedscope.app;
+    collapsed stacks work with flamegraph.pl and speedscope.
+    """
+    path = resolve_profile(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    media_type = "application/json" if name.endswith(".json") else "text/plain"
+    return FileResponse(path, media_type=media_type, filename=name)
@@ -0,0 +1,131 @@
+"""
+Offline analytics API over the Parquet event snapshots.
+Queries run in an embedded DuckDB against the files written by
+export_snapshots.py, so analytics never touch the production database.
+"""
+
+from fastapi import APIRouter, HTTPException
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel, Field
+from pathlib import Path
+from typing import Dict, Any, Optional
+import logging
+import threading
+import time
+
+from app.core.config import get_settings
+
+try:
+    import duckdb
+except ImportError:  # Optional: only needed for /analytics/query
+    duckdb = None
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+
+class SnapshotQuery(BaseModel):
+    """A read-only SQL query over the `events` view of the snapshots."""
+
+    sql: str = Field(..., description="A single SELECT statement, e.g. SELECT event_type, count(*) FROM events GROUP BY 1")
+    limit: Optional[int] = Field(None, ge=1, description="Maximum rows to return (capped by ANALYTICS_QUERY_MAX_ROWS)")
+
+
+def _snapshot_files(root: Path):
+    return list(root.glob("event_date=*/event_type=*/*.parquet"))
+
+
+def _connect(root: Path):
+    """
+    In-memory DuckDB with an `events` view over the snapshot files.
+
+    File access is then limited to the snapshot directory and the
+    configuration is locked, so queries cannot read other files or undo that.
+    """
+    connection = duckdb.connect()
+    directory = str(root.resolve()).replace("'", "''")
+    connection.execute(
+        f"CREATE VIEW events AS SELECT * FROM read_parquet('{directory}/*/*/*.parquet', "
+        "hive_partitioning = true, union_by_name = true)"
+    )
+    connection.execute(f"SET allowed_directories = ['{directory}']")
+    connection.execute("SET enable_external_access = false")
+    connection.execute("SET lock_configuration = true")
+    return connection
+
+
+@router.get("/snapshots")
+def get_snapshot_status() -> Dict[str, Any]:
+    """
+    Describe the exported snapshots: files, size and the partitions they cover.
+    """
+    root = Path(get_settings().SNAPSHOT_DIR)
+    files = _snapshot_files(root) if root.exists() else []
+    dates = sorted({path.parent.parent.name.split("=", 1)[1] for path in files})
+    event_types = sorted({path.parent.name.split("=", 1)[1] for path in files})
+    return {
+        "directory": str(root),
+        "files": len(files),
+        "bytes": sum(path.stat().st_size for path in files),
+        "first_date": dates[0] if dates else None,
+        "last_date": dates[-1] if dates else None,
+        "event_types": event_types,
+        "query_enabled": get_settings().ANALYTICS_QUERY_ENABLED and duckdb is not None
+    }
+
+
+@router.post("/query")
+def query_snapshots(query: SnapshotQuery) -> Dict[str, Any]:
+    """
+    Run a read-only SQL query over the event snapshots with DuckDB.
+
+    The `events` view has the flattened webhook event and specialized event
+    columns plus the event_date and event_type partition columns. Disabled
+    unless ANALYTICS_QUERY_ENABLED is set.
+    """
+    settings = get_settings()
+    if not settings.ANALYTICS_QUERY_ENABLED:
+        raise HTTPException(status_code=403, detail="Snapshot queries are disabled")
+    if duckdb is None:
+        raise HTTPException(status_code=503, detail="Snapshot queries require duckdb (pip install duckdb)")
+
+    root = Path(settings.SNAPSHOT_DIR)
+    if not root.exists() or not _snapshot_files(root):
+        raise HTTPException(status_code=404, detail="No snapshots have been exported yet")
+
+    limit = min(query.limit or settings.ANALYTICS_QUERY_MAX_ROWS, settings.ANALYTICS_QUERY_MAX_ROWS)
+    connection = _connect(root)
+    timer = threading.Timer(settings.ANALYTICS_QUERY_TIMEOUT_SECONDS, connection.interrupt)
+    try:
+        statements = connection.extract_statements(query.sql)
+        if len(statements) != 1 or statements[0].type != duckdb.StatementType.SELECT:
+            raise HTTPException(status_code=400, detail="Only a single SELECT statement is allowed")
+
+        started = time.perf_counter()
+        timer.start()
+        result = connection.execute(query.sql)
+        columns = [description[0] for description in result.description]
+        rows = result.fetchmany(limit + 1)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        return {
+            "columns": columns,
+            "rows": jsonable_encoder([list(row) for row in rows[:limit]]),
+            "row_count": min(len(rows), limit),
+            "truncated": len(rows) > limit,
+            "elapsed_ms": round(elapsed_ms, 2)
+        }
+
+    except HTTPException:
+        raise
+    except duckdb.InterruptException:
+        raise HTTPException(status_code=408, detail="Query exceeded the time limit")
+    except duckdb.Error as e:
+        raise HTTPException(status_code=400, detail=f"Query failed: {e}")
+    except Exception as e:
+        logger.error(f"Error querying snapshots: {e}")
+        raise HTTPException(status_code=500, detail="Failed to query snapshots")
+    finally:
+        timer.cancel()
+        connection.close()
@@ -3,21 +3,53 @@ API endpoints for querying GitHub audit data and analytics.
 Provides endpoints to retrieve processed webhook data and insights.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Path
+from fastapi import APIRouter, Depends, HTTPException, Query, Path, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Text, cast, func, select
 from sqlalchemy.orm import Session
-from typing import List, Optional, Dict, Any
-from datetime import datetime, timedelta
+from typing import Iterator, List, Optional, Dict, Any
+from datetime import datetime, timedelta, timezone
+import csv
+import io
+import json
 import logging
+import uuid
+import zlib
 
+from app.core.cache import organization_scope, response_cache
+from app.core.config import get_settings
 from app.core.database import get_database
+from app.core.http_cache import conditional_response, event_watermark, make_etag, unprocessed_watermark
 from app.models.core import Organization, Repository, User, Installation, WebhookEvent
-from app.models.events import RepositoryEvent, MemberEvent, SecurityEvent, CodeEvent
+from app.models.events import (
+    RepositoryEvent, MemberEvent, SecurityEvent, CodeEvent,
+    OrganizationMembershipHistory, RepositoryCollaboratorHistory, EffectivePermission
+)
+from app.services.access_service import PERMISSION_ORDER, permissions_at_least
 from app.services.entity_service import entity_service
+from app.services.event_analytics import event_analytics
+from app.services.leaderboard_service import leaderboard_service
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/audit", tags=["audit"])
 
+# Accepted values of the minimum effective permission filters
+PERMISSION_PATTERN = f"^({'|'.join(PERMISSION_ORDER)})$"
+
+
+def _etag(request: Request, watermark: Any, sliding_window: bool = False) -> str:
+    """
+    ETag of an audit response: the event watermark plus the query parameters.
+
+    Responses over a window ending now also change as events age out of the
+    window, so they carry the current hour as well.
+    """
+    parts = [request.url.path, watermark, sorted(request.query_params.multi_items())]
+    if sliding_window:
+        parts.append(datetime.utcnow().strftime("%Y-%m-%dT%H"))
+    return make_etag(*parts)
+
 
 @router.get("/test")
 def test_database_connection():
@@ -112,18 +144,27 @@ def list_organizations(
 
 @router.get("/organizations/{org_login}")
 def get_organization_details(
+    request: Request,
+    response: Response,
     org_login: str = Path(..., description="GitHub organization login"),
     db: Session = Depends(get_database)
 ):
     """
     Get detailed information about a specific organization.
     Includes repositories, members, and recent activity.
+    Supports If-None-Match against the organization's event watermark.
     """
     try:
         org = db.query(Organization).filter(Organization.login == org_login).first()
         if not org:
             raise HTTPException(status_code=404, detail="Organization not found")
         
+        not_modified = conditional_response(
+            request, response, _etag(request, event_watermark(db, org.id), sliding_window=True)
+        )
+        if not_modified:
+            return not_modified
+        
         # Get repositories
         repositories = db.query(Repository).filter(Repository.organization_id == org.id).all()
         
@@ -255,8 +296,336 @@ def list_repositories(
         raise HTTPException(status_code=500, detail="Failed to retrieve repositories")
 
 
+def _history_window(
+    at: Optional[datetime],
+    start: Optional[datetime],
+    end: Optional[datetime]
+) -> Dict[str, Optional[datetime]]:
+    """Validate point-in-time / range parameters; naive timestamps are taken as UTC."""
+    def as_utc(value: Optional[datetime]) -> Optional[datetime]:
+        return value.replace(tzinfo=timezone.utc) if value and not value.tzinfo else value
+    
+    at, start, end = as_utc(at), as_utc(start), as_utc(end)
+    if at and (start or end):
+        raise HTTPException(status_code=400, detail="Use either 'at' or 'start'/'end', not both")
+    if start and end and end <= start:
+        raise HTTPException(status_code=400, detail="'end' must be after 'start'")
+    if not (at or start or end):
+        at = datetime.now(timezone.utc)
+    return {"at": at, "start": start, "end": end}
+
+
+def _history_filter(model, window: Dict[str, Optional[datetime]]):
+    """
+    Periods valid at window["at"], or overlapping [start, end).
+    
+    Both are range operators on valid_during, answered by the GiST indexes.
+    """
+    if window["at"]:
+        return model.valid_during.contains(window["at"])
+    return model.valid_during.overlaps(func.tstzrange(window["start"], window["end"], "[)"))
+
+
+def _effective_access(access: EffectivePermission, **names) -> Dict[str, Any]:
+    sources = [
+        source for source, granted in (
+            ("collaborator", access.via_collaborator), ("team", access.via_team),
+            ("organization", access.via_organization)
+        ) if granted
+    ]
+    return {
+        "user_id": access.user_id, "repository_id": access.repository_id, **names,
+        "permission": access.permission, "via": sources
+    }
+
+
+def _period(row) -> Dict[str, Any]:
+    return {"valid_from": row.valid_from, "valid_to": row.valid_to, "current": row.valid_to is None}
+
+
+@router.get("/organizations/{org_login}/members/history")
+def get_organization_member_history(
+    org_login: str = Path(..., description="GitHub organization login"),
+    at: Optional[datetime] = Query(None, description="Point in time (default: now)"),
+    start: Optional[datetime] = Query(None, description="Range start: periods overlapping [start, end)"),
+    end: Optional[datetime] = Query(None, description="Range end (open-ended if omitted)"),
+    db: Session = Depends(get_database)
+):
+    """
+    Get who was a member of an organization, and with which role, at a point in time
+    or during a time range.
+    """
+    try:
+        window = _history_window(at, start, end)
+        org = db.query(Organization).filter(Organization.login == org_login).first()
+        if not org:
+            raise HTTPException(status_code=404, detail="Organization not found")
+        
+        rows = (
+            db.query(OrganizationMembershipHistory, User.login)
+            .join(User, User.id == OrganizationMembershipHistory.user_id)
+            .filter(
+                OrganizationMembershipHistory.organization_id == org.id,
+                _history_filter(OrganizationMembershipHistory, window)
+            )
+            .order_by(User.login, OrganizationMembershipHistory.valid_from)
+            .all()
+        )
+        
+        return {
+            "organization": org_login,
+            **window,
+            "members": [
+                {"user_id": period.user_id, "login": login, "role": period.role, **_period(period)}
+                for period, login in rows
+            ],
+            "total": len(rows)
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting organization member history: {e}")
+        raise HTTPException(status_code=500, detail="Failed to retrieve organization member history")
+
+
+@router.get("/repositories/{owner}/{repo}/collaborators/history")
+def get_repository_collaborator_history(
+    owner: str = Path(..., description="Repository owner login"),
+    repo: str = Path(..., description="Repository name"),
+    at: Optional[datetime] = Query(None, description="Point in time (default: now)"),
+    start: Optional[datetime] = Query(None, description="Range start: periods overlapping [start, end)"),
+    end: Optional[datetime] = Query(None, description="Range end (open-ended if omitted)"),
+    db: Session = Depends(get_database)
+):
+    """
+    Get who could access a repository as a collaborator, and with which permission,
+    at a point in time or during a time range.
+    """
+    try:
+        window = _history_window(at, start, end)
+        full_name = f"{owner}/{repo}"
+        repository = db.query(Repository).filter(Repository.full_name == full_name).first()
+        if not repository:
+            raise HTTPException(status_code=404, detail="Repository not found")
+        
+        rows = (
+            db.query(RepositoryCollaboratorHistory, User.login)
+            .join(User, User.id == RepositoryCollaboratorHistory.user_id)
+            .filter(
+                RepositoryCollaboratorHistory.repository_id == repository.id,
+                _history_filter(RepositoryCollaboratorHistory, window)
+            )
+            .order_by(User.login, RepositoryCollaboratorHistory.valid_from)
+            .all()
+        )
+        
+        return {
+            "repository": full_name,
+            **window,
+            "collaborators": [
+                {"user_id": period.user_id, "login": login, "permission": period.permission, **_period(period)}
+                for period, login in rows
+            ],
+            "total": len(rows)
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting repository collaborator history: {e}")
+        raise HTTPException(status_code=500, detail="Failed to retrieve repository collaborator history")
+
+
+@router.get("/users/{user_login}/access/history")
+def get_user_access_history(
+    user_login: str = Path(..., description="GitHub user login"),
+    at: Optional[datetime] = Query(None, description="Point in time (default: now)"),
+    start: Optional[datetime] = Query(None, description="Range start: periods overlapping [start, end)"),
+    end: Optional[datetime] = Query(None, description="Range end (open-ended if omitted)"),
+    db: Session = Depends(get_database)
+):
+    """
+    Get the organizations and repositories a user had access to at a point in time
+    or during a time range.
+    """
+    try:
+        window = _history_window(at, start, end)
+        user = db.query(User).filter(User.login == user_login).first()
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        
+        memberships = (
+            db.query(OrganizationMembershipHistory, Organization.login)
+            .join(Organization, Organization.id == OrganizationMembershipHistory.organization_id)
+            .filter(
+                OrganizationMembershipHistory.user_id == user.id,
+                _history_filter(OrganizationMembershipHistory, window)
+            )
+            .order_by(Organization.login, OrganizationMembershipHistory.valid_from)
+            .all()
+        )
+        collaborations = (
+            db.query(RepositoryCollaboratorHistory, Repository.full_name)
+            .join(Repository, Repository.id == RepositoryCollaboratorHistory.repository_id)
+            .filter(
+                RepositoryCollaboratorHistory.user_id == user.id,
+                _history_filter(RepositoryCollaboratorHistory, window)
+            )
+            .order_by(Repository.full_name, RepositoryCollaboratorHistory.valid_from)
+            .all()
+        )
+        
+        return {
+            "user": user_login,
+            **window,
+            "organizations": [
+                {"organization_id": period.organization_id, "login": login, "role": period.role, **_period(period)}
+                for period, login in memberships
+            ],
+            "repositories": [
+                {"repository_id": period.repository_id, "full_name": full_name,
+                 "permission": period.permission, **_period(period)}
+                for period, full_name in collaborations
+            ]
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting user access history: {e}")
+        raise HTTPException(status_code=500, detail="Failed to retrieve user access history")
+
+
+@router.get("/users/{user_login}/repositories")
+def get_user_repositories(
+    user_login: str = Path(..., description="GitHub user login"),
+    permission: str = Query("read", pattern=PERMISSION_PATTERN, description="Minimum effective permission"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, le=1000),
+    db: Session = Depends(get_database)
+):
+    """
+    Get the repositories a user can currently access with at least the given permission,
+    through collaboration, teams or organization ownership.
+    """
+    try:
+        user = db.query(User).filter(User.login == user_login).first()
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        
+        rows = (
+            db.query(EffectivePermission, Repository.full_name)
+            .join(Repository, Repository.id == EffectivePermission.repository_id)
+            .filter(
+                EffectivePermission.user_id == user.id,
+                EffectivePermission.permission.in_(permissions_at_least(permission))
+            )
+            .order_by(EffectivePermission.repository_id)
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+        
+        return {
+            "user": user_login,
+            "permission": permission,
+            "repositories": [_effective_access(access, full_name=full_name) for access, full_name in rows],
+            "total": len(rows),
+            "skip": skip,
+            "limit": limit
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting user repositories: {e}")
+        raise HTTPException(status_code=500, detail="Failed to retrieve user repositories")
+
+
+@router.get("/repositories/{owner}/{repo}/users")
+def get_repository_users(
+    owner: str = Path(..., description="Repository owner login"),
+    repo: str = Path(..., description="Repository name"),
+    permission: str = Query("read", pattern=PERMISSION_PATTERN, description="Minimum effective permission"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, le=1000),
+    db: Session = Depends(get_database)
+):
+    """
+    Get the users who can currently access a repository with at least the given
+    permission (e.g. permission=admin for everyone with admin access).
+    """
+    try:
+        full_name = f"{owner}/{repo}"
+        repository = db.query(Repository).filter(Repository.full_name == full_name).first()
+        if not repository:
+            raise HTTPException(status_code=404, detail="Repository not found")
+        
+        rows = (
+            db.query(EffectivePermission, User.login)
+            .join(User, User.id == EffectivePermission.user_id)
+            .filter(
+                EffectivePermission.repository_id == repository.id,
+                EffectivePermission.permission.in_(permissions_at_least(permission))
+            )
+            .order_by(EffectivePermission.user_id)
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+        
+        return {
+            "repository": full_name,
+            "permission": permission,
+            "users": [_effective_access(access, login=login) for access, login in rows],
+            "total": len(rows),
+            "skip": skip,
+            "limit": limit
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting repository users: {e}")
+        raise HTTPException(status_code=500, detail="Failed to retrieve repository users")
+
+
+def _filter_events(
+    query,
+    event_type: Optional[str],
+    org: Optional[Organization],
+    repository_name: Optional[str],
+    sender_login: Optional[str],
+    since: Optional[datetime],
+    until: Optional[datetime]
+):
+    """Apply the event list filters to an ORM query or a SELECT (shared by /events and /events/export)."""
+    if event_type:
+        query = query.filter(WebhookEvent.event_type == event_type)
+    
+    if org:
+        query = query.filter(WebhookEvent.organization_id == org.id)
+    
+    if repository_name:
+        query = query.filter(WebhookEvent.repository_name.ilike(f"%{repository_name}%"))
+    
+    if sender_login:
+        query = query.filter(WebhookEvent.sender_login.ilike(f"%{sender_login}%"))
+    
+    if since:
+        query = query.filter(WebhookEvent.received_at >= since)
+    
+    if until:
+        query = query.filter(WebhookEvent.received_at <= until)
+    
+    return query
+
+
 @router.get("/events")
 def list_webhook_events(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_database),
     event_type: Optional[str] = Query(None, description="Filter by event type"),
     organization_login: Optional[str] = Query(None, description="Filter by organization"),
@@ -270,30 +639,24 @@ def list_webhook_events(
     """
     List webhook events with filtering capabilities.
     Provides audit trail of all GitHub activities.
+    Supports If-None-Match against the event and processing watermarks of the
+    organization filter.
     """
     try:
-        query = db.query(WebhookEvent)
-        
-        # Apply filters
-        if event_type:
-            query = query.filter(WebhookEvent.event_type == event_type)
-        
+        org = None
         if organization_login:
             org = db.query(Organization).filter(Organization.login == organization_login).first()
-            if org:
-                query = query.filter(WebhookEvent.organization_id == org.id)
-        
-        if repository_name:
-            query = query.filter(WebhookEvent.repository_name.ilike(f"%{repository_name}%"))
-        
-        if sender_login:
-            query = query.filter(WebhookEvent.sender_login.ilike(f"%{sender_login}%"))
         
-        if since:
-            query = query.filter(WebhookEvent.received_at >= since)
+        # Items carry their processing status, which changes without new events
+        organization_id = org.id if org else None
+        watermark = (event_watermark(db, organization_id), unprocessed_watermark(db, organization_id))
+        not_modified = conditional_response(request, response, _etag(request, watermark))
+        if not_modified:
+            return not_modified
         
-        if until:
-            query = query.filter(WebhookEvent.received_at <= until)
+        query = _filter_events(
+            db.query(WebhookEvent), event_type, org, repository_name, sender_login, since, until
+        )
         
         # Order by most recent first
         query = query.order_by(WebhookEvent.received_at.desc())
@@ -335,6 +698,128 @@ def list_webhook_events(
         raise HTTPException(status_code=500, detail="Failed to retrieve events")
 
 
+# Columns of /events/export, in CSV column order
+EXPORT_COLUMNS = (
+    WebhookEvent.id, WebhookEvent.event_id, WebhookEvent.delivery_id, WebhookEvent.event_type,
+    WebhookEvent.event_action, WebhookEvent.organization_login, WebhookEvent.repository_name,
+    WebhookEvent.sender_login, WebhookEvent.event_timestamp, WebhookEvent.received_at, WebhookEvent.processed
+)
+# Rows fetched from the server-side cursor, and rows per chunk written to the response
+EXPORT_BATCH_SIZE = 1000
+
+
+def _export_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def _ndjson_chunks(rows, include_payload: bool) -> Iterator[str]:
+    """One JSON object per line; payloads are spliced in as the JSON text stored in the database."""
+    names = [column.key for column in EXPORT_COLUMNS]
+    lines = []
+    for row in rows:
+        record = json.dumps({name: _export_value(value) for name, value in zip(names, row)})
+        if include_payload:
+            record = f'{record[:-1]}, "payload": {row[-1] or "null"}}}'
+        lines.append(record)
+        if len(lines) >= EXPORT_BATCH_SIZE:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+def _csv_chunks(rows, include_payload: bool) -> Iterator[str]:
+    """CSV with a header row; the payload column holds the JSON text."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([column.key for column in EXPORT_COLUMNS] + (["payload"] if include_payload else []))
+    for count, row in enumerate(rows, start=1):
+        writer.writerow([_export_value(value) for value in row])
+        if count % EXPORT_BATCH_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _gzip_chunks(chunks: Iterator[str]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk.encode("utf-8"))
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    for coding in accept_encoding.split(","):
+        name, _, params = coding.strip().partition(";")
+        if name.strip().lower() == "gzip":
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+def _stream_rows(result) -> Iterator:
+    try:
+        yield from result
+    finally:
+        result.close()
+
+
+@router.get("/events/export")
+def export_webhook_events(
+    request: Request,
+    db: Session = Depends(get_database),
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="Output format"),
+    include_payload: bool = Query(False, description="Include the full webhook payload"),
+    event_type: Optional[str] = Query(None, description="Filter by event type"),
+    organization_login: Optional[str] = Query(None, description="Filter by organization"),
+    repository_name: Optional[str] = Query(None, description="Filter by repository"),
+    sender_login: Optional[str] = Query(None, description="Filter by sender"),
+    since: Optional[datetime] = Query(None, description="Events since this timestamp"),
+    until: Optional[datetime] = Query(None, description="Events until this timestamp")
+):
+    """
+    Export the audit trail as NDJSON or CSV, in event ID order.
+    Takes the same filters as /events without a page limit. Rows are streamed
+    from a server-side cursor, so memory use does not depend on the result size.
+    The response is gzip-compressed when the client accepts it.
+    """
+    try:
+        org = None
+        if organization_login:
+            org = db.query(Organization).filter(Organization.login == organization_login).first()
+        
+        columns = list(EXPORT_COLUMNS)
+        if include_payload:
+            columns.append(cast(WebhookEvent.payload, Text))
+        statement = (
+            _filter_events(select(*columns), event_type, org, repository_name, sender_login, since, until)
+            .order_by(WebhookEvent.id)
+            .execution_options(stream_results=True, yield_per=EXPORT_BATCH_SIZE)
+        )
+        rows = _stream_rows(db.execute(statement))
+        
+    except Exception as e:
+        logger.error(f"Error exporting events: {e}")
+        raise HTTPException(status_code=500, detail="Failed to export events")
+    
+    chunks = _ndjson_chunks(rows, include_payload) if format == "ndjson" else _csv_chunks(rows, include_payload)
+    headers = {
+        "Content-Disposition": f'attachment; filename="audit-events.{format}"',
+        "Vary": "Accept-Encoding",
+    }
+    if _accepts_gzip(request.headers.get("accept-encoding", "")):
+        chunks = _gzip_chunks(chunks)
+        headers["Content-Encoding"] = "gzip"
+    media_type = "application/x-ndjson" if format == "ndjson" else "text/csv; charset=utf-8"
+    return StreamingResponse(chunks, media_type=media_type, headers=headers)
+
+
 @router.get("/events/{event_id}")
 def get_event_details(
     event_id: str = Path(..., description="Webhook event ID"),
@@ -377,8 +862,95 @@ def get_event_details(
         raise HTTPException(status_code=500, detail="Failed to retrieve event details")
 
 
+def _analytics_summary(
+    db: Session, org: Optional[Organization], organization_login: Optional[str], days: int
+) -> Dict[str, Any]:
+    """Aggregate the events of the last `days` days (of one organization, if given)."""
+    start_date = datetime.now().replace(tzinfo=datetime.now().astimezone().tzinfo) - timedelta(days=days)
+    
+    query = db.query(WebhookEvent).filter(WebhookEvent.received_at >= start_date)
+    
+    # Filter by organization if specified
+    if org:
+        query = query.filter(WebhookEvent.organization_id == org.id)
+    
+    events = query.all()
+    
+    # Calculate analytics
+    total_events = len(events)
+    unique_repositories = len(set(event.repository_name for event in events if event.repository_name))
+    unique_users = len(set(event.sender_login for event in events if event.sender_login))
+    
+    # Event type distribution
+    event_types = {}
+    for event in events:
+        event_types[event.event_type] = event_types.get(event.event_type, 0) + 1
+    
+    # Daily activity (last 7 days)
+    daily_activity = {}
+    now = datetime.now().replace(tzinfo=datetime.now().astimezone().tzinfo)
+    for i in range(7):
+        day = now - timedelta(days=i)
+        day_str = day.strftime('%Y-%m-%d')
+        daily_activity[day_str] = 0
+    
+    for event in events:
+        seven_days_ago = now - timedelta(days=7)
+        if event.received_at >= seven_days_ago:
+            day_str = event.received_at.strftime('%Y-%m-%d')
+            if day_str in daily_activity:
+                daily_activity[day_str] += 1
+    
+    # Top active repositories
+    repo_activity = {}
+    for event in events:
+        if event.repository_name:
+            repo_activity[event.repository_name] = repo_activity.get(event.repository_name, 0) + 1
+    
+    top_repos = sorted(repo_activity.items(), key=lambda x: x[1], reverse=True)[:10]
+    
+    # Top active users
+    user_activity = {}
+    for event in events:
+        if event.sender_login:
+            user_activity[event.sender_login] = user_activity.get(event.sender_login, 0) + 1
+    
+    top_users = sorted(user_activity.items(), key=lambda x: x[1], reverse=True)[:10]
+    
+    return {
+        "period": {
+            "days": days,
+            "start_date": start_date,
+            "end_date": datetime.utcnow(),
+            "organization": organization_login
+        },
+        "summary": {
+            "total_events": total_events,
+            "unique_repositories": unique_repositories,
+            "unique_users": unique_users,
+            "avg_events_per_day": round(total_events / days, 2)
+        },
+        "event_types": event_types,
+        "daily_activity": daily_activity,
+        "top_repositories": [{"name": repo, "events": count} for repo, count in top_repos],
+        "top_users": [{"login": user, "events": count} for user, count in top_users]
+    }
+
+
+def _summarize(
+    db: Session, org: Optional[Organization], organization_login: Optional[str], days: int
+) -> Dict[str, Any]:
+    """Answer from the in-memory analytics engine when it covers the period, else from the database."""
+    if not event_analytics.covers(days):
+        return _analytics_summary(db, org, organization_login, days)
+    event_analytics.refresh(db)
+    return event_analytics.summary(days, org.id if org else None, organization_login)
+
+
 @router.get("/analytics/summary")
 def get_analytics_summary(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_database),
     organization_login: Optional[str] = Query(None, description="Filter by organization"),
     days: int = Query(30, ge=1, le=365, description="Number of days to analyze")
@@ -386,80 +958,62 @@ def get_analytics_summary(
     """
     Get analytics summary for the specified time period.
     Provides overview of activity, trends, and insights.
+    Supports If-None-Match against the event watermark of the organization filter;
+    other requests are answered from the response cache, which new events invalidate.
+    Periods within ANALYTICS_WINDOW_DAYS are computed by the in-memory analytics engine.
     """
     try:
-        start_date = datetime.now().replace(tzinfo=datetime.now().astimezone().tzinfo) - timedelta(days=days)
-        
-        query = db.query(WebhookEvent).filter(WebhookEvent.received_at >= start_date)
-        
-        # Filter by organization if specified
+        org = None
         if organization_login:
             org = db.query(Organization).filter(Organization.login == organization_login).first()
-            if org:
-                query = query.filter(WebhookEvent.organization_id == org.id)
-        
-        events = query.all()
-        
-        # Calculate analytics
-        total_events = len(events)
-        unique_repositories = len(set(event.repository_name for event in events if event.repository_name))
-        unique_users = len(set(event.sender_login for event in events if event.sender_login))
-        
-        # Event type distribution
-        event_types = {}
-        for event in events:
-            event_types[event.event_type] = event_types.get(event.event_type, 0) + 1
-        
-        # Daily activity (last 7 days)
-        daily_activity = {}
-        now = datetime.now().replace(tzinfo=datetime.now().astimezone().tzinfo)
-        for i in range(7):
-            day = now - timedelta(days=i)
-            day_str = day.strftime('%Y-%m-%d')
-            daily_activity[day_str] = 0
-        
-        for event in events:
-            seven_days_ago = now - timedelta(days=7)
-            if event.received_at >= seven_days_ago:
-                day_str = event.received_at.strftime('%Y-%m-%d')
-                if day_str in daily_activity:
-                    daily_activity[day_str] += 1
-        
-        # Top active repositories
-        repo_activity = {}
-        for event in events:
-            if event.repository_name:
-                repo_activity[event.repository_name] = repo_activity.get(event.repository_name, 0) + 1
         
-        top_repos = sorted(repo_activity.items(), key=lambda x: x[1], reverse=True)[:10]
+        not_modified = conditional_response(
+            request, response, _etag(request, event_watermark(db, org.id if org else None), sliding_window=True)
+        )
+        if not_modified:
+            return not_modified
         
-        # Top active users
-        user_activity = {}
-        for event in events:
-            if event.sender_login:
-                user_activity[event.sender_login] = user_activity.get(event.sender_login, 0) + 1
+        return response_cache.get_or_compute(
+            "analytics_summary",
+            {"organization_login": organization_login, "days": days},
+            lambda: _summarize(db, org, organization_login, days),
+            scopes=[organization_scope(org.id if org else None)]
+        )
         
-        top_users = sorted(user_activity.items(), key=lambda x: x[1], reverse=True)[:10]
+    except Exception as e:
+        logger.error(f"Error generating analytics summary: {e}")
+        raise HTTPException(status_code=500, detail="Failed to generate analytics summary")
+
+
+@router.get("/analytics/leaderboard")
+def get_analytics_leaderboard(
+    db: Session = Depends(get_database),
+    organization_login: Optional[str] = Query(None, description="Filter by organization"),
+    days: int = Query(7, ge=1, description="Number of UTC days, today included"),
+    limit: int = Query(10, ge=1, le=100, description="Number of top repositories and users")
+):
+    """
+    Get approximate top repositories, top users and distinct counts from streaming sketches.
+    Each count overestimates by at most its `error`; distinct counts carry their relative
+    standard error. Covers at most SKETCH_RETENTION_DAYS days.
+    """
+    if days > get_settings().SKETCH_RETENTION_DAYS:
+        raise HTTPException(
+            status_code=400, detail=f"Leaderboards cover at most {get_settings().SKETCH_RETENTION_DAYS} days"
+        )
+    try:
+        org = None
+        if organization_login:
+            org = db.query(Organization).filter(Organization.login == organization_login).first()
+            if not org:
+                raise HTTPException(status_code=404, detail="Organization not found")
         
-        return {
-            "period": {
-                "days": days,
-                "start_date": start_date,
-                "end_date": datetime.utcnow(),
-                "organization": organization_login
-            },
-            "summary": {
-                "total_events": total_events,
-                "unique_repositories": unique_repositories,
-                "unique_users": unique_users,
-                "avg_events_per_day": round(total_events / days, 2)
-            },
-            "event_types": event_types,
-            "daily_activity": daily_activity,
-            "top_repositories": [{"name": repo, "events": count} for repo, count in top_repos],
-            "top_users": [{"login": user, "events": count} for user, count in top_users]
-        }
+        return leaderboard_service.leaderboard(
+            db, org.id if org else None, days=days, limit=limit, organization_login=organization_login
+        )
         
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error generating analytics summary: {e}")
-        raise HTTPException(status_code=500, detail="Failed to generate analytics summary")
\ No newline at end of file
+        logger.error(f"Error generating analytics leaderboard: {e}")
+        raise HTTPException(status_code=500, detail="Failed to generate analytics leaderboard")
@@ -0,0 +1,131 @@
+"""
+Real-time event API for dashboards.
+Streams newly stored webhook events over Server-Sent Events or WebSockets,
+filtered to the requested repositories and organizations.
+"""
+
+from fastapi import APIRouter, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from typing import Dict, Any, List, Optional
+import asyncio
+import logging
+
+from app.core.config import get_settings
+from app.services.event_bus import event_bus
+from app.services.realtime_hub import (
+    HubFullError, organization_channel, realtime_hub, repository_channel
+)
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/realtime", tags=["realtime"])
+
+
+def _channels(repository: Optional[List[str]], organization: Optional[List[str]]) -> List[str]:
+    """Channels for the repository (owner/name) and organization filters; all events without any."""
+    return [repository_channel(name) for name in repository or []] + [
+        organization_channel(login) for login in organization or []
+    ]
+
+
+def _sse_frame(event_id: Optional[int], data: str) -> str:
+    if event_id is None:
+        return f"event: lagged\ndata: {data}\n\n"
+    return f"id: {event_id}\nevent: webhook\ndata: {data}\n\n"
+
+
+@router.get("/events")
+async def stream_events(
+    repository: Optional[List[str]] = Query(None, description="Repository full names (owner/name) to follow"),
+    organization: Optional[List[str]] = Query(None, description="Organization logins to follow")
+):
+    """
+    Stream new webhook events as Server-Sent Events.
+
+    Each message is a `webhook` event with the event JSON. A `lagged` event
+    reports how many messages were dropped because the client read too slowly.
+    Comment lines are sent as heartbeats while there is no traffic.
+    """
+    settings = get_settings()
+    if realtime_hub.subscriber_count >= settings.REALTIME_MAX_SUBSCRIBERS:
+        raise HTTPException(status_code=503, detail="Too many real-time subscribers")
+    heartbeat = settings.REALTIME_HEARTBEAT_SECONDS
+
+    async def frames():
+        # Subscribe once streaming starts: a client gone before then never
+        # runs this generator, so it would never run the finally below
+        try:
+            subscription = realtime_hub.subscribe(_channels(repository, organization))
+        except HubFullError:
+            return
+        try:
+            yield ": connected\n\n"
+            # Starlette cancels this generator when the client disconnects
+            while True:
+                batch = await subscription.next_batch(heartbeat)
+                if not batch:
+                    yield ": heartbeat\n\n"
+                    continue
+                yield "".join(_sse_frame(event_id, data) for event_id, data in batch)
+        finally:
+            realtime_hub.unsubscribe(subscription)
+
+    return StreamingResponse(
+        frames(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.websocket("/ws")
+async def websocket_events(
+    websocket: WebSocket,
+    repository: Optional[List[str]] = Query(None),
+    organization: Optional[List[str]] = Query(None)
+):
+    """
+    Stream new webhook events over a WebSocket.
+
+    Messages are JSON objects of type "event" (with the event) or "lagged"
+    (with the number of dropped messages). Messages sent by the client are ignored.
+    """
+    try:
+        subscription = realtime_hub.subscribe(_channels(repository, organization))
+    except HubFullError:
+        await websocket.close(code=1013)
+        return
+
+    await websocket.accept()
+    heartbeat = get_settings().REALTIME_HEARTBEAT_SECONDS
+
+    async def receive_until_closed():
+        try:
+            while True:
+                await websocket.receive_text()
+        except WebSocketDisconnect:
+            pass
+
+    closed = asyncio.create_task(receive_until_closed())
+    try:
+        while not closed.done():
+            batch_task = asyncio.create_task(subscription.next_batch(heartbeat))
+            await asyncio.wait({batch_task, closed}, return_when=asyncio.FIRST_COMPLETED)
+            if not batch_task.done():
+                batch_task.cancel()
+                break
+            for _, data in batch_task.result():
+                await websocket.send_text(data)
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        closed.cancel()
+        realtime_hub.unsubscribe(subscription)
+
+
+@router.get("/stats")
+async def get_realtime_stats() -> Dict[str, Any]:
+    """
+    Get the subscribers, channels and lagging subscribers of this worker,
+    and the state of its cross-worker event bus.
+    """
+    return {**realtime_hub.get_stats(), "event_bus": event_bus.get_stats()}
@@ -5,11 +5,13 @@ Receives and processes GitHub webhook events using the existing webhook_models.
 
 from fastapi import APIRouter, Request, Header, HTTPException, Depends, BackgroundTasks
 from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
 from typing import Optional, Dict, Any
 from sqlalchemy.orm import Session
 import logging
 
 from app.core.database import get_database
+from app.services.admission_service import admission_controller
 from app.services.webhook_service import webhook_receiver_service
 
 logger = logging.getLogger(__name__)
@@ -25,6 +27,9 @@ async def receive_github_webhook(
     x_github_event: str = Header(..., alias="X-GitHub-Event"),
     x_github_delivery: Optional[str] = Header(None, alias="X-GitHub-Delivery"),
     x_hub_signature_256: Optional[str] = Header(None, alias="X-Hub-Signature-256"),
+    x_github_hook_id: Optional[str] = Header(None, alias="X-GitHub-Hook-ID"),
+    x_github_hook_target_type: Optional[str] = Header(None, alias="X-GitHub-Hook-Installation-Target-Type"),
+    x_github_hook_target_id: Optional[str] = Header(None, alias="X-GitHub-Hook-Installation-Target-ID"),
     user_agent: Optional[str] = Header(None, alias="User-Agent")
 ):
     """
@@ -37,7 +42,8 @@ async def receive_github_webhook(
     - push (git push events)
     - issues (opened, closed, etc.)
     - pull_request (opened, closed, merged, etc.)
-    - team (added_to_repository)
+    - team (created, edited, deleted, added_to_repository, removed_from_repository)
+    - membership (team member added, removed)
     - fork (repository forked)
     - create/delete (branch/tag operations)
     - issue_comment (created, edited, deleted)
@@ -52,26 +58,44 @@ async def receive_github_webhook(
     - personal_access_token_request (PAT requests)
     """
     try:
-        # Get raw request body for signature validation
-        payload_body = await request.body()
-        
         # Extract headers for processing
         headers = {
             'x-github-event': x_github_event,
             'x-github-delivery': x_github_delivery,
             'x-hub-signature-256': x_hub_signature_256,
+            'x-github-hook-id': x_github_hook_id,
+            'x-github-hook-installation-target-type': x_github_hook_target_type,
+            'x-github-hook-installation-target-id': x_github_hook_target_id,
             'user-agent': user_agent
         }
         
-        logger.info(f"Received GitHub webhook: {x_github_event} - {x_github_delivery}")
+        # Admission control before any body is read
+        decision = admission_controller.try_admit(headers)
+        if not decision.admitted:
+            return await _shed_webhook(request, headers, decision)
         
-        # Process webhook using the service
-        result = await webhook_receiver_service.process_webhook(
-            payload_body=payload_body,
-            headers=headers,
-            background_tasks=background_tasks,
-            db=db
-        )
+        try:
+            # Stream the raw request body, verifying the signature as chunks arrive
+            try:
+                payload_body = await webhook_receiver_service.read_webhook_body(request, headers)
+            except HTTPException as e:
+                if e.status_code == 401:
+                    # Forged deliveries must not spend the rate limit of the hook they name
+                    admission_controller.refund(decision)
+                raise
+            
+            logger.info(f"Received GitHub webhook: {x_github_event} - {x_github_delivery}")
+            
+            # Process webhook using the service
+            result = await webhook_receiver_service.process_webhook(
+                payload_body=payload_body,
+                headers=headers,
+                background_tasks=background_tasks,
+                db=db,
+                signature_verified=True
+            )
+        finally:
+            admission_controller.release()
         
         # Return success response
         return JSONResponse(
@@ -91,6 +115,39 @@ async def receive_github_webhook(
         )
 
 
+async def _shed_webhook(request: Request, headers: Dict[str, Any], decision) -> JSONResponse:
+    """
+    Handle a webhook that was not admitted.
+    Spools the verified delivery to disk when WEBHOOK_SPOOL_DIR is set,
+    otherwise rejects it with 429/503 and Retry-After.
+    """
+    delivery_id = headers.get('x-github-delivery')
+    
+    if admission_controller.spool_enabled:
+        payload_body = await webhook_receiver_service.read_webhook_body(request, headers)
+        try:
+            spool_file = await run_in_threadpool(admission_controller.spool, headers, payload_body)
+        except UnicodeDecodeError:
+            raise HTTPException(status_code=400, detail="Webhook body is not valid UTF-8")
+        logger.warning(f"Spooled webhook {delivery_id} to {spool_file.name} ({decision.reason})")
+        return JSONResponse(
+            status_code=202,
+            content={
+                "status": "spooled",
+                "event_type": headers.get('x-github-event'),
+                "delivery_id": delivery_id,
+                "reason": decision.reason
+            }
+        )
+    
+    logger.warning(f"Shed webhook {delivery_id}: {decision.reason}")
+    raise HTTPException(
+        status_code=decision.status_code,
+        detail=f"Webhook not admitted: {decision.reason}",
+        headers={"Retry-After": str(decision.retry_after)}
+    )
+
+
 @router.get("/github/events")
 async def list_supported_events():
     """
@@ -117,6 +174,24 @@ async def list_supported_events():
     }
 
 
+@router.get("/github/stats")
+async def webhook_stats():
+    """
+    Webhook receiver statistics.
+    Per-hook signature verification counts, including failures and
+    deliveries still signed with a rotation (non-primary) secret,
+    duplicate delivery counts, and admitted/shed/spooled request counts.
+    """
+    from app.services.idempotency_service import idempotency_service
+    from app.services.signature_service import signature_service
+    
+    return {
+        "admission": admission_controller.get_stats(),
+        "signatures": signature_service.get_stats(),
+        "idempotency": idempotency_service.get_stats()
+    }
+
+
 @router.get("/github/test")
 async def test_webhook_endpoint():
     """
@@ -152,6 +227,7 @@ async def simulate_webhook_event(
     """
     try:
         import json
+        import uuid
         from app.core.config import get_settings
         
         settings = get_settings()
@@ -166,7 +242,7 @@ async def simulate_webhook_event(
         # Simulate headers
         headers = {
             'x-github-event': event_type,
-            'x-github-delivery': delivery_id or "simulated-delivery",
+            'x-github-delivery': delivery_id or f"simulated-{uuid.uuid4()}",
             'x-hub-signature-256': None,  # Skip signature validation for simulation
             'user-agent': 'GitHub-Hookshot/simulation'
         }
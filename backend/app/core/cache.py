@@ -0,0 +1,274 @@
+"""
+Read-through response cache for expensive read endpoints.
+
+Entries live in an in-process LRU by default, or in Redis when REDIS_URL is set
+so every worker shares them. Keys are built from the endpoint, its parameters
+and the generation of each scope the response depends on (all events, or one
+organization). Ingesting an event bumps its scopes' generations, so stale
+entries are never read again and age out on their own. Identical requests that
+miss at the same time are coalesced: one computes, the others wait for it.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from fastapi.encoders import jsonable_encoder
+
+from app.core.config import get_settings
+from app.core.metrics import RESPONSE_CACHE_REQUESTS
+
+try:
+    import redis
+except ImportError:  # Optional: without it only the in-process backend is available
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+# Scope of responses computed over all events
+GLOBAL_SCOPE = "all"
+# Scope every key depends on; bumped to invalidate everything (e.g. after a bulk import)
+EPOCH_SCOPE = "epoch"
+
+# How long a computation may hold the cross-worker lock before waiters compute themselves
+LOCK_TIMEOUT_SECONDS = 30.0
+LOCK_POLL_SECONDS = 0.05
+
+
+def organization_scope(organization_id: Optional[int]) -> str:
+    """Scope of responses filtered to one organization (GLOBAL_SCOPE without one)."""
+    return f"org:{organization_id}" if organization_id else GLOBAL_SCOPE
+
+
+class MemoryBackend:
+    """In-process LRU with per-entry expiry. Locks are process-local, so always granted."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: int):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def generations(self, scopes: List[str]) -> List[int]:
+        with self._lock:
+            return [self._generations.get(scope, 0) for scope in scopes]
+
+    def bump(self, scopes: Iterable[str]):
+        with self._lock:
+            for scope in scopes:
+                self._generations[scope] = self._generations.get(scope, 0) + 1
+
+    def acquire_lock(self, key: str, timeout: float) -> Optional[str]:
+        return "local"
+
+    def release_lock(self, key: str, token: str):
+        pass
+
+
+class RedisBackend:
+    """
+    Redis-backed entries, generations and computation locks shared by all workers.
+
+    Redis errors are logged and treated as misses, so an unavailable Redis
+    only costs the cache, not the request.
+    """
+
+    # Delete the lock only if this worker still holds it
+    RELEASE_SCRIPT = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end return 0"
+
+    def __init__(self, url: str):
+        if redis is None:
+            raise RuntimeError("REDIS_URL is set but the redis package is not installed")
+        self.client = redis.Redis.from_url(url, socket_timeout=1.0, socket_connect_timeout=1.0)
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            value = self.client.get(key)
+        except redis.RedisError as e:
+            logger.warning(f"⚠️ Cache read failed: {e}")
+            return None
+        return value.decode("utf-8") if value is not None else None
+
+    def set(self, key: str, value: str, ttl: int):
+        try:
+            self.client.set(key, value, ex=ttl)
+        except redis.RedisError as e:
+            logger.warning(f"⚠️ Cache write failed: {e}")
+
+    def generations(self, scopes: List[str]) -> List[int]:
+        try:
+            values = self.client.mget([f"cache:generation:{scope}" for scope in scopes])
+        except redis.RedisError as e:
+            logger.warning(f"⚠️ Cache generation read failed: {e}")
+            # Unique generations: nothing cached under them can be read
+            return [-time.time_ns()] * len(scopes)
+        return [int(value) if value is not None else 0 for value in values]
+
+    def bump(self, scopes: Iterable[str]):
+        try:
+            pipeline = self.client.pipeline(transaction=False)
+            for scope in scopes:
+                pipeline.incr(f"cache:generation:{scope}")
+            pipeline.execute()
+        except redis.RedisError as e:
+            logger.warning(f"⚠️ Cache invalidation failed: {e}")
+
+    def acquire_lock(self, key: str, timeout: float) -> Optional[str]:
+        token = uuid.uuid4().hex
+        try:
+            acquired = self.client.set(f"{key}:lock", token, nx=True, px=int(timeout * 1000))
+        except redis.RedisError:
+            return token  # Compute without coordination
+        return token if acquired else None
+
+    def release_lock(self, key: str, token: str):
+        try:
+            self.client.eval(self.RELEASE_SCRIPT, 1, f"{key}:lock", token)
+        except redis.RedisError:
+            pass
+
+
+class _Flight:
+    """A computation other requests for the same key wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class ResponseCache:
+    """Read-through cache with single-flight computation and scope invalidation."""
+
+    def __init__(self, backend=None, ttl: Optional[int] = None):
+        settings = get_settings()
+        if backend is None:
+            backend = RedisBackend(settings.REDIS_URL) if settings.REDIS_URL else MemoryBackend(settings.CACHE_MAX_ENTRIES)
+        self.backend = backend
+        self.ttl = ttl or settings.CACHE_TTL_SECONDS
+        self._flights: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def shared(self) -> bool:
+        """Whether all workers share entries and invalidations (Redis backend)."""
+        return isinstance(self.backend, RedisBackend)
+
+    def key(self, endpoint: str, params: Dict[str, Any], scopes: Iterable[str]) -> str:
+        """Build the cache key of an endpoint call under the current scope generations."""
+        scopes = [EPOCH_SCOPE, *sorted(set(scopes))]
+        generations = ".".join(str(generation) for generation in self.backend.generations(scopes))
+        digest = hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+        return f"cache:{endpoint}:{generations}:{digest[:20]}"
+
+    def get_or_compute(
+        self,
+        endpoint: str,
+        params: Dict[str, Any],
+        compute: Callable[[], Any],
+        scopes: Iterable[str] = (GLOBAL_SCOPE,),
+        ttl: Optional[int] = None
+    ) -> Any:
+        """
+        Get a cached response, or compute and cache it.
+
+        Concurrent misses for the same key in this process share one
+        computation; with Redis, workers also wait for the one holding the
+        key's lock instead of computing it again.
+
+        Args:
+            endpoint: Name of the endpoint (key prefix)
+            params: Parameters the response depends on
+            compute: Builds the response; its result must be JSON-encodable
+            scopes: Scopes whose invalidation makes the response stale
+            ttl: Seconds to keep the entry (default CACHE_TTL_SECONDS)
+
+        Returns:
+            The JSON-compatible response (as returned by jsonable_encoder)
+        """
+        key = self.key(endpoint, params, scopes)
+        cached = self.backend.get(key)
+        if cached is not None:
+            RESPONSE_CACHE_REQUESTS.labels(endpoint, "hit").inc()
+            return json.loads(cached)
+
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            flight.done.wait()
+            RESPONSE_CACHE_REQUESTS.labels(endpoint, "coalesced").inc()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = self._compute_once(endpoint, key, compute, ttl or self.ttl)
+            return flight.value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def _compute_once(self, endpoint: str, key: str, compute: Callable[[], Any], ttl: int) -> Any:
+        token = self.backend.acquire_lock(key, LOCK_TIMEOUT_SECONDS)
+        deadline = time.monotonic() + LOCK_TIMEOUT_SECONDS
+        while token is None and time.monotonic() < deadline:
+            # Another worker is computing this key
+            time.sleep(LOCK_POLL_SECONDS)
+            cached = self.backend.get(key)
+            if cached is not None:
+                RESPONSE_CACHE_REQUESTS.labels(endpoint, "coalesced").inc()
+                return json.loads(cached)
+            token = self.backend.acquire_lock(key, LOCK_TIMEOUT_SECONDS)
+
+        RESPONSE_CACHE_REQUESTS.labels(endpoint, "miss").inc()
+        try:
+            value = jsonable_encoder(compute())
+            self.backend.set(key, json.dumps(value), ttl)
+            return value
+        finally:
+            if token is not None:
+                self.backend.release_lock(key, token)
+
+    def invalidate(self, scopes: Iterable[str]):
+        """Make every entry that depends on any of the scopes stale."""
+        self.backend.bump(set(scopes))
+
+    def invalidate_all(self):
+        """Make every entry stale."""
+        self.backend.bump([EPOCH_SCOPE])
+
+
+# Global cache instance
+response_cache = ResponseCache()
@@ -4,7 +4,7 @@ Handles environment variables, Supabase settings, and application configuration.
 """
 
 from functools import lru_cache
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pydantic import BaseSettings, validator
 import os
 
@@ -34,29 +34,98 @@ class Settings(BaseSettings):
     SUPABASE_SERVICE_ROLE_KEY: Optional[str] = None
     DATABASE_URL: Optional[str] = None
     
+    # Database diagnostics
+    DB_ECHO: bool = False  # SQLAlchemy echo of every statement (verbose, slow)
+    DB_SLOW_QUERY_MS: int = 200  # Statements at least this slow go to the slow query log
+    DB_EXPLAIN_SAMPLE_RATE: float = 0.0  # Fraction of slow SELECTs to EXPLAIN
+    
+    # Request profiling (middleware is only installed when enabled)
+    PROFILING_ENABLED: bool = False
+    PROFILING_SAMPLE_RATE: float = 0.01  # Fraction of eligible requests to profile
+    PROFILING_PATHS: List[str] = ["/api/v1/webhooks/github", "/api/v1/audit"]
+    PROFILING_EVENT_TYPES: List[str] = []  # Empty profiles every event type
+    PROFILING_INTERVAL_MS: int = 5
+    PROFILING_FORMAT: str = "speedscope"  # "speedscope" or "collapsed"
+    PROFILING_MAX_FILES: int = 200  # Older profiles in logs/profiles are deleted
+    
     # GitHub webhook settings
     GITHUB_WEBHOOK_SECRET: Optional[str] = None
+    # Per-hook secrets keyed by X-GitHub-Hook-ID or "<target_type>:<target_id>"
+    # (e.g. "organization:38302899"). List several secrets to rotate without downtime.
+    GITHUB_WEBHOOK_SECRETS: Dict[str, List[str]] = {}
     GITHUB_API_TOKEN: Optional[str] = None
+    WEBHOOK_MAX_BODY_BYTES: int = 25 * 1024 * 1024  # GitHub caps deliveries at 25MB
+    IDEMPOTENCY_CACHE_SIZE: int = 100_000  # Recent delivery IDs remembered per worker
     
     # Event processing settings
     MAX_RETRY_ATTEMPTS: int = 3
     RETRY_DELAY_SECONDS: int = 5
     BATCH_PROCESSING_SIZE: int = 100
     
+    # Payload decode/validation executor
+    PAYLOAD_EXECUTOR_TYPE: str = "thread"  # "thread", "process" or "none"
+    PAYLOAD_EXECUTOR_WORKERS: int = 4
+    PAYLOAD_OFFLOAD_THRESHOLD_BYTES: int = 64 * 1024  # 64KB
+
     # Cache settings
     REDIS_URL: Optional[str] = None
     CACHE_TTL_SECONDS: int = 300  # 5 minutes
+    CACHE_MAX_ENTRIES: int = 1024  # In-process response cache size (used when REDIS_URL is not set)
+    AUDIT_CACHE_MAX_AGE: int = 0  # Seconds clients may reuse audit responses before revalidating with their ETag
+    
+    # Columnar snapshots (export_snapshots.py) and the DuckDB query endpoint over them
+    SNAPSHOT_DIR: str = "data/snapshots"
+    ANALYTICS_QUERY_ENABLED: bool = False  # POST /analytics/query runs caller-supplied SQL
+    ANALYTICS_QUERY_TIMEOUT_SECONDS: float = 30.0
+    ANALYTICS_QUERY_MAX_ROWS: int = 10_000
+    
+    # In-memory analytics engine behind /audit/analytics/summary
+    ANALYTICS_ENGINE_ENABLED: bool = True
+    ANALYTICS_WINDOW_DAYS: int = 90  # Longer summaries are computed in the database
+    
+    # Streaming leaderboard sketches (Space-Saving top-K, HyperLogLog distinct counts)
+    SKETCH_TOP_K_CAPACITY: int = 200  # Counters per scope and day; counts are off by at most events / capacity
+    SKETCH_HLL_PRECISION: int = 12  # 4096 registers: ~1.6% relative error on distinct counts
+    SKETCH_CHECKPOINT_SECONDS: int = 60
+    SKETCH_RETENTION_DAYS: int = 30
     
-    # Rate limiting
+    # Real-time fan-out to dashboards (/realtime/events SSE and /realtime/ws)
+    REALTIME_QUEUE_SIZE: int = 100  # Messages buffered per subscriber; the oldest are dropped beyond this
+    REALTIME_MAX_SUBSCRIBERS: int = 5000  # Per worker
+    REALTIME_HEARTBEAT_SECONDS: float = 15.0
+    
+    # Cross-worker event bus (PostgreSQL LISTEN/NOTIFY)
+    EVENT_BUS_ENABLED: bool = True
+    EVENT_BUS_CHANNEL: str = "github_events"
+    EVENT_BUS_FLUSH_MS: int = 50  # Events stored within this window share a NOTIFY
+    EVENT_BUS_BATCH_SIZE: int = 500  # Events per flush (split further to fit the 8000 byte payload limit)
+    EVENT_BUS_CATCHUP_SECONDS: float = 5.0  # Idle time after which webhook_events is checked for missed events
+    EVENT_BUS_CATCHUP_LIMIT: int = 1000
+    
+    # Rate limiting (per-hook token buckets on the webhook endpoint)
     RATE_LIMIT_REQUESTS: int = 100
     RATE_LIMIT_WINDOW: int = 60  # 1 minute
     
+    # Webhook admission control / load shedding
+    WEBHOOK_MAX_IN_FLIGHT: int = 64
+    WEBHOOK_POOL_UTILIZATION_THRESHOLD: float = 0.9
+    WEBHOOK_SPOOL_DIR: Optional[str] = None  # Spool shed deliveries here instead of rejecting
+    
     @validator('ALLOWED_ORIGINS', pre=True)
     def parse_cors_origins(cls, value):
         if isinstance(value, str):
             return [origin.strip() for origin in value.split(",")]
         return value
     
+    @validator('GITHUB_WEBHOOK_SECRETS', pre=True)
+    def parse_webhook_secrets(cls, value):
+        if isinstance(value, dict):
+            return {
+                str(key): [secrets] if isinstance(secrets, str) else secrets
+                for key, secrets in value.items()
+            }
+        return value
+    
     @validator('ALLOWED_HOSTS', pre=True)
     def parse_allowed_hosts(cls, value):
         if isinstance(value, str):
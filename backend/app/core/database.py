@@ -13,6 +13,7 @@ from supabase import create_client, Client
 from supabase.client import ClientOptions
 
 from .config import get_settings
+from .db_instrumentation import instrument_engine
 
 logger = logging.getLogger(__name__)
 
@@ -39,7 +40,7 @@ def create_database_engine():
     engine_kwargs = {
         "pool_pre_ping": True,
         "pool_recycle": 3600,  # 1 hour
-        "echo": settings.DEBUG,
+        "echo": settings.DB_ECHO,
     }
     
     # For SQLite (testing)
@@ -50,6 +51,7 @@ def create_database_engine():
         })
     
     engine = create_engine(settings.DATABASE_URL, **engine_kwargs)
+    instrument_engine(engine)
     return engine
 
 
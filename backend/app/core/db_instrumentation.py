@@ -0,0 +1,277 @@
+"""
+SQL statement instrumentation using SQLAlchemy cursor execution events.
+Records per-statement latency and row counts, aggregates them by statement
+fingerprint, counts statements per request, and logs slow queries (with a
+sampled EXPLAIN plan on PostgreSQL).
+"""
+
+import logging
+import queue
+import random
+import re
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import get_settings
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+slow_query_logger = logging.getLogger("app.database.slow_queries")
+
+# Distinct fingerprints tracked before new shapes are folded into "<other>"
+MAX_TRACKED_FINGERPRINTS = 2000
+
+# Slow SELECTs waiting for an EXPLAIN; beyond this, new ones are not explained
+EXPLAIN_QUEUE_SIZE = 8
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\([^)]+\)s|%s|:\w+|\$\d+|\?")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+DB_STATEMENT_SECONDS = registry.histogram(
+    "db_statement_seconds",
+    "SQL statement execution time",
+    ("operation",),
+)
+DB_ROWS = registry.counter(
+    "db_statement_rows_total",
+    "Rows returned or affected by SQL statements (where the driver reports it)",
+    ("operation",),
+)
+DB_SLOW_STATEMENTS = registry.counter(
+    "db_slow_statements_total",
+    "SQL statements slower than DB_SLOW_QUERY_MS",
+    ("operation",),
+)
+DB_EXPLAINS_DROPPED = registry.counter(
+    "db_explains_dropped_total",
+    "Sampled slow SELECTs not explained because the EXPLAIN queue was full",
+)
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(statement: str) -> str:
+    """
+    Normalize a SQL statement so identical query shapes aggregate together.
+
+    Literals and bind placeholders become '?', IN-lists of any length collapse
+    to '(?+)', and whitespace is collapsed. Cached, since SQLAlchemy emits the
+    same compiled statement strings over and over.
+    """
+    normalized = _STRING_LITERAL.sub("?", statement)
+    normalized = _PLACEHOLDER.sub("?", normalized)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _PLACEHOLDER_LIST.sub("(?+)", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+
+def statement_operation(statement: str) -> str:
+    """Get the leading SQL keyword (SELECT, INSERT, ...) of a statement."""
+    head = statement.lstrip().split(None, 1)
+    return head[0].upper() if head else "UNKNOWN"
+
+
+@dataclass
+class RequestStatementStats:
+    """Statements executed on behalf of one HTTP request."""
+
+    statements: int = 0
+    seconds: float = 0.0
+
+
+_request_stats: ContextVar[Optional[RequestStatementStats]] = ContextVar("request_statement_stats", default=None)
+
+
+def begin_request_tracking() -> RequestStatementStats:
+    """
+    Start counting statements for the current request context.
+
+    The returned object is shared with tasks and threadpool calls spawned from
+    this context, so it keeps counting for the whole request.
+    """
+    stats = RequestStatementStats()
+    _request_stats.set(stats)
+    return stats
+
+
+class StatementStatsRegistry:
+    """Aggregated per-fingerprint statement statistics."""
+
+    def __init__(self):
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, statement_fingerprint: str, seconds: float, rows: int):
+        entry = self._stats.get(statement_fingerprint)
+        if entry is None:
+            with self._lock:
+                if statement_fingerprint not in self._stats and len(self._stats) >= MAX_TRACKED_FINGERPRINTS:
+                    statement_fingerprint = "<other>"
+                entry = self._stats.setdefault(statement_fingerprint, {
+                    "calls": 0,
+                    "total_seconds": 0.0,
+                    "max_seconds": 0.0,
+                    "rows": 0,
+                })
+        entry["calls"] += 1
+        entry["total_seconds"] += seconds
+        if seconds > entry["max_seconds"]:
+            entry["max_seconds"] = seconds
+        if rows > 0:
+            entry["rows"] += rows
+
+    def top(self, limit: int = 50, order_by: str = "total_seconds") -> List[Dict[str, Any]]:
+        """
+        Get the heaviest statement fingerprints.
+
+        Args:
+            limit: Maximum number of fingerprints to return
+            order_by: One of total_seconds, calls, max_seconds, rows, mean_seconds
+        """
+        rows = []
+        for statement_fingerprint, entry in list(self._stats.items()):
+            row = dict(entry, fingerprint=statement_fingerprint)
+            row["mean_seconds"] = row["total_seconds"] / row["calls"] if row["calls"] else 0.0
+            rows.append(row)
+        rows.sort(key=lambda row: row.get(order_by, 0), reverse=True)
+        return rows[:limit]
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+    def __len__(self) -> int:
+        return len(self._stats)
+
+
+# Global statement statistics
+statement_stats = StatementStatsRegistry()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_times = conn.info.get("query_start_time")
+    if not start_times:
+        return
+    elapsed = time.perf_counter() - start_times.pop()
+
+    operation = statement_operation(statement)
+    rows = cursor.rowcount if cursor.rowcount is not None else -1
+
+    DB_STATEMENT_SECONDS.labels(operation).observe(elapsed)
+    if rows > 0:
+        DB_ROWS.labels(operation).inc(rows)
+    statement_stats.record(fingerprint(statement), elapsed, rows)
+
+    request_stats = _request_stats.get()
+    if request_stats is not None:
+        request_stats.statements += 1
+        request_stats.seconds += elapsed
+
+    settings = get_settings()
+    if elapsed * 1000 >= settings.DB_SLOW_QUERY_MS:
+        DB_SLOW_STATEMENTS.labels(operation).inc()
+        _log_slow_query(conn, cursor, statement, parameters, elapsed, rows, operation, executemany)
+
+
+def _handle_error(exception_context):
+    # after_cursor_execute is not called for failed statements
+    conn = exception_context.connection
+    start_times = conn.info.get("query_start_time") if conn is not None else None
+    if start_times:
+        start_times.pop()
+
+
+def _log_slow_query(conn, cursor, statement, parameters, elapsed, rows, operation, executemany):
+    slow_query_logger.warning(
+        f"🐢 SLOW QUERY {elapsed * 1000:.1f}ms | rows={rows} | {fingerprint(statement)}"
+    )
+
+    settings = get_settings()
+    if (
+        operation != "SELECT"
+        or executemany
+        or conn.dialect.name != "postgresql"
+        or random.random() >= settings.DB_EXPLAIN_SAMPLE_RATE
+    ):
+        return
+
+    # Explained off the request's connection and thread: a failing EXPLAIN cannot
+    # abort the request's transaction, and a busy pool cannot delay the request
+    _explainer.submit(conn.engine, statement, parameters)
+
+
+class _Explainer:
+    """
+    Single background thread running the sampled EXPLAINs one at a time.
+
+    The queue is bounded, so a slow-query storm holds at most one extra pool
+    connection and EXPLAIN_QUEUE_SIZE pending statements; the rest are dropped.
+    """
+
+    def __init__(self):
+        self._queue: "queue.Queue[tuple]" = queue.Queue(maxsize=EXPLAIN_QUEUE_SIZE)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def submit(self, engine: Engine, statement: str, parameters):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="slow-query-explain", daemon=True)
+                self._thread.start()
+        try:
+            self._queue.put_nowait((engine, statement, parameters))
+        except queue.Full:
+            DB_EXPLAINS_DROPPED.inc()
+
+    def _run(self):
+        while True:
+            _explain(*self._queue.get())
+
+
+_explainer = _Explainer()
+
+
+def _explain(engine: Engine, statement: str, parameters):
+    """
+    Log the plan of a slow SELECT, using plain EXPLAIN (ANALYZE would run it again).
+
+    Runs on a raw DBAPI connection from the pool, so the EXPLAIN bypasses these event hooks.
+    """
+    try:
+        raw = engine.raw_connection()
+        try:
+            explain_cursor = raw.cursor()
+            try:
+                explain_cursor.execute(f"EXPLAIN {statement}", parameters)
+                plan = "\n".join(row[0] for row in explain_cursor.fetchall())
+            finally:
+                explain_cursor.close()
+            raw.rollback()
+        finally:
+            raw.close()
+        slow_query_logger.warning(f"📋 QUERY PLAN for {fingerprint(statement)}\n{plan}")
+    except Exception as e:
+        slow_query_logger.warning(f"Could not capture query plan: {e}")
+
+
+def instrument_engine(engine: Engine):
+    """Attach statement instrumentation to an engine (idempotent)."""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+    logger.debug(f"SQL statement instrumentation attached to {engine.url.drivername} engine")
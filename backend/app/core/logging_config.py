@@ -57,7 +57,8 @@ def setup_logging(log_level: str = "INFO"):
     
     Creates multiple log files:
     - application.log: All application logs (info, debug, warnings, errors)
-    - database.log: All SQLAlchemy database queries and operations
+    - database.log: Slow query log, query plans and database operations
+      (plus every statement when DB_ECHO is enabled)
     - errors.log: Only error and critical logs
     - webhook_events.log: Specific webhook processing logs
     """
@@ -95,7 +96,7 @@ def setup_logging(log_level: str = "INFO"):
     app_handler.setFormatter(detailed_formatter)
     handlers.append(app_handler)
     
-    # 2. Database log file (for SQLAlchemy queries)
+    # 2. Database log file (slow queries, query plans, DB_ECHO output)
     db_handler = logging.handlers.RotatingFileHandler(
         filename=LOGS_DIR / "database.log",
         maxBytes=10*1024*1024,  # 10MB
@@ -147,11 +148,15 @@ def setup_logging(log_level: str = "INFO"):
     for handler in handlers:
         root_logger.addHandler(handler)
     
-    # Configure SQLAlchemy logging for database queries
+    # Per-statement timings come from the cursor event hooks in
+    # app.core.db_instrumentation; engine INFO logging is only enabled by DB_ECHO
     sqlalchemy_logger = logging.getLogger('sqlalchemy.engine')
-    sqlalchemy_logger.setLevel(logging.INFO)
+    sqlalchemy_logger.setLevel(logging.WARNING)
     sqlalchemy_logger.addHandler(db_handler)
     
+    database_logger = logging.getLogger('app.database')
+    database_logger.addHandler(db_handler)
+    
     # Configure specific loggers
     loggers_config = {
         'app': logging.DEBUG,
@@ -163,7 +168,7 @@ def setup_logging(log_level: str = "INFO"):
         'uvicorn.access': logging.INFO,
         'uvicorn.error': logging.INFO,
         'fastapi': logging.INFO,
-        'sqlalchemy.engine.Engine': logging.INFO,
+        'sqlalchemy.engine.Engine': logging.WARNING,
     }
     
     for logger_name, level in loggers_config.items():
@@ -183,7 +188,7 @@ def setup_logging(log_level: str = "INFO"):
     logger.info(f"📊 Log level: {log_level}")
     logger.info(f"📝 Log files created:")
     logger.info(f"   • application.log - All application logs")
-    logger.info(f"   • database.log - Database queries and operations")
+    logger.info(f"   • database.log - Slow queries, query plans and database operations")
     logger.info(f"   • errors.log - Errors and critical issues") 
     logger.info(f"   • webhook_events.log - Webhook processing logs")
     logger.info("=" * 80)
@@ -0,0 +1,351 @@
+"""
+In-process metrics registry for the GitHub Audit Platform.
+Counters, gauges and histograms rendered in the Prometheus text exposition format.
+
+Observations on the hot path only touch pre-created per-label children: a dict
+lookup plus a few integer/float increments under the GIL, with no lock taken.
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Latency buckets in seconds, from sub-millisecond stages up to slow background jobs
+DEFAULT_LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+# Label sets per family beyond this collapse into a single "other" series,
+# so unauthenticated header values (hook IDs) cannot grow the registry unbounded
+MAX_LABEL_SETS = 1000
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape_label(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class _Metric:
+    """Base class for a metric family with optional labels."""
+
+    metric_type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[LabelValues, object] = {}
+        self._create_lock = threading.Lock()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        """
+        Get the child metric for a set of label values.
+
+        The lock is only taken the first time a label combination is seen.
+        """
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+            with self._create_lock:
+                if len(self._children) >= MAX_LABEL_SETS:
+                    key = ("other",) * len(key)
+                child = self._children.get(key)
+                if child is None:
+                    child = self._children[key] = self._new_child()
+        return child
+
+    def _default(self):
+        return self.labels()
+
+    def collect(self) -> List[str]:
+        """Render the family in Prometheus text format."""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}",
+        ]
+        for values, child in list(self._children.items()):
+            lines.extend(self._render_child(values, child))
+        return lines
+
+    def values(self) -> Dict[LabelValues, float]:
+        """Get the current value of every label combination (counters and gauges)."""
+        return {values: child.value for values, child in list(self._children.items())}
+
+    def _render_child(self, values: LabelValues, child) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}"]
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter."""
+
+    metric_type = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0):
+        self._default().inc(amount)
+
+
+class _GaugeChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value: float):
+        self.value = value
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        self.value -= amount
+
+
+class Gauge(_Metric):
+    """Gauge set to the current value of something (in-flight requests, backlog)."""
+
+    metric_type = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float):
+        self._default().set(value)
+
+
+class _HistogramChild:
+    __slots__ = ("upper_bounds", "bucket_counts", "sum", "count")
+
+    def __init__(self, upper_bounds: Tuple[float, ...]):
+        self.upper_bounds = upper_bounds
+        self.bucket_counts = [0] * (len(upper_bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.bucket_counts[bisect.bisect_left(self.upper_bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        """Observe the wall-clock duration of a block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+
+class Histogram(_Metric):
+    """Histogram with fixed upper bounds (stored per bucket, rendered cumulatively)."""
+
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.upper_bounds = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.upper_bounds)
+
+    def observe(self, value: float):
+        self._default().observe(value)
+
+    def time(self):
+        return self._default().time()
+
+    def _render_child(self, values: LabelValues, child: _HistogramChild) -> List[str]:
+        lines = []
+        cumulative = 0
+        bounds = self.upper_bounds + (float("inf"),)
+        for upper_bound, bucket_count in zip(bounds, list(child.bucket_counts)):
+            cumulative += bucket_count
+            labels = _format_labels(self.labelnames + ("le",), values + (_format_value(upper_bound),))
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, values)
+        lines.append(f"{self.name}_sum{labels} {_format_value(child.sum)}")
+        lines.append(f"{self.name}_count{labels} {child.count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds metric families and renders them for /metrics."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        """Register a metric family, returning the existing one if the name is taken."""
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """Render every registered family in Prometheus text format."""
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            try:
+                lines.extend(metric.collect())
+            except Exception as e:
+                lines.append(f"# collect failed for {metric.name}: {e}")
+        return "\n".join(lines) + "\n"
+
+
+# Global registry
+registry = MetricsRegistry()
+
+# Content type of the Prometheus text exposition format
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+# Webhook ingest pipeline
+INGEST_STAGE_SECONDS = registry.histogram(
+    "webhook_ingest_stage_seconds",
+    "Time spent in each stage of webhook ingestion",
+    ("stage", "event_type"),
+)
+EVENTS_PROCESSED = registry.counter(
+    "webhook_events_processed_total",
+    "Webhook events processed into specialized tables",
+    ("event_type",),
+)
+EVENTS_FAILED = registry.counter(
+    "webhook_events_failed_total",
+    "Webhook events whose background processing failed",
+    ("event_type",),
+)
+EVENTS_RETRIED = registry.counter(
+    "webhook_events_retried_total",
+    "Webhook events processed again after an earlier failure",
+    ("event_type",),
+)
+
+# Signature verification
+SIGNATURES_VERIFIED = registry.counter(
+    "webhook_signatures_verified_total",
+    "Webhook deliveries with a valid signature",
+    ("hook",),
+)
+SIGNATURE_FAILURES = registry.counter(
+    "webhook_signature_failures_total",
+    "Webhook deliveries rejected for a missing or invalid signature",
+    ("hook",),
+)
+SIGNATURE_ROTATION_MATCHES = registry.counter(
+    "webhook_signature_rotation_matches_total",
+    "Webhook deliveries signed with a secondary (rotation) secret",
+    ("hook",),
+)
+
+# Admission control
+REQUESTS_ADMITTED = registry.counter(
+    "webhook_requests_admitted_total",
+    "Webhook requests admitted by admission control",
+    ("hook",),
+)
+REQUESTS_SHED = registry.counter(
+    "webhook_requests_shed_total",
+    "Webhook requests rejected or spooled by admission control",
+    ("reason",),
+)
+REQUESTS_SPOOLED = registry.counter(
+    "webhook_requests_spooled_total",
+    "Shed webhook deliveries written to the spool directory",
+)
+REQUESTS_IN_FLIGHT = registry.gauge(
+    "webhook_requests_in_flight",
+    "Webhook requests currently being processed",
+)
+
+# Delivery idempotency
+DUPLICATE_DELIVERIES = registry.counter(
+    "webhook_duplicate_deliveries_total",
+    "Redelivered webhooks acknowledged without storing",
+    ("source",),
+)
+
+
+# Response cache
+RESPONSE_CACHE_REQUESTS = registry.counter(
+    "response_cache_requests_total",
+    "Cached endpoint calls by result (hit, miss, coalesced)",
+    ("endpoint", "result"),
+)
+
+# Real-time fan-out
+REALTIME_SUBSCRIBERS = registry.gauge(
+    "realtime_subscribers",
+    "Connected real-time subscribers (SSE and WebSocket) of this worker",
+)
+REALTIME_MESSAGES = registry.counter(
+    "realtime_messages_total",
+    "Real-time messages queued for subscribers, or dropped from full subscriber queues",
+    ("result",),
+)
+
+
+def observe_stage(stage: str, event_type: Optional[str]):
+    """
+    Time a webhook ingest stage.
+
+    Usage:
+        with observe_stage("decode", event_type):
+            ...
+    """
+    return INGEST_STAGE_SECONDS.labels(stage, event_type or "unknown").time()
@@ -0,0 +1,197 @@
+"""
+Statistical sampling profiler used by the opt-in profiling middleware.
+A background thread snapshots thread stacks with sys._current_frames() at a
+fixed interval and writes them as collapsed stacks or speedscope JSON into
+the logs/profiles directory.
+"""
+
+import json
+import logging
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from app.core.logging_config import LOGS_DIR
+
+logger = logging.getLogger(__name__)
+
+PROFILES_DIR = LOGS_DIR / "profiles"
+
+# Profile file extensions by output format
+PROFILE_EXTENSIONS = {
+    "collapsed": ".collapsed.txt",
+    "speedscope": ".speedscope.json",
+}
+
+# Only files written by the profiler are served back by the admin endpoints
+PROFILE_NAME_PATTERN = re.compile(r"^[\w.-]+\.(collapsed\.txt|speedscope\.json)$")
+
+# Leaf frames of threads parked on a lock/condition (idle thread pool workers)
+IDLE_LEAF_FUNCTIONS = {("threading.py", "wait"), ("threading.py", "_wait_for_tstate_lock")}
+
+Frame = Tuple[str, str, int]  # (function, filename, first line)
+
+
+class SamplingProfiler:
+    """
+    Samples the stacks of every other thread until stopped.
+
+    The webhook handlers run on the event loop thread and the sync audit
+    handlers on thread pool workers, so all threads are sampled and each stack
+    is rooted at its thread name. Concurrent requests share those threads, so
+    a profile shows where the process spent the request's wall time, not only
+    the request itself.
+    """
+
+    def __init__(self, interval_seconds: float):
+        self.interval = interval_seconds
+        self.samples: "Counter[Tuple[Frame, ...]]" = Counter()
+        self.sample_count = 0
+        self.started_at = 0.0
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.duration = time.perf_counter() - self.started_at
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = self._walk(frame)
+                if not stack:
+                    continue
+                leaf = stack[-1]
+                if (Path(leaf[1]).name, leaf[0]) in IDLE_LEAF_FUNCTIONS:
+                    continue
+                root = (f"thread:{thread_names.get(thread_id, thread_id)}", "", 0)
+                self.samples[(root,) + stack] += 1
+            self.sample_count += 1
+
+    @staticmethod
+    def _walk(frame) -> Tuple[Frame, ...]:
+        stack: List[Frame] = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+            frame = frame.f_back
+        stack.reverse()
+        return tuple(stack)
+
+    @staticmethod
+    def _frame_label(frame: Frame) -> str:
+        name, filename, line = frame
+        if not filename:
+            return name
+        return f"{name} ({Path(filename).name}:{line})"
+
+    def to_collapsed(self) -> str:
+        """Render samples in Brendan Gregg's collapsed stack format (flamegraph.pl, speedscope)."""
+        lines = [
+            ";".join(self._frame_label(frame).replace(";", ":") for frame in stack) + f" {count}"
+            for stack, count in self.samples.most_common()
+        ]
+        return "\n".join(lines) + "\n"
+
+    def to_speedscope(self, name: str) -> str:
+        """Render samples as a speedscope sampled profile."""
+        frame_index: Dict[Frame, int] = {}
+        frames = []
+        samples = []
+        weights = []
+        for stack, count in self.samples.items():
+            indexes = []
+            for frame in stack:
+                if frame not in frame_index:
+                    frame_index[frame] = len(frames)
+                    function, filename, line = frame
+                    entry = {"name": function}
+                    if filename:
+                        entry.update({"file": filename, "line": line})
+                    frames.append(entry)
+                indexes.append(frame_index[frame])
+            samples.append(indexes)
+            weights.append(count * self.interval)
+
+        return json.dumps({
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": round(self.duration, 6),
+                "samples": samples,
+                "weights": weights,
+            }],
+            "name": name,
+            "exporter": "github-audit-platform",
+        })
+
+
+def write_profile(profiler: SamplingProfiler, label: str, output_format: str, max_files: int) -> Path:
+    """
+    Write a finished profile to logs/profiles and prune the oldest files.
+
+    Args:
+        profiler: Stopped profiler
+        label: Request description used in the file name (method, path, event type)
+        output_format: "collapsed" or "speedscope"
+        max_files: Number of most recent profiles to keep
+
+    Returns:
+        Path of the written profile
+    """
+    PROFILES_DIR.mkdir(parents=True, exist_ok=True)
+    output_format = output_format if output_format in PROFILE_EXTENSIONS else "collapsed"
+
+    slug = re.sub(r"[^\w.-]+", "_", label).strip("_")[:80]
+    timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+    path = PROFILES_DIR / f"{timestamp}-{slug}{PROFILE_EXTENSIONS[output_format]}"
+
+    if output_format == "speedscope":
+        path.write_text(profiler.to_speedscope(label), encoding="utf-8")
+    else:
+        path.write_text(profiler.to_collapsed(), encoding="utf-8")
+
+    for old_profile in list_profiles()[max_files:]:
+        try:
+            old_profile.unlink()
+        except OSError:
+            pass
+
+    return path
+
+
+def list_profiles() -> List[Path]:
+    """Get profile files, newest first."""
+    if not PROFILES_DIR.exists():
+        return []
+    profiles = [path for path in PROFILES_DIR.iterdir() if PROFILE_NAME_PATTERN.match(path.name)]
+    return sorted(profiles, key=lambda path: path.name, reverse=True)
+
+
+def resolve_profile(name: str) -> Optional[Path]:
+    """Get the path of a profile by file name, refusing anything outside logs/profiles."""
+    if not PROFILE_NAME_PATTERN.match(name):
+        return None
+    path = PROFILES_DIR / name
+    return path if path.is_file() else None
@@ -0,0 +1,131 @@
+"""
+Mergeable streaming sketches for approximate analytics.
+Space-Saving tracks heavy hitters (top-K) and HyperLogLog estimates distinct
+counts, both in fixed memory. Sketches of the same kind can be merged, so
+per-worker and per-day sketches combine into any window.
+"""
+
+import base64
+import hashlib
+import math
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class SpaceSaving:
+    """
+    Space-Saving heavy hitters summary with a fixed number of counters.
+
+    Every estimated count overestimates the true count by at most its
+    recorded error, which never exceeds total / capacity. Any item occurring
+    more than total / capacity times is guaranteed to be tracked.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.total = 0
+        self.counters: Dict[str, List[int]] = {}  # item -> [count, error]
+
+    def add(self, item: str, weight: int = 1):
+        """Count an occurrence of `item`, replacing the smallest counter when full."""
+        self.total += weight
+        counter = self.counters.get(item)
+        if counter is not None:
+            counter[0] += weight
+        elif len(self.counters) < self.capacity:
+            self.counters[item] = [weight, 0]
+        else:
+            smallest = min(self.counters, key=lambda key: self.counters[key][0])
+            minimum = self.counters.pop(smallest)[0]
+            self.counters[item] = [minimum + weight, minimum]
+
+    def _floor(self) -> int:
+        """Upper bound on the count of any item not being tracked."""
+        if len(self.counters) < self.capacity:
+            return 0
+        return min(counter[0] for counter in self.counters.values())
+
+    def merge(self, other: "SpaceSaving") -> "SpaceSaving":
+        """
+        Merged summary of both streams (keeps this summary's capacity).
+
+        Items missing from one side are charged that side's floor as both
+        count and error, so the error bounds still hold after merging.
+        """
+        floor, other_floor = self._floor(), other._floor()
+        merged = SpaceSaving(self.capacity)
+        merged.total = self.total + other.total
+        for item in self.counters.keys() | other.counters.keys():
+            count, error = self.counters.get(item, (floor, floor))
+            other_count, other_error = other.counters.get(item, (other_floor, other_floor))
+            merged.counters[item] = [count + other_count, error + other_error]
+        if len(merged.counters) > merged.capacity:
+            kept = sorted(merged.counters.items(), key=lambda entry: entry[1][0], reverse=True)[:merged.capacity]
+            merged.counters = dict(kept)
+        return merged
+
+    def top(self, limit: int) -> List[Tuple[str, int, int]]:
+        """The `limit` largest counters as (item, estimated count, maximum overestimate)."""
+        ranked = sorted(self.counters.items(), key=lambda entry: (-entry[1][0], entry[0]))[:limit]
+        return [(item, count, error) for item, (count, error) in ranked]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"capacity": self.capacity, "total": self.total, "counters": self.counters}
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> "SpaceSaving":
+        sketch = cls(state["capacity"])
+        sketch.total = state["total"]
+        sketch.counters = {item: list(counter) for item, counter in state["counters"].items()}
+        return sketch
+
+
+class HyperLogLog:
+    """
+    HyperLogLog distinct counter with 2^precision one-byte registers.
+
+    The relative standard error of estimates is 1.04 / sqrt(2^precision),
+    about 1.6% at the default precision of 12 (4 KB).
+    """
+
+    def __init__(self, precision: int = 12, registers: Optional[bytes] = None):
+        self.precision = precision
+        self.size = 1 << precision
+        self.registers = bytearray(registers) if registers is not None else bytearray(self.size)
+
+    @property
+    def relative_error(self) -> float:
+        return 1.04 / math.sqrt(self.size)
+
+    def add(self, item: str):
+        value = int.from_bytes(hashlib.blake2b(item.encode("utf-8"), digest_size=8).digest(), "big")
+        bits = 64 - self.precision
+        index = value >> bits
+        rank = bits - (value & ((1 << bits) - 1)).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        """Sketch of the union of both sets (precisions must match)."""
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches of different precision")
+        merged = np.maximum(np.frombuffer(self.registers, dtype=np.uint8), np.frombuffer(other.registers, dtype=np.uint8))
+        return HyperLogLog(self.precision, merged.tobytes())
+
+    def estimate(self) -> int:
+        """Estimated number of distinct items (linear counting for small sets)."""
+        registers = np.frombuffer(self.registers, dtype=np.uint8)
+        alpha = 0.7213 / (1 + 1.079 / self.size)
+        estimate = alpha * self.size * self.size / float(np.sum(np.ldexp(1.0, -registers.astype(np.int32))))
+        zeros = int(np.count_nonzero(registers == 0))
+        if estimate <= 2.5 * self.size and zeros:
+            estimate = self.size * math.log(self.size / zeros)
+        return int(round(estimate))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"precision": self.precision, "registers": base64.b64encode(bytes(self.registers)).decode("ascii")}
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> "HyperLogLog":
+        return cls(state["precision"], base64.b64decode(state["registers"]))
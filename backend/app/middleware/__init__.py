@@ -4,5 +4,6 @@ Middleware components for the GitHub Audit Platform.
 
 from .timing import TimingMiddleware
 from .logging import LoggingMiddleware
+from .profiling import ProfilingMiddleware
 
-__all__ = ["TimingMiddleware", "LoggingMiddleware"]
\ No newline at end of file
+__all__ = ["TimingMiddleware", "LoggingMiddleware", "ProfilingMiddleware"]
\ No newline at end of file
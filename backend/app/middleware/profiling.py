@@ -0,0 +1,78 @@
+"""
+Opt-in request profiling middleware.
+Only installed when PROFILING_ENABLED is set, so there is no per-request cost otherwise.
+"""
+
+from fastapi import Request, Response
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware.base import BaseHTTPMiddleware
+import logging
+import random
+import threading
+
+from app.core.config import get_settings
+from app.core.profiler import SamplingProfiler, write_profile
+
+logger = logging.getLogger(__name__)
+
+
+class ProfilingMiddleware(BaseHTTPMiddleware):
+    """
+    Middleware that runs the sampling profiler for a fraction of requests.
+
+    Requests are eligible when their path starts with one of PROFILING_PATHS
+    and, if PROFILING_EVENT_TYPES is set, their X-GitHub-Event header (or
+    event_type query parameter) is one of those types. One request is profiled
+    at a time; eligible requests arriving meanwhile are not profiled.
+    """
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.settings = get_settings()
+        self._active = threading.Lock()
+
+    def _should_profile(self, request: Request) -> bool:
+        path = request.url.path
+        if not any(path.startswith(prefix) for prefix in self.settings.PROFILING_PATHS):
+            return False
+
+        if self.settings.PROFILING_EVENT_TYPES:
+            event_type = request.headers.get("x-github-event") or request.query_params.get("event_type")
+            if event_type not in self.settings.PROFILING_EVENT_TYPES:
+                return False
+
+        return random.random() < self.settings.PROFILING_SAMPLE_RATE
+
+    async def dispatch(self, request: Request, call_next):
+        if not self._should_profile(request) or not self._active.acquire(blocking=False):
+            return await call_next(request)
+
+        profiler = SamplingProfiler(self.settings.PROFILING_INTERVAL_MS / 1000)
+        try:
+            profiler.start()
+            try:
+                response: Response = await call_next(request)
+            finally:
+                profiler.stop()
+        finally:
+            self._active.release()
+
+        event_type = request.headers.get("x-github-event") or request.query_params.get("event_type") or ""
+        label = f"{request.method} {request.url.path} {event_type}"
+        try:
+            path = await run_in_threadpool(
+                write_profile,
+                profiler,
+                label,
+                self.settings.PROFILING_FORMAT,
+                self.settings.PROFILING_MAX_FILES
+            )
+            response.headers["X-Profile"] = path.name
+            logger.info(
+                f"📈 Profiled {label.strip()} - {profiler.sample_count} samples "
+                f"over {profiler.duration:.3f}s -> {path.name}"
+            )
+        except Exception as e:
+            logger.error(f"Failed to write profile for {label.strip()}: {e}")
+
+        return response
@@ -7,16 +7,20 @@ from starlette.middleware.base import BaseHTTPMiddleware
 import time
 import logging
 
+from app.core.db_instrumentation import begin_request_tracking
+
 logger = logging.getLogger(__name__)
 
 
 class TimingMiddleware(BaseHTTPMiddleware):
     """
     Middleware to track request timing and log slow requests.
+    Also reports the SQL statements executed while handling the request.
     """
     
     async def dispatch(self, request: Request, call_next):
         start_time = time.time()
+        db_stats = begin_request_tracking()
         
         # Process the request
         response: Response = await call_next(request)
@@ -26,12 +30,15 @@ class TimingMiddleware(BaseHTTPMiddleware):
         
         # Add timing header
         response.headers["X-Process-Time"] = str(process_time)
+        response.headers["X-DB-Statements"] = str(db_stats.statements)
+        response.headers["X-DB-Time"] = f"{db_stats.seconds:.6f}"
         
         # Log slow requests (over 1 second)
         if process_time > 1.0:
             logger.warning(
                 f"Slow request: {request.method} {request.url} "
-                f"took {process_time:.2f}s"
+                f"took {process_time:.2f}s ({db_stats.statements} statements, "
+                f"{db_stats.seconds:.2f}s in database)"
             )
         
         return response
\ No newline at end of file
@@ -7,6 +7,7 @@ from .core import (
     User, 
     Repository,
     Installation,
+    Team,
     WebhookEvent
 )
 
@@ -15,16 +16,25 @@ from .events import (
     MemberEvent,
     SecurityEvent,
     CodeEvent,
+    CollaborationEvent,
     OrganizationMembership,
-    RepositoryCollaborator
+    RepositoryCollaborator,
+    OrganizationMembershipHistory,
+    RepositoryCollaboratorHistory,
+    TeamMembership,
+    TeamRepository,
+    EffectivePermission
 )
 
+from .system import ProcessingWatermark, AnalyticsSketch
+
 __all__ = [
     # Core models
     "Organization",
     "User", 
     "Repository",
     "Installation",
+    "Team",
     "WebhookEvent",
     
     # Event models
@@ -32,6 +42,16 @@ __all__ = [
     "MemberEvent", 
     "SecurityEvent",
     "CodeEvent",
+    "CollaborationEvent",
     "OrganizationMembership",
-    "RepositoryCollaborator"
+    "RepositoryCollaborator",
+    "OrganizationMembershipHistory",
+    "RepositoryCollaboratorHistory",
+    "TeamMembership",
+    "TeamRepository",
+    "EffectivePermission",
+    
+    # System models
+    "ProcessingWatermark",
+    "AnalyticsSketch"
 ]
\ No newline at end of file
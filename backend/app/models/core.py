@@ -222,6 +222,7 @@ class Repository(Base):
     member_events = relationship("MemberEvent", back_populates="repository")
     security_events = relationship("SecurityEvent", back_populates="repository")
     code_events = relationship("CodeEvent", back_populates="repository")
+    collaboration_events = relationship("CollaborationEvent", back_populates="repository")
     
     # Constraints
     __table_args__ = (
@@ -269,6 +270,32 @@ class Installation(Base):
     )
 
 
+class Team(Base):
+    """Team model based on webhook_models/common/issues.py Team"""
+    
+    __tablename__ = "teams"
+    
+    id = Column(Integer, primary_key=True)
+    github_id = Column(BigInteger, unique=True, nullable=False)
+    organization_id = Column(Integer, ForeignKey("organizations.id"))
+    node_id = Column(String(255))
+    name = Column(String(255), nullable=False)
+    slug = Column(String(255), nullable=False)
+    description = Column(Text)
+    privacy = Column(String(20))
+    permission = Column(String(20))
+    parent_github_id = Column(BigInteger)
+    html_url = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    # Constraints
+    __table_args__ = (
+        CheckConstraint('github_id > 0', name='team_github_id_check'),
+        Index('idx_teams_organization', 'organization_id'),
+    )
+
+
 class WebhookEvent(Base):
     """Main webhook events table storing all GitHub webhook events"""
     
@@ -316,13 +343,14 @@ class WebhookEvent(Base):
     member_event = relationship("MemberEvent", back_populates="webhook_event", uselist=False)
     security_event = relationship("SecurityEvent", back_populates="webhook_event", uselist=False)
     code_event = relationship("CodeEvent", back_populates="webhook_event", uselist=False)
+    collaboration_event = relationship("CollaborationEvent", back_populates="webhook_event", uselist=False)
     
     # Constraints and indexes
     __table_args__ = (
         CheckConstraint(
             """event_type IN (
                 'member', 'repository', 'push', 'issues', 'pull_request', 
-                'team', 'fork', 'create', 'delete', 'issue_comment',
+                'team', 'membership', 'fork', 'create', 'delete', 'issue_comment',
                 'pull_request_review', 'ping', 'installation', 'organization',
                 'code_scanning_alert', 'dependabot_alert', 'secret_scanning_alert',
                 'meta', 'personal_access_token_request'
@@ -333,6 +361,7 @@ class WebhookEvent(Base):
         Index('idx_webhook_events_type_timestamp', 'event_type', 'event_timestamp'),
         Index('idx_webhook_events_repo_timestamp', 'repository_id', 'event_timestamp'),
         Index('idx_webhook_events_org_timestamp', 'organization_id', 'event_timestamp'),
+        Index('idx_webhook_events_org_id', 'organization_id', 'id'),
         Index('idx_webhook_events_sender', 'sender_id'),
         Index('idx_webhook_events_processed', 'processed', 'received_at'),
         Index('idx_webhook_events_delivery', 'delivery_id'),
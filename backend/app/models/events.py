@@ -6,9 +6,9 @@ the full payload in the main webhook_events table.
 
 from sqlalchemy import (
     Column, Integer, String, Boolean, Text, DateTime, 
-    ForeignKey, Index, CheckConstraint
+    ForeignKey, Index, CheckConstraint, Computed, PrimaryKeyConstraint
 )
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.dialects.postgresql import JSONB, TSTZRANGE, ExcludeConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -158,6 +158,39 @@ class CodeEvent(Base):
     )
 
 
+class CollaborationEvent(Base):
+    """Issue and pull request activity events (issues, comments, pull requests, reviews)"""
+    
+    __tablename__ = "collaboration_events"
+    
+    id = Column(Integer, primary_key=True)
+    webhook_event_id = Column(Integer, ForeignKey("webhook_events.id"))
+    repository_id = Column(Integer, ForeignKey("repositories.id"))
+    event_type = Column(String(100), nullable=False)
+    action = Column(String(100), nullable=False)
+    number = Column(Integer)  # issue/pull request number
+    state = Column(String(50))  # issue/pull request state, or review state for reviews
+    author_id = Column(Integer, ForeignKey("users.id"))  # author of the issue, pull request, comment or review
+    merged = Column(Boolean)  # pull requests only
+    event_timestamp = Column(DateTime(timezone=True), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Relationships
+    webhook_event = relationship("WebhookEvent", back_populates="collaboration_event")
+    repository = relationship("Repository", back_populates="collaboration_events")
+    author = relationship("User")
+    
+    # Constraints
+    __table_args__ = (
+        CheckConstraint(
+            """event_type IN ('issues', 'issue_comment', 'pull_request', 'pull_request_review')""",
+            name='collaboration_event_type_check'
+        ),
+        Index('idx_collaboration_events_timestamp', 'event_timestamp'),
+        Index('idx_collaboration_events_repo_number', 'repository_id', 'number'),
+    )
+
+
 class OrganizationMembership(Base):
     """Organization memberships tracking"""
     
@@ -186,6 +219,7 @@ class OrganizationMembership(Base):
             name='membership_state_check'
         ),
         Index('idx_org_memberships_unique', 'organization_id', 'user_id', unique=True),
+        Index('idx_org_memberships_user', 'user_id'),
     )
 
 
@@ -212,4 +246,133 @@ class RepositoryCollaborator(Base):
             name='collaborator_permission_check'
         ),
         Index('idx_repo_collaborators_unique', 'repository_id', 'user_id', unique=True),
-    )
\ No newline at end of file
+        Index('idx_repo_collaborators_user', 'user_id'),
+    )
+
+
+class OrganizationMembershipHistory(Base):
+    """Organization membership validity periods (valid_to is NULL while current)"""
+    
+    __tablename__ = "organization_membership_history"
+    
+    id = Column(Integer, primary_key=True)
+    organization_id = Column(Integer, ForeignKey("organizations.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    role = Column(String(50), nullable=False)
+    valid_from = Column(DateTime(timezone=True), nullable=False)
+    valid_to = Column(DateTime(timezone=True))
+    # [valid_from, valid_to) as a range, maintained by the database
+    valid_during = Column(TSTZRANGE, Computed("tstzrange(valid_from, valid_to, '[)')", persisted=True))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Constraints and indexes (GiST on scalar columns needs the btree_gist extension)
+    __table_args__ = (
+        CheckConstraint(
+            """role IN ('member', 'admin', 'billing_manager')""",
+            name='membership_history_role_check'
+        ),
+        ExcludeConstraint(
+            ('organization_id', '='), ('user_id', '='), ('valid_during', '&&'),
+            name='membership_history_no_overlap',
+            using='gist'
+        ),
+        Index('idx_membership_history_user_period', 'user_id', 'valid_during', postgresql_using='gist'),
+    )
+
+
+class RepositoryCollaboratorHistory(Base):
+    """Repository collaborator validity periods (valid_to is NULL while current)"""
+    
+    __tablename__ = "repository_collaborator_history"
+    
+    id = Column(Integer, primary_key=True)
+    repository_id = Column(Integer, ForeignKey("repositories.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    permission = Column(String(50), nullable=False)
+    valid_from = Column(DateTime(timezone=True), nullable=False)
+    valid_to = Column(DateTime(timezone=True))
+    # [valid_from, valid_to) as a range, maintained by the database
+    valid_during = Column(TSTZRANGE, Computed("tstzrange(valid_from, valid_to, '[)')", persisted=True))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Constraints and indexes (GiST on scalar columns needs the btree_gist extension)
+    __table_args__ = (
+        CheckConstraint(
+            """permission IN ('read', 'write', 'admin', 'maintain', 'triage')""",
+            name='collaborator_history_permission_check'
+        ),
+        ExcludeConstraint(
+            ('repository_id', '='), ('user_id', '='), ('valid_during', '&&'),
+            name='collaborator_history_no_overlap',
+            using='gist'
+        ),
+        Index('idx_collaborator_history_user_period', 'user_id', 'valid_during', postgresql_using='gist'),
+    )
+
+
+class TeamMembership(Base):
+    """Team members"""
+    
+    __tablename__ = "team_memberships"
+    
+    id = Column(Integer, primary_key=True)
+    team_id = Column(Integer, ForeignKey("teams.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Constraints
+    __table_args__ = (
+        Index('idx_team_memberships_unique', 'team_id', 'user_id', unique=True),
+        Index('idx_team_memberships_user', 'user_id'),
+    )
+
+
+class TeamRepository(Base):
+    """Repositories a team has access to, with the team's permission"""
+    
+    __tablename__ = "team_repositories"
+    
+    id = Column(Integer, primary_key=True)
+    team_id = Column(Integer, ForeignKey("teams.id"), nullable=False)
+    repository_id = Column(Integer, ForeignKey("repositories.id"), nullable=False)
+    permission = Column(String(50), nullable=False, default="read")
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    # Constraints
+    __table_args__ = (
+        CheckConstraint(
+            """permission IN ('read', 'write', 'admin', 'maintain', 'triage')""",
+            name='team_repository_permission_check'
+        ),
+        Index('idx_team_repositories_unique', 'team_id', 'repository_id', unique=True),
+        Index('idx_team_repositories_repository', 'repository_id'),
+    )
+
+
+class EffectivePermission(Base):
+    """
+    Materialized highest permission per (user, repository), combining direct
+    collaborators, team grants and organization admins
+    """
+    
+    __tablename__ = "effective_permissions"
+    
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    repository_id = Column(Integer, ForeignKey("repositories.id"), nullable=False)
+    permission = Column(String(50), nullable=False)
+    via_collaborator = Column(Boolean, nullable=False, default=False)
+    via_team = Column(Boolean, nullable=False, default=False)
+    via_organization = Column(Boolean, nullable=False, default=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Constraints and indexes: the primary key answers "repositories of user U",
+    # the second index "users with permission P on repository R"
+    __table_args__ = (
+        PrimaryKeyConstraint('user_id', 'repository_id', name='effective_permissions_pkey'),
+        CheckConstraint(
+            """permission IN ('read', 'write', 'admin', 'maintain', 'triage')""",
+            name='effective_permission_check'
+        ),
+        Index('idx_effective_permissions_repository', 'repository_id', 'permission', 'user_id'),
+    )
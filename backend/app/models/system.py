@@ -0,0 +1,40 @@
+"""
+SQLAlchemy models for platform bookkeeping tables.
+These track the state of background jobs rather than GitHub data.
+"""
+
+from sqlalchemy import Column, Integer, BigInteger, String, Date, DateTime, Text, Index, UniqueConstraint
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+
+class ProcessingWatermark(Base):
+    """Highest source row id a derived-data job has applied, per job name"""
+    
+    __tablename__ = "processing_watermarks"
+    
+    id = Column(Integer, primary_key=True)
+    name = Column(String(100), unique=True, nullable=False)
+    last_event_id = Column(BigInteger, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class AnalyticsSketch(Base):
+    """Checkpointed streaming sketches (top-K and distinct counts) of one worker, per scope and UTC day"""
+    
+    __tablename__ = "analytics_sketches"
+    
+    id = Column(Integer, primary_key=True)
+    worker_id = Column(String(100), nullable=False)
+    scope = Column(String(100), nullable=False)
+    day = Column(Date, nullable=False)
+    events = Column(BigInteger, nullable=False, default=0)
+    state = Column(Text, nullable=False)  # JSON: Space-Saving counters and HyperLogLog registers
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    __table_args__ = (
+        UniqueConstraint('worker_id', 'scope', 'day', name='unique_analytics_sketch'),
+        Index('idx_analytics_sketches_scope_day', 'scope', 'day'),
+    )
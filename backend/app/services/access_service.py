@@ -0,0 +1,173 @@
+"""
+Effective access service.
+Maintains effective_permissions, the highest permission each user holds on each
+repository through direct collaboration, team grants or organization ownership,
+so access questions are answered from an index instead of joins at query time.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from sqlalchemy import Select, case, func, insert, literal, select, union_all
+from sqlalchemy.orm import Session
+
+from app.models.core import Repository
+from app.models.events import (
+    EffectivePermission, OrganizationMembership, RepositoryCollaborator,
+    TeamMembership, TeamRepository
+)
+
+logger = logging.getLogger(__name__)
+
+# Repository permissions from lowest to highest
+PERMISSION_ORDER = ("read", "triage", "write", "maintain", "admin")
+PERMISSION_RANKS = {permission: rank for rank, permission in enumerate(PERMISSION_ORDER, start=1)}
+
+# Team permissions as GitHub names them (team.permission, repository.permissions keys)
+TEAM_PERMISSIONS = {
+    "pull": "read", "read": "read",
+    "triage": "triage",
+    "push": "write", "write": "write",
+    "maintain": "maintain",
+    "admin": "admin",
+}
+
+# User or repository IDs: a list, or a SELECT returning one ID column
+IdSet = Union[Sequence[int], Select]
+
+
+def permissions_at_least(permission: str) -> List[str]:
+    """Get the permissions that include `permission` (e.g. write -> write, maintain, admin)."""
+    return list(PERMISSION_ORDER[PERMISSION_RANKS[permission] - 1:])
+
+
+def team_repository_permission(team: Dict[str, Any], repository: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Get a team's permission on a repository from a team webhook payload.
+
+    repository.permissions (booleans per permission) is the team's access on
+    that repository; team.permission is the team's default. Falls back to read.
+    """
+    permissions = (repository or {}).get("permissions") or {}
+    granted = [TEAM_PERMISSIONS[name] for name, enabled in permissions.items() if enabled and name in TEAM_PERMISSIONS]
+    if granted:
+        return max(granted, key=PERMISSION_RANKS.get)
+    return TEAM_PERMISSIONS.get(team.get("permission") or "", "read")
+
+
+def _rank(permission_column):
+    return case(PERMISSION_RANKS, value=permission_column, else_=0)
+
+
+class AccessService:
+    """Keeps the effective permission index consistent with the relationship tables."""
+
+    def _grants(self, users: Optional[IdSet], repositories: Optional[IdSet]):
+        """
+        Every permission grant, optionally restricted to users x repositories.
+
+        Columns: user_id, repository_id, rank, collaborator, team, organization
+        (the last three are 1 for the source of the grant).
+        """
+        def restrict(query, user_column, repository_column):
+            if users is not None:
+                query = query.where(user_column.in_(users))
+            if repositories is not None:
+                query = query.where(repository_column.in_(repositories))
+            return query
+
+        collaborators = restrict(
+            select(
+                RepositoryCollaborator.user_id.label("user_id"),
+                RepositoryCollaborator.repository_id.label("repository_id"),
+                _rank(RepositoryCollaborator.permission).label("rank"),
+                literal(1).label("collaborator"), literal(0).label("team"), literal(0).label("organization")
+            ),
+            RepositoryCollaborator.user_id, RepositoryCollaborator.repository_id
+        )
+        teams = restrict(
+            select(
+                TeamMembership.user_id, TeamRepository.repository_id, _rank(TeamRepository.permission),
+                literal(0), literal(1), literal(0)
+            ).join(TeamRepository, TeamRepository.team_id == TeamMembership.team_id),
+            TeamMembership.user_id, TeamRepository.repository_id
+        )
+        # Organization owners have admin on every repository of the organization
+        owners = restrict(
+            select(
+                OrganizationMembership.user_id, Repository.id, literal(PERMISSION_RANKS["admin"]),
+                literal(0), literal(0), literal(1)
+            )
+            .join(Repository, Repository.organization_id == OrganizationMembership.organization_id)
+            .where(OrganizationMembership.role == "admin"),
+            OrganizationMembership.user_id, Repository.id
+        )
+        return union_all(collaborators, teams, owners).subquery("grants")
+
+    def _write(self, db: Session, users: Optional[IdSet], repositories: Optional[IdSet]) -> int:
+        grants = self._grants(users, repositories)
+        best_rank = func.max(grants.c.rank)
+        effective = (
+            select(
+                grants.c.user_id,
+                grants.c.repository_id,
+                case({rank: permission for permission, rank in PERMISSION_RANKS.items()}, value=best_rank),
+                func.max(grants.c.collaborator) > 0,
+                func.max(grants.c.team) > 0,
+                func.max(grants.c.organization) > 0,
+            )
+            .where(grants.c.rank > 0)
+            .group_by(grants.c.user_id, grants.c.repository_id)
+        )
+        result = db.execute(
+            insert(EffectivePermission).from_select(
+                ["user_id", "repository_id", "permission", "via_collaborator", "via_team", "via_organization"],
+                effective
+            )
+        )
+        return result.rowcount
+
+    def refresh(self, db: Session, users: IdSet, repositories: IdSet) -> int:
+        """
+        Recompute the effective permissions of users x repositories.
+
+        Called after a relationship change with the pairs it can affect (e.g. a
+        team's members x the repository the team was added to). Pending ORM
+        changes are flushed first so the recomputation sees them.
+
+        Args:
+            db: Database session
+            users: User IDs, or a SELECT of user IDs
+            repositories: Repository IDs, or a SELECT of repository IDs
+
+        Returns:
+            Number of effective permission rows written
+        """
+        if isinstance(users, (list, tuple)) and not users:
+            return 0
+        if isinstance(repositories, (list, tuple)) and not repositories:
+            return 0
+
+        db.flush()
+        db.query(EffectivePermission).filter(
+            EffectivePermission.user_id.in_(users),
+            EffectivePermission.repository_id.in_(repositories)
+        ).delete(synchronize_session=False)
+        return self._write(db, users, repositories)
+
+    def rebuild_all(self, db: Session) -> int:
+        """
+        Recompute the whole effective permission table in the caller's transaction.
+
+        Returns:
+            Number of effective permission rows
+        """
+        db.flush()
+        db.query(EffectivePermission).delete(synchronize_session=False)
+        rows = self._write(db, None, None)
+        logger.info(f"🔐 Rebuilt {rows} effective permissions")
+        return rows
+
+
+# Global service instance
+access_service = AccessService()
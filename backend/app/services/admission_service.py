@@ -0,0 +1,220 @@
+"""
+Admission control for the webhook endpoint.
+Applies token buckets per configured hook and a global in-flight limit, and sheds load
+(or spools it to disk) before a burst can exhaust the database pool.
+"""
+
+import json
+import logging
+import math
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from app.core.config import get_settings
+from app.core.metrics import REQUESTS_ADMITTED, REQUESTS_IN_FLIGHT, REQUESTS_SHED, REQUESTS_SPOOLED
+from app.services.signature_service import SignatureService
+
+logger = logging.getLogger(__name__)
+
+# Hook keys come from unauthenticated headers and are read before the signature
+# is checked: only hooks with their own GITHUB_WEBHOOK_SECRETS entry get their
+# own bucket, every other key shares this one, so rotating the header value
+# neither grows memory nor escapes the rate limit
+SHARED_BUCKET = "other"
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at `rate` tokens per second."""
+
+    def __init__(self, capacity: float, rate: float):
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def try_acquire(self) -> float:
+        """
+        Take one token if available.
+
+        Returns:
+            0.0 if a token was taken, otherwise seconds until one is available
+        """
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return 0.0
+        return (1.0 - self.tokens) / self.rate if self.rate > 0 else float(get_settings().RATE_LIMIT_WINDOW)
+
+    def refund(self):
+        """Give back a token taken by try_acquire()."""
+        self.tokens = min(self.capacity, self.tokens + 1.0)
+
+
+@dataclass
+class AdmissionDecision:
+    """Outcome of an admission check."""
+
+    admitted: bool
+    status_code: int = 200
+    reason: Optional[str] = None
+    retry_after: int = 0
+    bucket: Optional[str] = None
+
+
+class AdmissionController:
+    """
+    Admission controller in front of receive_github_webhook.
+
+    - Token buckets sized by RATE_LIMIT_REQUESTS per RATE_LIMIT_WINDOW (429), one per
+      hook configured in GITHUB_WEBHOOK_SECRETS and one shared by all other hooks
+    - Global in-flight limit WEBHOOK_MAX_IN_FLIGHT (503)
+    - Database pool utilization above WEBHOOK_POOL_UTILIZATION_THRESHOLD (503)
+    """
+
+    def __init__(self):
+        self.settings = get_settings()
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.admitted = Counter()
+        self.shed = Counter()
+        self.spooled = 0
+
+    def _tracked_hook(self, hook: str) -> str:
+        """Bucket and counter key of a hook: itself if it has its own secrets, else the shared key."""
+        if hook in (self.settings.GITHUB_WEBHOOK_SECRETS or {}):
+            return hook
+        return SHARED_BUCKET
+
+    def _bucket_for(self, key: str) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            capacity = float(self.settings.RATE_LIMIT_REQUESTS)
+            rate = capacity / max(self.settings.RATE_LIMIT_WINDOW, 1)
+            bucket = self._buckets[key] = TokenBucket(capacity, rate)
+        return bucket
+
+    @staticmethod
+    def pool_utilization() -> Optional[float]:
+        """Get the fraction of database pool connections checked out, if measurable."""
+        from app.core import database
+
+        pool = getattr(database.engine, "pool", None)
+        if pool is None or not hasattr(pool, "size"):
+            return None
+        capacity = pool.size() + max(getattr(pool, "_max_overflow", 0), 0)
+        if capacity <= 0:
+            return None
+        return pool.checkedout() / capacity
+
+    def try_admit(self, headers: Dict[str, Optional[str]]) -> AdmissionDecision:
+        """
+        Decide whether to admit a webhook request.
+
+        Admitted requests must be paired with a call to release().
+        """
+        overload_retry_after = max(self.settings.RETRY_DELAY_SECONDS, 1)
+
+        with self._lock:
+            if self.in_flight >= self.settings.WEBHOOK_MAX_IN_FLIGHT:
+                return self._shed("in_flight_limit", 503, overload_retry_after)
+
+            utilization = self.pool_utilization()
+            if utilization is not None and utilization >= self.settings.WEBHOOK_POOL_UTILIZATION_THRESHOLD:
+                return self._shed("db_pool_saturated", 503, overload_retry_after)
+
+            hook = self._tracked_hook(SignatureService.hook_key(headers))
+            wait = self._bucket_for(hook).try_acquire()
+            if wait > 0:
+                return self._shed("rate_limited", 429, math.ceil(wait))
+
+            self.in_flight += 1
+            self.admitted[hook] += 1
+            REQUESTS_ADMITTED.labels(hook).inc()
+            REQUESTS_IN_FLIGHT.set(self.in_flight)
+            return AdmissionDecision(admitted=True, bucket=hook)
+
+    def _shed(self, reason: str, status_code: int, retry_after: int) -> AdmissionDecision:
+        self.shed[reason] += 1
+        REQUESTS_SHED.labels(reason).inc()
+        return AdmissionDecision(
+            admitted=False,
+            status_code=status_code,
+            reason=reason,
+            retry_after=retry_after
+        )
+
+    def refund(self, decision: AdmissionDecision):
+        """
+        Return the token of an admitted request whose signature failed.
+
+        The bucket is chosen from the unauthenticated hook ID, so without this
+        forged deliveries naming a configured hook would use up its rate limit.
+        """
+        if not decision.admitted or decision.bucket is None:
+            return
+        with self._lock:
+            bucket = self._buckets.get(decision.bucket)
+            if bucket is not None:
+                bucket.refund()
+
+    def release(self):
+        """Release the in-flight slot taken by an admitted request."""
+        with self._lock:
+            self.in_flight = max(self.in_flight - 1, 0)
+            REQUESTS_IN_FLIGHT.set(self.in_flight)
+
+    @property
+    def spool_enabled(self) -> bool:
+        """Whether shed deliveries are spooled to disk instead of rejected."""
+        return bool(self.settings.WEBHOOK_SPOOL_DIR)
+
+    def spool(self, headers: Dict[str, Optional[str]], payload_body: bytes) -> Path:
+        """
+        Append a shed delivery to the hourly NDJSON spool file.
+
+        Each line is a {"headers": ..., "body": ...} record, the same format read
+        by the delivery archive importer.
+
+        Raises:
+            UnicodeDecodeError: If the body is not UTF-8 (not a GitHub delivery)
+        """
+        spool_dir = Path(self.settings.WEBHOOK_SPOOL_DIR)
+        spool_dir.mkdir(parents=True, exist_ok=True)
+        spool_file = spool_dir / f"webhooks-{datetime.now(timezone.utc):%Y%m%d-%H}.ndjson"
+
+        record: Dict[str, Any] = {
+            "headers": {key: value for key, value in headers.items() if value is not None},
+            "body": payload_body.decode("utf-8"),
+            "spooled_at": datetime.now(timezone.utc).isoformat(),
+        }
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+
+        with self._lock:
+            with open(spool_file, "a", encoding="utf-8") as f:
+                f.write(line)
+            self.spooled += 1
+            REQUESTS_SPOOLED.inc()
+        return spool_file
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get admitted/shed counters and current load."""
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.settings.WEBHOOK_MAX_IN_FLIGHT,
+            "db_pool_utilization": self.pool_utilization(),
+            "admitted": dict(self.admitted),
+            "shed": dict(self.shed),
+            "spooled": self.spooled,
+        }
+
+
+# Global controller instance
+admission_controller = AdmissionController()
@@ -4,7 +4,7 @@ Handles creation, updates, and relationships between entities.
 """
 
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Union
 from datetime import datetime
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
@@ -13,7 +13,9 @@ from sqlalchemy.exc import IntegrityError
 from app.webhook_models.common.user import User as WebhookUser
 from app.webhook_models.common.repository import Repository as WebhookRepository
 from app.webhook_models.common.organization import Organization as WebhookOrganization
-from app.webhook_models.common.installation import Installation as WebhookInstallation
+from app.webhook_models.common.installation import (
+    Installation as WebhookInstallation, InstallationLite as WebhookInstallationLite
+)
 
 from app.core.logging_config import log_database_operation
 from app.models.core import User, Repository, Organization, Installation
@@ -139,13 +141,19 @@ class EntityService:
             user.email = webhook_user.email
         # Add other fields as needed
     
-    async def ensure_repository(self, db: Session, webhook_repo: WebhookRepository) -> int:
+    async def ensure_repository(
+        self,
+        db: Session,
+        webhook_repo: WebhookRepository,
+        organization_id: Optional[int] = None
+    ) -> int:
         """
         Ensure repository exists in database, create or update as needed.
         
         Args:
             db: Database session
             webhook_repo: Repository data from webhook
+            organization_id: Database ID of the organization owning the repository, if any
             
         Returns:
             Repository database ID
@@ -159,12 +167,15 @@ class EntityService:
             if existing_repo:
                 # Update existing repository
                 self._update_repository_from_webhook(existing_repo, webhook_repo)
+                if organization_id:
+                    existing_repo.organization_id = organization_id
                 db.commit()
                 logger.debug(f"Updated existing repository: {webhook_repo.full_name}")
                 return existing_repo.id
             
             # Create new repository
             new_repo = self._create_repository_from_webhook(webhook_repo)
+            new_repo.organization_id = organization_id
             
             # Handle owner relationship
             if webhook_repo.owner:
@@ -334,16 +345,21 @@ class EntityService:
         org.avatar_url = webhook_org.avatar_url
         # Add other fields as needed
     
-    async def ensure_installation(self, db: Session, webhook_installation: WebhookInstallation) -> int:
+    async def ensure_installation(
+        self,
+        db: Session,
+        webhook_installation: Union[WebhookInstallation, WebhookInstallationLite]
+    ) -> Optional[int]:
         """
         Ensure installation exists in database, create or update as needed.
         
         Args:
             db: Database session
-            webhook_installation: Installation data from webhook
+            webhook_installation: Installation data from webhook; a stub (id only)
+                is matched to a stored installation but never creates one
             
         Returns:
-            Installation database ID
+            Installation database ID, or None for a stub of an unknown installation
         """
         try:
             # Check if installation exists
@@ -351,6 +367,9 @@ class EntityService:
                 Installation.github_id == webhook_installation.id
             ).first()
             
+            if isinstance(webhook_installation, WebhookInstallationLite):
+                return existing_installation.id if existing_installation else None
+            
             if existing_installation:
                 # Update existing installation
                 self._update_installation_from_webhook(existing_installation, webhook_installation)
@@ -0,0 +1,351 @@
+"""
+In-memory columnar analytics over recent webhook events.
+Keeps the last ANALYTICS_WINDOW_DAYS of events as NumPy arrays (entity IDs,
+epoch timestamps and event type codes) so summaries are computed with
+vectorized operations instead of loading ORM objects.
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.models.core import WebhookEvent
+
+logger = logging.getLogger(__name__)
+
+SECONDS_PER_DAY = 86_400
+
+# Refreshes re-read this many IDs below the last one seen, so events whose
+# transactions committed after a higher ID was already read are not missed
+REFRESH_OVERLAP = 256
+
+LOAD_BATCH_SIZE = 50_000
+
+# Array columns: name -> dtype (0 stands for a missing entity ID)
+COLUMNS = {
+    "id": np.int64,
+    "received_at": np.int64,
+    "event_type": np.int16,
+    "organization_id": np.int32,
+    "repository_id": np.int32,
+    "sender_id": np.int32,
+}
+
+EVENT_COLUMNS = (
+    WebhookEvent.id,
+    WebhookEvent.received_at,
+    WebhookEvent.event_type,
+    WebhookEvent.organization_id,
+    WebhookEvent.repository_id,
+    WebhookEvent.sender_id,
+    WebhookEvent.repository_name,
+    WebhookEvent.sender_login,
+)
+
+
+def _epoch_seconds(value: Optional[datetime]) -> int:
+    """Epoch seconds of a timestamp; naive values are taken as UTC."""
+    if value is None:
+        return int(time.time())
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+
+def _entity_counts(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Distinct non-zero IDs and their event counts.
+
+    Counted with np.bincount when the IDs are dense enough (linear time),
+    otherwise with np.unique (a sort).
+    """
+    values = values[values != 0]
+    if not values.size:
+        return values, values
+    if int(values.max()) <= 4 * values.size + 1_000_000:
+        counts = np.bincount(values)
+        ids = np.flatnonzero(counts)
+        return ids, counts[ids]
+    return np.unique(values, return_counts=True)
+
+
+def _top(ids: np.ndarray, counts: np.ndarray, names: Dict[int, str], limit: int) -> List[Tuple[str, int]]:
+    """The `limit` most frequent IDs as (name, count), ties by ID."""
+    if ids.size > limit:
+        candidates = np.argpartition(-counts, limit - 1)[:limit]
+        ids, counts = ids[candidates], counts[candidates]
+    order = np.lexsort((ids, -counts))[:limit]
+    return [(names.get(int(ids[i]), str(ids[i])), int(counts[i])) for i in order]
+
+
+class EventAnalytics:
+    """
+    Columnar cache of the recent webhook events of this worker.
+
+    Arrays are kept in event ID order in growable buffers. Events stored by
+    this worker are appended from the ingest path; refresh() picks up the
+    events stored by other workers and imports.
+    """
+
+    def __init__(self, window_days: Optional[int] = None):
+        self.window_days = window_days or get_settings().ANALYTICS_WINDOW_DAYS
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._columns = {name: np.zeros(0, dtype=dtype) for name, dtype in COLUMNS.items()}
+        self._size = 0
+        self._event_types: List[str] = []
+        self._event_type_codes: Dict[str, int] = {}
+        self._repository_names: Dict[int, str] = {}
+        self._user_logins: Dict[int, str] = {}
+        self._refreshed_id = 0
+        self._pruned_at = 0.0
+        self.loaded = False
+
+    @property
+    def size(self) -> int:
+        """Number of events held in memory."""
+        return self._size
+
+    def _encode(self, rows: Iterable[tuple]) -> Dict[str, np.ndarray]:
+        """Convert (EVENT_COLUMNS) rows to column arrays, recording names and type codes."""
+        ids, received, types, organizations, repositories, senders = [], [], [], [], [], []
+        for event_id, received_at, event_type, organization_id, repository_id, sender_id, repository_name, sender_login in rows:
+            code = self._event_type_codes.get(event_type)
+            if code is None:
+                code = self._event_type_codes[event_type] = len(self._event_types)
+                self._event_types.append(event_type)
+            ids.append(event_id)
+            received.append(_epoch_seconds(received_at))
+            types.append(code)
+            organizations.append(organization_id or 0)
+            repositories.append(repository_id or 0)
+            senders.append(sender_id or 0)
+            if repository_id and repository_name:
+                self._repository_names[repository_id] = repository_name
+            if sender_id and sender_login:
+                self._user_logins[sender_id] = sender_login
+
+        values = (ids, received, types, organizations, repositories, senders)
+        return {name: np.array(column, dtype=COLUMNS[name]) for name, column in zip(COLUMNS, values)}
+
+    def _append(self, batch: Dict[str, np.ndarray]):
+        """
+        Add encoded events, skipping IDs already held.
+
+        Events newer than everything held go to the end of the buffers (grown
+        by doubling); older ones are inserted in ID order.
+        """
+        ids = self._columns["id"][:self._size]
+        if ids.size:
+            positions = np.searchsorted(ids, batch["id"])
+            known = positions < ids.size
+            known[known] = ids[positions[known]] == batch["id"][known]
+            if known.any():
+                batch = {name: column[~known] for name, column in batch.items()}
+        count = batch["id"].size
+        if not count:
+            return
+
+        order = np.argsort(batch["id"], kind="stable")
+        batch = {name: column[order] for name, column in batch.items()}
+        if ids.size and batch["id"][0] < ids[-1]:
+            positions = np.searchsorted(ids, batch["id"])
+            self._columns = {
+                name: np.insert(self._columns[name][:self._size], positions, batch[name]) for name in COLUMNS
+            }
+            self._size += count
+            return
+
+        needed = self._size + count
+        capacity = self._columns["id"].size
+        if needed > capacity:
+            capacity = max(needed, capacity * 2, 1024)
+            for name, dtype in COLUMNS.items():
+                grown = np.zeros(capacity, dtype=dtype)
+                grown[:self._size] = self._columns[name][:self._size]
+                self._columns[name] = grown
+        for name in COLUMNS:
+            self._columns[name][self._size:needed] = batch[name]
+        self._size = needed
+
+    def _prune(self, now: float):
+        """Drop events older than the window, and names no held event uses (at most once an hour)."""
+        if now - self._pruned_at < 3600:
+            return
+        self._pruned_at = now
+        keep = self._columns["received_at"][:self._size] >= now - self.window_days * SECONDS_PER_DAY
+        if keep.all():
+            return
+        self._columns = {name: self._columns[name][:self._size][keep] for name in COLUMNS}
+        self._size = int(keep.sum())
+        repository_ids = np.unique(self._columns["repository_id"]).tolist()
+        self._repository_names = {
+            repository_id: self._repository_names[repository_id]
+            for repository_id in repository_ids if repository_id in self._repository_names
+        }
+        sender_ids = np.unique(self._columns["sender_id"]).tolist()
+        self._user_logins = {
+            sender_id: self._user_logins[sender_id] for sender_id in sender_ids if sender_id in self._user_logins
+        }
+
+    def load(self, db: Session):
+        """
+        Load the events of the window from the database, replacing what is held.
+
+        Args:
+            db: Database session
+        """
+        started = time.perf_counter()
+        since = datetime.now(timezone.utc) - timedelta(days=self.window_days)
+        statement = (
+            select(*EVENT_COLUMNS)
+            .where(WebhookEvent.received_at >= since)
+            .order_by(WebhookEvent.id)
+            .execution_options(stream_results=True, yield_per=LOAD_BATCH_SIZE)
+        )
+        with self._lock:
+            self._reset()
+            self._refreshed_id = db.execute(select(func.coalesce(func.max(WebhookEvent.id), 0))).scalar()
+            for rows in db.execute(statement).partitions():
+                batch = self._encode(rows)
+                self._append(batch)
+                self._refreshed_id = max(self._refreshed_id, int(batch["id"][-1]))
+            self._pruned_at = time.time()
+            self.loaded = True
+
+        logger.info(
+            f"📊 Loaded {self._size} events of the last {self.window_days} days into the analytics engine "
+            f"in {(time.perf_counter() - started) * 1000:.0f}ms"
+        )
+
+    def refresh(self, db: Session):
+        """
+        Load the window on first use, then read the events stored since the last refresh.
+
+        Args:
+            db: Database session
+        """
+        if not self.loaded:
+            self.load(db)
+            return
+
+        rows = db.execute(
+            select(*EVENT_COLUMNS)
+            .where(WebhookEvent.id > self._refreshed_id - REFRESH_OVERLAP)
+            .order_by(WebhookEvent.id)
+        ).all()
+        with self._lock:
+            if rows:
+                batch = self._encode(rows)
+                self._append(batch)
+                self._refreshed_id = max(self._refreshed_id, int(batch["id"][-1]))
+            self._prune(time.time())
+
+    def record(self, event: WebhookEvent):
+        """
+        Add an event stored by this worker (called from the ingest path).
+
+        Ignored until the window has been loaded, since the load will include it.
+
+        Args:
+            event: Stored webhook event
+        """
+        if not self.loaded:
+            return
+        with self._lock:
+            self._append(self._encode([tuple(getattr(event, column.key) for column in EVENT_COLUMNS)]))
+
+    def covers(self, days: int) -> bool:
+        """Whether a summary over the last `days` days can be answered from memory."""
+        return get_settings().ANALYTICS_ENGINE_ENABLED and days <= self.window_days
+
+    def summary(
+        self,
+        days: int,
+        organization_id: Optional[int] = None,
+        organization_login: Optional[str] = None,
+        now: Optional[datetime] = None,
+        limit: int = 10
+    ) -> Dict[str, Any]:
+        """
+        Aggregate the events of the last `days` days (of one organization, if given).
+
+        Same shape as the /audit/analytics/summary response; days are UTC dates.
+
+        Args:
+            days: Number of days to analyze (at most the window)
+            organization_id: Only count this organization's events
+            organization_login: Organization reported in the period
+            now: End of the period (default: now)
+            limit: Number of top repositories and users
+
+        Returns:
+            Totals, distinct counts, event type histogram, daily activity of the
+            last 7 days and the most active repositories and users
+        """
+        now = now or datetime.now(timezone.utc)
+        end = _epoch_seconds(now)
+        start = end - days * SECONDS_PER_DAY
+
+        with self._lock:
+            columns = {name: self._columns[name][:self._size] for name in COLUMNS}
+            event_types = list(self._event_types)
+            repository_names = self._repository_names
+            user_logins = self._user_logins
+
+        mask = columns["received_at"] >= start
+        if organization_id is not None:
+            mask &= columns["organization_id"] == organization_id
+        received = columns["received_at"][mask]
+        repositories = _entity_counts(columns["repository_id"][mask])
+        senders = _entity_counts(columns["sender_id"][mask])
+        total_events = int(received.size)
+
+        type_counts = np.bincount(columns["event_type"][mask], minlength=len(event_types))
+
+        today = end // SECONDS_PER_DAY
+        day_offsets = today - received[received >= end - 7 * SECONDS_PER_DAY] // SECONDS_PER_DAY
+        daily_counts = np.bincount(day_offsets[(day_offsets >= 0) & (day_offsets < 7)], minlength=7)
+        daily_activity = {
+            datetime.fromtimestamp((today - offset) * SECONDS_PER_DAY, timezone.utc).strftime('%Y-%m-%d'):
+                int(daily_counts[offset])
+            for offset in range(7)
+        }
+
+        return {
+            "period": {
+                "days": days,
+                "start_date": datetime.fromtimestamp(start, timezone.utc),
+                "end_date": now,
+                "organization": organization_login
+            },
+            "summary": {
+                "total_events": total_events,
+                "unique_repositories": int(repositories[0].size),
+                "unique_users": int(senders[0].size),
+                "avg_events_per_day": round(total_events / days, 2)
+            },
+            "event_types": {
+                event_types[code]: int(count) for code, count in enumerate(type_counts) if count
+            },
+            "daily_activity": daily_activity,
+            "top_repositories": [
+                {"name": name, "events": count} for name, count in _top(*repositories, repository_names, limit)
+            ],
+            "top_users": [
+                {"login": login, "events": count} for login, count in _top(*senders, user_logins, limit)
+            ]
+        }
+
+
+# Global analytics engine instance
+event_analytics = EventAnalytics()
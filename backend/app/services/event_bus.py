@@ -0,0 +1,310 @@
+"""
+Cross-worker event bus on PostgreSQL LISTEN/NOTIFY.
+Stored events are fanned out to this worker's handlers at once and announced
+to the other workers in batched NOTIFYs; each worker keeps one listening
+connection and catches up from webhook_events by ID on notifications it missed.
+"""
+
+import json
+import logging
+import os
+import queue
+import select
+import socket
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import create_engine, func, select as sql_select, text
+from sqlalchemy.engine import Connection, Engine
+
+from app.core.config import get_settings
+from app.models.core import WebhookEvent
+
+logger = logging.getLogger(__name__)
+
+# Compact event fields, sent positionally in notifications
+FIELDS = (
+    "id", "event_type", "event_action", "organization_id", "organization_login",
+    "repository_name", "sender_login", "event_timestamp",
+)
+
+# PostgreSQL rejects NOTIFY payloads of 8000 bytes or more
+MAX_PAYLOAD_BYTES = 7900
+
+# Catch-up re-reads this many IDs below the highest one seen, for events whose
+# transactions committed after a higher ID had already been announced
+CATCHUP_OVERLAP = 100
+
+# Delivered event IDs remembered to drop duplicates (notification vs catch-up)
+SEEN_IDS = 10_000
+
+Handler = Callable[[List[Dict[str, Any]]], None]
+
+
+def compact(event: Dict[str, Any]) -> List[Any]:
+    return [event.get(field) for field in FIELDS]
+
+
+def expand(values: List[Any]) -> Dict[str, Any]:
+    return dict(zip(FIELDS, values))
+
+
+class EventBus:
+    """
+    Local handler registry plus the NOTIFY publisher and LISTEN threads.
+
+    Handlers get lists of compact event dicts. Handlers subscribed with
+    include_local=False only see events stored by other workers (e.g. to
+    invalidate this worker's caches). Without PostgreSQL, or before start(),
+    the bus only dispatches locally.
+    """
+
+    def __init__(self):
+        self.settings = get_settings()
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._handlers: List[Tuple[Handler, bool]] = []
+        self._outbox: "queue.Queue[List[Any]]" = queue.Queue()
+        self._seen: Deque[int] = deque()
+        self._seen_ids: Set[int] = set()
+        self._seen_lock = threading.Lock()
+        self._last_event_id: Optional[int] = None
+        self._start_event_id: Optional[int] = None
+        self._engine: Optional[Engine] = None
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self.stats = {"published": 0, "notifies": 0, "received": 0, "caught_up": 0, "duplicates": 0, "errors": 0}
+
+    @property
+    def running(self) -> bool:
+        return bool(self._threads)
+
+    def subscribe(self, handler: Handler, include_local: bool = True):
+        """Register a handler for batches of events (once; repeated calls are ignored)."""
+        if (handler, include_local) not in self._handlers:
+            self._handlers.append((handler, include_local))
+
+    def _dispatch(self, events: List[Dict[str, Any]], local: bool):
+        for handler, include_local in self._handlers:
+            if local and not include_local:
+                continue
+            try:
+                handler(events)
+            except Exception as e:
+                logger.error(f"Event bus handler {getattr(handler, '__name__', handler)} failed: {e}")
+
+    def _mark_seen(self, event_ids: List[int]) -> Set[int]:
+        """Remember delivered IDs; returns those that were new."""
+        new = set()
+        with self._seen_lock:
+            for event_id in event_ids:
+                if event_id in self._seen_ids:
+                    continue
+                new.add(event_id)
+                self._seen_ids.add(event_id)
+                self._seen.append(event_id)
+                if len(self._seen) > SEEN_IDS:
+                    self._seen_ids.discard(self._seen.popleft())
+                if self._last_event_id is None or event_id > self._last_event_id:
+                    self._last_event_id = event_id
+        return new
+
+    def publish(self, event: Dict[str, Any]):
+        """
+        Deliver a stored event to this worker's handlers and queue its notification.
+
+        Args:
+            event: Event with (at least) the FIELDS keys; "id" is required
+        """
+        self._mark_seen([event["id"]])
+        self.stats["published"] += 1
+        self._dispatch([event], local=True)
+        if self.running:
+            self._outbox.put(compact(event))
+
+    def payloads(self, items: List[List[Any]]) -> List[str]:
+        """Encode compact events into as few NOTIFY payloads as fit the size limit."""
+        payloads, batch, size = [], [], 0
+        overhead = len(json.dumps({"w": self.worker_id, "e": []}))
+        for item in items:
+            encoded = json.dumps(item, default=str, separators=(",", ":"))
+            if batch and overhead + size + len(encoded) + 1 > MAX_PAYLOAD_BYTES:
+                payloads.append(self._payload(batch))
+                batch, size = [], 0
+            batch.append(encoded)
+            size += len(encoded) + 1
+        if batch:
+            payloads.append(self._payload(batch))
+        return payloads
+
+    def _payload(self, encoded: List[str]) -> str:
+        return f'{{"w":{json.dumps(self.worker_id)},"e":[{",".join(encoded)}]}}'
+
+    def receive(self, payload: str):
+        """Handle a notification: events from other workers go to the handlers once."""
+        message = json.loads(payload)
+        events = [expand(values) for values in message["e"]]
+        self.stats["received"] += len(events)
+        new = self._mark_seen([event["id"] for event in events])
+        if message["w"] == self.worker_id:
+            return
+        self.stats["duplicates"] += len(events) - len(new)
+        events = [event for event in events if event["id"] in new]
+        if events:
+            self._dispatch(events, local=False)
+
+    def catch_up(self, connection: Connection) -> int:
+        """
+        Deliver stored events missed by notifications (lost NOTIFYs, listener downtime).
+
+        Reads webhook_events past the highest ID seen, minus a small overlap for
+        late commits; IDs already delivered are skipped.
+
+        Args:
+            connection: Database connection
+
+        Returns:
+            Number of events delivered
+        """
+        if self._start_event_id is None:
+            # Events stored before this worker started are not replayed
+            self._start_event_id = connection.execute(
+                sql_select(func.coalesce(func.max(WebhookEvent.id), 0))
+            ).scalar()
+            if self._last_event_id is None:
+                self._last_event_id = self._start_event_id
+                return 0
+
+        rows = connection.execute(
+            sql_select(*(getattr(WebhookEvent, field) for field in FIELDS))
+            .where(WebhookEvent.id > max(self._start_event_id, self._last_event_id - CATCHUP_OVERLAP))
+            .order_by(WebhookEvent.id)
+            .limit(self.settings.EVENT_BUS_CATCHUP_LIMIT)
+        ).all()
+        new = self._mark_seen([row[0] for row in rows])
+        events = []
+        for row in rows:
+            if row[0] in new:
+                event = expand(list(row))
+                if event["event_timestamp"] is not None:
+                    event["event_timestamp"] = event["event_timestamp"].isoformat()
+                events.append(event)
+        if events:
+            self.stats["caught_up"] += len(events)
+            logger.info(f"🔁 Event bus caught up on {len(events)} events")
+            self._dispatch(events, local=False)
+        return len(events)
+
+    def _publish_loop(self):
+        """Send queued notifications, batching those that arrive within EVENT_BUS_FLUSH_MS."""
+        while not self._stop.is_set():
+            try:
+                items = [self._outbox.get(timeout=1.0)]
+            except queue.Empty:
+                continue
+            deadline = time.monotonic() + self.settings.EVENT_BUS_FLUSH_MS / 1000
+            while len(items) < self.settings.EVENT_BUS_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    items.append(self._outbox.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                with self._engine.begin() as connection:
+                    for payload in self.payloads(items):
+                        connection.execute(
+                            text("SELECT pg_notify(:channel, :payload)"),
+                            {"channel": self.settings.EVENT_BUS_CHANNEL, "payload": payload}
+                        )
+                        self.stats["notifies"] += 1
+            except Exception as e:
+                # The other workers pick these events up in their catch-up reads
+                self.stats["errors"] += 1
+                logger.error(f"Failed to send event bus notifications for {len(items)} events: {e}")
+
+    def _listen_loop(self):
+        """Keep one LISTEN connection, reconnecting (and catching up) after failures."""
+        backoff = 1.0
+        while not self._stop.is_set():
+            raw = None
+            try:
+                raw = self._engine.raw_connection()
+                listener = raw.driver_connection
+                listener.autocommit = True
+                listener.cursor().execute(f'LISTEN "{self.settings.EVENT_BUS_CHANNEL}"')
+                logger.info(f"📡 Event bus listening on {self.settings.EVENT_BUS_CHANNEL} as {self.worker_id}")
+                with self._engine.connect() as connection:
+                    self.catch_up(connection)
+                backoff = 1.0
+
+                while not self._stop.is_set():
+                    ready, _, _ = select.select([listener], [], [], self.settings.EVENT_BUS_CATCHUP_SECONDS)
+                    if not ready:
+                        with self._engine.connect() as connection:
+                            self.catch_up(connection)
+                        continue
+                    listener.poll()
+                    while listener.notifies:
+                        self.receive(listener.notifies.pop(0).payload)
+
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.error(f"Event bus listener failed, reconnecting in {backoff:.0f}s: {e}")
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                if raw is not None:
+                    # Discarded rather than returned to the pool, since it is still listening
+                    raw.invalidate()
+
+    def start(self, database_url: Optional[str] = None):
+        """
+        Start the publisher and listener threads (PostgreSQL only).
+
+        Args:
+            database_url: Database to use (default DATABASE_URL)
+        """
+        url = database_url or self.settings.DATABASE_URL
+        if self.running or not self.settings.EVENT_BUS_ENABLED:
+            return
+        if not url or not url.startswith("postgres"):
+            logger.info("Event bus needs PostgreSQL - dispatching locally only")
+            return
+
+        # Listener, catch-up and publisher connections, kept out of the request pool
+        self._engine = create_engine(url, pool_size=3, max_overflow=0, pool_pre_ping=True)
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._publish_loop, name="event-bus-publisher", daemon=True),
+            threading.Thread(target=self._listen_loop, name="event-bus-listener", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        """Stop the threads and close their connections."""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=5)
+        self._threads = []
+        if self._engine is not None:
+            self._engine.dispose()
+            self._engine = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "worker_id": self.worker_id,
+            "running": self.running,
+            "last_event_id": self._last_event_id,
+            "pending_notifications": self._outbox.qsize(),
+            **self.stats
+        }
+
+
+# Global event bus instance
+event_bus = EventBus()
@@ -1,21 +1,37 @@
 """
 Event processing service for creating specialized event records.
-Handles the extraction and storage of structured data from webhook events.
+Routes stored webhook events to the processors registered in
+app.services.processors, and maintains the membership and team relationship
+tables the member and team processors apply their events to.
 """
 
 import logging
-from typing import Dict, Any, Optional
+from typing import Any, Dict, List, Optional, Type
 from datetime import datetime, timezone
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
-from app.models.core import WebhookEvent
+from app.core.metrics import EVENTS_FAILED, EVENTS_PROCESSED, EVENTS_RETRIED
+from app.models.core import Repository, Team, User, WebhookEvent
 from app.models.events import (
-    RepositoryEvent, MemberEvent, SecurityEvent, CodeEvent,
-    OrganizationMembership, RepositoryCollaborator
+    OrganizationMembership, RepositoryCollaborator,
+    OrganizationMembershipHistory, RepositoryCollaboratorHistory,
+    TeamMembership, TeamRepository
 )
+from app.services.access_service import access_service, team_repository_permission
+from app.services.processors import processor_registry
 
 logger = logging.getLogger(__name__)
 
+# Values allowed by the membership_role_check / collaborator_permission_check constraints
+MEMBERSHIP_ROLES = ("member", "admin", "billing_manager")
+COLLABORATOR_PERMISSIONS = ("read", "write", "admin", "maintain", "triage")
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Treat naive timestamps (e.g. read back from SQLite) as UTC."""
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
 
 class EventProcessingService:
     """Service for processing webhook events into specialized event records."""
@@ -34,263 +50,322 @@ class EventProcessingService:
         Returns:
             True if processing was successful, False otherwise
         """
-        try:
-            event_type = webhook_event.event_type
-            payload = webhook_event.payload
-            
-            logger.info(f"Processing {event_type} event (ID: {webhook_event.id})")
+        errors = await self.process_batch(db, [webhook_event])
+        return webhook_event.id not in errors
+    
+    async def process_batch(self, db: Session, webhook_events: List[WebhookEvent]) -> Dict[int, str]:
+        """
+        Process stored webhook events and mark them processed, in one commit.
+        
+        Events are routed through processor_registry, and each processor gets all
+        of its events at once inside a savepoint. When a batch fails it is rolled
+        back and its events are processed one at a time, so only the failing
+        events are left unprocessed (with their error, to be retried). Events no
+        processor handles are marked processed as they are. If the commit itself
+        fails, the whole batch is rolled back and every event is kept for retry.
+        
+        Args:
+            db: Database session
+            webhook_events: Stored webhook events, in id order
             
-            # Route to appropriate processing function
-            if event_type == "repository":
-                await self._process_repository_event(db, webhook_event, payload)
-            elif event_type == "member":
-                await self._process_member_event(db, webhook_event, payload)
-            elif event_type == "organization":
-                await self._process_organization_event(db, webhook_event, payload)
-            elif event_type in ["code_scanning_alert", "dependabot_alert", "secret_scanning_alert"]:
-                await self._process_security_event(db, webhook_event, payload)
-            elif event_type in ["push", "create", "delete", "fork"]:
-                await self._process_code_event(db, webhook_event, payload)
+        Returns:
+            Processing error by ID of the events that failed
+        """
+        errors: Dict[int, str] = {}
+        for processor, events in processor_registry.group(webhook_events):
+            try:
+                with db.begin_nested():
+                    await processor.process_batch(db, events)
+                continue
+            except Exception as e:
+                if len(events) == 1:
+                    errors[events[0].id] = str(e)
+                    continue
+                logger.warning(
+                    f"⚠️ {type(processor).__name__} failed on a batch of {len(events)} events, "
+                    f"processing them one at a time: {e}"
+                )
+            for event in events:
+                try:
+                    with db.begin_nested():
+                        await processor.process_batch(db, [event])
+                except Exception as e:
+                    errors[event.id] = str(e)
+        
+        processed_at = datetime.now(timezone.utc)
+        for webhook_event in webhook_events:
+            if webhook_event.retry_count:
+                EVENTS_RETRIED.labels(webhook_event.event_type).inc()
+            error = errors.get(webhook_event.id)
+            if error is None:
+                webhook_event.processed = True
+                webhook_event.processed_at = processed_at
             else:
-                logger.debug(f"No specialized processing for event type: {event_type}")
-            
-            # Mark webhook event as processed
-            webhook_event.processed = True
-            webhook_event.processed_at = datetime.now(timezone.utc)
+                webhook_event.processing_error = error
+                webhook_event.retry_count = (webhook_event.retry_count or 0) + 1
+        try:
             db.commit()
-            
-            logger.info(f"Successfully processed {event_type} event (ID: {webhook_event.id})")
-            return True
-            
         except Exception as e:
+            # Nothing of the batch was stored; keep every event for retry
+            logger.error(f"Failed to commit a batch of {len(webhook_events)} webhook events: {e}")
             db.rollback()
-            webhook_event.processing_error = str(e)
-            webhook_event.retry_count = (webhook_event.retry_count or 0) + 1
+            errors = {}
+            for webhook_event in webhook_events:
+                webhook_event.processing_error = str(e)
+                webhook_event.retry_count = (webhook_event.retry_count or 0) + 1
+                errors[webhook_event.id] = str(e)
             db.commit()
-            logger.error(f"Failed to process event {webhook_event.id}: {e}")
-            return False
+        
+        for webhook_event in webhook_events:
+            error = errors.get(webhook_event.id)
+            if error is None:
+                EVENTS_PROCESSED.labels(webhook_event.event_type).inc()
+            else:
+                EVENTS_FAILED.labels(webhook_event.event_type).inc()
+                logger.error(f"Failed to process event {webhook_event.id}: {error}")
+        
+        logger.info(f"Processed {len(webhook_events) - len(errors)} of {len(webhook_events)} webhook events")
+        return errors
     
-    async def _process_repository_event(
-        self, 
-        db: Session, 
-        webhook_event: WebhookEvent, 
-        payload: Dict[str, Any]
-    ):
-        """Process repository events (created, deleted, archived, etc.)"""
-        action = payload.get("action", "")
+    def count_unprocessed(self, db: Session) -> Dict[str, int]:
+        """
+        Count webhook events still waiting for background processing.
         
-        # Create repository event record
-        repo_event = RepositoryEvent(
-            webhook_event_id=webhook_event.id,
-            repository_id=webhook_event.repository_id,
-            action=action,
-            changes=payload.get("changes", {}),
-            event_timestamp=webhook_event.event_timestamp
+        Args:
+            db: Database session
+            
+        Returns:
+            Mapping of event type to the number of rows with processed = False
+        """
+        rows = (
+            db.query(WebhookEvent.event_type, func.count())
+            .filter(WebhookEvent.processed == False)
+            .group_by(WebhookEvent.event_type)
+            .all()
         )
-        
-        db.add(repo_event)
-        logger.debug(f"Created repository event: {action}")
+        return {event_type: count for event_type, count in rows}
     
-    async def _process_member_event(
-        self, 
-        db: Session, 
-        webhook_event: WebhookEvent, 
-        payload: Dict[str, Any]
+    def _find_user_id(self, db: Session, github_id: Optional[int]) -> Optional[int]:
+        """Look up our user ID for a GitHub user ID."""
+        if not github_id:
+            return None
+        user_record = db.query(User).filter(User.github_id == github_id).first()
+        if user_record:
+            return user_record.id
+        logger.warning(f"User with GitHub ID {github_id} not found in database")
+        return None
+    
+    async def _apply_membership_relationships(
+        self,
+        db: Session,
+        action: str,
+        organization_id: Optional[int],
+        repository_id: Optional[int],
+        member_id: Optional[int],
+        permission_level: Optional[str],
+        event_timestamp: Optional[datetime] = None
     ):
-        """Process member events (added, removed, permission changes)"""
-        action = payload.get("action", "")
-        member_data = payload.get("member", {})
-        membership_data = payload.get("membership", {})
-        
-        # Extract member information from different payload structures
-        member_github_id = None
-        member_login = None
-        permission_level = payload.get("permission")
+        """
+        Apply a member event to the organization membership and repository collaborator tables.
         
-        # Get member info from member field (repository member events)
-        if member_data:
-            member_github_id = member_data.get("id")
-            member_login = member_data.get("login")
+        Shared by live event processing and the incremental relationship rebuild,
+        which replays stored member events in id order. The history tables get
+        the same change as a validity period starting at the event timestamp,
+        and the effective permissions of the affected repositories are refreshed.
         
-        # Get member info from membership field (organization member events)
-        elif membership_data and membership_data.get("user"):
-            user = membership_data["user"]
-            member_github_id = user.get("id")
-            member_login = user.get("login")
-            # Get role from membership for org events
-            if not permission_level:
-                permission_level = membership_data.get("role", "member")
+        Args:
+            db: Database session
+            action: Member event action
+            organization_id: Organization the event belongs to
+            repository_id: Repository the event belongs to
+            member_id: User the event is about
+            permission_level: Permission or role carried by the event
+            event_timestamp: When the change happened (defaults to now)
+        """
+        if not member_id:
+            return
         
-        # Find the actual user ID in our database
-        member_id = None
-        if member_github_id:
-            from app.models.core import User
-            user_record = db.query(User).filter(User.github_id == member_github_id).first()
-            if user_record:
-                member_id = user_record.id
-            else:
-                logger.warning(f"User with GitHub ID {member_github_id} not found in database")
+        # Repository member events carry a repository permission (e.g. "write"),
+        # which is not an organization role
+        role = permission_level if permission_level in MEMBERSHIP_ROLES else "member"
+        permission = permission_level if permission_level in COLLABORATOR_PERMISSIONS else "read"
+        changed_at = event_timestamp or datetime.now(timezone.utc)
         
-        # Create member event record
-        member_event = MemberEvent(
-            webhook_event_id=webhook_event.id,
-            repository_id=webhook_event.repository_id,
-            organization_id=webhook_event.organization_id,
-            member_id=member_id,
-            action=action,
-            permission_level=permission_level,
-            changes=payload.get("changes", {}),
-            event_timestamp=webhook_event.event_timestamp
-        )
+        # Organization membership events
+        if action in ["member_added", "added"] and organization_id:
+            await self._update_organization_membership(
+                db, organization_id, member_id, role, "active"
+            )
+            self._record_history(
+                db, OrganizationMembershipHistory, {"organization_id": organization_id, "user_id": member_id},
+                {"role": role}, changed_at
+            )
+            access_service.refresh(db, [member_id], self._organization_repositories(organization_id))
+            logger.info(f"Added organization membership: org={organization_id}, user={member_id}")
         
-        db.add(member_event)
+        elif action in ["member_removed", "removed"] and organization_id:
+            await self._remove_organization_membership(
+                db, organization_id, member_id
+            )
+            self._record_history(
+                db, OrganizationMembershipHistory, {"organization_id": organization_id, "user_id": member_id},
+                None, changed_at
+            )
+            access_service.refresh(db, [member_id], self._organization_repositories(organization_id))
+            logger.info(f"Removed organization membership: org={organization_id}, user={member_id}")
         
-        # Handle relationship updates based on action and context
-        if member_id:
-            # Organization membership events
-            if action in ["member_added", "added"] and webhook_event.organization_id:
-                await self._update_organization_membership(
-                    db, webhook_event.organization_id, member_id, permission_level or "member", "active"
-                )
-                logger.info(f"Added organization membership: org={webhook_event.organization_id}, user={member_id}")
-            
-            elif action in ["member_removed", "removed"] and webhook_event.organization_id:
-                await self._remove_organization_membership(
-                    db, webhook_event.organization_id, member_id
-                )
-                logger.info(f"Removed organization membership: org={webhook_event.organization_id}, user={member_id}")
-            
-            # Repository collaborator events  
-            if action == "added" and webhook_event.repository_id:
-                await self._update_repository_collaborator(
-                    db, webhook_event.repository_id, member_id, permission_level or "read"
-                )
-                logger.info(f"Added repository collaborator: repo={webhook_event.repository_id}, user={member_id}")
-            
-            elif action == "removed" and webhook_event.repository_id:
-                await self._remove_repository_collaborator(
-                    db, webhook_event.repository_id, member_id
-                )
-                logger.info(f"Removed repository collaborator: repo={webhook_event.repository_id}, user={member_id}")
+        # Repository collaborator events  
+        if action == "added" and repository_id:
+            await self._update_repository_collaborator(
+                db, repository_id, member_id, permission
+            )
+            self._record_history(
+                db, RepositoryCollaboratorHistory, {"repository_id": repository_id, "user_id": member_id},
+                {"permission": permission}, changed_at
+            )
+            access_service.refresh(db, [member_id], [repository_id])
+            logger.info(f"Added repository collaborator: repo={repository_id}, user={member_id}")
         
-        logger.debug(f"Created member event: {action}, member_id: {member_id}")
+        elif action == "removed" and repository_id:
+            await self._remove_repository_collaborator(
+                db, repository_id, member_id
+            )
+            self._record_history(
+                db, RepositoryCollaboratorHistory, {"repository_id": repository_id, "user_id": member_id},
+                None, changed_at
+            )
+            access_service.refresh(db, [member_id], [repository_id])
+            logger.info(f"Removed repository collaborator: repo={repository_id}, user={member_id}")
     
-    async def _process_organization_event(
-        self, 
-        db: Session, 
-        webhook_event: WebhookEvent, 
-        payload: Dict[str, Any]
-    ):
-        """Process organization events"""
-        action = payload.get("action", "")
-        
-        # Organization events are typically membership-related
-        # Process them as member events
-        await self._process_member_event(db, webhook_event, payload)
-        
-        logger.debug(f"Created organization event: {action}")
+    def _organization_repositories(self, organization_id: int):
+        """SELECT of the repository IDs of an organization (owners have admin on all of them)."""
+        return select(Repository.id).where(Repository.organization_id == organization_id)
     
-    async def _process_security_event(
-        self, 
-        db: Session, 
-        webhook_event: WebhookEvent, 
-        payload: Dict[str, Any]
+    def _record_history(
+        self,
+        db: Session,
+        model: Type,
+        keys: Dict[str, int],
+        values: Optional[Dict[str, str]],
+        changed_at: datetime
     ):
-        """Process security events (code scanning, dependabot, secret scanning)"""
-        action = payload.get("action", "")
-        alert_data = payload.get("alert", {})
-        
-        # Extract security-specific fields
-        alert_number = alert_data.get("number")
-        state = alert_data.get("state")
-        severity = None
-        rule_id = None
-        tool_name = None
-        secret_type = None
+        """
+        Close the current validity period of a relationship and open the next one.
         
-        # Extract severity based on alert type
-        if webhook_event.event_type == "code_scanning_alert":
-            rule = alert_data.get("rule", {})
-            severity = rule.get("severity")
-            rule_id = rule.get("id")
-            tool_name = alert_data.get("tool", {}).get("name")
-        elif webhook_event.event_type == "dependabot_alert":
-            security_advisory = alert_data.get("security_advisory", {})
-            severity = security_advisory.get("severity")
-        elif webhook_event.event_type == "secret_scanning_alert":
-            secret_type = alert_data.get("secret_type")
+        A change that repeats the current values (a redelivery) leaves the
+        history alone. Timestamps never move a period boundary backwards: an
+        event older than the latest boundary is applied at that boundary, and a
+        period that would end where it starts is replaced instead of closed.
         
-        # Create security event record
-        security_event = SecurityEvent(
-            webhook_event_id=webhook_event.id,
-            repository_id=webhook_event.repository_id,
-            alert_type=webhook_event.event_type,
-            alert_number=alert_number,
-            action=action,
-            state=state,
-            severity=severity,
-            rule_id=rule_id,
-            tool_name=tool_name,
-            secret_type=secret_type,
-            event_timestamp=webhook_event.event_timestamp
+        Args:
+            db: Database session
+            model: OrganizationMembershipHistory or RepositoryCollaboratorHistory
+            keys: Scope and user columns identifying the relationship
+            values: Role/permission of the new period, or None if the relationship ended
+            changed_at: When the change happened
+        """
+        latest = (
+            db.query(model)
+            .filter_by(**keys)
+            .order_by(model.valid_from.desc())
+            .first()
         )
+        current = latest if latest is not None and latest.valid_to is None else None
+        if current is not None and values is not None and all(
+            getattr(current, column) == value for column, value in values.items()
+        ):
+            return
+        if current is None and values is None:
+            return
+        
+        if latest is not None:
+            boundary = _as_utc(latest.valid_to or latest.valid_from)
+            changed_at = max(_as_utc(changed_at), boundary)
+        
+        if current is not None:
+            if changed_at <= _as_utc(current.valid_from):
+                if values is None:
+                    db.delete(current)
+                else:
+                    for column, value in values.items():
+                        setattr(current, column, value)
+                return
+            current.valid_to = changed_at
         
-        db.add(security_event)
-        logger.debug(f"Created security event: {webhook_event.event_type} - {action}")
+        if values is not None:
+            db.add(model(**keys, **values, valid_from=changed_at))
     
-    async def _process_code_event(
-        self, 
-        db: Session, 
-        webhook_event: WebhookEvent, 
+    async def _process_team_event(
+        self,
+        db: Session,
+        webhook_event: WebhookEvent,
         payload: Dict[str, Any]
     ):
-        """Process code events (push, create, delete, fork)"""
-        event_type = webhook_event.event_type
+        """Process team events (repository grants) and membership events (team members)"""
+        action = payload.get("action", "")
+        team_data = payload.get("team") or {}
+        if not team_data.get("id"):
+            return
         
-        # Extract code-specific fields
-        ref_name = None
-        ref_type = None
-        before_sha = None
-        after_sha = None
-        commits_count = 0
-        distinct_commits_count = 0
-        forced = False
+        team = self._ensure_team(db, team_data, webhook_event.organization_id)
+        members = select(TeamMembership.user_id).where(TeamMembership.team_id == team.id)
+        repositories = select(TeamRepository.repository_id).where(TeamRepository.team_id == team.id)
+        repository_id = webhook_event.repository_id
         
-        if event_type == "push":
-            ref_name = payload.get("ref", "").replace("refs/heads/", "").replace("refs/tags/", "")
-            before_sha = payload.get("before")
-            after_sha = payload.get("after")
-            commits = payload.get("commits", [])
-            commits_count = len(commits)
-            distinct_commits_count = len(set(commit.get("id") for commit in commits if commit.get("id")))
-            forced = payload.get("forced", False)
-            ref_type = "branch"  # Most pushes are to branches
-            
-        elif event_type in ["create", "delete"]:
-            ref_name = payload.get("ref")
-            ref_type = payload.get("ref_type")  # "branch" or "tag"
-            
-        elif event_type == "fork":
-            # Fork events don't have ref information
-            pass
+        if action in ["added_to_repository", "edited"] and repository_id:
+            permission = team_repository_permission(team_data, payload.get("repository"))
+            grant = db.query(TeamRepository).filter_by(team_id=team.id, repository_id=repository_id).first()
+            if grant:
+                grant.permission = permission
+            else:
+                db.add(TeamRepository(team_id=team.id, repository_id=repository_id, permission=permission))
+            access_service.refresh(db, members, [repository_id])
+            logger.info(f"Granted team {permission}: team={team.id}, repo={repository_id}")
         
-        # Create code event record
-        code_event = CodeEvent(
-            webhook_event_id=webhook_event.id,
-            repository_id=webhook_event.repository_id,
-            event_type=event_type,
-            ref_name=ref_name,
-            ref_type=ref_type,
-            before_sha=before_sha,
-            after_sha=after_sha,
-            commits_count=commits_count,
-            distinct_commits_count=distinct_commits_count,
-            forced=forced,
-            event_timestamp=webhook_event.event_timestamp
-        )
+        elif action == "removed_from_repository" and repository_id:
+            db.query(TeamRepository).filter_by(team_id=team.id, repository_id=repository_id).delete()
+            access_service.refresh(db, members, [repository_id])
+            logger.info(f"Revoked team access: team={team.id}, repo={repository_id}")
+        
+        elif action in ["added", "removed"]:
+            member_id = self._find_user_id(db, (payload.get("member") or {}).get("id"))
+            if not member_id:
+                return
+            membership = db.query(TeamMembership).filter_by(team_id=team.id, user_id=member_id).first()
+            if action == "added" and not membership:
+                db.add(TeamMembership(team_id=team.id, user_id=member_id))
+            elif action == "removed" and membership:
+                db.delete(membership)
+            access_service.refresh(db, [member_id], repositories)
+            logger.info(f"Team membership {action}: team={team.id}, user={member_id}")
+        
+        elif action == "deleted":
+            member_ids = [row[0] for row in db.execute(members)]
+            repository_ids = [row[0] for row in db.execute(repositories)]
+            db.query(TeamMembership).filter_by(team_id=team.id).delete()
+            db.query(TeamRepository).filter_by(team_id=team.id).delete()
+            db.delete(team)
+            access_service.refresh(db, member_ids, repository_ids)
+            logger.info(f"Deleted team {team.id}: {len(member_ids)} members, {len(repository_ids)} repositories")
+    
+    def _ensure_team(self, db: Session, team_data: Dict[str, Any], organization_id: Optional[int]) -> Team:
+        """Create or update a team from a team webhook payload."""
+        team = db.query(Team).filter(Team.github_id == team_data["id"]).first()
+        if not team:
+            team = Team(github_id=team_data["id"])
+            db.add(team)
         
-        db.add(code_event)
-        logger.debug(f"Created code event: {event_type}")
+        team.organization_id = organization_id or team.organization_id
+        team.node_id = team_data.get("node_id")
+        team.name = team_data.get("name")
+        team.slug = team_data.get("slug")
+        team.description = team_data.get("description")
+        team.privacy = team_data.get("privacy")
+        team.permission = team_data.get("permission")
+        team.parent_github_id = (team_data.get("parent") or {}).get("id")
+        team.html_url = team_data.get("html_url")
+        db.flush()
+        return team
     
     async def _update_organization_membership(
         self,
@@ -0,0 +1,88 @@
+"""
+Delivery idempotency service for GitHub webhook redeliveries.
+Keeps a bounded in-memory record of recent X-GitHub-Delivery IDs so duplicates
+are acknowledged before any parsing or database work.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Set
+
+from app.core.config import get_settings
+from app.core.metrics import DUPLICATE_DELIVERIES
+
+logger = logging.getLogger(__name__)
+
+# Outcomes of DeliveryIdempotencyService.claim()
+CLAIMED = "claimed"
+DUPLICATE = "duplicate"
+IN_PROGRESS = "in_progress"
+
+
+class DeliveryIdempotencyService:
+    """
+    Bounded LRU set of recently stored delivery IDs plus the set in flight.
+
+    This is only the fast path: a delivery evicted from (or never seen by) this
+    worker still hits the unique delivery_id constraint, which the store path
+    handles with INSERT ... ON CONFLICT DO NOTHING.
+    """
+
+    def __init__(self, max_size: Optional[int] = None):
+        self.max_size = max_size or get_settings().IDEMPOTENCY_CACHE_SIZE
+        self._seen: "OrderedDict[str, None]" = OrderedDict()
+        self._in_flight: Set[str] = set()
+        self._lock = threading.Lock()
+        self.duplicates_cached = 0
+        self.duplicates_stored = 0
+
+    def claim(self, delivery_id: str) -> str:
+        """
+        Claim a delivery ID for processing.
+
+        Returns:
+            CLAIMED if the caller should process the delivery, DUPLICATE if it was
+            already stored, IN_PROGRESS if another request is processing it now
+        """
+        with self._lock:
+            if delivery_id in self._seen:
+                self._seen.move_to_end(delivery_id)
+                self.duplicates_cached += 1
+                DUPLICATE_DELIVERIES.labels("cache").inc()
+                return DUPLICATE
+            if delivery_id in self._in_flight:
+                return IN_PROGRESS
+            self._in_flight.add(delivery_id)
+            return CLAIMED
+
+    def complete(self, delivery_id: str, duplicate: bool = False):
+        """Record a claimed delivery as stored (by this request or an earlier one)."""
+        with self._lock:
+            self._in_flight.discard(delivery_id)
+            self._seen[delivery_id] = None
+            self._seen.move_to_end(delivery_id)
+            while len(self._seen) > self.max_size:
+                self._seen.popitem(last=False)
+            if duplicate:
+                self.duplicates_stored += 1
+                DUPLICATE_DELIVERIES.labels("database").inc()
+
+    def release(self, delivery_id: str):
+        """Release a claim after a failure so a redelivery can be processed."""
+        with self._lock:
+            self._in_flight.discard(delivery_id)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get cache size and duplicate counters."""
+        return {
+            "cached_delivery_ids": len(self._seen),
+            "in_flight": len(self._in_flight),
+            "max_size": self.max_size,
+            "duplicates_cached": self.duplicates_cached,
+            "duplicates_stored": self.duplicates_stored,
+        }
+
+
+# Global service instance
+idempotency_service = DeliveryIdempotencyService()
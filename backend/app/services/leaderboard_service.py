@@ -0,0 +1,285 @@
+"""
+Streaming leaderboard service.
+Maintains Space-Saving (top repositories and users) and HyperLogLog (distinct
+repositories and users) sketches per scope and UTC day as events are stored,
+checkpoints them to analytics_sketches, and merges the sketches of all workers
+to answer leaderboards over the last N days with bounded error.
+"""
+
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from sqlalchemy import delete, insert, select, tuple_
+from sqlalchemy.orm import Session
+
+from app.core.cache import GLOBAL_SCOPE, organization_scope
+from app.core.config import get_settings
+from app.core.sketches import HyperLogLog, SpaceSaving
+from app.models.core import WebhookEvent
+from app.models.system import AnalyticsSketch
+
+logger = logging.getLogger(__name__)
+
+
+class ActivitySketch:
+    """Event count, heavy hitters and distinct counts of one scope over some days."""
+
+    def __init__(self, capacity: int, precision: int):
+        self.events = 0
+        self.repositories = SpaceSaving(capacity)
+        self.users = SpaceSaving(capacity)
+        self.distinct_repositories = HyperLogLog(precision)
+        self.distinct_users = HyperLogLog(precision)
+
+    def add(self, repository_name: Optional[str], sender_login: Optional[str]):
+        self.events += 1
+        if repository_name:
+            self.repositories.add(repository_name)
+            self.distinct_repositories.add(repository_name)
+        if sender_login:
+            self.users.add(sender_login)
+            self.distinct_users.add(sender_login)
+
+    def merge(self, other: "ActivitySketch") -> "ActivitySketch":
+        merged = ActivitySketch(self.repositories.capacity, self.distinct_repositories.precision)
+        merged.events = self.events + other.events
+        merged.repositories = self.repositories.merge(other.repositories)
+        merged.users = self.users.merge(other.users)
+        merged.distinct_repositories = self.distinct_repositories.merge(other.distinct_repositories)
+        merged.distinct_users = self.distinct_users.merge(other.distinct_users)
+        return merged
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "repositories": self.repositories.to_dict(),
+            "users": self.users.to_dict(),
+            "distinct_repositories": self.distinct_repositories.to_dict(),
+            "distinct_users": self.distinct_users.to_dict(),
+        })
+
+    @classmethod
+    def from_json(cls, events: int, state: str) -> "ActivitySketch":
+        values = json.loads(state)
+        sketch = cls.__new__(cls)
+        sketch.events = events
+        sketch.repositories = SpaceSaving.from_dict(values["repositories"])
+        sketch.users = SpaceSaving.from_dict(values["users"])
+        sketch.distinct_repositories = HyperLogLog.from_dict(values["distinct_repositories"])
+        sketch.distinct_users = HyperLogLog.from_dict(values["distinct_users"])
+        return sketch
+
+
+def _day(value: Optional[datetime]) -> date:
+    """UTC date of a timestamp; naive values are taken as UTC."""
+    if value is None:
+        return datetime.now(timezone.utc).date()
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.date()
+
+
+class LeaderboardService:
+    """
+    Per-worker streaming sketches keyed by (scope, UTC day).
+
+    Scopes are GLOBAL_SCOPE and one per organization. Each worker checkpoints
+    the sketches it changed at most every SKETCH_CHECKPOINT_SECONDS under its
+    own worker ID; leaderboards merge this worker's live sketches with the
+    checkpoints of all other workers (including ones that have since exited).
+    Events stored after a worker's last checkpoint are lost if it crashes.
+    """
+
+    def __init__(self):
+        self.settings = get_settings()
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._sketches: Dict[Tuple[str, date], ActivitySketch] = {}
+        self._dirty: Set[Tuple[str, date]] = set()
+        self._remote: Dict[Tuple[str, date], Tuple[float, Optional[ActivitySketch]]] = {}
+        self._checkpointed_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _new_sketch(self) -> ActivitySketch:
+        return ActivitySketch(self.settings.SKETCH_TOP_K_CAPACITY, self.settings.SKETCH_HLL_PRECISION)
+
+    def _first_day(self, days: int, today: Optional[date] = None) -> date:
+        return (today or datetime.now(timezone.utc).date()) - timedelta(days=days - 1)
+
+    def add(self, organization_id: Optional[int], repository_name: Optional[str],
+            sender_login: Optional[str], received_at: Optional[datetime] = None):
+        """Count one event in the global and organization sketches of its day."""
+        day = _day(received_at)
+        if day < self._first_day(self.settings.SKETCH_RETENTION_DAYS):
+            return
+        scopes = {GLOBAL_SCOPE, organization_scope(organization_id)}
+        with self._lock:
+            for scope in scopes:
+                key = (scope, day)
+                sketch = self._sketches.get(key)
+                if sketch is None:
+                    sketch = self._sketches[key] = self._new_sketch()
+                sketch.add(repository_name, sender_login)
+                self._dirty.add(key)
+
+    def record(self, db: Session, event: WebhookEvent):
+        """
+        Count a stored event (called from the ingest path) and checkpoint when due.
+
+        Checkpoint failures are logged and retried at the next event; they never
+        fail the webhook.
+
+        Args:
+            db: Database session (the event is already committed)
+            event: Stored webhook event
+        """
+        self.add(event.organization_id, event.repository_name, event.sender_login, event.received_at)
+        if time.monotonic() - self._checkpointed_at < self.settings.SKETCH_CHECKPOINT_SECONDS:
+            return
+        try:
+            self.checkpoint(db)
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"⚠️ Failed to checkpoint leaderboard sketches: {e}")
+
+    def checkpoint(self, db: Session) -> int:
+        """
+        Write this worker's changed sketches and drop expired ones (of all workers).
+
+        Args:
+            db: Database session
+
+        Returns:
+            Number of sketches written
+        """
+        first_day = self._first_day(self.settings.SKETCH_RETENTION_DAYS)
+        with self._lock:
+            self._checkpointed_at = time.monotonic()
+            for key in [key for key in self._sketches if key[1] < first_day]:
+                del self._sketches[key]
+            dirty = {key for key in self._dirty if key in self._sketches}
+            rows = [
+                {"worker_id": self.worker_id, "scope": scope, "day": day,
+                 "events": self._sketches[(scope, day)].events, "state": self._sketches[(scope, day)].to_json()}
+                for scope, day in dirty
+            ]
+            self._dirty.clear()
+
+        try:
+            db.execute(delete(AnalyticsSketch).where(AnalyticsSketch.day < first_day))
+            if rows:
+                db.execute(delete(AnalyticsSketch).where(
+                    AnalyticsSketch.worker_id == self.worker_id,
+                    tuple_(AnalyticsSketch.scope, AnalyticsSketch.day).in_(list(dirty))
+                ))
+                db.execute(insert(AnalyticsSketch), rows)
+            db.commit()
+        except Exception:
+            with self._lock:
+                self._dirty |= dirty
+            raise
+        logger.info(f"📌 Checkpointed {len(rows)} leaderboard sketches for worker {self.worker_id}")
+        return len(rows)
+
+    def _remote_sketch(self, db: Session, scope: str, first_day: date) -> Optional[ActivitySketch]:
+        """
+        Merged checkpoints of the other workers, reread at most every SKETCH_CHECKPOINT_SECONDS.
+        """
+        now = time.monotonic()
+        cached = self._remote.get((scope, first_day))
+        if cached and now - cached[0] < self.settings.SKETCH_CHECKPOINT_SECONDS:
+            return cached[1]
+
+        rows = db.execute(
+            select(AnalyticsSketch.events, AnalyticsSketch.state)
+            .where(
+                AnalyticsSketch.scope == scope,
+                AnalyticsSketch.day >= first_day,
+                AnalyticsSketch.worker_id != self.worker_id
+            )
+        ).all()
+        merged = self._merge(ActivitySketch.from_json(events, state) for events, state in rows)
+
+        self._remote = {
+            key: value for key, value in self._remote.items()
+            if now - value[0] < self.settings.SKETCH_CHECKPOINT_SECONDS
+        }
+        self._remote[(scope, first_day)] = (now, merged)
+        return merged
+
+    @staticmethod
+    def _merge(sketches: Iterable[ActivitySketch]) -> Optional[ActivitySketch]:
+        merged = None
+        for sketch in sketches:
+            merged = sketch if merged is None else merged.merge(sketch)
+        return merged
+
+    def leaderboard(
+        self,
+        db: Session,
+        organization_id: Optional[int] = None,
+        days: int = 7,
+        limit: int = 10,
+        organization_login: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Approximate top repositories and users and distinct counts of the last `days` UTC days.
+
+        Args:
+            db: Database session
+            organization_id: Only count this organization's events
+            days: Number of UTC days, today included (at most SKETCH_RETENTION_DAYS)
+            limit: Number of top repositories and users
+            organization_login: Organization reported in the period
+
+        Returns:
+            Event count, top repositories and users with the maximum overestimate
+            of each count, and distinct count estimates with their relative error
+        """
+        scope = organization_scope(organization_id)
+        today = datetime.now(timezone.utc).date()
+        first_day = self._first_day(days, today)
+        # Merging into a new sketch copies the live ones, which other threads keep updating
+        merged = self._new_sketch()
+        with self._lock:
+            for (sketch_scope, day), sketch in self._sketches.items():
+                if sketch_scope == scope and day >= first_day:
+                    merged = merged.merge(sketch)
+        remote = self._remote_sketch(db, scope, first_day)
+        if remote is not None:
+            merged = merged.merge(remote)
+
+        return {
+            "period": {
+                "days": days,
+                "start_date": first_day,
+                "end_date": today,
+                "organization": organization_login
+            },
+            "total_events": merged.events,
+            "unique_repositories": {
+                "estimate": merged.distinct_repositories.estimate(),
+                "relative_error": round(merged.distinct_repositories.relative_error, 4)
+            },
+            "unique_users": {
+                "estimate": merged.distinct_users.estimate(),
+                "relative_error": round(merged.distinct_users.relative_error, 4)
+            },
+            "top_repositories": [
+                {"name": name, "events": count, "error": error}
+                for name, count, error in merged.repositories.top(limit)
+            ],
+            "top_users": [
+                {"login": login, "events": count, "error": error}
+                for login, count, error in merged.users.top(limit)
+            ]
+        }
+
+
+# Global service instance
+leaderboard_service = LeaderboardService()
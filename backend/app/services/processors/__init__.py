@@ -0,0 +1,12 @@
+"""
+Event processors that turn stored webhook events into specialized event records.
+Importing this package registers every processor module with processor_registry;
+a new event type only needs a new module listed here.
+"""
+
+from app.services.processors.base import EventProcessor, ProcessorRegistry, processor_registry
+from app.services.processors import (  # noqa: F401 - registers the processors
+    code, collaboration, installation, membership, repository, security, team
+)
+
+__all__ = ["EventProcessor", "ProcessorRegistry", "processor_registry"]
@@ -0,0 +1,124 @@
+"""
+Event processor interface and registry.
+Processors declare the event types (and optionally actions) they handle and
+process a batch of stored webhook events at once; EventProcessingService
+routes events to them through the registry.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.models.core import User, WebhookEvent
+
+
+class EventProcessor:
+    """
+    Base class for processors of stored webhook events.
+
+    Subclasses set `event_types` and, to only handle some actions, `actions`
+    (None handles every action), and implement process_batch. Each event type
+    and action is handled by at most one processor. A batch holds
+    events in id order; it either succeeds as a whole or raises, in which case
+    the service retries its events one at a time to isolate the failing one.
+    """
+
+    event_types: Tuple[str, ...] = ()
+    actions: Optional[Tuple[str, ...]] = None
+
+    def handles(self, event_type: str, action: Optional[str]) -> bool:
+        """Whether this processor handles events of this type and action."""
+        return event_type in self.event_types and (self.actions is None or action in self.actions)
+
+    async def process_batch(self, db: Session, events: List[WebhookEvent]):
+        """
+        Create the specialized records of a batch of events (without committing).
+
+        Args:
+            db: Database session
+            events: Stored webhook events handled by this processor, in id order
+        """
+        raise NotImplementedError
+
+
+class ProcessorRegistry:
+    """Event type/action -> processor index."""
+
+    def __init__(self):
+        self._processors: List[EventProcessor] = []
+        self._routes: Dict[Tuple[str, Optional[str]], Optional[EventProcessor]] = {}
+
+    def register(self, processor_class: Type[EventProcessor]) -> Type[EventProcessor]:
+        """
+        Register a processor class (usable as a class decorator).
+
+        Raises:
+            ValueError: If the class declares no event types, or handles an
+                event type and action another processor already handles
+        """
+        if not processor_class.event_types:
+            raise ValueError(f"{processor_class.__name__} declares no event types")
+        for processor in self._processors:
+            if _overlaps(processor, processor_class):
+                raise ValueError(f"{processor_class.__name__} overlaps {type(processor).__name__}")
+        self._processors.append(processor_class())
+        self._routes.clear()
+        return processor_class
+
+    @property
+    def event_types(self) -> List[str]:
+        return sorted({event_type for processor in self._processors for event_type in processor.event_types})
+
+    def processor_for(self, event_type: str, action: Optional[str]) -> Optional[EventProcessor]:
+        """The processor handling an event type and action (None if there is none)."""
+        key = (event_type, action)
+        if key not in self._routes:
+            self._routes[key] = next(
+                (processor for processor in self._processors if processor.handles(event_type, action)), None
+            )
+        return self._routes[key]
+
+    def group(self, events: Iterable[WebhookEvent]) -> List[Tuple[EventProcessor, List[WebhookEvent]]]:
+        """
+        Split events into one batch per processor; events no processor handles are left out.
+
+        Returns:
+            (processor, events in input order) pairs, in registration order
+        """
+        batches: Dict[int, List[WebhookEvent]] = {}
+        for event in events:
+            processor = self.processor_for(event.event_type, event.event_action)
+            if processor is not None:
+                batches.setdefault(id(processor), []).append(event)
+        return [
+            (processor, batches[id(processor)]) for processor in self._processors if id(processor) in batches
+        ]
+
+
+def _overlaps(processor: EventProcessor, other: Type[EventProcessor]) -> bool:
+    """Whether two processors handle some event type and action in common."""
+    if not set(processor.event_types) & set(other.event_types):
+        return False
+    if processor.actions is None or other.actions is None:
+        return True
+    return bool(set(processor.actions) & set(other.actions))
+
+
+def bulk_insert(db: Session, model: Type, rows: List[Dict[str, Any]]):
+    """Insert rows of a model in one executemany (no ORM objects are created)."""
+    if rows:
+        db.execute(insert(model), rows)
+
+
+def user_ids(db: Session, github_ids: Iterable[Optional[int]]) -> Dict[int, int]:
+    """Look up our user IDs for GitHub user IDs in one query (missing users are left out)."""
+    wanted = {github_id for github_id in github_ids if github_id}
+    if not wanted:
+        return {}
+    rows = db.execute(select(User.github_id, User.id).where(User.github_id.in_(wanted))).all()
+    return {github_id: user_id for github_id, user_id in rows}
+
+
+# Global registry instance
+processor_registry = ProcessorRegistry()
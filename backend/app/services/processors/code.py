@@ -0,0 +1,54 @@
+"""
+Code activity processor (pushes, branch/tag creation and deletion, forks).
+"""
+
+from typing import Any, Dict, List
+
+from sqlalchemy.orm import Session
+
+from app.models.core import WebhookEvent
+from app.models.events import CodeEvent
+from app.services.processors.base import EventProcessor, bulk_insert, processor_registry
+
+
+def code_fields(event: WebhookEvent) -> Dict[str, Any]:
+    """Ref and commit fields of a code event (forks carry no ref information)."""
+    payload = event.payload
+    fields = {
+        "webhook_event_id": event.id,
+        "repository_id": event.repository_id,
+        "event_type": event.event_type,
+        "ref_name": None,
+        "ref_type": None,
+        "before_sha": None,
+        "after_sha": None,
+        "commits_count": 0,
+        "distinct_commits_count": 0,
+        "forced": False,
+        "event_timestamp": event.event_timestamp
+    }
+    if event.event_type == "push":
+        commits = payload.get("commits") or []
+        fields.update({
+            "ref_name": payload.get("ref", "").replace("refs/heads/", "").replace("refs/tags/", ""),
+            "ref_type": "tag" if payload.get("ref", "").startswith("refs/tags/") else "branch",
+            "before_sha": payload.get("before"),
+            "after_sha": payload.get("after"),
+            "commits_count": len(commits),
+            "distinct_commits_count": len({commit.get("id") for commit in commits if commit.get("id")}),
+            "forced": payload.get("forced", False)
+        })
+    elif event.event_type in ("create", "delete"):
+        fields["ref_name"] = payload.get("ref")
+        fields["ref_type"] = payload.get("ref_type")
+    return fields
+
+
+@processor_registry.register
+class CodeEventProcessor(EventProcessor):
+    """Records code activity in code_events."""
+
+    event_types = ("push", "create", "delete", "fork")
+
+    async def process_batch(self, db: Session, events: List[WebhookEvent]):
+        bulk_insert(db, CodeEvent, [code_fields(event) for event in events])
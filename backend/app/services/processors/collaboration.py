@@ -0,0 +1,53 @@
+"""
+Collaboration processor for issue and pull request activity.
+"""
+
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.core import WebhookEvent
+from app.models.events import CollaborationEvent
+from app.services.processors.base import EventProcessor, bulk_insert, processor_registry, user_ids
+
+
+def collaboration_fields(event: WebhookEvent) -> Dict[str, Any]:
+    """
+    Number, state and author GitHub ID of an issue, comment, pull request or review event.
+
+    Comments and reviews report the state of their issue or review and the
+    author of the comment or review itself.
+    """
+    payload = event.payload
+    subject = payload.get("pull_request") or payload.get("issue") or {}
+    authored = payload.get("comment") or payload.get("review") or subject
+    if event.event_type == "pull_request_review":
+        state = (payload.get("review") or {}).get("state")
+    else:
+        state = subject.get("state")
+    merged: Optional[bool] = subject.get("merged") if event.event_type == "pull_request" else None
+    return {
+        "webhook_event_id": event.id,
+        "repository_id": event.repository_id,
+        "event_type": event.event_type,
+        "action": event.event_action,
+        "number": subject.get("number") or payload.get("number"),
+        "state": state,
+        "author_github_id": (authored.get("user") or {}).get("id"),
+        "merged": merged,
+        "event_timestamp": event.event_timestamp
+    }
+
+
+@processor_registry.register
+class CollaborationEventProcessor(EventProcessor):
+    """Records issue and pull request activity in collaboration_events."""
+
+    event_types = ("issues", "issue_comment", "pull_request", "pull_request_review")
+
+    async def process_batch(self, db: Session, events: List[WebhookEvent]):
+        rows = [collaboration_fields(event) for event in events]
+        authors = user_ids(db, [row["author_github_id"] for row in rows])
+        for row in rows:
+            row["author_id"] = authors.get(row.pop("author_github_id"))
+        bulk_insert(db, CollaborationEvent, rows)
@@ -0,0 +1,37 @@
+"""
+Installation processor for GitHub App suspension changes.
+"""
+
+from typing import Dict, List
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.models.core import Installation, WebhookEvent
+from app.services.processors.base import EventProcessor, processor_registry
+
+
+@processor_registry.register
+class InstallationEventProcessor(EventProcessor):
+    """Records who suspended an installation and when (cleared on unsuspend)."""
+
+    event_types = ("installation",)
+    actions = ("suspend", "unsuspend")
+
+    async def process_batch(self, db: Session, events: List[WebhookEvent]):
+        # Only the latest change of each installation matters
+        latest: Dict[int, WebhookEvent] = {}
+        for event in events:
+            if event.installation_id:
+                latest[event.installation_id] = event
+
+        rows = [
+            {
+                "id": installation_id,
+                "suspended_at": event.event_timestamp if event.event_action == "suspend" else None,
+                "suspended_by_id": event.sender_id if event.event_action == "suspend" else None
+            }
+            for installation_id, event in latest.items()
+        ]
+        if rows:
+            db.execute(update(Installation), rows)
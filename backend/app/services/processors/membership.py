@@ -0,0 +1,80 @@
+"""
+Membership processor for repository member and organization events.
+"""
+
+import logging
+from typing import List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models.core import WebhookEvent
+from app.models.events import MemberEvent
+from app.services.processors.base import EventProcessor, bulk_insert, processor_registry, user_ids
+
+logger = logging.getLogger(__name__)
+
+
+def member_fields(event: WebhookEvent) -> Tuple[Optional[int], Optional[str]]:
+    """
+    GitHub ID and permission level of the member an event is about.
+
+    Repository member events carry a `member` and a `permission`; organization
+    events carry a `membership` whose role is the permission level.
+    """
+    payload = event.payload
+    member = payload.get("member") or {}
+    membership = payload.get("membership") or {}
+    permission_level = payload.get("permission")
+    if member:
+        return member.get("id"), permission_level
+    if membership.get("user"):
+        return membership["user"].get("id"), permission_level or membership.get("role", "member")
+    return None, permission_level
+
+
+@processor_registry.register
+class MembershipEventProcessor(EventProcessor):
+    """
+    Records member events in member_events and applies them to the membership,
+    collaborator and history tables.
+    """
+
+    event_types = ("member", "organization")
+    # Values allowed by member_event_action_check
+    actions = ("added", "removed", "edited", "invited", "member_invited", "member_added", "member_removed")
+
+    async def process_batch(self, db: Session, events: List[WebhookEvent]):
+        # Imported here: the service imports this package to route events
+        from app.services.event_processing_service import event_processing_service
+
+        members = [member_fields(event) for event in events]
+        known = user_ids(db, [github_id for github_id, _ in members])
+        for github_id, _ in members:
+            if github_id and github_id not in known:
+                logger.warning(f"User with GitHub ID {github_id} not found in database")
+
+        bulk_insert(db, MemberEvent, [
+            {
+                "webhook_event_id": event.id,
+                "repository_id": event.repository_id,
+                "organization_id": event.organization_id,
+                "member_id": known.get(github_id),
+                "action": event.event_action,
+                "permission_level": permission_level,
+                "changes": event.payload.get("changes", {}),
+                "event_timestamp": event.event_timestamp
+            }
+            for event, (github_id, permission_level) in zip(events, members)
+        ])
+
+        # Relationship changes build on each other, so they are applied in event order
+        for event, (github_id, permission_level) in zip(events, members):
+            await event_processing_service._apply_membership_relationships(
+                db,
+                event.event_action,
+                event.organization_id,
+                event.repository_id,
+                known.get(github_id),
+                permission_level,
+                event.event_timestamp
+            )
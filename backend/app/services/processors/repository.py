@@ -0,0 +1,32 @@
+"""
+Repository event processor (created, deleted, archived, etc.).
+"""
+
+from typing import List
+
+from sqlalchemy.orm import Session
+
+from app.models.core import WebhookEvent
+from app.models.events import RepositoryEvent
+from app.services.processors.base import EventProcessor, bulk_insert, processor_registry
+
+
+@processor_registry.register
+class RepositoryEventProcessor(EventProcessor):
+    """Records repository lifecycle changes in repository_events."""
+
+    event_types = ("repository",)
+    # Values allowed by repo_event_action_check
+    actions = ("created", "deleted", "archived", "unarchived", "edited", "publicized", "privatized", "transferred")
+
+    async def process_batch(self, db: Session, events: List[WebhookEvent]):
+        bulk_insert(db, RepositoryEvent, [
+            {
+                "webhook_event_id": event.id,
+                "repository_id": event.repository_id,
+                "action": event.event_action,
+                "changes": event.payload.get("changes", {}),
+                "event_timestamp": event.event_timestamp
+            }
+            for event in events
+        ])
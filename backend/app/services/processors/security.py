@@ -0,0 +1,51 @@
+"""
+Security alert processor (code scanning, Dependabot and secret scanning alerts).
+"""
+
+from typing import Any, Dict, List
+
+from sqlalchemy.orm import Session
+
+from app.models.core import WebhookEvent
+from app.models.events import SecurityEvent
+from app.services.processors.base import EventProcessor, bulk_insert, processor_registry
+
+
+def security_fields(event: WebhookEvent) -> Dict[str, Any]:
+    """Alert fields of a security event; severity, rule and tool depend on the alert type."""
+    alert = event.payload.get("alert") or {}
+    fields = {
+        "webhook_event_id": event.id,
+        "repository_id": event.repository_id,
+        "alert_type": event.event_type,
+        "alert_number": alert.get("number"),
+        "action": event.event_action,
+        "state": alert.get("state"),
+        "severity": None,
+        "rule_id": None,
+        "tool_name": None,
+        "secret_type": None,
+        "event_timestamp": event.event_timestamp
+    }
+    if event.event_type == "code_scanning_alert":
+        rule = alert.get("rule") or {}
+        fields["severity"] = rule.get("severity")
+        fields["rule_id"] = rule.get("id")
+        fields["tool_name"] = (alert.get("tool") or {}).get("name")
+    elif event.event_type == "dependabot_alert":
+        fields["severity"] = (alert.get("security_advisory") or {}).get("severity")
+    elif event.event_type == "secret_scanning_alert":
+        fields["secret_type"] = alert.get("secret_type")
+    return fields
+
+
+@processor_registry.register
+class SecurityEventProcessor(EventProcessor):
+    """Records security alert changes in security_events."""
+
+    event_types = ("code_scanning_alert", "dependabot_alert", "secret_scanning_alert")
+    # Values allowed by security_action_check
+    actions = ("created", "fixed", "dismissed", "reopened", "resolved", "revoked")
+
+    async def process_batch(self, db: Session, events: List[WebhookEvent]):
+        bulk_insert(db, SecurityEvent, [security_fields(event) for event in events])
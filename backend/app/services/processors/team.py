@@ -0,0 +1,25 @@
+"""
+Team processor for team events (repository grants) and membership events (team members).
+"""
+
+from typing import List
+
+from sqlalchemy.orm import Session
+
+from app.models.core import WebhookEvent
+from app.services.processors.base import EventProcessor, processor_registry
+
+
+@processor_registry.register
+class TeamEventProcessor(EventProcessor):
+    """Maintains teams, team members and team repository grants."""
+
+    event_types = ("team", "membership")
+
+    async def process_batch(self, db: Session, events: List[WebhookEvent]):
+        # Imported here: the service imports this package to route events
+        from app.services.event_processing_service import event_processing_service
+
+        # Each change reads the team state left by the previous one
+        for event in events:
+            await event_processing_service._process_team_event(db, event, event.payload)
@@ -0,0 +1,208 @@
+"""
+In-process pub/sub hub for real-time dashboard updates.
+Subscribers (SSE streams and WebSockets) listen on per-repository and
+per-organization channels; each has a bounded queue, so a slow consumer
+loses its oldest messages instead of holding memory or slowing others down.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.core.config import get_settings
+from app.core.metrics import REALTIME_MESSAGES, REALTIME_SUBSCRIBERS
+
+logger = logging.getLogger(__name__)
+
+# Channel every event is published on
+ALL_CHANNEL = "all"
+
+# Queued message: (webhook event ID, JSON text); the ID is None for notices
+Message = Tuple[Optional[int], str]
+
+
+def repository_channel(full_name: str) -> str:
+    return f"repository:{full_name.lower()}"
+
+
+def organization_channel(login: str) -> str:
+    return f"organization:{login.lower()}"
+
+
+def event_channels(event: Dict[str, Any]) -> List[str]:
+    """Channels an event is published on: all, its organization and its repository."""
+    channels = [ALL_CHANNEL]
+    if event.get("organization_login"):
+        channels.append(organization_channel(event["organization_login"]))
+    if event.get("repository_name"):
+        channels.append(repository_channel(event["repository_name"]))
+    return channels
+
+
+class HubFullError(Exception):
+    """Raised when the worker already serves REALTIME_MAX_SUBSCRIBERS subscribers."""
+
+
+class Subscription:
+    """
+    A subscriber's bounded message queue.
+
+    When the queue is full the oldest message is dropped; the drops are
+    coalesced into a single "lagged" notice delivered ahead of the next
+    messages, so the client knows to resynchronize.
+    """
+
+    def __init__(self, channels: Set[str], max_queue: int, loop: asyncio.AbstractEventLoop):
+        self.channels = channels
+        self.loop = loop
+        self.dropped = 0
+        self._queue: Deque[Message] = deque(maxlen=max_queue)
+        self._ready = asyncio.Event()
+
+    def push(self, message: Message):
+        """Queue a message (on the subscriber's event loop)."""
+        if len(self._queue) == self._queue.maxlen:
+            self.dropped += 1
+            REALTIME_MESSAGES.labels("dropped").inc()
+        self._queue.append(message)
+        self._ready.set()
+
+    async def next_batch(self, timeout: float) -> List[Message]:
+        """
+        Wait for messages and take all of them.
+
+        Returns:
+            The queued messages, preceded by a lagged notice if any were dropped;
+            an empty list if nothing arrived within `timeout` seconds
+        """
+        if not self._queue:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+
+        batch: List[Message] = []
+        if self.dropped:
+            batch.append((None, json.dumps({"type": "lagged", "dropped": self.dropped})))
+            self.dropped = 0
+        batch.extend(self._queue)
+        self._queue.clear()
+        return batch
+
+
+class RealtimeHub:
+    """
+    Channel -> subscribers index.
+
+    Publishing looks up only the event's channels, so its cost is proportional
+    to the subscribers of those channels, and the event is encoded to JSON once
+    for all of them.
+    """
+
+    def __init__(self):
+        self.settings = get_settings()
+        self._channels: Dict[str, Set[Subscription]] = {}
+        self._subscriptions: Set[Subscription] = set()
+        self._lock = threading.Lock()
+        self.published = 0
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscriptions)
+
+    def subscribe(self, channels: Iterable[str]) -> Subscription:
+        """
+        Register a subscriber on the running event loop.
+
+        Args:
+            channels: Channel names (ALL_CHANNEL when empty)
+
+        Returns:
+            The subscriber's queue
+
+        Raises:
+            HubFullError: If REALTIME_MAX_SUBSCRIBERS are already connected
+        """
+        subscription = Subscription(
+            set(channels) or {ALL_CHANNEL}, self.settings.REALTIME_QUEUE_SIZE, asyncio.get_running_loop()
+        )
+        with self._lock:
+            if len(self._subscriptions) >= self.settings.REALTIME_MAX_SUBSCRIBERS:
+                raise HubFullError("Too many real-time subscribers")
+            self._subscriptions.add(subscription)
+            for channel in subscription.channels:
+                self._channels.setdefault(channel, set()).add(subscription)
+            REALTIME_SUBSCRIBERS.set(len(self._subscriptions))
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+            for channel in subscription.channels:
+                subscribers = self._channels.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._channels[channel]
+            REALTIME_SUBSCRIBERS.set(len(self._subscriptions))
+
+    def publish(self, event: Dict[str, Any]) -> int:
+        """
+        Fan an event out to the subscribers of its channels.
+
+        Safe to call from any thread: subscribers on another event loop (or
+        when called outside one) are handed the message with call_soon_threadsafe.
+
+        Args:
+            event: JSON-serializable event with an "id" and optional
+                organization_login and repository_name
+
+        Returns:
+            Number of subscribers the event was queued for
+        """
+        with self._lock:
+            subscribers: Set[Subscription] = set()
+            for channel in event_channels(event):
+                subscribers.update(self._channels.get(channel, ()))
+        self.published += 1
+        if not subscribers:
+            return 0
+
+        message: Message = (event.get("id"), json.dumps({"type": "event", "event": event}, default=str))
+        try:
+            current_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            current_loop = None
+        for subscription in subscribers:
+            if subscription.loop is current_loop:
+                subscription.push(message)
+            elif not subscription.loop.is_closed():
+                subscription.loop.call_soon_threadsafe(subscription.push, message)
+        REALTIME_MESSAGES.labels("queued").inc(len(subscribers))
+        return len(subscribers)
+
+    def publish_many(self, events: List[Dict[str, Any]]):
+        """Publish a batch of events (an event bus handler)."""
+        for event in events:
+            self.publish(event)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            busiest = sorted(self._channels.items(), key=lambda item: len(item[1]), reverse=True)[:10]
+            return {
+                "subscribers": len(self._subscriptions),
+                "channels": len(self._channels),
+                "published": self.published,
+                "lagging_subscribers": sum(1 for subscription in self._subscriptions if subscription.dropped),
+                "busiest_channels": {channel: len(subscribers) for channel, subscribers in busiest},
+                "max_subscribers": self.settings.REALTIME_MAX_SUBSCRIBERS,
+                "queue_size": self.settings.REALTIME_QUEUE_SIZE
+            }
+
+
+# Global hub instance
+realtime_hub = RealtimeHub()
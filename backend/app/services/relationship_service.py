@@ -0,0 +1,366 @@
+"""
+Relationship rebuild service.
+Rebuilds organization_memberships and repository_collaborators, and their
+validity-period history tables, from member_events, either incrementally from
+a stored watermark or in full through shadow tables that are swapped in
+atomically, so the live tables are never empty.
+"""
+
+import logging
+import re
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+
+from app.models.events import MemberEvent
+from app.models.system import ProcessingWatermark
+from app.services.access_service import access_service
+from app.services.event_processing_service import (
+    COLLABORATOR_PERMISSIONS, MEMBERSHIP_ROLES, event_processing_service
+)
+
+logger = logging.getLogger(__name__)
+
+# processing_watermarks.name of the relationship rebuild (tracks member_events.id)
+RELATIONSHIPS_WATERMARK = "relationships"
+
+# Suffix of the shadow tables a full rebuild fills before the swap
+SHADOW_SUFFIX = "_rebuild"
+
+# Member event actions that add or remove a relationship, as applied by
+# EventProcessingService._apply_membership_relationships
+MEMBERSHIP_ADD_ACTIONS = ("member_added", "added")
+MEMBERSHIP_REMOVE_ACTIONS = ("member_removed", "removed")
+COLLABORATOR_ADD_ACTIONS = ("added",)
+COLLABORATOR_REMOVE_ACTIONS = ("removed",)
+
+
+def _sql_list(values: Sequence[str]) -> str:
+    return ", ".join(f"'{value}'" for value in values)
+
+
+def _latest_state_sql(
+    target: str,
+    scope_column: str,
+    value_column: str,
+    default_value: str,
+    allowed_values: Sequence[str],
+    add_actions: Sequence[str],
+    remove_actions: Sequence[str],
+    extra_columns: str = "",
+    extra_values: str = ""
+) -> str:
+    """
+    Build the set-based INSERT that computes a relationship table from member_events.
+
+    Per (scope, member) the newest add/remove event (ROW_NUMBER over id DESC)
+    decides whether the relationship exists; created_at is the first add since
+    the last removal. A permission level outside the allowed values falls
+    back to the default, as in live processing.
+    """
+    return f"""
+        INSERT INTO {target} ({scope_column}, user_id, {value_column}{extra_columns}, created_at, updated_at)
+        SELECT {scope_column}, member_id, value{extra_values}, first_added_at, event_timestamp
+        FROM (
+            SELECT
+                {scope_column}, member_id, action, value, event_timestamp,
+                ROW_NUMBER() OVER (PARTITION BY {scope_column}, member_id ORDER BY id DESC) AS recency,
+                MIN(event_timestamp) FILTER (WHERE id > last_removal_id)
+                    OVER (PARTITION BY {scope_column}, member_id) AS first_added_at
+            FROM (
+                SELECT
+                    id, {scope_column}, member_id, action, event_timestamp,
+                    CASE WHEN permission_level IN ({_sql_list(allowed_values)})
+                        THEN permission_level ELSE '{default_value}' END AS value,
+                    COALESCE(MAX(CASE WHEN action IN ({_sql_list(remove_actions)}) THEN id END)
+                        OVER (PARTITION BY {scope_column}, member_id), 0) AS last_removal_id
+                FROM member_events
+                WHERE id <= :high_water
+                  AND {scope_column} IS NOT NULL
+                  AND member_id IS NOT NULL
+                  AND action IN ({_sql_list(add_actions + remove_actions)})
+            ) events
+        ) ranked
+        WHERE recency = 1 AND action IN ({_sql_list(add_actions)})
+    """
+
+
+def _history_sql(
+    target: str,
+    scope_column: str,
+    value_column: str,
+    default_value: str,
+    allowed_values: Sequence[str],
+    add_actions: Sequence[str],
+    remove_actions: Sequence[str]
+) -> str:
+    """
+    Build the set-based INSERT that computes a relationship history table from member_events.
+
+    Per (scope, member) every event that changes the value (NULL once removed)
+    starts a period that ends where the next change starts. As in
+    EventProcessingService._record_history, a boundary never precedes the one
+    before it (running MAX of the timestamps) and empty periods are dropped.
+    """
+    partition = f"PARTITION BY {scope_column}, member_id ORDER BY id"
+    return f"""
+        INSERT INTO {target} ({scope_column}, user_id, {value_column}, valid_from, valid_to)
+        SELECT {scope_column}, member_id, value, valid_from, valid_to
+        FROM (
+            SELECT
+                {scope_column}, member_id, value, valid_from,
+                LEAD(valid_from) OVER ({partition}) AS valid_to
+            FROM (
+                SELECT id, {scope_column}, member_id, value, MAX(event_timestamp) OVER ({partition}) AS valid_from
+                FROM (
+                    SELECT
+                        id, {scope_column}, member_id, value, event_timestamp,
+                        LAG(value) OVER ({partition}) AS previous_value
+                    FROM (
+                        SELECT
+                            id, {scope_column}, member_id, event_timestamp,
+                            CASE WHEN action IN ({_sql_list(remove_actions)}) THEN NULL
+                                WHEN permission_level IN ({_sql_list(allowed_values)}) THEN permission_level
+                                ELSE '{default_value}' END AS value
+                        FROM member_events
+                        WHERE id <= :high_water
+                          AND {scope_column} IS NOT NULL
+                          AND member_id IS NOT NULL
+                          AND action IN ({_sql_list(add_actions + remove_actions)})
+                    ) events
+                ) changes
+                WHERE value IS DISTINCT FROM previous_value
+            ) boundaries
+        ) periods
+        WHERE value IS NOT NULL AND (valid_to IS NULL OR valid_to > valid_from)
+    """
+
+
+REBUILD_QUERIES = {
+    "organization_memberships": lambda target: _latest_state_sql(
+        target, "organization_id", "role", "member", MEMBERSHIP_ROLES,
+        MEMBERSHIP_ADD_ACTIONS, MEMBERSHIP_REMOVE_ACTIONS,
+        extra_columns=", state", extra_values=", 'active'"
+    ),
+    "repository_collaborators": lambda target: _latest_state_sql(
+        target, "repository_id", "permission", "read", COLLABORATOR_PERMISSIONS,
+        COLLABORATOR_ADD_ACTIONS, COLLABORATOR_REMOVE_ACTIONS
+    ),
+    "organization_membership_history": lambda target: _history_sql(
+        target, "organization_id", "role", "member", MEMBERSHIP_ROLES,
+        MEMBERSHIP_ADD_ACTIONS, MEMBERSHIP_REMOVE_ACTIONS
+    ),
+    "repository_collaborator_history": lambda target: _history_sql(
+        target, "repository_id", "permission", "read", COLLABORATOR_PERMISSIONS,
+        COLLABORATOR_ADD_ACTIONS, COLLABORATOR_REMOVE_ACTIONS
+    ),
+}
+
+
+class RelationshipRebuildService:
+    """Keeps the relationship tables consistent with the stored member events."""
+
+    def get_watermark(self, db: Session, name: str = RELATIONSHIPS_WATERMARK, lock: bool = False) -> ProcessingWatermark:
+        """
+        Get a watermark row, creating it at 0 if it does not exist yet.
+
+        Args:
+            db: Database session
+            name: Watermark name
+            lock: Lock the row (SELECT ... FOR UPDATE) so concurrent rebuilds serialize
+
+        Returns:
+            The watermark row
+        """
+        query = db.query(ProcessingWatermark).filter(ProcessingWatermark.name == name)
+        if lock:
+            query = query.with_for_update()
+        watermark = query.first()
+        if watermark is None:
+            watermark = ProcessingWatermark(name=name, last_event_id=0)
+            db.add(watermark)
+            db.flush()
+        return watermark
+
+    async def rebuild_incremental(
+        self,
+        db: Session,
+        chunk_size: int = 1000,
+        progress: Optional[Callable[[int, int], None]] = None
+    ) -> Dict[str, int]:
+        """
+        Replay member events newer than the watermark onto the live relationship tables.
+
+        Events are applied in id order, chunk by chunk. Each chunk and the
+        watermark advance commit together, so an interrupted run resumes at the
+        last committed chunk and no event is applied twice from a stale watermark.
+
+        Args:
+            db: Database session
+            chunk_size: Member events per transaction
+            progress: Called with (events replayed so far, current watermark) after each chunk
+
+        Returns:
+            Number of replayed events and the final watermark
+        """
+        replayed = 0
+        while True:
+            watermark = self.get_watermark(db, lock=True)
+            events = (
+                db.query(MemberEvent)
+                .filter(MemberEvent.id > watermark.last_event_id)
+                .order_by(MemberEvent.id)
+                .limit(chunk_size)
+                .all()
+            )
+            if not events:
+                db.commit()
+                break
+
+            for member_event in events:
+                await event_processing_service._apply_membership_relationships(
+                    db,
+                    member_event.action,
+                    member_event.organization_id,
+                    member_event.repository_id,
+                    member_event.member_id,
+                    member_event.permission_level,
+                    member_event.event_timestamp
+                )
+                # Later events in the chunk must see this event's pending rows
+                db.flush()
+
+            watermark.last_event_id = events[-1].id
+            db.commit()
+            replayed += len(events)
+            if progress:
+                progress(replayed, events[-1].id)
+
+        watermark = self.get_watermark(db)
+        logger.info(f"🔁 Replayed {replayed} member events - relationship watermark at {watermark.last_event_id}")
+        return {"replayed": replayed, "watermark": watermark.last_event_id}
+
+    def rebuild_full(self, db: Session) -> Dict[str, Any]:
+        """
+        Recompute the relationship tables from all member events and swap them in.
+
+        The new contents are built into shadow tables with set-based SQL while
+        the live tables keep serving reads. The swap of all tables and the
+        watermark update happen in one short transaction. Events newer than the
+        captured high-water mark are left for rebuild_incremental(). The
+        effective permissions are recomputed once the new tables are live.
+
+        Args:
+            db: Database session (PostgreSQL only)
+
+        Returns:
+            Row counts per table and the new watermark
+
+        Raises:
+            RuntimeError: If the database is not PostgreSQL
+        """
+        if db.get_bind().dialect.name != "postgresql":
+            raise RuntimeError("Full relationship rebuild requires PostgreSQL")
+
+        high_water = db.query(func.coalesce(func.max(MemberEvent.id), 0)).scalar()
+        counts = {}
+        for table, build_query in REBUILD_QUERIES.items():
+            shadow = f"{table}{SHADOW_SUFFIX}"
+            db.execute(text(f"DROP TABLE IF EXISTS {shadow}"))
+            db.execute(text(f"CREATE TABLE {shadow} (LIKE {table} INCLUDING ALL)"))
+            counts[table] = db.execute(text(build_query(shadow)), {"high_water": high_water}).rowcount
+            db.execute(text(f"ANALYZE {shadow}"))
+        db.commit()
+
+        foreign_keys: Dict[str, List[str]] = {}
+        try:
+            for table in REBUILD_QUERIES:
+                foreign_keys[table] = self._swap_in(db, table, f"{table}{SHADOW_SUFFIX}")
+            watermark = self.get_watermark(db, lock=True)
+            watermark.last_event_id = high_water
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        # Foreign keys were re-added NOT VALID to keep the swap short; validating
+        # only takes a SHARE UPDATE EXCLUSIVE lock, so reads and writes continue
+        for table, constraint_names in foreign_keys.items():
+            for name in constraint_names:
+                db.execute(text(f'ALTER TABLE {table} VALIDATE CONSTRAINT "{name}"'))
+        db.commit()
+
+        # The swapped-in tables replace rows the effective permissions were derived from
+        counts["effective_permissions"] = access_service.rebuild_all(db)
+        db.commit()
+
+        logger.info(f"🔁 Rebuilt relationship tables {counts} - watermark at {high_water}")
+        return {"rows": counts, "watermark": high_water}
+
+    def _swap_in(self, db: Session, table: str, shadow: str) -> List[str]:
+        """
+        Replace `table` with `shadow` inside the caller's transaction.
+
+        LIKE ... INCLUDING ALL copied columns, defaults, checks and indexes, but
+        not foreign keys, triggers or row level security, and the id default
+        still uses the old table's sequence. The sequence is re-owned before the
+        old table is dropped, the indexes get their old names back and the rest
+        is recreated from the catalog.
+
+        Returns:
+            Names of the foreign keys re-added NOT VALID
+        """
+        def rows(sql: str, **params) -> List[Any]:
+            return db.execute(text(sql), params).all()
+
+        db.execute(text(f"LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE"))
+
+        foreign_keys = rows(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = CAST(:table AS regclass) AND contype = 'f'",
+            table=table
+        )
+        triggers = rows(
+            "SELECT pg_get_triggerdef(oid) FROM pg_trigger "
+            "WHERE tgrelid = CAST(:table AS regclass) AND NOT tgisinternal",
+            table=table
+        )
+        row_security = rows("SELECT relrowsecurity FROM pg_class WHERE oid = CAST(:table AS regclass)", table=table)[0][0]
+        sequence = rows("SELECT pg_get_serial_sequence(:table, 'id')", table=table)[0][0]
+
+        def index_names(relation: str) -> Dict[str, str]:
+            return {
+                re.sub(r"INDEX \S+ ON \S+", "INDEX ON", definition): name
+                for name, definition in rows(
+                    "SELECT indexrelid::regclass::text, pg_get_indexdef(indexrelid) FROM pg_index "
+                    "WHERE indrelid = CAST(:relation AS regclass)",
+                    relation=relation
+                )
+            }
+
+        old_indexes = index_names(table)
+        new_indexes = index_names(shadow)
+
+        if sequence:
+            db.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY {shadow}.id"))
+        db.execute(text(f"DROP TABLE {table}"))
+        db.execute(text(f"ALTER TABLE {shadow} RENAME TO {table}"))
+
+        for signature, new_name in new_indexes.items():
+            old_name = old_indexes.get(signature)
+            if old_name and old_name != new_name:
+                db.execute(text(f"ALTER INDEX {new_name} RENAME TO {old_name}"))
+        for name, definition in foreign_keys:
+            db.execute(text(f'ALTER TABLE {table} ADD CONSTRAINT "{name}" {definition} NOT VALID'))
+        for (definition,) in triggers:
+            db.execute(text(definition))
+        if row_security:
+            db.execute(text(f"ALTER TABLE {table} ENABLE ROW LEVEL SECURITY"))
+
+        logger.info(f"🔀 Swapped rebuilt {table} into place")
+        return [name for name, _ in foreign_keys]
+
+
+# Global service instance
+relationship_service = RelationshipRebuildService()
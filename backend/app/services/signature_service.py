@@ -0,0 +1,215 @@
+"""
+Webhook signature verification service.
+Verifies X-Hub-Signature-256 incrementally as the request body streams in,
+against the secrets configured for the delivering hook.
+"""
+
+import hashlib
+import hmac
+import logging
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence
+
+from app.core.config import get_settings
+from app.core.metrics import (
+    MAX_LABEL_SETS, SIGNATURE_FAILURES, SIGNATURE_ROTATION_MATCHES, SIGNATURES_VERIFIED
+)
+
+logger = logging.getLogger(__name__)
+
+SIGNATURE_PREFIX = "sha256="
+SIGNATURE_LENGTH = len(SIGNATURE_PREFIX) + hashlib.sha256().digest_size * 2
+
+
+@lru_cache(maxsize=128)
+def get_keyed_hmac(secret: str) -> "hmac.HMAC":
+    """
+    Get a pre-keyed HMAC object for a webhook secret.
+
+    Keying (hashing the padded secret into the inner/outer states) is done once;
+    callers must .copy() the returned object and never update it directly.
+    """
+    return hmac.new(secret.encode('utf-8'), digestmod=hashlib.sha256)
+
+
+def is_well_formed_signature(signature_header: Optional[str]) -> bool:
+    """Check that a signature header looks like 'sha256=<64 hex chars>'."""
+    if not signature_header or len(signature_header) != SIGNATURE_LENGTH:
+        return False
+    if not signature_header.startswith(SIGNATURE_PREFIX):
+        return False
+    try:
+        bytes.fromhex(signature_header[len(SIGNATURE_PREFIX):])
+        return True
+    except ValueError:
+        return False
+
+
+class StreamingSignatureVerifier:
+    """
+    Incremental HMAC-SHA256 verifier for webhook bodies.
+
+    Body chunks are fed to one HMAC per candidate secret as they arrive, so
+    verification finishes as soon as the last chunk is read without a second
+    pass over the buffer.
+    """
+
+    def __init__(self, secrets: Optional[Sequence[str]]):
+        if isinstance(secrets, str):
+            secrets = [secrets]
+        self._hmacs = [get_keyed_hmac(secret).copy() for secret in (secrets or []) if secret]
+        self.bytes_received = 0
+        self.matched_index: Optional[int] = None
+
+    @property
+    def enabled(self) -> bool:
+        """Whether any secret is configured and the signature is checked."""
+        return bool(self._hmacs)
+
+    def update(self, chunk: bytes):
+        """Feed a body chunk into every candidate HMAC."""
+        self.bytes_received += len(chunk)
+        for keyed_hmac in self._hmacs:
+            keyed_hmac.update(chunk)
+
+    def verify(self, signature_header: Optional[str]) -> bool:
+        """
+        Compare the computed digests with the X-Hub-Signature-256 header.
+
+        Every candidate is compared (in constant time) so the response time does
+        not reveal which secret slot matched.
+
+        Returns:
+            True if signature is valid (or no secret is configured), False otherwise
+        """
+        if not self._hmacs:
+            return True
+        if not signature_header:
+            return False
+
+        self.matched_index = None
+        for index, keyed_hmac in enumerate(self._hmacs):
+            expected_signature = SIGNATURE_PREFIX + keyed_hmac.hexdigest()
+            if hmac.compare_digest(expected_signature, signature_header) and self.matched_index is None:
+                self.matched_index = index
+        return self.matched_index is not None
+
+
+def verify_signature(
+    payload_body: bytes,
+    signature_header: Optional[str],
+    secrets: Sequence[str]
+) -> bool:
+    """
+    Verify a fully buffered payload using the cached pre-keyed HMACs.
+
+    Args:
+        payload_body: Raw webhook payload body
+        signature_header: X-Hub-Signature-256 header value
+        secrets: One or more candidate webhook secrets
+
+    Returns:
+        True if signature is valid for any candidate, False otherwise
+    """
+    verifier = StreamingSignatureVerifier(secrets)
+    verifier.update(payload_body)
+    return verifier.verify(signature_header)
+
+
+def _count(counter: Counter, hook: str):
+    """
+    Count an outcome for a hook; hook keys come from unauthenticated headers, so
+    beyond MAX_LABEL_SETS new ones are counted under "other" (as the metrics are).
+    """
+    if hook not in counter and len(counter) >= MAX_LABEL_SETS:
+        hook = "other"
+    counter[hook] += 1
+
+
+class SignatureService:
+    """Resolves per-hook webhook secrets and tracks verification outcomes."""
+
+    def __init__(self):
+        self.settings = get_settings()
+        self.verified = Counter()
+        self.failures = Counter()
+        self.rotation_matches = Counter()
+
+    @staticmethod
+    def hook_key(headers: Dict[str, Optional[str]]) -> str:
+        """Get a stable label for the delivering hook, used for lookups and metrics."""
+        hook_id = headers.get('x-github-hook-id')
+        if hook_id:
+            return str(hook_id)
+        target_type = headers.get('x-github-hook-installation-target-type')
+        target_id = headers.get('x-github-hook-installation-target-id')
+        if target_type and target_id:
+            return f"{target_type}:{target_id}"
+        return "default"
+
+    def candidate_secrets(self, headers: Dict[str, Optional[str]]) -> List[str]:
+        """
+        Get the active secrets for the hook that sent a delivery.
+
+        Lookup order is X-GitHub-Hook-ID, then the installation target
+        ("<target_type>:<target_id>"), then GITHUB_WEBHOOK_SECRET.
+        """
+        secrets_by_hook = self.settings.GITHUB_WEBHOOK_SECRETS or {}
+
+        hook_id = headers.get('x-github-hook-id')
+        if hook_id and str(hook_id) in secrets_by_hook:
+            return secrets_by_hook[str(hook_id)]
+
+        target_type = headers.get('x-github-hook-installation-target-type')
+        target_id = headers.get('x-github-hook-installation-target-id')
+        target_key = f"{target_type}:{target_id}"
+        if target_type and target_id and target_key in secrets_by_hook:
+            return secrets_by_hook[target_key]
+
+        if self.settings.GITHUB_WEBHOOK_SECRET:
+            return [self.settings.GITHUB_WEBHOOK_SECRET]
+        return []
+
+    @property
+    def validation_enabled(self) -> bool:
+        """Whether any webhook secret is configured at all."""
+        return bool(self.settings.GITHUB_WEBHOOK_SECRET or self.settings.GITHUB_WEBHOOK_SECRETS)
+
+    def create_verifier(self, headers: Dict[str, Optional[str]]) -> StreamingSignatureVerifier:
+        """Create a streaming verifier for the hook that sent a delivery."""
+        return StreamingSignatureVerifier(self.candidate_secrets(headers))
+
+    def record_result(
+        self,
+        headers: Dict[str, Optional[str]],
+        is_valid: bool,
+        verifier: Optional[StreamingSignatureVerifier] = None
+    ):
+        """Count a verification outcome for the delivering hook."""
+        hook = self.hook_key(headers)
+        if not is_valid:
+            _count(self.failures, hook)
+            SIGNATURE_FAILURES.labels(hook).inc()
+            logger.error(f"Webhook signature verification failed for hook {hook}")
+            return
+
+        _count(self.verified, hook)
+        SIGNATURES_VERIFIED.labels(hook).inc()
+        if verifier is not None and verifier.matched_index:
+            # Matched a secondary secret - the hook has not switched to the newest one yet
+            _count(self.rotation_matches, hook)
+            SIGNATURE_ROTATION_MATCHES.labels(hook).inc()
+            logger.info(f"Hook {hook} signed with rotation secret #{verifier.matched_index}")
+
+    def get_stats(self) -> Dict[str, Dict[str, int]]:
+        """Get per-hook verification counters."""
+        return {
+            "verified": dict(self.verified),
+            "failures": dict(self.failures),
+            "rotation_matches": dict(self.rotation_matches),
+        }
+
+
+# Global service instance
+signature_service = SignatureService()
@@ -0,0 +1,205 @@
+"""
+Columnar snapshot service.
+Exports webhook events, flattened together with their specialized event
+columns, into Parquet files partitioned by event date and event type, so
+offline analytics read files instead of querying the production database.
+"""
+
+import logging
+import os
+from collections import defaultdict
+from datetime import timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.models.core import WebhookEvent
+from app.models.events import CodeEvent, MemberEvent, RepositoryEvent, SecurityEvent
+from app.services.relationship_service import relationship_service
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # Optional: only needed to export snapshots
+    pyarrow = None
+
+logger = logging.getLogger(__name__)
+
+# processing_watermarks.name of the snapshot export (tracks webhook_events.id)
+SNAPSHOTS_WATERMARK = "parquet_snapshots"
+
+# Flattened columns: (name, SQL expression, Arrow type name). event_type and
+# the event date are partition directories rather than file columns.
+SNAPSHOT_COLUMNS = [
+    ("id", WebhookEvent.id, "int64"),
+    ("event_id", WebhookEvent.event_id, "string"),
+    ("delivery_id", WebhookEvent.delivery_id, "string"),
+    ("event_action", WebhookEvent.event_action, "string"),
+    ("organization_id", WebhookEvent.organization_id, "int64"),
+    ("organization_login", WebhookEvent.organization_login, "string"),
+    ("repository_id", WebhookEvent.repository_id, "int64"),
+    ("repository_name", WebhookEvent.repository_name, "string"),
+    ("sender_id", WebhookEvent.sender_id, "int64"),
+    ("sender_login", WebhookEvent.sender_login, "string"),
+    ("installation_id", WebhookEvent.installation_id, "int64"),
+    ("event_timestamp", WebhookEvent.event_timestamp, "timestamp"),
+    ("received_at", WebhookEvent.received_at, "timestamp"),
+    ("processed", WebhookEvent.processed, "bool"),
+    ("repository_action", RepositoryEvent.action, "string"),
+    ("member_action", MemberEvent.action, "string"),
+    ("member_id", MemberEvent.member_id, "int64"),
+    ("member_permission_level", MemberEvent.permission_level, "string"),
+    ("security_alert_type", SecurityEvent.alert_type, "string"),
+    ("security_alert_number", SecurityEvent.alert_number, "int64"),
+    ("security_action", SecurityEvent.action, "string"),
+    ("security_state", SecurityEvent.state, "string"),
+    ("security_severity", SecurityEvent.severity, "string"),
+    ("security_rule_id", SecurityEvent.rule_id, "string"),
+    ("security_tool_name", SecurityEvent.tool_name, "string"),
+    ("security_secret_type", SecurityEvent.secret_type, "string"),
+    ("code_ref_name", CodeEvent.ref_name, "string"),
+    ("code_ref_type", CodeEvent.ref_type, "string"),
+    ("code_before_sha", CodeEvent.before_sha, "string"),
+    ("code_after_sha", CodeEvent.after_sha, "string"),
+    ("code_commits_count", CodeEvent.commits_count, "int64"),
+    ("code_distinct_commits_count", CodeEvent.distinct_commits_count, "int64"),
+    ("code_forced", CodeEvent.forced, "bool"),
+]
+
+
+def _require_pyarrow():
+    if pyarrow is None:
+        raise RuntimeError("Parquet snapshots require pyarrow (pip install pyarrow)")
+
+
+def snapshot_schema():
+    """Arrow schema of the snapshot files."""
+    _require_pyarrow()
+    types = {
+        "int64": pyarrow.int64(),
+        "string": pyarrow.string(),
+        "bool": pyarrow.bool_(),
+        "timestamp": pyarrow.timestamp("us", tz="UTC"),
+    }
+    return pyarrow.schema([(name, types[type_name]) for name, _, type_name in SNAPSHOT_COLUMNS])
+
+
+class SnapshotService:
+    """Incremental Parquet export of webhook events."""
+
+    def _export_bound(self, db: Session, after_id: int) -> Optional[int]:
+        """
+        First event ID that cannot be exported yet.
+
+        Events still waiting for processing have no specialized columns; the
+        export stops before the oldest of them so it never skips one. Events
+        that exhausted their retries do not hold it back.
+        """
+        return (
+            db.query(func.min(WebhookEvent.id))
+            .filter(
+                WebhookEvent.id > after_id,
+                WebhookEvent.processed == False,
+                func.coalesce(WebhookEvent.retry_count, 0) < get_settings().MAX_RETRY_ATTEMPTS
+            )
+            .scalar()
+        )
+
+    def _fetch(self, db: Session, after_id: int, bound: Optional[int], batch_size: int) -> List[Dict[str, Any]]:
+        statement = (
+            select(WebhookEvent.event_type, *(expression.label(name) for name, expression, _ in SNAPSHOT_COLUMNS))
+            .outerjoin(RepositoryEvent, RepositoryEvent.webhook_event_id == WebhookEvent.id)
+            .outerjoin(MemberEvent, MemberEvent.webhook_event_id == WebhookEvent.id)
+            .outerjoin(SecurityEvent, SecurityEvent.webhook_event_id == WebhookEvent.id)
+            .outerjoin(CodeEvent, CodeEvent.webhook_event_id == WebhookEvent.id)
+            .where(WebhookEvent.id > after_id)
+            .order_by(WebhookEvent.id)
+            .limit(batch_size)
+        )
+        if bound is not None:
+            statement = statement.where(WebhookEvent.id < bound)
+        return [dict(row) for row in db.execute(statement).mappings()]
+
+    def _write_partitions(self, directory: Path, rows: List[Dict[str, Any]]) -> int:
+        """
+        Write one file per (date, event type) partition in the batch.
+
+        Files are named after the batch's first event ID, so re-exporting
+        from the same watermark after a crash replaces them instead of
+        duplicating rows. Each file is written aside and renamed into place.
+        """
+        partitions: Dict[tuple, List[Dict[str, Any]]] = defaultdict(list)
+        for row in rows:
+            timestamp = row["event_timestamp"]
+            timestamp = timestamp.astimezone(timezone.utc) if timestamp.tzinfo else timestamp
+            event_id = row["event_id"]
+            row["event_id"] = str(event_id) if event_id is not None else None
+            partitions[(timestamp.date().isoformat(), row.pop("event_type"))].append(row)
+
+        schema = snapshot_schema()
+        name = f"part-{rows[0]['id']:012d}.parquet"
+        for (event_date, event_type), partition_rows in partitions.items():
+            partition = directory / f"event_date={event_date}" / f"event_type={event_type}"
+            partition.mkdir(parents=True, exist_ok=True)
+            temporary = partition / f".{name}.tmp"
+            pyarrow.parquet.write_table(
+                pyarrow.Table.from_pylist(partition_rows, schema=schema), temporary, compression="zstd"
+            )
+            os.replace(temporary, partition / name)
+        return len(partitions)
+
+    def export_incremental(
+        self,
+        db: Session,
+        directory: Optional[str] = None,
+        batch_size: int = 50_000,
+        progress: Optional[Callable[[int, int], None]] = None
+    ) -> Dict[str, int]:
+        """
+        Export the events past the snapshot watermark.
+
+        Each batch is written and then committed as the new watermark, so an
+        interrupted export resumes where it stopped.
+
+        Args:
+            db: Database session
+            directory: Snapshot root directory (default SNAPSHOT_DIR)
+            batch_size: Events per batch (and at most per file)
+            progress: Called with (events exported, watermark) after each batch
+
+        Returns:
+            Events exported, files written and the new watermark
+
+        Raises:
+            RuntimeError: If pyarrow is not installed
+        """
+        _require_pyarrow()
+        root = Path(directory or get_settings().SNAPSHOT_DIR)
+        root.mkdir(parents=True, exist_ok=True)
+
+        watermark = relationship_service.get_watermark(db, SNAPSHOTS_WATERMARK, lock=True)
+        bound = self._export_bound(db, watermark.last_event_id)
+        exported = files = 0
+        while True:
+            rows = self._fetch(db, watermark.last_event_id, bound, batch_size)
+            if not rows:
+                break
+            last_id = rows[-1]["id"]
+            files += self._write_partitions(root, rows)
+            exported += len(rows)
+            watermark.last_event_id = last_id
+            db.commit()
+            watermark = relationship_service.get_watermark(db, SNAPSHOTS_WATERMARK, lock=True)
+            if progress:
+                progress(exported, last_id)
+        db.commit()
+
+        logger.info(f"🧊 Exported {exported} events to {files} snapshot files - watermark at {watermark.last_event_id}")
+        return {"exported": exported, "files": files, "watermark": watermark.last_event_id}
+
+
+# Global service instance
+snapshot_service = SnapshotService()
@@ -5,21 +5,33 @@ Integrates with existing webhook_models package for validation and parsing.
 
 import json
 import logging
-from typing import Optional, Dict, Any
+import time
+from typing import Optional, Dict, Any, Tuple
 from datetime import datetime, timezone
-from fastapi import HTTPException, BackgroundTasks
+from fastapi import HTTPException, BackgroundTasks, Request
+from sqlalchemy import insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 # Import our local webhook models
-from app.webhook_models.utils import validate_github_signature, parse_webhook_payload, WEBHOOK_EVENT_MAP
+from app.webhook_models.utils import parse_webhook_payload, WEBHOOK_EVENT_MAP
 from app.webhook_models.common.base import WebhookBase
 
+from app.core.cache import GLOBAL_SCOPE, organization_scope, response_cache
 from app.core.config import get_settings
-from app.core.database import get_supabase_client
 from app.core.logging_config import log_webhook_event, log_database_operation
+from app.core.metrics import INGEST_STAGE_SECONDS, observe_stage
 from app.models.core import WebhookEvent, Organization, User, Repository, Installation
 from app.services.entity_service import EntityService
+from app.services.event_analytics import event_analytics
+from app.services.event_bus import event_bus
 from app.services.event_processing_service import event_processing_service
+from app.services.idempotency_service import idempotency_service, CLAIMED, DUPLICATE
+from app.services.leaderboard_service import leaderboard_service
+from app.services.payload_executor import payload_executor
+from app.services.signature_service import is_well_formed_signature, signature_service
 
 logger = logging.getLogger(__name__)
 
@@ -34,42 +46,108 @@ class WebhookReceiverService:
     async def validate_webhook_signature(
         self, 
         payload_body: bytes, 
-        signature_header: Optional[str]
+        signature_header: Optional[str],
+        headers: Optional[Dict[str, str]] = None
     ) -> bool:
         """
-        Validate GitHub webhook signature using existing webhook_models utility.
+        Validate GitHub webhook signature against the secrets for the delivering hook.
         
         Args:
             payload_body: Raw webhook payload body
             signature_header: X-Hub-Signature-256 header value
+            headers: Request headers, used to look up per-hook secrets
             
         Returns:
             True if signature is valid, False otherwise
         """
-        if not self.settings.GITHUB_WEBHOOK_SECRET:
+        headers = headers or {}
+        
+        if not signature_service.validation_enabled:
             logger.warning("GitHub webhook secret not configured - signature validation disabled")
             return True
         
         if not signature_header:
             logger.error("Missing webhook signature header")
+            signature_service.record_result(headers, False)
             return False
         
         try:
-            is_valid = validate_github_signature(
-                payload_body,
-                signature_header,
-                self.settings.GITHUB_WEBHOOK_SECRET
-            )
-            
-            if not is_valid:
-                logger.error("Invalid webhook signature")
-            
+            verifier = signature_service.create_verifier(headers)
+            verifier.update(payload_body)
+            is_valid = verifier.verify(signature_header) if verifier.enabled else False
+            signature_service.record_result(headers, is_valid, verifier)
             return is_valid
             
         except Exception as e:
             logger.error(f"Signature validation error: {e}")
             return False
     
+    async def read_webhook_body(
+        self,
+        request: Request,
+        headers: Dict[str, str]
+    ) -> bytes:
+        """
+        Read the request body while verifying its signature chunk by chunk.
+        
+        Oversized and unsigned requests are rejected before the body is buffered,
+        and the HMACs for all of the hook's active secrets are complete as soon as
+        the last chunk arrives.
+        
+        Args:
+            request: Incoming webhook request
+            headers: Webhook headers (signature and hook identification)
+            
+        Returns:
+            Raw request body with a verified signature
+            
+        Raises:
+            HTTPException: 413 if the body exceeds WEBHOOK_MAX_BODY_BYTES,
+                401 if the signature is missing, malformed or invalid
+        """
+        max_body_bytes = self.settings.WEBHOOK_MAX_BODY_BYTES
+        signature_header = headers.get('x-hub-signature-256')
+        
+        content_length = request.headers.get('content-length')
+        if content_length and content_length.isdigit() and int(content_length) > max_body_bytes:
+            logger.error(f"Rejected webhook body of {content_length} bytes (limit {max_body_bytes})")
+            raise HTTPException(status_code=413, detail="Webhook payload too large")
+        
+        verifier = signature_service.create_verifier(headers)
+        if not signature_service.validation_enabled:
+            logger.warning("GitHub webhook secret not configured - signature validation disabled")
+        elif not verifier.enabled:
+            logger.error(f"No webhook secret configured for hook {signature_service.hook_key(headers)}")
+            signature_service.record_result(headers, False)
+            raise HTTPException(status_code=401, detail="Invalid webhook signature")
+        elif not is_well_formed_signature(signature_header):
+            logger.error("Missing or malformed webhook signature header")
+            signature_service.record_result(headers, False)
+            raise HTTPException(status_code=401, detail="Invalid webhook signature")
+        
+        event_type = headers.get('x-github-event')
+        hashing_seconds = 0.0
+        chunks = []
+        async for chunk in request.stream():
+            start = time.perf_counter()
+            verifier.update(chunk)
+            hashing_seconds += time.perf_counter() - start
+            if verifier.bytes_received > max_body_bytes:
+                logger.error(f"Rejected webhook body over {max_body_bytes} bytes while streaming")
+                raise HTTPException(status_code=413, detail="Webhook payload too large")
+            chunks.append(chunk)
+        
+        if verifier.enabled:
+            start = time.perf_counter()
+            is_valid = verifier.verify(signature_header)
+            hashing_seconds += time.perf_counter() - start
+            INGEST_STAGE_SECONDS.labels("signature", event_type or "unknown").observe(hashing_seconds)
+            signature_service.record_result(headers, is_valid, verifier)
+            if not is_valid:
+                raise HTTPException(status_code=401, detail="Invalid webhook signature")
+        
+        return b"".join(chunks)
+    
     async def parse_webhook_event(
         self,
         payload: Dict[str, Any],
@@ -106,6 +184,42 @@ class WebhookReceiverService:
             logger.error(f"Failed payload: {json.dumps(payload, indent=2) if isinstance(payload, dict) else str(payload)}")
             raise HTTPException(status_code=400, detail=f"Invalid webhook payload: {e}")
     
+    async def decode_webhook_payload(
+        self,
+        payload_body: bytes,
+        event_type: str
+    ) -> Tuple[Dict[str, Any], WebhookBase]:
+        """
+        Decode and parse a raw webhook body, off the event loop for large payloads.
+        
+        Args:
+            payload_body: Raw request body
+            event_type: GitHub event type (X-GitHub-Event header)
+            
+        Returns:
+            Tuple of (decoded JSON payload, parsed webhook event model)
+            
+        Raises:
+            HTTPException: If the body is not JSON, or event type/action is not supported or validation fails
+        """
+        try:
+            payload, webhook_event = await payload_executor.decode_and_parse(payload_body, event_type)
+            logger.info(f"Successfully parsed {event_type} event with action: {payload.get('action')}")
+            return payload, webhook_event
+            
+        except json.JSONDecodeError:
+            raise HTTPException(status_code=400, detail="Invalid JSON payload")
+            
+        except ValueError as e:
+            logger.error(f"Unsupported webhook event: {e}")
+            logger.error(f"Failed payload: {payload_body[:2000]!r}")
+            raise HTTPException(status_code=422, detail=f"Unsupported event type: {e}")
+            
+        except Exception as e:
+            logger.error(f"Webhook parsing error: {e}")
+            logger.error(f"Failed payload: {payload_body[:2000]!r}")
+            raise HTTPException(status_code=400, detail=f"Invalid webhook payload: {e}")
+    
     async def store_webhook_event(
         self,
         db: Session,
@@ -114,10 +228,13 @@ class WebhookReceiverService:
         headers: Dict[str, str],
         delivery_id: Optional[str],
         event_type: str
-    ) -> WebhookEvent:
+    ) -> Optional[WebhookEvent]:
         """
         Store webhook event in database with entity relationships.
         
+        The event row is written with INSERT ... ON CONFLICT (delivery_id) DO NOTHING,
+        so a redelivery that reaches the database is detected without an IntegrityError.
+        
         Args:
             db: Database session
             webhook_event: Parsed webhook event model
@@ -126,7 +243,7 @@ class WebhookReceiverService:
             delivery_id: GitHub delivery ID
             
         Returns:
-            Stored webhook event record
+            Stored webhook event record, or None if the delivery was already stored
         """
         try:
             # Extract event timestamp
@@ -145,35 +262,50 @@ class WebhookReceiverService:
             installation_id = None
             
             if hasattr(webhook_event, 'organization') and webhook_event.organization:
-                organization_id = await self.entity_service.ensure_organization(db, webhook_event.organization)
+                with observe_stage("ensure_organization", event_type):
+                    organization_id = await self.entity_service.ensure_organization(db, webhook_event.organization)
             
             if hasattr(webhook_event, 'repository') and webhook_event.repository:
-                repository_id = await self.entity_service.ensure_repository(db, webhook_event.repository)
+                with observe_stage("ensure_repository", event_type):
+                    repository_id = await self.entity_service.ensure_repository(
+                        db, webhook_event.repository, organization_id
+                    )
             
             if hasattr(webhook_event, 'sender') and webhook_event.sender:
-                sender_id = await self.entity_service.ensure_user(db, webhook_event.sender)
+                with observe_stage("ensure_user", event_type):
+                    sender_id = await self.entity_service.ensure_user(db, webhook_event.sender)
             
             if hasattr(webhook_event, 'installation') and webhook_event.installation:
-                installation_id = await self.entity_service.ensure_installation(db, webhook_event.installation)
+                with observe_stage("ensure_installation", event_type):
+                    installation_id = await self.entity_service.ensure_installation(db, webhook_event.installation)
             
             # Create webhook event record
-            db_webhook_event = WebhookEvent(
-                delivery_id=delivery_id,
-                event_type=event_type,
-                event_action=getattr(webhook_event, 'action', None),
-                organization_id=organization_id,
-                repository_id=repository_id,
-                sender_id=sender_id,
-                installation_id=installation_id,
-                event_timestamp=event_timestamp,
-                payload=raw_payload,
-                headers=headers,
-                processed=False
-            )
-            
-            db.add(db_webhook_event)
+            insert_started = time.perf_counter()
+            event_id = self._insert_webhook_event(db, {
+                "delivery_id": delivery_id,
+                "event_type": event_type,
+                "event_action": getattr(webhook_event, 'action', None),
+                "organization_id": organization_id,
+                "repository_id": repository_id,
+                "sender_id": sender_id,
+                "installation_id": installation_id,
+                "event_timestamp": event_timestamp,
+                "payload": raw_payload,
+                "headers": headers,
+                "processed": False
+            })
             db.commit()
-            db.refresh(db_webhook_event)
+            INGEST_STAGE_SECONDS.labels("event_insert", event_type).observe(time.perf_counter() - insert_started)
+            
+            if event_id is None:
+                logger.info(f"Webhook delivery {delivery_id} already stored - skipping duplicate")
+                return None
+            
+            response_cache.invalidate({GLOBAL_SCOPE, organization_scope(organization_id)})
+            
+            db_webhook_event = db.get(WebhookEvent, event_id)
+            event_analytics.record(db_webhook_event)
+            leaderboard_service.record(db, db_webhook_event)
             
             logger.info(f"Stored webhook event {event_type} with ID {db_webhook_event.id}")
             return db_webhook_event
@@ -183,36 +315,56 @@ class WebhookReceiverService:
             logger.error(f"Failed to store webhook event: {e}")
             raise HTTPException(status_code=500, detail=f"Failed to store event: {e}")
     
+    def _insert_webhook_event(self, db: Session, values: Dict[str, Any]) -> Optional[int]:
+        """
+        Insert a webhook event row, ignoring a conflicting delivery_id.
+        
+        Returns:
+            New webhook event ID, or None if the delivery_id already exists
+        """
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            statement = postgresql_insert(WebhookEvent)
+        elif dialect == "sqlite":
+            statement = sqlite_insert(WebhookEvent)
+        else:
+            statement = None
+        
+        if statement is not None:
+            statement = statement.values(**values).returning(WebhookEvent.id)
+            if values.get("delivery_id"):
+                statement = statement.on_conflict_do_nothing(index_elements=["delivery_id"])
+            return db.execute(statement).scalar()
+        
+        # Other dialects: plain insert inside a savepoint
+        try:
+            with db.begin_nested():
+                return db.execute(insert(WebhookEvent).values(**values).returning(WebhookEvent.id)).scalar()
+        except IntegrityError:
+            return None
+    
     async def trigger_real_time_update(self, webhook_event: WebhookEvent):
         """
-        Trigger real-time updates via Supabase for dashboard subscriptions.
+        Announce a stored event on the event bus, which fans it out to the real-time
+        hub of every worker for dashboard subscriptions.
         
         Args:
             webhook_event: Stored webhook event
         """
         try:
-            supabase = get_supabase_client()
-            if not supabase:
-                logger.warning("Supabase client not available - real-time updates disabled")
-                return
-            
-            # Publish real-time event to Supabase
-            # This will be received by frontend dashboard subscriptions
-            channel_name = f"webhook_events:{webhook_event.repository_id or 'global'}"
-            
             event_data = {
                 "id": webhook_event.id,
                 "event_type": webhook_event.event_type,
                 "event_action": webhook_event.event_action,
                 "event_timestamp": webhook_event.event_timestamp.isoformat(),
+                "organization_id": webhook_event.organization_id,
                 "repository_name": webhook_event.repository_name,
                 "organization_login": webhook_event.organization_login,
                 "sender_login": webhook_event.sender_login
             }
             
-            # Note: Supabase real-time broadcasting happens automatically
-            # through database triggers and RLS policies
-            logger.info(f"Real-time update triggered for event {webhook_event.id}")
+            event_bus.publish(event_data)
+            logger.debug(f"Real-time update published for event {webhook_event.id}")
             
         except Exception as e:
             logger.error(f"Failed to trigger real-time update: {e}")
@@ -223,7 +375,8 @@ class WebhookReceiverService:
         payload_body: bytes,
         headers: Dict[str, str],
         background_tasks: BackgroundTasks,
-        db: Session
+        db: Session,
+        signature_verified: bool = False
     ) -> Dict[str, Any]:
         """
         Main webhook processing pipeline.
@@ -233,6 +386,7 @@ class WebhookReceiverService:
             headers: Request headers
             background_tasks: FastAPI background tasks
             db: Database session
+            signature_verified: True if the body was already verified while streaming
             
         Returns:
             Processing result
@@ -253,29 +407,48 @@ class WebhookReceiverService:
             log_webhook_event("unknown", delivery_id or "no-delivery-id", "❌ Missing X-GitHub-Event header", "ERROR")
             raise HTTPException(status_code=400, detail="Missing X-GitHub-Event header")
         
-        # Validate signature
-        log_webhook_event(event_type, delivery_id, "🔐 Validating webhook signature", "DEBUG")
-        is_valid = await self.validate_webhook_signature(payload_body, signature)
-        if not is_valid:
-            log_webhook_event(event_type, delivery_id, "❌ Invalid webhook signature", "ERROR")
-            raise HTTPException(status_code=401, detail="Invalid webhook signature")
+        # Validate signature (unless it was verified while streaming the body)
+        if not signature_verified:
+            log_webhook_event(event_type, delivery_id, "🔐 Validating webhook signature", "DEBUG")
+            with observe_stage("signature", event_type):
+                is_valid = await self.validate_webhook_signature(payload_body, signature, headers)
+            if not is_valid:
+                log_webhook_event(event_type, delivery_id, "❌ Invalid webhook signature", "ERROR")
+                raise HTTPException(status_code=401, detail="Invalid webhook signature")
         
         log_webhook_event(event_type, delivery_id, "✅ Webhook signature validated", "DEBUG")
         
-        # Parse payload
+        # Acknowledge redeliveries before any parsing
+        if delivery_id:
+            claim = idempotency_service.claim(delivery_id)
+            if claim == DUPLICATE:
+                log_webhook_event(event_type, delivery_id, "♻️ Duplicate delivery acknowledged", "INFO")
+                return self._duplicate_response(event_type, delivery_id)
+            if claim != CLAIMED:
+                log_webhook_event(event_type, delivery_id, "⏳ Delivery already in progress", "WARNING")
+                raise HTTPException(status_code=409, detail="Delivery is already being processed")
+        
         try:
-            payload = json.loads(payload_body)
-        except json.JSONDecodeError:
-            raise HTTPException(status_code=400, detail="Invalid JSON payload")
+            # Decode and parse webhook event using existing models
+            # (large payloads are handled by the executor stage, off the event loop)
+            payload, webhook_event = await self.decode_webhook_payload(payload_body, event_type)
+            action = payload.get('action')
+            
+            # Store in database
+            db_webhook_event = await self.store_webhook_event(
+                db, webhook_event, payload, dict(headers), delivery_id, event_type
+            )
+        except Exception:
+            if delivery_id:
+                idempotency_service.release(delivery_id)
+            raise
         
-        # Parse webhook event using existing models
-        action = payload.get('action')
-        webhook_event = await self.parse_webhook_event(payload, event_type, action)
+        if delivery_id:
+            idempotency_service.complete(delivery_id, duplicate=db_webhook_event is None)
         
-        # Store in database
-        db_webhook_event = await self.store_webhook_event(
-            db, webhook_event, payload, dict(headers), delivery_id, event_type
-        )
+        if db_webhook_event is None:
+            log_webhook_event(event_type, delivery_id, "♻️ Duplicate delivery already stored", "INFO")
+            return self._duplicate_response(event_type, delivery_id)
         
         # Add background tasks
         background_tasks.add_task(self.trigger_real_time_update, db_webhook_event)
@@ -290,6 +463,16 @@ class WebhookReceiverService:
             "processed": False
         }
     
+    @staticmethod
+    def _duplicate_response(event_type: str, delivery_id: str) -> Dict[str, Any]:
+        """Build the acknowledgement for a delivery that was already stored."""
+        return {
+            "status": "duplicate",
+            "event_type": event_type,
+            "delivery_id": delivery_id,
+            "processed": False
+        }
+    
     async def process_event_async(self, event_id: int):
         """
         Background processing of webhook events.
@@ -314,7 +497,8 @@ class WebhookReceiverService:
                     return
                 
                 # Process the event into specialized tables
-                success = await event_processing_service.process_webhook_event(db, webhook_event)
+                with observe_stage("background_processing", webhook_event.event_type):
+                    success = await event_processing_service.process_webhook_event(db, webhook_event)
                 
                 if success:
                     logger.info(f"Successfully processed event {event_id} into specialized tables")
@@ -26,7 +26,7 @@ from .common.base import WebhookHeaders, WebhookBase
 from .common.user import User, GitUser, RepositoryOwner
 from .common.repository import Repository, RepositoryLicense
 from .common.organization import Organization, Membership
-from .common.installation import Installation, GitHubApp, AppPermissions, Enterprise
+from .common.installation import Installation, InstallationLite, GitHubApp, AppPermissions, Enterprise
 from .common.git import Commit, Pusher
 from .common.issues import (
     Label, Reactions, Milestone, Comment, Review, Issue, 
@@ -46,6 +46,7 @@ from .push import PushEvent
 from .issues_opened import IssuesOpenedEvent
 from .pull_request_opened import PullRequestOpenedEvent
 from .team_member_added import TeamMemberAddedEvent
+from .team import TeamEvent
 from .fork import ForkEvent
 from .create import CreateEvent
 from .delete import DeleteEvent
@@ -82,6 +83,7 @@ __all__ = [
     "RepositoryLicense",
     "Organization", 
     "Installation",
+    "InstallationLite",
     "GitHubApp",
     "AppPermissions",
     "Enterprise",
@@ -4,7 +4,7 @@ from .base import WebhookBase, WebhookHeaders
 from .user import User, GitUser, RepositoryOwner
 from .repository import Repository, RepositoryLicense
 from .organization import Organization
-from .installation import Installation, GitHubApp, AppPermissions, Enterprise
+from .installation import Installation, InstallationLite, GitHubApp, AppPermissions, Enterprise
 
 __all__ = [
     "WebhookBase",
@@ -16,6 +16,7 @@ __all__ = [
     "RepositoryLicense",
     "Organization",
     "Installation",
+    "InstallationLite",
     "GitHubApp", 
     "AppPermissions",
     "Enterprise",
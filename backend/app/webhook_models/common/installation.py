@@ -87,6 +87,13 @@ class Installation(BaseModel):
     suspended_at: Optional[str] = None
 
 
+class InstallationLite(BaseModel):
+    """Installation stub sent in events delivered to a GitHub App (id and node_id only)."""
+    
+    id: int
+    node_id: Optional[str] = None
+
+
 class Enterprise(BaseModel):
     """GitHub Enterprise model."""
     
@@ -0,0 +1,50 @@
+"""Team event webhook model."""
+
+from typing import Any, Dict, Optional
+
+from pydantic import Field
+
+from .common.base import WebhookBase
+from .common.user import User
+from .common.repository import Repository
+from .common.organization import Organization
+from .common.installation import InstallationLite
+from .common.issues import Team
+
+
+class TeamEvent(WebhookBase):
+    """
+    GitHub webhook event for changes to a team and its repository access.
+    
+    Event Type: team
+    Actions: created, deleted, edited, added_to_repository, removed_from_repository
+    
+    For repository actions (and edits of a team's repository permission),
+    repository.permissions carries the team's permission on that repository.
+    """
+    
+    action: str = Field(..., description="Action performed on the team")
+    team: Team = Field(..., description="The team that changed")
+    organization: Organization = Field(..., description="The organization that owns the team")
+    sender: User = Field(..., description="The user who performed the action")
+    repository: Optional[Repository] = Field(None, description="Repository the team was added to or removed from")
+    changes: Optional[Dict[str, Any]] = Field(None, description="Previous values (for edited events)")
+    installation: Optional[InstallationLite] = Field(None, description="GitHub App installation (id only)")
+    
+    class Config:
+        schema_extra = {
+            "example": {
+                "action": "added_to_repository",
+                "team": {
+                    "id": 3,
+                    "name": "github",
+                    "slug": "github",
+                    "permission": "push"
+                },
+                "repository": {
+                    "id": 186853002,
+                    "full_name": "Octocoders/Hello-World",
+                    "permissions": {"pull": True, "triage": True, "push": True, "maintain": False, "admin": False}
+                }
+            }
+        }
@@ -8,7 +8,7 @@ from .common.base import WebhookBase
 from .common.user import User
 from .common.repository import Repository
 from .common.organization import Organization
-from .common.installation import Installation
+from .common.installation import InstallationLite
 from .common.issues import Team
 
 
@@ -26,7 +26,7 @@ class TeamMemberAddedEvent(WebhookBase):
     team: Team = Field(..., description="The team to which the member was added")
     organization: Organization = Field(..., description="The organization that owns the team")
     sender: User = Field(..., description="The user who performed the action")
-    installation: Optional[Installation] = Field(None, description="GitHub App installation info")
+    installation: Optional[InstallationLite] = Field(None, description="GitHub App installation (id only)")
     repository: Optional[Repository] = Field(None, description="Repository info (if applicable)")
     
     class Config:
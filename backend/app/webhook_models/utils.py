@@ -13,6 +13,7 @@ from .push import PushEvent
 from .issues_opened import IssuesOpenedEvent
 from .pull_request_opened import PullRequestOpenedEvent
 from .team_member_added import TeamMemberAddedEvent
+from .team import TeamEvent
 from .fork import ForkEvent
 from .create import CreateEvent
 from .delete import DeleteEvent
@@ -48,8 +49,17 @@ WEBHOOK_EVENT_MAP: Dict[str, Dict[str, Type[WebhookBase]]] = {
         "opened": PullRequestOpenedEvent,
     },
     "team": {
-        "added_to_repository": TeamMemberAddedEvent,
+        "created": TeamEvent,
+        "deleted": TeamEvent,
+        "edited": TeamEvent,
+        "added_to_repository": TeamEvent,
+        "removed_from_repository": TeamEvent,
         "added": TeamMemberAddedEvent,
+        "removed": TeamMemberAddedEvent,
+    },
+    "membership": {
+        "added": TeamMemberAddedEvent,
+        "removed": TeamMemberAddedEvent,
     },
     "fork": {
         None: ForkEvent,  # Fork events don't have actions
@@ -0,0 +1,5 @@
+"""
+Benchmarks and load-generation tools for the GitHub Audit Platform backend.
+
+Run from the backend directory, e.g. `python -m benchmarks.load_test --help`.
+"""
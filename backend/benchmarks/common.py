@@ -0,0 +1,212 @@
+"""
+Shared helpers for the benchmark tools.
+Loads the GitHub webhook fixtures from tests/payloads, produces synthetic
+variants with randomized IDs, signs bodies and summarizes latency samples.
+"""
+
+import copy
+import hashlib
+import hmac
+import json
+import math
+import random
+import re
+import sys
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+PAYLOADS_DIR = BACKEND_DIR / "tests" / "payloads"
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+# Make `app` and `main` importable when run as `python -m benchmarks.<tool>`
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+# Fixture file -> X-GitHub-Event. Left out: fixtures of event types the receiver
+# does not support (08-10), and 18, a Markdown excerpt that is not a complete payload
+FIXTURE_EVENT_MAP = {
+    "01_AddMemberEvent.json": "member",
+    "02_MemberPermissionChangedEvent.json": "member",
+    "03_OrganizationMemberAddedEvent.json": "organization",
+    "04_TeamAddedToRepositoryEvent.json": "team",
+    "05_TeamMemberAddedEvent.json": "team",
+    "06_RepositoryCreatedEvent.json": "repository",
+    "07_RepositoryMadePublicEvent.json": "repository",
+    "11_CodeScanningAlertCreatedEvent.json": "code_scanning_alert",
+    "12_DependabotAlertCreatedEvent.json": "dependabot_alert",
+    "13_PersonalAccessTokenRequestCreated.json": "personal_access_token_request",
+    "14_SecretScanningAlertCreated.json": "secret_scanning_alert",
+    "15_PushEvent.json": "push",
+    "16_PullRequestOpenedEvent.json": "pull_request",
+    "17_IssueOpenedEvent.json": "issues",
+    "19_PullRequestReviewSubmittedEvent.json": "pull_request_review",
+    "20_CreateBranchEvent.json": "create",
+    "21_DeleteBranchEvent.json": "delete",
+    "22_ForkEvent.json": "fork",
+    "23_PingEvent.json": "ping",
+    "24_Meta_WebhookDeleted_Event.json": "meta",
+    "25_InstallationCreatedEvent.json": "installation",
+}
+
+_JSON_BLOCK = re.compile(r"```json\s*(.*?)```", re.DOTALL)
+
+
+@dataclass
+class Fixture:
+    """A webhook fixture: event type plus decoded payload."""
+
+    name: str
+    event_type: str
+    payload: Dict[str, Any]
+
+    @property
+    def action(self) -> Optional[str]:
+        return self.payload.get("action")
+
+
+def load_fixture_payload(path: Path) -> Dict[str, Any]:
+    """Load a fixture file (JSON, or the first ```json block of a Markdown file)."""
+    text = path.read_text(encoding="utf-8")
+    if path.suffix == ".md":
+        match = _JSON_BLOCK.search(text)
+        if not match:
+            raise ValueError(f"No JSON payload block in {path.name}")
+        text = match.group(1)
+    return json.loads(text)
+
+
+def load_fixtures(event_types: Optional[Iterable[str]] = None) -> List[Fixture]:
+    """
+    Load the webhook fixtures from tests/payloads.
+
+    Args:
+        event_types: Only load fixtures for these event types (all if None)
+
+    Returns:
+        Fixtures in file order
+    """
+    wanted = set(event_types) if event_types else None
+    fixtures = []
+    for name, event_type in FIXTURE_EVENT_MAP.items():
+        if wanted is not None and event_type not in wanted:
+            continue
+        path = PAYLOADS_DIR / name
+        if not path.exists():
+            continue
+        fixtures.append(Fixture(name=name, event_type=event_type, payload=load_fixture_payload(path)))
+    return fixtures
+
+
+def randomize_ids(payload: Dict[str, Any], rng: random.Random) -> Dict[str, Any]:
+    """
+    Create a synthetic variant of a payload with fresh entity IDs.
+
+    Every integer "id" is remapped consistently within the payload (the same
+    original ID always maps to the same new ID), and logins/names get a suffix,
+    so a variant creates new users, repositories and organizations instead of
+    updating the fixture's rows.
+    """
+    id_map: Dict[int, int] = {}
+    suffix = f"-{rng.randrange(16 ** 6):06x}"
+
+    def remap(value: Any, key: Optional[str] = None) -> Any:
+        if isinstance(value, dict):
+            return {child_key: remap(child, child_key) for child_key, child in value.items()}
+        if isinstance(value, list):
+            return [remap(child) for child in value]
+        if key == "id" and isinstance(value, int) and not isinstance(value, bool):
+            if value not in id_map:
+                id_map[value] = rng.randrange(10 ** 9, 2 ** 31)
+            return id_map[value]
+        if key == "full_name" and isinstance(value, str) and "/" in value:
+            owner, name = value.split("/", 1)
+            return f"{owner}{suffix}/{name}{suffix}"
+        if key in ("login", "name", "full_name") and isinstance(value, str) and value:
+            return value + suffix
+        return value
+
+    return remap(copy.deepcopy(payload))
+
+
+def encode_payload(payload: Dict[str, Any]) -> bytes:
+    """Serialize a payload the way GitHub sends it (compact JSON)."""
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+
+def sign_payload(body: bytes, secret: Optional[str]) -> Optional[str]:
+    """Compute the X-Hub-Signature-256 header for a body."""
+    if not secret:
+        return None
+    return "sha256=" + hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+
+
+def build_headers(
+    event_type: str,
+    body: bytes,
+    secret: Optional[str] = None,
+    delivery_id: Optional[str] = None,
+    hook_id: Optional[str] = None
+) -> Dict[str, str]:
+    """Build GitHub webhook request headers for a body."""
+    headers = {
+        "X-GitHub-Event": event_type,
+        "X-GitHub-Delivery": delivery_id or f"bench-{uuid.uuid4()}",
+        "Content-Type": "application/json",
+        "User-Agent": "GitHub-Hookshot/benchmark",
+    }
+    signature = sign_payload(body, secret)
+    if signature:
+        headers["X-Hub-Signature-256"] = signature
+    if hook_id:
+        headers["X-GitHub-Hook-ID"] = hook_id
+    return headers
+
+
+def percentile(sorted_values: Sequence[float], fraction: float) -> Optional[float]:
+    """Nearest-rank percentile of already sorted values."""
+    if not sorted_values:
+        return None
+    rank = max(math.ceil(fraction * len(sorted_values)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def summarize(values: Iterable[float]) -> Dict[str, Optional[float]]:
+    """Get count, mean, min/max and p50/p95/p99 of a set of samples."""
+    ordered = sorted(values)
+    if not ordered:
+        return {"count": 0, "mean": None, "min": None, "p50": None, "p95": None, "p99": None, "max": None}
+    return {
+        "count": len(ordered),
+        "mean": sum(ordered) / len(ordered),
+        "min": ordered[0],
+        "p50": percentile(ordered, 0.50),
+        "p95": percentile(ordered, 0.95),
+        "p99": percentile(ordered, 0.99),
+        "max": ordered[-1],
+    }
+
+
+def save_results(results: Dict[str, Any], output: Optional[str], prefix: str) -> Path:
+    """
+    Save benchmark results as JSON.
+
+    Args:
+        results: Results document
+        output: Output path, or None for benchmarks/results/<prefix>-<timestamp>.json
+        prefix: File name prefix for the default path
+
+    Returns:
+        Path the results were written to
+    """
+    if output:
+        path = Path(output)
+    else:
+        timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        path = RESULTS_DIR / f"{prefix}-{timestamp}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(results, indent=2, default=str), encoding="utf-8")
+    return path
@@ -0,0 +1,906 @@
+#!/usr/bin/env python3
+"""
+Synthetic audit dataset generator.
+
+Builds a consistent, production-sized dataset from the tests/payloads
+templates and bulk loads it with COPY:
+  - organizations, users, repositories, installations
+  - organization_memberships and repository_collaborators
+  - webhook_events (payloads rendered from the fixtures)
+  - repository_events, member_events, security_events and code_events, with
+    the same values EventProcessingService would extract for processed events
+
+Activity is skewed the way real audit traffic is: repositories are assigned to
+organizations, users to organizations, events to repositories and senders to
+members with Zipf-distributed weights, so a few orgs/repos/users dominate.
+
+Examples:
+    python -m benchmarks.generate_dataset --truncate --events 1000000
+    python -m benchmarks.generate_dataset --truncate --orgs 200 --repos 20000 --users 50000 \\
+        --events 5000000 --defer-indexes
+    python -m benchmarks.generate_dataset --dry-run --events 200000
+"""
+
+import argparse
+import copy
+import io
+import json
+import multiprocessing
+import random
+import sys
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from benchmarks.common import load_fixtures
+
+from app.core.config import get_settings
+
+# Relative share of each template (fixture file) in the generated event stream.
+EVENT_MIX = {
+    "15_PushEvent.json": 40.0,
+    "16_PullRequestOpenedEvent.json": 15.0,
+    "17_IssueOpenedEvent.json": 10.0,
+    "19_PullRequestReviewSubmittedEvent.json": 8.0,
+    "20_CreateBranchEvent.json": 5.0,
+    "21_DeleteBranchEvent.json": 3.0,
+    "01_AddMemberEvent.json": 1.5,
+    "02_MemberPermissionChangedEvent.json": 0.5,
+    "03_OrganizationMemberAddedEvent.json": 1.0,
+    "04_TeamAddedToRepositoryEvent.json": 0.5,
+    "05_TeamMemberAddedEvent.json": 1.0,
+    "06_RepositoryCreatedEvent.json": 1.5,
+    "07_RepositoryMadePublicEvent.json": 0.5,
+    "11_CodeScanningAlertCreatedEvent.json": 1.5,
+    "12_DependabotAlertCreatedEvent.json": 1.5,
+    "14_SecretScanningAlertCreated.json": 0.5,
+    "22_ForkEvent.json": 1.0,
+    "13_PersonalAccessTokenRequestCreated.json": 0.3,
+    "25_InstallationCreatedEvent.json": 0.2,
+    "24_Meta_WebhookDeleted_Event.json": 0.1,
+    "23_PingEvent.json": 0.1,
+}
+
+SECURITY_EVENT_TYPES = ("code_scanning_alert", "dependabot_alert", "secret_scanning_alert")
+CODE_EVENT_TYPES = ("push", "create", "delete", "fork")
+
+# GitHub ID ranges for synthetic entities (kept apart from the fixtures' IDs)
+ORG_GITHUB_ID_BASE = 10_000_000
+USER_GITHUB_ID_BASE = 20_000_000
+REPO_GITHUB_ID_BASE = 30_000_000
+INSTALLATION_GITHUB_ID_BASE = 40_000_000
+SYNTHETIC_APP_ID = 424242
+
+LANGUAGES = ("Python", "TypeScript", "Go", "Java", "Rust", "Ruby", "C++", None)
+
+WEBHOOK_EVENT_COLUMNS = (
+    "id", "delivery_id", "event_type", "event_action", "organization_id", "repository_id",
+    "sender_id", "installation_id", "event_timestamp", "received_at", "processed",
+    "processed_at", "payload", "headers", "sender_login", "repository_name", "organization_login",
+)
+
+# Tables loaded by the generator, children first (TRUNCATE / index handling)
+LOADED_TABLES = (
+    "repository_events", "member_events", "security_events", "code_events",
+    "repository_collaborators", "organization_memberships", "webhook_events",
+    "installations", "repositories", "users", "organizations",
+)
+EVENT_TABLES = ("webhook_events", "repository_events", "member_events", "security_events", "code_events")
+
+NULL = "\\N"
+
+
+def copy_text(value: Optional[str]) -> str:
+    """Escape a string for COPY ... FROM STDIN text format."""
+    if value is None:
+        return NULL
+    return (
+        value.replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def copy_json(value: Any) -> str:
+    """Serialize a value as compact JSON escaped for COPY text format."""
+    if value is None:
+        return NULL
+    return copy_text(json.dumps(value, separators=(",", ":")))
+
+
+def copy_bool(value: bool) -> str:
+    return "t" if value else "f"
+
+
+def copy_int(value: Optional[int]) -> str:
+    return NULL if value is None else str(value)
+
+
+class ZipfSampler:
+    """
+    Samples indexes 0..n-1 with Zipf(s) weights.
+
+    Ranks are shuffled so the heaviest items are spread over the index range
+    instead of always being the lowest IDs.
+    """
+
+    def __init__(self, n: int, s: float, rng: random.Random):
+        self.order = list(range(n))
+        rng.shuffle(self.order)
+        self.cum_weights = list(accumulate(1.0 / (rank ** s) for rank in range(1, n + 1)))
+        self.ranks = range(n)
+
+    def sample(self, rng: random.Random) -> int:
+        return self.order[rng.choices(self.ranks, cum_weights=self.cum_weights)[0]]
+
+    def sample_many(self, rng: random.Random, k: int) -> List[int]:
+        order = self.order
+        return [order[rank] for rank in rng.choices(self.ranks, cum_weights=self.cum_weights, k=k)]
+
+
+@dataclass
+class Organization:
+    id: int
+    github_id: int
+    login: str
+    installation_id: int
+    members: List[int] = field(default_factory=list)  # user ids, heaviest first
+    member_sampler: Optional[ZipfSampler] = None
+
+
+@dataclass
+class User:
+    id: int
+    github_id: int
+    login: str
+    organization_id: int
+
+
+@dataclass
+class Repository:
+    id: int
+    github_id: int
+    name: str
+    full_name: str
+    organization_id: int
+
+
+class FragmentTemplates:
+    """
+    Compact JSON for the organization, user, repository and installation
+    objects embedded in payloads, rendered from the fixtures' own objects with
+    their identity fields swapped. Fragments are cached per entity and already
+    escaped for COPY, since popular entities appear in millions of payloads.
+    """
+
+    def __init__(self, fixtures: Dict[str, Dict[str, Any]]):
+        self.organization = self._tokenize(fixtures["06_RepositoryCreatedEvent.json"]["organization"], "login")
+        self.user = self._tokenize(fixtures["15_PushEvent.json"]["sender"], "login")
+        self.owner = self._tokenize(fixtures["06_RepositoryCreatedEvent.json"]["repository"]["owner"], "login")
+        self.installation = self._tokenize(fixtures["25_InstallationCreatedEvent.json"]["installation"], None)
+
+        repository = copy.deepcopy(fixtures["06_RepositoryCreatedEvent.json"]["repository"])
+        old_full_name = repository["full_name"]
+        repository.update({"id": "__ID__", "node_id": "__NODE_ID__", "name": "__REPO_NAME__", "owner": "__OWNER__"})
+        text = json.dumps(repository, separators=(",", ":"))
+        text = text.replace('"__ID__"', "__ID__").replace('"__OWNER__"', "__OWNER__")
+        self.repository = text.replace(old_full_name, "__FULL_NAME__")
+
+        self._cache: Dict[Tuple[str, int], str] = {}
+
+    @staticmethod
+    def _tokenize(obj: Dict[str, Any], name_key: Optional[str]) -> str:
+        obj = copy.deepcopy(obj)
+        old_name = obj.get(name_key) if name_key else None
+        obj["id"] = "__ID__"
+        obj["node_id"] = "__NODE_ID__"
+        if "account" in obj:
+            obj["account"] = "__OWNER__"
+        text = json.dumps(obj, separators=(",", ":"))
+        text = text.replace('"__ID__"', "__ID__").replace('"__OWNER__"', "__OWNER__")
+        if old_name:
+            text = text.replace(old_name, "__NAME__")
+        return text
+
+    @staticmethod
+    def _render(text: str, github_id: int, name: str = "", **tokens: str) -> str:
+        text = text.replace("__ID__", str(github_id)).replace("__NODE_ID__", f"SYN{github_id:x}")
+        for token, value in tokens.items():
+            text = text.replace(f"__{token}__", value)
+        return text.replace("__NAME__", name)
+
+    def _cached(self, kind: str, key: int, build) -> str:
+        fragment = self._cache.get((kind, key))
+        if fragment is None:
+            fragment = copy_text(build())
+            self._cache[(kind, key)] = fragment
+        return fragment
+
+    def _owner_json(self, org: Organization) -> str:
+        return self._render(self.owner, org.github_id, org.login).replace('"type":"User"', '"type":"Organization"')
+
+    def organization_json(self, org: Organization) -> str:
+        return self._cached("org", org.id, lambda: self._render(self.organization, org.github_id, org.login))
+
+    def user_json(self, user: User) -> str:
+        return self._cached("user", user.id, lambda: self._render(self.user, user.github_id, user.login))
+
+    def repository_json(self, repo: Repository, org: Organization) -> str:
+        return self._cached("repo", repo.id, lambda: self._render(
+            self.repository,
+            repo.github_id,
+            REPO_NAME=repo.name,
+            FULL_NAME=repo.full_name,
+            OWNER=self._owner_json(org),
+        ))
+
+    def installation_json(self, org: Organization) -> str:
+        return self._cached("installation", org.id, lambda: self._render(
+            self.installation,
+            INSTALLATION_GITHUB_ID_BASE + org.id,
+            OWNER=self._owner_json(org),
+        ))
+
+
+class PayloadTemplate:
+    """
+    A fixture payload pre-serialized around slots for the parts that change
+    per event (repository, organization, sender, member, installation, SHAs).
+    Rendering is a single join of COPY-escaped literals and fragments.
+    """
+
+    SLOT_PATHS = (
+        (("repository",), "repository"),
+        (("organization",), "organization"),
+        (("sender",), "sender"),
+        (("member",), "member"),
+        (("membership", "user"), "member"),
+        (("installation",), "installation"),
+        (("before",), "before"),
+        (("after",), "after"),
+    )
+
+    def __init__(self, name: str, event_type: str, payload: Dict[str, Any]):
+        self.name = name
+        self.event_type = event_type
+        self.action = payload.get("action")
+        self.specialized = specialized_values(event_type, payload)
+
+        payload = copy.deepcopy(payload)
+        self.has_repository = "repository" in payload
+        self.has_installation = isinstance(payload.get("installation"), dict)
+        # Every synthetic repository is organization-owned, so GitHub would
+        # include the organization object on all repository/org deliveries.
+        if self.has_repository or "organization" in payload or self.has_installation:
+            payload["organization"] = {}
+        self.has_member = False
+        self.headers = copy_json({
+            "x-github-event": event_type,
+            "x-github-delivery": "__DELIVERY__",
+            "content-type": "application/json",
+            "user-agent": "GitHub-Hookshot/synthetic",
+        })
+
+        for path, slot in self.SLOT_PATHS:
+            parent = payload
+            for key in path[:-1]:
+                parent = parent.get(key) if isinstance(parent, dict) else None
+            if not isinstance(parent, dict) or path[-1] not in parent:
+                continue
+            if slot in ("before", "after") and not isinstance(parent[path[-1]], str):
+                continue
+            parent[path[-1]] = f"@@SLOT:{slot}@@"
+            self.has_member = self.has_member or slot == "member"
+
+        text = copy_text(json.dumps(payload, separators=(",", ":")))
+        self.parts: List[str] = []
+        self.slots: List[str] = []
+        for index, chunk in enumerate(text.split('"@@SLOT:')):
+            if index == 0:
+                self.parts.append(chunk)
+                continue
+            slot, literal = chunk.split('@@"', 1)
+            self.slots.append(slot)
+            self.parts.append(literal)
+
+    def render(self, values: Dict[str, str]) -> str:
+        parts = self.parts
+        pieces = [parts[0]]
+        for index, slot in enumerate(self.slots):
+            pieces.append(values[slot])
+            pieces.append(parts[index + 1])
+        return "".join(pieces)
+
+
+def specialized_values(event_type: str, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Get the per-template specialized row values, mirroring the extraction in
+    EventProcessingService's _process_* handlers.
+    """
+    action = payload.get("action", "")
+    if event_type == "repository":
+        return {"table": "repository_events", "action": action, "changes": payload.get("changes", {})}
+
+    if event_type in ("member", "organization"):
+        permission_level = payload.get("permission")
+        if not payload.get("member") and (payload.get("membership") or {}).get("user") and not permission_level:
+            permission_level = payload["membership"].get("role", "member")
+        return {
+            "table": "member_events",
+            "action": action,
+            "permission_level": permission_level,
+            "changes": payload.get("changes", {}),
+        }
+
+    if event_type in SECURITY_EVENT_TYPES:
+        alert = payload.get("alert", {})
+        values = {
+            "table": "security_events",
+            "action": action,
+            "alert_number": alert.get("number"),
+            "state": alert.get("state"),
+            "severity": None,
+            "rule_id": None,
+            "tool_name": None,
+            "secret_type": None,
+        }
+        if event_type == "code_scanning_alert":
+            rule = alert.get("rule", {})
+            values.update(severity=rule.get("severity"), rule_id=rule.get("id"), tool_name=alert.get("tool", {}).get("name"))
+        elif event_type == "dependabot_alert":
+            values["severity"] = alert.get("security_advisory", {}).get("severity")
+        else:
+            values["secret_type"] = alert.get("secret_type")
+        return values
+
+    if event_type in CODE_EVENT_TYPES:
+        values = {
+            "table": "code_events",
+            "ref_name": None,
+            "ref_type": None,
+            "commits_count": 0,
+            "distinct_commits_count": 0,
+            "forced": False,
+        }
+        if event_type == "push":
+            commits = payload.get("commits", [])
+            values.update(
+                ref_name=payload.get("ref", "").replace("refs/heads/", "").replace("refs/tags/", ""),
+                ref_type="branch",
+                commits_count=len(commits),
+                distinct_commits_count=len(set(commit.get("id") for commit in commits if commit.get("id"))),
+                forced=payload.get("forced", False),
+            )
+        elif event_type in ("create", "delete"):
+            values.update(ref_name=payload.get("ref"), ref_type=payload.get("ref_type"))
+        return values
+
+    return None
+
+
+class DatasetGenerator:
+    """Generates entities and events and writes them as COPY text buffers."""
+
+    def __init__(self, args):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.end = datetime.now(timezone.utc).replace(microsecond=0)
+        self.start = self.end - timedelta(days=args.days)
+
+        fixtures = {fixture.name: fixture for fixture in load_fixtures()}
+        self.fragments = FragmentTemplates({name: fixture.payload for name, fixture in fixtures.items()})
+        self.templates = [
+            PayloadTemplate(name, fixtures[name].event_type, fixtures[name].payload)
+            for name in EVENT_MIX if name in fixtures
+        ]
+        self.template_weights = list(accumulate(EVENT_MIX[template.name] for template in self.templates))
+
+        self.organizations: List[Organization] = []
+        self.users: List[User] = []
+        self.repositories: List[Repository] = []
+        self.repo_sampler: Optional[ZipfSampler] = None
+
+    # ------------------------------------------------------------------
+    # Entities
+    # ------------------------------------------------------------------
+
+    def build_entities(self):
+        """Create organizations, users (as org members) and repositories."""
+        args = self.args
+        for index in range(1, args.orgs + 1):
+            self.organizations.append(Organization(
+                id=index,
+                github_id=ORG_GITHUB_ID_BASE + index,
+                login=f"synthetic-org-{index}",
+                installation_id=index,
+            ))
+
+        # Every org gets at least one member; the rest follow the org's Zipf weight
+        org_sampler = ZipfSampler(args.orgs, args.zipf_s, self.rng)
+        homes = list(range(args.orgs)) + org_sampler.sample_many(self.rng, args.users - args.orgs)
+        for index, org_index in enumerate(homes, start=1):
+            org = self.organizations[org_index]
+            self.users.append(User(
+                id=index,
+                github_id=USER_GITHUB_ID_BASE + index,
+                login=f"synthetic-user-{index}",
+                organization_id=org.id,
+            ))
+            org.members.append(index)
+        for org in self.organizations:
+            org.member_sampler = ZipfSampler(len(org.members), args.zipf_s, self.rng)
+
+        homes = list(range(args.orgs)) + org_sampler.sample_many(self.rng, max(args.repos - args.orgs, 0))
+        for index, org_index in enumerate(homes[:args.repos], start=1):
+            org = self.organizations[org_index]
+            name = f"repo-{index}"
+            self.repositories.append(Repository(
+                id=index,
+                github_id=REPO_GITHUB_ID_BASE + index,
+                name=name,
+                full_name=f"{org.login}/{name}",
+                organization_id=org.id,
+            ))
+        self.repo_sampler = ZipfSampler(len(self.repositories), args.zipf_s, self.rng)
+
+    def entity_buffers(self) -> List[Tuple[str, Sequence[str], io.StringIO]]:
+        """COPY buffers for the entity and membership tables."""
+        rng = self.rng
+        created_at = (self.start - timedelta(days=365)).isoformat()
+
+        organizations = io.StringIO()
+        installations = io.StringIO()
+        for org in self.organizations:
+            api = f"https://api.github.com/orgs/{org.login}"
+            organizations.write("\t".join((
+                str(org.id), str(org.github_id), org.login, f"SYN{org.github_id:x}", api, f"{api}/repos",
+                f"{api}/events", f"{api}/hooks", f"{api}/issues", f"{api}/members{{/member}}",
+                f"{api}/public_members{{/member}}", f"https://avatars.githubusercontent.com/u/{org.github_id}?v=4",
+                f"https://github.com/{org.login}", "Organization", created_at,
+            )) + "\n")
+            installations.write("\t".join((
+                str(org.installation_id), str(INSTALLATION_GITHUB_ID_BASE + org.id), str(SYNTHETIC_APP_ID),
+                "synthetic-audit", str(org.github_id), "Organization", "all",
+                copy_json({"members": "read", "metadata": "read", "administration": "read"}),
+                "{member,organization,push,pull_request,repository}",
+            )) + "\n")
+
+        users = io.StringIO()
+        memberships = io.StringIO()
+        for user in self.users:
+            users.write("\t".join((
+                str(user.id), str(user.github_id), user.login, f"SYN{user.github_id:x}",
+                f"https://avatars.githubusercontent.com/u/{user.github_id}?v=4",
+                f"https://api.github.com/users/{user.login}", f"https://github.com/{user.login}",
+                "User", "f", created_at,
+            )) + "\n")
+        for org in self.organizations:
+            for rank, user_id in enumerate(org.members):
+                role = "admin" if rank == 0 or rng.random() < 0.05 else "member"
+                memberships.write(f"{org.id}\t{user_id}\t{role}\tactive\n")
+
+        repositories = io.StringIO()
+        for repo in self.repositories:
+            private = rng.random() < 0.6
+            repositories.write("\t".join((
+                str(repo.id), str(repo.github_id), f"SYN{repo.github_id:x}", repo.name, repo.full_name,
+                str(repo.organization_id), copy_bool(private), f"https://github.com/{repo.full_name}",
+                f"https://api.github.com/repos/{repo.full_name}", "f", "main",
+                "private" if private else "public", copy_text(rng.choice(LANGUAGES)),
+                str(int(rng.paretovariate(1.2)) - 1), created_at,
+            )) + "\n")
+
+        return [
+            ("organizations", (
+                "id", "github_id", "login", "node_id", "url", "repos_url", "events_url", "hooks_url",
+                "issues_url", "members_url", "public_members_url", "avatar_url", "html_url", "type",
+                "github_created_at",
+            ), organizations),
+            ("users", (
+                "id", "github_id", "login", "node_id", "avatar_url", "url", "html_url", "type",
+                "site_admin", "github_created_at",
+            ), users),
+            ("repositories", (
+                "id", "github_id", "node_id", "name", "full_name", "organization_id", "private", "html_url",
+                "url", "fork", "default_branch", "visibility", "language", "stargazers_count",
+                "github_created_at",
+            ), repositories),
+            ("installations", (
+                "id", "github_id", "app_id", "app_slug", "target_id", "target_type",
+                "repository_selection", "permissions", "events",
+            ), installations),
+            ("organization_memberships", ("organization_id", "user_id", "role", "state"), memberships),
+        ]
+
+    # ------------------------------------------------------------------
+    # Events
+    # ------------------------------------------------------------------
+
+    def batch_count(self) -> int:
+        return (self.args.events + self.args.batch - 1) // self.args.batch
+
+    def event_batch(self, batch_index: int) -> Tuple[int, Dict[str, io.StringIO], Dict[Tuple[int, int], str]]:
+        """
+        Build the COPY buffers for one batch of events.
+
+        Batches are independent (each has its own seeded RNG and ID range) so
+        they can be generated by parallel workers. Event IDs and timestamps
+        ascend together across batches.
+
+        Returns:
+            (event count, buffers by table, collaborators added by member events)
+        """
+        args = self.args
+        rng = random.Random(f"{args.seed}-{batch_index}")
+        fragments = self.fragments
+        step = (self.end - self.start).total_seconds() / max(args.events, 1)
+
+        batch_start = batch_index * args.batch + 1
+        count = min(args.batch, args.events - batch_start + 1)
+        repo_indexes = self.repo_sampler.sample_many(rng, count)
+        templates = rng.choices(self.templates, cum_weights=self.template_weights, k=count)
+
+        buffers = {table: io.StringIO() for table in EVENT_TABLES}
+        webhook_events = buffers["webhook_events"]
+        collaborators: Dict[Tuple[int, int], str] = {}
+
+        for offset in range(count):
+            event_id = batch_start + offset
+            template = templates[offset]
+            repo = self.repositories[repo_indexes[offset]]
+            org = self.organizations[repo.organization_id - 1]
+            sender = self.users[org.members[org.member_sampler.sample(rng)] - 1]
+
+            timestamp = self.start + timedelta(seconds=(event_id - 1 + rng.random()) * step)
+            event_timestamp = timestamp.isoformat()
+            received_at = (timestamp + timedelta(milliseconds=rng.randint(50, 2000))).isoformat()
+            processed = rng.random() < args.processed_fraction
+            processed_at = (timestamp + timedelta(seconds=rng.randint(1, 30))).isoformat() if processed else NULL
+            delivery_id = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+            values = {
+                "repository": fragments.repository_json(repo, org),
+                "organization": fragments.organization_json(org),
+                "sender": fragments.user_json(sender),
+            }
+            member = None
+            if template.has_member:
+                member = self.users[rng.choice(org.members) - 1]
+                values["member"] = fragments.user_json(member)
+            if template.has_installation:
+                values["installation"] = fragments.installation_json(org)
+            shas = None
+            if template.event_type == "push":
+                shas = (f"{rng.getrandbits(160):040x}", f"{rng.getrandbits(160):040x}")
+                values["before"] = f'"{shas[0]}"'
+                values["after"] = f'"{shas[1]}"'
+
+            repository_id = repo.id if template.has_repository else None
+            webhook_events.write("\t".join((
+                str(event_id), delivery_id, template.event_type, copy_text(template.action),
+                str(org.id), copy_int(repository_id), str(sender.id),
+                str(org.installation_id) if template.has_installation else NULL,
+                event_timestamp, received_at, copy_bool(processed), processed_at,
+                template.render(values), template.headers.replace("__DELIVERY__", delivery_id, 1),
+                sender.login, repo.full_name if template.has_repository else NULL, org.login,
+            )) + "\n")
+
+            if processed and template.specialized:
+                self._write_specialized(
+                    buffers, collaborators, template, event_id, repository_id, org, member, shas, event_timestamp
+                )
+
+        return count, buffers, collaborators
+
+    def _write_specialized(
+        self, buffers, collaborators, template, event_id, repository_id, org, member, shas, event_timestamp
+    ):
+        spec = template.specialized
+        table = spec["table"]
+        repository = copy_int(repository_id)
+
+        if table == "repository_events":
+            line = (str(event_id), repository, spec["action"], copy_json(spec["changes"]), event_timestamp)
+        elif table == "member_events":
+            permission_level = spec["permission_level"]
+            line = (
+                str(event_id), repository, str(org.id), copy_int(member.id if member else None),
+                spec["action"], copy_text(permission_level), copy_json(spec["changes"]), event_timestamp,
+            )
+            if member and spec["action"] == "added" and repository_id:
+                collaborators[(repository_id, member.id)] = permission_level or "read"
+        elif table == "security_events":
+            line = (
+                str(event_id), repository, template.event_type, copy_int(spec["alert_number"]), spec["action"],
+                copy_text(spec["state"]), copy_text(spec["severity"]), copy_text(spec["rule_id"]),
+                copy_text(spec["tool_name"]), copy_text(spec["secret_type"]), event_timestamp,
+            )
+        else:
+            line = (
+                str(event_id), repository, template.event_type, copy_text(spec["ref_name"]),
+                copy_text(spec["ref_type"]), copy_text(shas and shas[0]), copy_text(shas and shas[1]),
+                str(spec["commits_count"]), str(spec["distinct_commits_count"]), copy_bool(spec["forced"]),
+                event_timestamp,
+            )
+        buffers[table].write("\t".join(line) + "\n")
+
+
+SPECIALIZED_COLUMNS = {
+    "repository_events": ("webhook_event_id", "repository_id", "action", "changes", "event_timestamp"),
+    "member_events": (
+        "webhook_event_id", "repository_id", "organization_id", "member_id", "action",
+        "permission_level", "changes", "event_timestamp",
+    ),
+    "security_events": (
+        "webhook_event_id", "repository_id", "alert_type", "alert_number", "action", "state",
+        "severity", "rule_id", "tool_name", "secret_type", "event_timestamp",
+    ),
+    "code_events": (
+        "webhook_event_id", "repository_id", "event_type", "ref_name", "ref_type", "before_sha",
+        "after_sha", "commits_count", "distinct_commits_count", "forced", "event_timestamp",
+    ),
+}
+
+
+class CopyLoader:
+    """Loads COPY text buffers over a raw psycopg2 connection."""
+
+    def __init__(self, database_url: str):
+        from sqlalchemy import create_engine
+
+        self.engine = create_engine(database_url)
+        self.connection = self.engine.raw_connection()
+        self.deferred_indexes: List[Tuple[str, str]] = []
+
+    def execute(self, sql: str, params=None):
+        with self.connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            rows = cursor.fetchall() if cursor.description else None
+        self.connection.commit()
+        return rows
+
+    def copy(self, table: str, columns: Sequence[str], buffer: io.StringIO) -> int:
+        rows = buffer.getvalue().count("\n")
+        if not rows:
+            return 0
+        buffer.seek(0)
+        with self.connection.cursor() as cursor:
+            cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", buffer)
+        return rows
+
+    def commit(self):
+        self.connection.commit()
+
+    def ensure_empty(self, truncate: bool):
+        if truncate:
+            self.execute(f"TRUNCATE {', '.join(LOADED_TABLES)} RESTART IDENTITY CASCADE")
+            return
+        non_empty = [table for table in LOADED_TABLES if self.execute(f"SELECT EXISTS (SELECT 1 FROM {table})")[0][0]]
+        if non_empty:
+            raise SystemExit(f"❌ Tables already contain data: {', '.join(non_empty)} (use --truncate)")
+
+    def drop_indexes(self, tables: Sequence[str]):
+        """Drop secondary indexes (not backing a constraint) so they are built once after the load."""
+        self.deferred_indexes = self.execute(
+            """
+            SELECT i.indexname, i.indexdef
+            FROM pg_indexes i
+            WHERE i.schemaname = current_schema()
+              AND i.tablename = ANY(%s)
+              AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conname = i.indexname)
+            """,
+            (list(tables),),
+        ) or []
+        for name, _ in self.deferred_indexes:
+            self.execute(f'DROP INDEX IF EXISTS "{name}"')
+
+    def restore_indexes(self):
+        for name, definition in self.deferred_indexes:
+            started = time.perf_counter()
+            self.execute(definition)
+            print(f"  🔧 {name} rebuilt in {time.perf_counter() - started:.1f}s")
+        self.deferred_indexes = []
+
+    def finish(self):
+        """Move sequences past the explicit IDs and refresh planner statistics."""
+        for table in LOADED_TABLES:
+            self.execute(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), COALESCE(MAX(id), 0) + 1, false) FROM {table}"
+            )
+        self.connection.autocommit = True
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {', '.join(LOADED_TABLES)}")
+        self.connection.autocommit = False
+
+    def close(self):
+        self.connection.close()
+        self.engine.dispose()
+
+
+class NullLoader:
+    """Stand-in loader for --dry-run: counts rows without a database."""
+
+    def copy(self, table: str, columns: Sequence[str], buffer: io.StringIO) -> int:
+        return buffer.getvalue().count("\n")
+
+    def commit(self):
+        pass
+
+
+# Set in the parent before the worker pool forks, so workers share the entities
+_worker_generator: Optional[DatasetGenerator] = None
+_worker_loader = None
+
+
+def _init_worker(database_url: Optional[str]):
+    global _worker_loader
+    _worker_loader = CopyLoader(database_url) if database_url else NullLoader()
+
+
+def _copy_batch_in_worker(batch_index: int):
+    return copy_batch(_worker_generator, _worker_loader, batch_index)
+
+
+def copy_batch(generator: DatasetGenerator, loader, batch_index: int):
+    """
+    Generate one batch of events and COPY it in its own transaction.
+
+    Returns:
+        (event count, rows by table, collaborators added, seconds spent in COPY)
+    """
+    count, buffers, collaborators = generator.event_batch(batch_index)
+    started = time.perf_counter()
+    rows = {"webhook_events": loader.copy("webhook_events", WEBHOOK_EVENT_COLUMNS, buffers["webhook_events"])}
+    for table, columns in SPECIALIZED_COLUMNS.items():
+        rows[table] = loader.copy(table, columns, buffers[table])
+    loader.commit()
+    return count, rows, collaborators, time.perf_counter() - started
+
+
+def load(generator: DatasetGenerator, loader, database_url: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Generate and load the dataset, printing per-batch throughput.
+
+    Args:
+        generator: Dataset generator
+        loader: CopyLoader (or NullLoader for --dry-run) used for the entity tables
+        database_url: Database the worker processes connect to (None for --dry-run)
+
+    Returns:
+        Summary with elapsed seconds, rows per table and throughput
+    """
+    global _worker_generator
+    args = generator.args
+    started = time.perf_counter()
+    counts: Dict[str, int] = {}
+
+    generator.build_entities()
+    for table, columns, buffer in generator.entity_buffers():
+        counts[table] = loader.copy(table, columns, buffer)
+    loader.commit()
+    print(
+        f"🏢 {len(generator.organizations)} orgs, {len(generator.users)} users, "
+        f"{len(generator.repositories)} repos loaded in {time.perf_counter() - started:.1f}s"
+    )
+
+    batch_indexes = range(generator.batch_count())
+    pool = None
+    if args.workers > 1:
+        _worker_generator = generator
+        pool = multiprocessing.get_context("fork").Pool(args.workers, _init_worker, (database_url,))
+        results = pool.imap(_copy_batch_in_worker, batch_indexes)
+    else:
+        results = (copy_batch(generator, loader, batch_index) for batch_index in batch_indexes)
+
+    loaded_events = 0
+    collaborators: Dict[Tuple[int, int], str] = {}
+    try:
+        for batch_count, batch_rows, batch_collaborators, copy_seconds in results:
+            for table, rows in batch_rows.items():
+                counts[table] = counts.get(table, 0) + rows
+            collaborators.update(batch_collaborators)
+            loaded_events += batch_count
+
+            elapsed = time.perf_counter() - started
+            print(
+                f"  📦 {loaded_events:>10,}/{args.events:,} events - "
+                f"batch {sum(batch_rows.values()) / max(copy_seconds, 1e-9):>9,.0f} rows/s (COPY), "
+                f"overall {loaded_events / elapsed:>9,.0f} events/s"
+            )
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    buffer = io.StringIO()
+    for (repository_id, user_id), permission in collaborators.items():
+        buffer.write(f"{repository_id}\t{user_id}\t{permission}\n")
+    counts["repository_collaborators"] = loader.copy(
+        "repository_collaborators", ("repository_id", "user_id", "permission"), buffer
+    )
+    loader.commit()
+
+    elapsed = time.perf_counter() - started
+    total_rows = sum(counts.values())
+    return {
+        "seconds": elapsed,
+        "rows": counts,
+        "rows_per_second": total_rows / elapsed if elapsed else None,
+        "events_per_second": loaded_events / elapsed if elapsed else None,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate and bulk load a synthetic audit dataset")
+    parser.add_argument("--orgs", type=int, default=50, help="Organizations (default 50)")
+    parser.add_argument("--repos", type=int, default=5000, help="Repositories (default 5000)")
+    parser.add_argument("--users", type=int, default=20000, help="Users (default 20000)")
+    parser.add_argument("--events", type=int, default=1_000_000, help="Webhook events (default 1000000)")
+    parser.add_argument("--zipf-s", type=float, default=1.1, help="Zipf exponent for activity skew (default 1.1)")
+    parser.add_argument("--days", type=int, default=90, help="Days of history, ending now (default 90)")
+    parser.add_argument("--processed-fraction", type=float, default=1.0,
+                        help="Share of events marked processed, with specialized rows (default 1.0)")
+    parser.add_argument("--batch", type=int, default=50_000, help="Events per COPY batch (default 50000)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Processes generating and COPYing batches in parallel (default 1)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed (default 42)")
+    parser.add_argument("--database-url", help="Target database (default: DATABASE_URL)")
+    parser.add_argument("--truncate", action="store_true", help="Empty the loaded tables first (RESTART IDENTITY)")
+    parser.add_argument("--defer-indexes", action="store_true",
+                        help="Drop secondary indexes on the event tables during the load and rebuild them after")
+    parser.add_argument("--dry-run", action="store_true", help="Generate rows without a database (measures generation)")
+    args = parser.parse_args(argv)
+
+    if args.orgs < 1 or args.users < args.orgs or args.repos < 1:
+        parser.error("need at least one org and one repo, and --users >= --orgs")
+    if args.workers < 1 or args.batch < 1:
+        parser.error("--workers and --batch must be at least 1")
+    if not 0.0 <= args.processed_fraction <= 1.0:
+        parser.error("--processed-fraction must be between 0 and 1")
+    return args
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    generator = DatasetGenerator(args)
+
+    print(
+        f"🧪 Generating {args.events:,} events over {args.days} days: {args.orgs} orgs, {args.repos} repos, "
+        f"{args.users} users, zipf s={args.zipf_s}"
+    )
+
+    if args.dry_run:
+        summary = load(generator, NullLoader())
+    else:
+        database_url = args.database_url or get_settings().DATABASE_URL
+        if not database_url:
+            print("❌ DATABASE_URL is not set (or pass --database-url)")
+            return 1
+        loader = CopyLoader(database_url)
+        try:
+            loader.ensure_empty(args.truncate)
+            if args.defer_indexes:
+                loader.drop_indexes(EVENT_TABLES)
+                print(f"🔧 Dropped {len(loader.deferred_indexes)} secondary indexes for the load")
+            try:
+                summary = load(generator, loader, database_url)
+            finally:
+                loader.connection.rollback()
+                if args.defer_indexes:
+                    loader.restore_indexes()
+            loader.finish()
+        finally:
+            loader.close()
+
+    print(f"\n✅ Loaded in {summary['seconds']:.1f}s ({summary['rows_per_second']:,.0f} rows/s overall)")
+    for table, rows in summary["rows"].items():
+        print(f"  • {table:<26} {rows:>12,}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
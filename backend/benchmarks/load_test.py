@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Webhook load test and replay harness.
+
+Replays the tests/payloads fixtures (and synthetic variants with randomized
+IDs) against the webhook endpoint with valid HMAC signatures, either against
+the ASGI app in-process or against a running server, and reports throughput,
+latency percentiles, error rates and DB statements per delivery.
+
+Examples:
+    python -m benchmarks.load_test --requests 2000 --concurrency 32
+    python -m benchmarks.load_test --rate 200 --duration 30 --url http://localhost:8000
+    python -m benchmarks.load_test --events push,pull_request --variants 1.0
+"""
+
+import argparse
+import asyncio
+import os
+import platform
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from benchmarks.common import (
+    Fixture, build_headers, encode_payload, load_fixtures, randomize_ids, save_results, summarize
+)
+
+WEBHOOK_PATH = "/api/v1/webhooks/github"
+
+
+@dataclass
+class Delivery:
+    """A prepared webhook request."""
+
+    event_type: str
+    body: bytes
+    synthetic: bool
+
+
+@dataclass
+class Sample:
+    """Outcome of one request."""
+
+    event_type: str
+    status: Optional[int]
+    latency: float
+    db_statements: Optional[int] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class RunState:
+    """Mutable state shared by the request workers."""
+
+    samples: List[Sample] = field(default_factory=list)
+    in_flight: int = 0
+    max_in_flight: int = 0
+
+
+class DeliveryFactory:
+    """Cycles through the fixtures, producing fresh signed deliveries."""
+
+    def __init__(self, fixtures: List[Fixture], variant_fraction: float, secret: Optional[str], hook_id: Optional[str], seed: int):
+        self.fixtures = fixtures
+        self.variant_fraction = variant_fraction
+        self.secret = secret
+        self.hook_id = hook_id
+        self.rng = random.Random(seed)
+        self._bodies = {fixture.name: encode_payload(fixture.payload) for fixture in fixtures}
+        self._index = 0
+
+    def next(self) -> Delivery:
+        fixture = self.fixtures[self._index % len(self.fixtures)]
+        self._index += 1
+        if self.rng.random() < self.variant_fraction:
+            return Delivery(fixture.event_type, encode_payload(randomize_ids(fixture.payload, self.rng)), True)
+        return Delivery(fixture.event_type, self._bodies[fixture.name], False)
+
+    def headers(self, delivery: Delivery) -> Dict[str, str]:
+        return build_headers(delivery.event_type, delivery.body, self.secret, hook_id=self.hook_id)
+
+
+async def send(client: httpx.AsyncClient, factory: DeliveryFactory, state: RunState, scheduled_at: Optional[float] = None):
+    """
+    Send one delivery and record its outcome.
+
+    In rate mode latency is measured from the scheduled send time, so a
+    backed-up server is not hidden by the client waiting (coordinated omission).
+    """
+    delivery = factory.next()
+    headers = factory.headers(delivery)
+    start = scheduled_at if scheduled_at is not None else time.perf_counter()
+
+    state.in_flight += 1
+    state.max_in_flight = max(state.max_in_flight, state.in_flight)
+    try:
+        response = await client.post(WEBHOOK_PATH, content=delivery.body, headers=headers)
+        db_statements = response.headers.get("x-db-statements")
+        state.samples.append(Sample(
+            event_type=delivery.event_type,
+            status=response.status_code,
+            latency=time.perf_counter() - start,
+            db_statements=int(db_statements) if db_statements and db_statements.isdigit() else None,
+        ))
+    except Exception as e:
+        state.samples.append(Sample(
+            event_type=delivery.event_type,
+            status=None,
+            latency=time.perf_counter() - start,
+            error=type(e).__name__,
+        ))
+    finally:
+        state.in_flight -= 1
+
+
+async def check_fixtures(client: httpx.AsyncClient, factory: DeliveryFactory):
+    """
+    Send each fixture once and require a 2xx, so rejected deliveries are not
+    measured as part of the load.
+
+    Raises:
+        SystemExit: If any fixture is not accepted
+    """
+    rejected = []
+    for fixture in factory.fixtures:
+        body = encode_payload(fixture.payload)
+        headers = build_headers(fixture.event_type, body, factory.secret, hook_id=factory.hook_id)
+        response = await client.post(WEBHOOK_PATH, content=body, headers=headers)
+        if not 200 <= response.status_code < 300:
+            rejected.append(f"{fixture.name}: {response.status_code} {response.text[:200]}")
+    if rejected:
+        raise SystemExit("Fixtures not accepted by the webhook endpoint:\n  " + "\n  ".join(rejected))
+
+
+async def run_concurrency(client, factory, state, concurrency: int, total: Optional[int], duration: Optional[float]):
+    """Closed loop: `concurrency` workers each send their next request as soon as the last completes."""
+    deadline = time.perf_counter() + duration if duration else None
+    remaining = [total] if total else None
+
+    async def worker():
+        while True:
+            if deadline is not None and time.perf_counter() >= deadline:
+                return
+            if remaining is not None:
+                if remaining[0] <= 0:
+                    return
+                remaining[0] -= 1
+            await send(client, factory, state)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+
+async def run_rate(client, factory, state, rate: float, total: Optional[int], duration: Optional[float], max_in_flight: int):
+    """Open loop: start requests on a fixed schedule of `rate` per second regardless of responses."""
+    count = total if total else int(rate * duration)
+    interval = 1.0 / rate
+    start = time.perf_counter()
+    limiter = asyncio.Semaphore(max_in_flight)
+    tasks = []
+
+    async def bounded(scheduled_at: float):
+        async with limiter:
+            await send(client, factory, state, scheduled_at)
+
+    for index in range(count):
+        scheduled_at = start + index * interval
+        delay = scheduled_at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(bounded(scheduled_at)))
+
+    await asyncio.gather(*tasks)
+
+
+def create_client(args) -> httpx.AsyncClient:
+    """Create an HTTP client for a remote server or the in-process ASGI app."""
+    timeout = httpx.Timeout(args.timeout)
+    if args.url:
+        limits = httpx.Limits(max_connections=max(args.concurrency, args.max_in_flight))
+        return httpx.AsyncClient(base_url=args.url, timeout=timeout, limits=limits)
+
+    from app.core.config import get_settings
+    settings = get_settings()
+    if not args.respect_rate_limit:
+        # The load generator is a single hook; lift its per-hook and in-flight limits
+        settings.RATE_LIMIT_REQUESTS = 10 ** 9
+        settings.WEBHOOK_MAX_IN_FLIGHT = 10 ** 6
+
+    from main import app
+    return httpx.AsyncClient(app=app, base_url="http://benchmark", timeout=timeout)
+
+
+def build_report(args, state: RunState, elapsed: float) -> Dict[str, Any]:
+    """Summarize samples into the results document."""
+    samples = state.samples
+    statuses = Counter(str(sample.status) if sample.status is not None else sample.error for sample in samples)
+    errors = [sample for sample in samples if sample.status is None or sample.status >= 500]
+    rejected = [sample for sample in samples if sample.status is not None and 400 <= sample.status < 500]
+
+    by_event: Dict[str, List[Sample]] = defaultdict(list)
+    for sample in samples:
+        by_event[sample.event_type].append(sample)
+
+    def latency_ms(group: List[Sample]) -> Dict[str, Optional[float]]:
+        stats = summarize(sample.latency * 1000 for sample in group)
+        return {key: round(value, 3) if isinstance(value, float) else value for key, value in stats.items()}
+
+    def statements(group: List[Sample]) -> Dict[str, Optional[float]]:
+        return summarize(sample.db_statements for sample in group if sample.db_statements is not None)
+
+    return {
+        "tool": "load_test",
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "config": {
+            "target": args.url or "in-process",
+            "mode": "rate" if args.rate else "concurrency",
+            "rate": args.rate,
+            "concurrency": args.concurrency if not args.rate else None,
+            "requests": args.requests,
+            "duration": args.duration,
+            "variants": args.variants,
+            "events": args.events,
+            "signed": bool(args.secret),
+            "seed": args.seed,
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "elapsed_seconds": round(elapsed, 3),
+        "requests": len(samples),
+        "throughput_rps": round(len(samples) / elapsed, 2) if elapsed else None,
+        "max_in_flight": state.max_in_flight,
+        "status_counts": dict(statuses),
+        "error_rate": len(errors) / len(samples) if samples else 0.0,
+        "rejected_rate": len(rejected) / len(samples) if samples else 0.0,
+        "latency_ms": latency_ms(samples),
+        "db_statements_per_delivery": statements(samples),
+        "by_event_type": {
+            event_type: {
+                "requests": len(group),
+                "errors": sum(1 for sample in group if sample.status is None or sample.status >= 500),
+                "latency_ms": latency_ms(group),
+                "db_statements_per_delivery": statements(group),
+            }
+            for event_type, group in sorted(by_event.items())
+        },
+    }
+
+
+def print_report(report: Dict[str, Any]):
+    latency = report["latency_ms"]
+    statements = report["db_statements_per_delivery"]
+    print("\n📈 Load Test Results")
+    print("=" * 60)
+    print(f"  Target:        {report['config']['target']} ({report['config']['mode']})")
+    print(f"  Requests:      {report['requests']} in {report['elapsed_seconds']}s")
+    print(f"  Throughput:    {report['throughput_rps']} req/s (max in flight {report['max_in_flight']})")
+    print(f"  Status codes:  {report['status_counts']}")
+    print(f"  Error rate:    {report['error_rate']:.2%} (4xx: {report['rejected_rate']:.2%})")
+    if latency["count"]:
+        print(f"  Latency (ms):  p50 {latency['p50']}  p95 {latency['p95']}  p99 {latency['p99']}  max {latency['max']}")
+    if statements["count"]:
+        print(f"  DB statements: mean {statements['mean']:.1f}  p95 {statements['p95']}  max {statements['max']}")
+
+    print(f"\n  {'event type':<32}{'reqs':>7}{'errors':>8}{'p50 ms':>10}{'p99 ms':>10}{'stmts':>8}")
+    for event_type, row in report["by_event_type"].items():
+        mean_statements = row["db_statements_per_delivery"]["mean"]
+        print(
+            f"  {event_type:<32}{row['requests']:>7}{row['errors']:>8}"
+            f"{row['latency_ms']['p50'] or 0:>10.2f}{row['latency_ms']['p99'] or 0:>10.2f}"
+            f"{mean_statements if mean_statements is not None else float('nan'):>8.1f}"
+        )
+
+
+async def main_async(args) -> Dict[str, Any]:
+    fixtures = load_fixtures(args.events.split(",") if args.events else None)
+    if not fixtures:
+        raise SystemExit("No fixtures match --events")
+
+    factory = DeliveryFactory(fixtures, args.variants, args.secret, args.hook_id, args.seed)
+    state = RunState()
+
+    async with create_client(args) as client:
+        await check_fixtures(client, factory)
+        start = time.perf_counter()
+        if args.rate:
+            await run_rate(client, factory, state, args.rate, args.requests, args.duration, args.max_in_flight)
+        else:
+            await run_concurrency(client, factory, state, args.concurrency, args.requests, args.duration)
+        elapsed = time.perf_counter() - start
+
+    return build_report(args, state, elapsed)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Replay GitHub webhook fixtures against the webhook endpoint")
+    parser.add_argument("--url", help="Base URL of a running server (default: drive the ASGI app in-process)")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--concurrency", type=int, default=16, help="Closed-loop concurrent requests (default 16)")
+    mode.add_argument("--rate", type=float, help="Open-loop target rate in requests per second")
+    parser.add_argument("--requests", type=int, help="Total requests to send")
+    parser.add_argument("--duration", type=float, help="Run for this many seconds")
+    parser.add_argument("--max-in-flight", type=int, default=1000, help="Cap on outstanding requests in rate mode")
+    parser.add_argument("--variants", type=float, default=0.5, help="Fraction of deliveries with randomized IDs (default 0.5)")
+    parser.add_argument("--events", help="Comma-separated event types to replay (default: all fixtures)")
+    parser.add_argument("--secret", help="Webhook secret for signatures (default: GITHUB_WEBHOOK_SECRET)")
+    parser.add_argument("--hook-id", help="X-GitHub-Hook-ID to send (selects per-hook secrets and rate limits)")
+    parser.add_argument("--respect-rate-limit", action="store_true", help="Keep admission limits when running in-process")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for synthetic variants")
+    parser.add_argument("--output", help="Results JSON path (default: benchmarks/results/load-<timestamp>.json)")
+    args = parser.parse_args(argv)
+
+    if not args.requests and not args.duration:
+        args.requests = 1000
+    if args.secret is None:
+        from app.core.config import get_settings
+        args.secret = get_settings().GITHUB_WEBHOOK_SECRET
+    return args
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    report = asyncio.run(main_async(args))
+    print_report(report)
+    path = save_results(report, args.output, "load")
+    print(f"\n💾 Results saved to {path}")
+    return 0 if report["error_rate"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
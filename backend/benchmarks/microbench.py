@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Per-event-type microbenchmarks for the webhook ingest path.
+
+For every (event type, action) in WEBHOOK_EVENT_MAP this times:
+  - decode:  json.loads of the raw body
+  - parse:   parse_webhook_payload model construction
+  - store:   WebhookReceiverService.store_webhook_event (ensure_* + insert)
+  - handler: EventProcessingService.process_webhook_event for the stored row
+
+The database stages run against DATABASE_URL inside an outer transaction with
+join_transaction_mode="create_savepoint", so nothing is left behind. Payloads
+are also inflated (their longest list repeated) to cover larger size buckets.
+
+Examples:
+    python -m benchmarks.microbench --no-db
+    python -m benchmarks.microbench --save-baseline benchmarks/baseline.json
+    python -m benchmarks.microbench --baseline benchmarks/baseline.json --threshold 0.25
+"""
+
+import argparse
+import asyncio
+import copy
+import gc
+import json
+import logging
+import sys
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from benchmarks.common import encode_payload, load_fixtures, save_results, summarize
+
+from app.webhook_models.utils import WEBHOOK_EVENT_MAP, parse_webhook_payload
+
+# Upper bounds (bytes) of the payload size buckets
+SIZE_BUCKETS = ((4 * 1024, "<4KB"), (16 * 1024, "4-16KB"), (64 * 1024, "16-64KB"), (256 * 1024, "64-256KB"))
+LARGEST_BUCKET = ">=256KB"
+
+# Differences below this many microseconds are treated as noise
+NOISE_FLOOR_US = 5.0
+
+Case = Tuple[str, Optional[str], int, Dict[str, Any]]  # (event type, action, size factor, payload)
+
+
+def size_bucket(size: int) -> str:
+    for upper_bound, label in SIZE_BUCKETS:
+        if size < upper_bound:
+            return label
+    return LARGEST_BUCKET
+
+
+def inflate(payload: Dict[str, Any], factor: int) -> Optional[Dict[str, Any]]:
+    """Repeat the longest list in a payload `factor` times (None if it has no list)."""
+    if factor == 1:
+        return payload
+
+    longest: Optional[Tuple[Dict[str, Any], str]] = None
+    longest_length = 0
+
+    def visit(node: Any):
+        nonlocal longest, longest_length
+        if isinstance(node, dict):
+            for key, value in node.items():
+                if isinstance(value, list) and len(value) > longest_length:
+                    longest, longest_length = (node, key), len(value)
+                visit(value)
+        elif isinstance(node, list):
+            for item in node:
+                visit(item)
+
+    inflated = copy.deepcopy(payload)
+    visit(inflated)
+    if longest is None:
+        return None
+    parent, key = longest
+    parent[key] = parent[key] * factor
+    return inflated
+
+
+def build_cases(size_factors: List[int], event_types: Optional[List[str]]) -> Tuple[List[Case], List[str]]:
+    """
+    Build a payload for every WEBHOOK_EVENT_MAP entry and size factor.
+
+    Actions without a fixture reuse the event type's fixture with the action
+    substituted. Entries that still fail validation are reported as skipped.
+    """
+    fixtures_by_event: Dict[str, Dict[Optional[str], Dict[str, Any]]] = defaultdict(dict)
+    for fixture in load_fixtures():
+        fixtures_by_event[fixture.event_type].setdefault(fixture.action, fixture.payload)
+
+    cases: List[Case] = []
+    skipped: List[str] = []
+    for event_type, actions in WEBHOOK_EVENT_MAP.items():
+        if event_types and event_type not in event_types:
+            continue
+        templates = fixtures_by_event.get(event_type)
+        if not templates:
+            skipped.extend(f"{event_type}.{action}: no fixture" for action in actions)
+            continue
+
+        for action in actions:
+            payload = templates.get(action)
+            if payload is None:
+                payload = copy.deepcopy(next(iter(templates.values())))
+                if action is None:
+                    payload.pop("action", None)
+                else:
+                    payload["action"] = action
+            try:
+                parse_webhook_payload(payload, event_type, action)
+            except Exception as e:
+                skipped.append(f"{event_type}.{action}: {type(e).__name__}: {str(e).splitlines()[0]}")
+                continue
+
+            for factor in size_factors:
+                inflated = inflate(payload, factor)
+                if inflated is not None:
+                    cases.append((event_type, action, factor, inflated))
+    return cases, skipped
+
+
+def time_calls(function: Callable[[], Any], repeat: int) -> List[float]:
+    """Time `repeat` calls of a function, in microseconds, with GC paused."""
+    samples = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter_ns()
+            function()
+            samples.append((time.perf_counter_ns() - start) / 1000)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return samples
+
+
+async def time_database_stages(session, event_type: str, payload: Dict[str, Any], repeat: int) -> Dict[str, List[float]]:
+    """Time store_webhook_event and process_webhook_event for fresh deliveries."""
+    from app.services.event_processing_service import event_processing_service
+    from app.services.webhook_service import webhook_receiver_service
+
+    webhook_event = parse_webhook_payload(payload, event_type, payload.get("action"))
+    headers = {"x-github-event": event_type}
+    samples: Dict[str, List[float]] = {"store": [], "handler": []}
+
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        stored = await webhook_receiver_service.store_webhook_event(
+            session, webhook_event, payload, headers, f"microbench-{uuid.uuid4()}", event_type
+        )
+        samples["store"].append((time.perf_counter_ns() - start) / 1000)
+
+        start = time.perf_counter_ns()
+        await event_processing_service.process_webhook_event(session, stored)
+        samples["handler"].append((time.perf_counter_ns() - start) / 1000)
+    return samples
+
+
+class SavepointDatabase:
+    """A session inside an outer transaction that is rolled back at the end."""
+
+    def __init__(self, database_url: str):
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import Session
+
+        self.engine = create_engine(database_url)
+        self.connection = self.engine.connect()
+        self.transaction = self.connection.begin()
+        self.session = Session(bind=self.connection, join_transaction_mode="create_savepoint")
+
+    def close(self):
+        self.session.close()
+        self.transaction.rollback()
+        self.connection.close()
+        self.engine.dispose()
+
+
+async def run(args) -> Dict[str, Any]:
+    size_factors = [int(factor) for factor in args.size_factors.split(",")]
+    cases, skipped = build_cases(size_factors, args.events.split(",") if args.events else None)
+
+    database = None
+    if not args.no_db:
+        from app.core.config import get_settings
+        database_url = args.database_url or get_settings().DATABASE_URL
+        if not database_url:
+            raise SystemExit("DATABASE_URL is not configured - pass --database-url or --no-db")
+        database = SavepointDatabase(database_url)
+
+    results = []
+    try:
+        for event_type, action, factor, payload in cases:
+            body = encode_payload(payload)
+            decoded = json.loads(body)
+            stages = {
+                "decode": time_calls(lambda: json.loads(body), args.repeat),
+                "parse": time_calls(lambda: parse_webhook_payload(decoded, event_type, action), args.repeat),
+            }
+            if database is not None:
+                try:
+                    stages.update(await time_database_stages(database.session, event_type, decoded, args.db_repeat))
+                except Exception as e:
+                    skipped.append(f"{event_type}.{action}.x{factor} database stages: {type(e).__name__}: {e}")
+
+            results.append({
+                "key": f"{event_type}.{action}.x{factor}",
+                "event_type": event_type,
+                "action": action,
+                "size_factor": factor,
+                "size_bytes": len(body),
+                "size_bucket": size_bucket(len(body)),
+                "stages_us": {stage: summarize(samples) for stage, samples in stages.items()},
+            })
+    finally:
+        if database is not None:
+            database.close()
+
+    by_bucket: Dict[str, Dict[str, List[float]]] = defaultdict(lambda: defaultdict(list))
+    for result in results:
+        for stage, stats in result["stages_us"].items():
+            by_bucket[result["size_bucket"]][stage].append(stats["p50"])
+
+    return {
+        "tool": "microbench",
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "config": {
+            "repeat": args.repeat,
+            "db_repeat": None if args.no_db else args.db_repeat,
+            "size_factors": size_factors,
+        },
+        "results": results,
+        "by_size_bucket": {
+            bucket: {stage: summarize(medians) for stage, medians in stages.items()}
+            for bucket, stages in sorted(by_bucket.items())
+        },
+        "skipped": skipped,
+    }
+
+
+def compare_to_baseline(report: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    Find stages whose median regressed past the threshold.
+
+    Returns:
+        Human-readable regression descriptions (empty if none)
+    """
+    baseline_stages = {result["key"]: result["stages_us"] for result in baseline.get("results", [])}
+    regressions = []
+    for result in report["results"]:
+        previous = baseline_stages.get(result["key"])
+        if not previous:
+            continue
+        for stage, stats in result["stages_us"].items():
+            before = (previous.get(stage) or {}).get("p50")
+            after = stats["p50"]
+            if not before or after is None:
+                continue
+            if after > before * (1 + threshold) and after - before > NOISE_FLOOR_US:
+                regressions.append(
+                    f"{result['key']} {stage}: {before:.1f}us -> {after:.1f}us (+{(after / before - 1):.0%})"
+                )
+    return regressions
+
+
+def print_report(report: Dict[str, Any]):
+    print("\n⏱️  Microbenchmark Results (median µs)")
+    print("=" * 92)
+    print(f"  {'event.action':<52}{'bytes':>9}{'decode':>8}{'parse':>8}{'store':>8}{'handler':>9}")
+    for result in report["results"]:
+        stages = result["stages_us"]
+
+        def median(stage: str) -> str:
+            stats = stages.get(stage)
+            return f"{stats['p50']:.0f}" if stats and stats["p50"] is not None else "-"
+
+        print(
+            f"  {result['key']:<52}{result['size_bytes']:>9}{median('decode'):>8}"
+            f"{median('parse'):>8}{median('store'):>8}{median('handler'):>9}"
+        )
+
+    print("\n📦 By payload size bucket (median of per-entry medians, µs)")
+    for bucket, stages in report["by_size_bucket"].items():
+        summary = "  ".join(f"{stage} {stats['p50']:.0f}" for stage, stats in stages.items())
+        print(f"  {bucket:<10}{summary}")
+
+    if report["skipped"]:
+        print(f"\n⚠️  Skipped {len(report['skipped'])} entries:")
+        for reason in report["skipped"]:
+            print(f"  • {reason}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Per-event-type webhook ingest microbenchmarks")
+    parser.add_argument("--repeat", type=int, default=200, help="Iterations for decode/parse (default 200)")
+    parser.add_argument("--db-repeat", type=int, default=20, help="Iterations for store/handler (default 20)")
+    parser.add_argument("--size-factors", default="1,10,100", help="Longest-list multipliers (default 1,10,100)")
+    parser.add_argument("--events", help="Comma-separated event types (default: all of WEBHOOK_EVENT_MAP)")
+    parser.add_argument("--no-db", action="store_true", help="Only time decode and parse")
+    parser.add_argument("--database-url", help="Database for store/handler stages (default: DATABASE_URL)")
+    parser.add_argument("--baseline", help="Baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed median slowdown vs baseline (default 0.25)")
+    parser.add_argument("--save-baseline", help="Write this run's results as a baseline file")
+    parser.add_argument("--output", help="Results JSON path (default: benchmarks/results/microbench-<timestamp>.json)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    # Keep per-statement logging out of the timings
+    logging.disable(logging.INFO)
+
+    report = asyncio.run(run(args))
+    print_report(report)
+
+    path = save_results(report, args.output, "microbench")
+    print(f"\n💾 Results saved to {path}")
+    if args.save_baseline:
+        save_results(report, args.save_baseline, "baseline")
+        print(f"📌 Baseline written to {args.save_baseline}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = compare_to_baseline(report, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) past {args.threshold:.0%}:")
+            for regression in regressions:
+                print(f"  • {regression}")
+            return 1
+        print(f"\n✅ No regressions past {args.threshold:.0%} vs {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
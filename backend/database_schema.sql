@@ -2,6 +2,9 @@
 -- Designed based on webhook_models Pydantic models
 -- Optimized for Supabase PostgreSQL with performance and audit requirements
 
+-- GiST indexes mixing scalar and range columns (relationship history tables)
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+
 -- =============================================================================
 -- CORE ENTITY TABLES (Based on common models)
 -- =============================================================================
@@ -199,6 +202,25 @@ CREATE TABLE installations (
     CONSTRAINT install_repo_selection_check CHECK (repository_selection IN ('all', 'selected'))
 );
 
+-- Teams table (from common/issues.py Team)
+CREATE TABLE teams (
+    id SERIAL PRIMARY KEY,
+    github_id BIGINT UNIQUE NOT NULL,
+    organization_id INTEGER REFERENCES organizations(id),
+    node_id VARCHAR(255),
+    name VARCHAR(255) NOT NULL,
+    slug VARCHAR(255) NOT NULL,
+    description TEXT,
+    privacy VARCHAR(20),
+    permission VARCHAR(20),
+    parent_github_id BIGINT,
+    html_url TEXT,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    
+    CONSTRAINT team_github_id_check CHECK (github_id > 0)
+);
+
 -- =============================================================================
 -- AUDIT EVENT TABLES (Based on webhook events)
 -- =============================================================================
@@ -238,7 +260,7 @@ CREATE TABLE webhook_events (
     
     CONSTRAINT event_type_check CHECK (event_type IN (
         'member', 'repository', 'push', 'issues', 'pull_request', 
-        'team', 'fork', 'create', 'delete', 'issue_comment',
+        'team', 'membership', 'fork', 'create', 'delete', 'issue_comment',
         'pull_request_review', 'ping', 'installation', 'organization',
         'code_scanning_alert', 'dependabot_alert', 'secret_scanning_alert',
         'meta', 'personal_access_token_request'
@@ -330,6 +352,25 @@ CREATE TABLE code_events (
     CONSTRAINT code_ref_type_check CHECK (ref_type IN ('branch', 'tag') OR ref_type IS NULL)
 );
 
+-- Issue and pull request activity events (issues, comments, pull requests, reviews)
+CREATE TABLE collaboration_events (
+    id SERIAL PRIMARY KEY,
+    webhook_event_id INTEGER REFERENCES webhook_events(id),
+    repository_id INTEGER REFERENCES repositories(id),
+    event_type VARCHAR(100) NOT NULL,
+    action VARCHAR(100) NOT NULL,
+    number INTEGER, -- issue/pull request number
+    state VARCHAR(50), -- issue/pull request state, or review state for reviews
+    author_id INTEGER REFERENCES users(id),
+    merged BOOLEAN, -- pull requests only
+    event_timestamp TIMESTAMP WITH TIME ZONE NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    
+    CONSTRAINT collaboration_event_type_check CHECK (event_type IN (
+        'issues', 'issue_comment', 'pull_request', 'pull_request_review'
+    ))
+);
+
 -- =============================================================================
 -- RELATIONSHIP TABLES
 -- =============================================================================
@@ -362,6 +403,104 @@ CREATE TABLE repository_collaborators (
     CONSTRAINT collaborator_permission_check CHECK (permission IN ('read', 'write', 'admin', 'maintain', 'triage'))
 );
 
+-- Team members
+CREATE TABLE team_memberships (
+    id SERIAL PRIMARY KEY,
+    team_id INTEGER NOT NULL REFERENCES teams(id),
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    
+    UNIQUE(team_id, user_id)
+);
+
+-- Repositories a team has access to
+CREATE TABLE team_repositories (
+    id SERIAL PRIMARY KEY,
+    team_id INTEGER NOT NULL REFERENCES teams(id),
+    repository_id INTEGER NOT NULL REFERENCES repositories(id),
+    permission VARCHAR(50) NOT NULL DEFAULT 'read',
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    
+    UNIQUE(team_id, repository_id),
+    CONSTRAINT team_repository_permission_check CHECK (permission IN ('read', 'write', 'admin', 'maintain', 'triage'))
+);
+
+-- Highest permission per (user, repository) from collaborators, teams and org admins,
+-- maintained incrementally by event processing
+CREATE TABLE effective_permissions (
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    repository_id INTEGER NOT NULL REFERENCES repositories(id),
+    permission VARCHAR(50) NOT NULL,
+    via_collaborator BOOLEAN NOT NULL DEFAULT FALSE,
+    via_team BOOLEAN NOT NULL DEFAULT FALSE,
+    via_organization BOOLEAN NOT NULL DEFAULT FALSE,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    
+    CONSTRAINT effective_permissions_pkey PRIMARY KEY (user_id, repository_id),
+    CONSTRAINT effective_permission_check CHECK (permission IN ('read', 'write', 'admin', 'maintain', 'triage'))
+);
+
+-- Organization membership history: one row per period a user held a role,
+-- valid_to is NULL while the membership is current
+CREATE TABLE organization_membership_history (
+    id SERIAL PRIMARY KEY,
+    organization_id INTEGER NOT NULL REFERENCES organizations(id),
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    role VARCHAR(50) NOT NULL,
+    valid_from TIMESTAMP WITH TIME ZONE NOT NULL,
+    valid_to TIMESTAMP WITH TIME ZONE,
+    valid_during TSTZRANGE GENERATED ALWAYS AS (tstzrange(valid_from, valid_to, '[)')) STORED,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    
+    CONSTRAINT membership_history_role_check CHECK (role IN ('member', 'admin', 'billing_manager')),
+    CONSTRAINT membership_history_no_overlap EXCLUDE USING gist (
+        organization_id WITH =, user_id WITH =, valid_during WITH &&
+    )
+);
+
+-- Repository collaborator history: one row per period a user held a permission
+CREATE TABLE repository_collaborator_history (
+    id SERIAL PRIMARY KEY,
+    repository_id INTEGER NOT NULL REFERENCES repositories(id),
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    permission VARCHAR(50) NOT NULL,
+    valid_from TIMESTAMP WITH TIME ZONE NOT NULL,
+    valid_to TIMESTAMP WITH TIME ZONE,
+    valid_during TSTZRANGE GENERATED ALWAYS AS (tstzrange(valid_from, valid_to, '[)')) STORED,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    
+    CONSTRAINT collaborator_history_permission_check CHECK (permission IN ('read', 'write', 'admin', 'maintain', 'triage')),
+    CONSTRAINT collaborator_history_no_overlap EXCLUDE USING gist (
+        repository_id WITH =, user_id WITH =, valid_during WITH &&
+    )
+);
+
+-- =============================================================================
+-- SYSTEM TABLES
+-- =============================================================================
+
+-- Highest source row id each derived-data job has applied (e.g. relationship rebuilds)
+CREATE TABLE processing_watermarks (
+    id SERIAL PRIMARY KEY,
+    name VARCHAR(100) NOT NULL UNIQUE,
+    last_event_id BIGINT NOT NULL DEFAULT 0,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Checkpointed leaderboard sketches (Space-Saving and HyperLogLog) per worker, scope and UTC day
+CREATE TABLE analytics_sketches (
+    id SERIAL PRIMARY KEY,
+    worker_id VARCHAR(100) NOT NULL,
+    scope VARCHAR(100) NOT NULL,
+    day DATE NOT NULL,
+    events BIGINT NOT NULL DEFAULT 0,
+    state TEXT NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    CONSTRAINT unique_analytics_sketch UNIQUE (worker_id, scope, day)
+);
+
 -- =============================================================================
 -- PERFORMANCE INDEXES
 -- =============================================================================
@@ -371,6 +510,8 @@ CREATE INDEX idx_webhook_events_timestamp ON webhook_events(event_timestamp DESC
 CREATE INDEX idx_webhook_events_type_timestamp ON webhook_events(event_type, event_timestamp DESC);
 CREATE INDEX idx_webhook_events_repo_timestamp ON webhook_events(repository_id, event_timestamp DESC) WHERE repository_id IS NOT NULL;
 CREATE INDEX idx_webhook_events_org_timestamp ON webhook_events(organization_id, event_timestamp DESC) WHERE organization_id IS NOT NULL;
+-- Per-organization watermark (max id) for audit ETags
+CREATE INDEX idx_webhook_events_org_id ON webhook_events(organization_id, id) WHERE organization_id IS NOT NULL;
 CREATE INDEX idx_webhook_events_sender ON webhook_events(sender_id) WHERE sender_id IS NOT NULL;
 CREATE INDEX idx_webhook_events_processed ON webhook_events(processed, received_at) WHERE NOT processed;
 CREATE INDEX idx_webhook_events_delivery ON webhook_events(delivery_id);
@@ -385,12 +526,31 @@ CREATE INDEX idx_users_login ON users(login);
 CREATE INDEX idx_repositories_full_name ON repositories(full_name);
 CREATE INDEX idx_repositories_owner ON repositories(owner_id);
 CREATE INDEX idx_repositories_org ON repositories(organization_id);
+CREATE INDEX idx_teams_organization ON teams(organization_id);
 
 -- Event-specific indexes
 CREATE INDEX idx_repository_events_timestamp ON repository_events(event_timestamp DESC);
 CREATE INDEX idx_member_events_timestamp ON member_events(event_timestamp DESC);
 CREATE INDEX idx_security_events_timestamp ON security_events(event_timestamp DESC);
 CREATE INDEX idx_code_events_timestamp ON code_events(event_timestamp DESC);
+CREATE INDEX idx_collaboration_events_timestamp ON collaboration_events(event_timestamp DESC);
+CREATE INDEX idx_collaboration_events_repo_number ON collaboration_events(repository_id, number);
+
+-- Team and effective access indexes (the primary key serves "repositories of user U";
+-- the user indexes serve the per-user effective permission refresh)
+CREATE INDEX idx_org_memberships_user ON organization_memberships(user_id);
+CREATE INDEX idx_repo_collaborators_user ON repository_collaborators(user_id);
+CREATE INDEX idx_team_memberships_user ON team_memberships(user_id);
+CREATE INDEX idx_team_repositories_repository ON team_repositories(repository_id);
+CREATE INDEX idx_effective_permissions_repository ON effective_permissions(repository_id, permission, user_id);
+
+-- Leaderboard sketch checkpoints are read per scope over a range of days
+CREATE INDEX idx_analytics_sketches_scope_day ON analytics_sketches(scope, day);
+
+-- Relationship history indexes (the no-overlap constraints already index
+-- (scope, user_id, valid_during) for "who had access to X at T")
+CREATE INDEX idx_membership_history_user_period ON organization_membership_history USING gist (user_id, valid_during);
+CREATE INDEX idx_collaborator_history_user_period ON repository_collaborator_history USING gist (user_id, valid_during);
 
 -- =============================================================================
 -- ROW LEVEL SECURITY (RLS) POLICIES
@@ -406,6 +566,7 @@ ALTER TABLE repository_events ENABLE ROW LEVEL SECURITY;
 ALTER TABLE member_events ENABLE ROW LEVEL SECURITY;
 ALTER TABLE security_events ENABLE ROW LEVEL SECURITY;
 ALTER TABLE code_events ENABLE ROW LEVEL SECURITY;
+ALTER TABLE collaboration_events ENABLE ROW LEVEL SECURITY;
 
 -- Basic RLS policies (will be refined based on auth requirements)
 CREATE POLICY "Users can read all data" ON webhook_events FOR SELECT TO authenticated USING (true);
@@ -430,6 +591,8 @@ CREATE TRIGGER tr_users_updated_at BEFORE UPDATE ON users FOR EACH ROW EXECUTE F
 CREATE TRIGGER tr_repositories_updated_at BEFORE UPDATE ON repositories FOR EACH ROW EXECUTE FUNCTION update_updated_at();
 CREATE TRIGGER tr_memberships_updated_at BEFORE UPDATE ON organization_memberships FOR EACH ROW EXECUTE FUNCTION update_updated_at();
 CREATE TRIGGER tr_collaborators_updated_at BEFORE UPDATE ON repository_collaborators FOR EACH ROW EXECUTE FUNCTION update_updated_at();
+CREATE TRIGGER tr_teams_updated_at BEFORE UPDATE ON teams FOR EACH ROW EXECUTE FUNCTION update_updated_at();
+CREATE TRIGGER tr_team_repositories_updated_at BEFORE UPDATE ON team_repositories FOR EACH ROW EXECUTE FUNCTION update_updated_at();
 
 -- Function to extract and update computed fields from webhook payload
 CREATE OR REPLACE FUNCTION update_webhook_computed_fields()
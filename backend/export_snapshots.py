@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Script to export webhook events into partitioned Parquet snapshots for offline analytics.
+
+Events past the "parquet_snapshots" watermark are flattened together with their specialized
+event columns (member, repository, security and code events) and written to
+<dir>/event_date=YYYY-MM-DD/event_type=<type>/part-<first id>.parquet. Events still waiting
+for processing hold the export back, so their specialized columns are never missed.
+The snapshots can be queried with DuckDB through POST /api/v1/analytics/query.
+
+Run it from cron, or with --interval to keep exporting on a schedule.
+
+Usage:
+    python export_snapshots.py
+    python export_snapshots.py --dir /data/snapshots --interval 300
+"""
+
+import sys
+import argparse
+import logging
+import time
+from pathlib import Path
+
+# Add backend to path
+backend_path = Path(__file__).parent
+sys.path.insert(0, str(backend_path))
+
+from app.core.config import get_settings
+from app.core.database import get_database
+from app.services.snapshot_service import snapshot_service
+
+
+def export_snapshots(args):
+    """Export the events past the snapshot watermark once."""
+    db_gen = get_database()
+    db = next(db_gen)
+
+    try:
+        started = time.perf_counter()
+        print(f"🧊 Exporting Parquet snapshots to {args.dir}")
+
+        def progress(exported: int, last_event_id: int):
+            elapsed = time.perf_counter() - started
+            print(f"  {exported} events exported (watermark {last_event_id}) - {exported / elapsed:,.0f} events/s", end="\r")
+
+        result = snapshot_service.export_incremental(db, args.dir, batch_size=args.batch_size, progress=progress)
+
+        print(f"\n  📦 Events exported: {result['exported']}")
+        print(f"  🗂️  Files written: {result['files']}")
+        print(f"  📍 Watermark: {result['watermark']}")
+        print(f"  ⏱️  Elapsed: {time.perf_counter() - started:.1f}s")
+
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Error during snapshot export: {e}")
+        import traceback
+        traceback.print_exc()
+    finally:
+        db.close()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Export webhook events to partitioned Parquet snapshots")
+    parser.add_argument("--dir", default=get_settings().SNAPSHOT_DIR, help="Snapshot directory (default SNAPSHOT_DIR)")
+    parser.add_argument("--batch-size", type=int, default=50_000, help="Events per batch and file (default 50000)")
+    parser.add_argument("--interval", type=int, default=0,
+                        help="Keep running, exporting every N seconds (default: export once)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    logging.disable(logging.INFO)
+    export_snapshots(args)
+    while args.interval:
+        time.sleep(args.interval)
+        export_snapshots(args)
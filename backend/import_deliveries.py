@@ -0,0 +1,534 @@
+#!/usr/bin/env python3
+"""
+Script to bulk import historical GitHub webhook deliveries from NDJSON archives.
+
+Each line of an archive is one delivery record, {"headers": {...}, "body": "..."}, the
+format the webhook spool writes (body may also be an already decoded JSON object).
+Plain and gzipped files are both accepted; "-" reads standard input.
+
+Records are read and parsed in batches, so memory stays flat whatever the archive size:
+  - optionally verify X-Hub-Signature-256 against the configured webhook secrets
+  - drop deliveries repeated within the batch; deliveries already stored are skipped
+    with ON CONFLICT (delivery_id) DO NOTHING, so re-running an import is safe
+  - upsert the batch's organizations, users, repositories and installations with one
+    INSERT ... ON CONFLICT (github_id) DO UPDATE per table
+  - COPY the events into a temporary staging table and move them into webhook_events
+    in a single INSERT ... SELECT (PostgreSQL; other databases use multi-row INSERTs)
+
+Imported events are stored unprocessed; afterwards the backlog is drained the same way
+as reprocess_events.py does (skip with --no-process and run it later).
+
+Usage:
+    python import_deliveries.py archive/2024-*.ndjson.gz
+    python import_deliveries.py --verify-signatures --rejects rejected.ndjson deliveries.ndjson
+    zcat deliveries.ndjson.gz | python import_deliveries.py --workers 4 --no-process -
+"""
+
+import sys
+import asyncio
+import argparse
+import gzip
+import io
+import json
+import logging
+import multiprocessing
+import time
+from collections import Counter, deque
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+# Add backend to path
+backend_path = Path(__file__).parent
+sys.path.insert(0, str(backend_path))
+
+from sqlalchemy import inspect as sqlalchemy_inspect, func
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app.core.cache import response_cache
+from app.core.database import create_database_engine
+from app.models.core import Installation, Organization, Repository, User, WebhookEvent
+from app.services.entity_service import entity_service
+from app.services.signature_service import signature_service, verify_signature
+from app.webhook_models.common.installation import Installation as WebhookInstallation
+from app.webhook_models.common.organization import Organization as WebhookOrganization
+from app.webhook_models.common.repository import Repository as WebhookRepository
+from app.webhook_models.common.user import User as WebhookUser
+
+# Event types accepted by the webhook_events event_type_check constraint
+ACCEPTED_EVENT_TYPES = frozenset((
+    "member", "repository", "push", "issues", "pull_request",
+    "team", "membership", "fork", "create", "delete", "issue_comment",
+    "pull_request_review", "ping", "installation", "organization",
+    "code_scanning_alert", "dependabot_alert", "secret_scanning_alert",
+    "meta", "personal_access_token_request",
+))
+
+# Record keys holding the original receive time, in order of preference
+TIMESTAMP_KEYS = ("received_at", "delivered_at", "spooled_at", "timestamp")
+
+EVENT_COLUMNS = (
+    "delivery_id", "event_type", "event_action", "organization_id", "repository_id",
+    "sender_id", "installation_id", "event_timestamp", "received_at", "payload", "headers",
+)
+
+STAGING_TABLE = "import_webhook_events"
+
+NULL = "\\N"
+
+
+def copy_text(value: Optional[str]) -> str:
+    """Escape a string for COPY ... FROM STDIN text format."""
+    if value is None:
+        return NULL
+    return (
+        value.replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def _parse_timestamp(value: Any) -> Optional[datetime]:
+    if not isinstance(value, str):
+        return None
+    try:
+        parsed = datetime.fromisoformat(value[:-1] + "+00:00" if value.endswith("Z") else value)
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+# ----------------------------------------------------------------------
+# Reading and parsing (runs in the worker processes with --workers > 1)
+# ----------------------------------------------------------------------
+
+def read_batches(paths: Sequence[str], batch_size: int) -> Iterator[List[bytes]]:
+    """Yield raw archive lines in batches of batch_size, one file after another."""
+    batch: List[bytes] = []
+    for path in paths:
+        raw = sys.stdin.buffer if path == "-" else open(path, "rb")
+        try:
+            stream = raw if path == "-" else io.BufferedReader(raw)
+            if stream.peek(2)[:2] == b"\x1f\x8b":
+                stream = gzip.GzipFile(fileobj=stream)
+            for line in stream:
+                if not line.strip():
+                    continue
+                batch.append(line)
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+        finally:
+            if path != "-":
+                raw.close()
+    if batch:
+        yield batch
+
+
+def prepare_batch(lines: List[bytes], verify_signatures: bool) -> Dict[str, Any]:
+    """
+    Parse a batch of archive lines into event rows and the entities they reference.
+
+    Returns:
+        {"events": [...], "entities": {kind: {github_id: fragment}}, "counts": Counter,
+         "rejected": [raw lines]}
+    """
+    counts = Counter()
+    rejected: List[bytes] = []
+    events: List[Dict[str, Any]] = []
+    entities: Dict[str, Dict[int, Dict[str, Any]]] = {
+        "organizations": {}, "users": {}, "repositories": {}, "installations": {},
+        # Organization GitHub ID by repository GitHub ID
+        "repository_organizations": {},
+    }
+    seen_deliveries = set()
+
+    def reject(reason: str, line: bytes):
+        counts[reason] += 1
+        rejected.append(line)
+
+    for line in lines:
+        try:
+            record = json.loads(line)
+            headers = {str(key).lower(): value for key, value in (record.get("headers") or {}).items()}
+            body = record.get("body", record.get("payload"))
+            if isinstance(body, str):
+                body_text = body
+                payload = json.loads(body_text)
+            else:
+                payload = body
+                body_text = json.dumps(payload, separators=(",", ":"))
+        except (ValueError, AttributeError, TypeError):
+            reject("invalid", line)
+            continue
+        if not isinstance(payload, dict) or "\\u0000" in body_text:
+            # jsonb cannot store NUL characters
+            reject("invalid", line)
+            continue
+
+        event_type = headers.get("x-github-event")
+        if event_type not in ACCEPTED_EVENT_TYPES:
+            reject("unsupported", line)
+            continue
+
+        if verify_signatures:
+            # Only the original body bytes can be verified; re-encoded objects cannot
+            signature = headers.get("x-hub-signature-256")
+            secrets = signature_service.candidate_secrets(headers)
+            if not isinstance(body, str) or not verify_signature(body_text.encode("utf-8"), signature, secrets):
+                reject("bad_signature", line)
+                continue
+
+        delivery_id = headers.get("x-github-delivery")
+        if delivery_id:
+            if delivery_id in seen_deliveries:
+                counts["duplicates"] += 1
+                continue
+            seen_deliveries.add(delivery_id)
+
+        references = {}
+        for kind, key in (("organizations", "organization"), ("users", "sender"),
+                          ("repositories", "repository"), ("installations", "installation")):
+            fragment = payload.get(key)
+            if isinstance(fragment, dict) and isinstance(fragment.get("id"), int):
+                # Later deliveries win, as they would when received one by one
+                entities[kind][fragment["id"]] = fragment
+                references[kind] = fragment["id"]
+        if "repositories" in references and "organizations" in references:
+            entities["repository_organizations"][references["repositories"]] = references["organizations"]
+        owner = (payload.get("repository") or {}).get("owner") if isinstance(payload.get("repository"), dict) else None
+        if isinstance(owner, dict) and isinstance(owner.get("id"), int):
+            entities["users"].setdefault(owner["id"], owner)
+
+        received_at = next(
+            (parsed for parsed in (_parse_timestamp(record.get(key)) for key in TIMESTAMP_KEYS) if parsed), None
+        )
+        events.append({
+            "delivery_id": delivery_id,
+            "event_type": event_type,
+            "event_action": payload.get("action") if isinstance(payload.get("action"), str) else None,
+            "references": references,
+            "received_at": received_at,
+            "payload": body_text,
+            "headers": json.dumps(headers, separators=(",", ":")),
+        })
+
+    counts["parsed"] = len(events)
+    return {"events": events, "entities": entities, "counts": counts, "rejected": rejected}
+
+
+# ----------------------------------------------------------------------
+# Writing
+# ----------------------------------------------------------------------
+
+ENTITY_MODELS = {
+    "users": (User, WebhookUser, entity_service._create_user_from_webhook),
+    "organizations": (Organization, WebhookOrganization, entity_service._create_organization_from_webhook),
+    "repositories": (Repository, WebhookRepository, entity_service._create_repository_from_webhook),
+    "installations": (Installation, WebhookInstallation, entity_service._create_installation_from_webhook),
+}
+
+# Columns refreshed on an existing row, the same ones EntityService._update_*_from_webhook sets
+ENTITY_UPDATE_COLUMNS = {
+    "users": ("login", "node_id", "avatar_url", "gravatar_id", "url", "html_url", "type", "site_admin",
+              "name", "email"),
+    "organizations": ("login", "description", "avatar_url"),
+    "repositories": ("name", "full_name", "private", "description", "fork", "archived", "disabled"),
+    "installations": ("permissions", "events"),
+}
+
+
+def dialect_insert(connection, table):
+    """INSERT statement with ON CONFLICT support for the connection's dialect."""
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        return postgresql_insert(table)
+    if dialect == "sqlite":
+        return sqlite_insert(table)
+    raise RuntimeError(f"Delivery import does not support the {dialect} dialect")
+
+
+def entity_rows(kind: str, fragments: Dict[int, Dict[str, Any]], counts: Counter) -> List[Dict[str, Any]]:
+    """Build column values for entity fragments the same way EntityService creates rows."""
+    model, webhook_model, create = ENTITY_MODELS[kind]
+    rows = []
+    for fragment in fragments.values():
+        try:
+            instance = create(webhook_model.parse_obj(fragment))
+        except Exception:
+            # The events are still imported, just without this reference
+            counts[f"invalid_{kind}"] += 1
+            continue
+        assigned = sqlalchemy_inspect(instance).dict
+        values = {column.key: assigned[column.key] for column in model.__table__.columns if column.key in assigned}
+        if kind == "repositories":
+            values.setdefault("owner_id", None)
+        rows.append(values)
+    return rows
+
+
+def upsert_entities(connection, kind: str, rows: List[Dict[str, Any]]) -> Dict[int, int]:
+    """
+    Insert or refresh a batch of entities in one statement.
+
+    Returns:
+        Database ID by GitHub ID
+    """
+    if not rows:
+        return {}
+    model = ENTITY_MODELS[kind][0]
+    statement = dialect_insert(connection, model.__table__).values(rows)
+    update_columns = {column: statement.excluded[column] for column in ENTITY_UPDATE_COLUMNS[kind]}
+    # ORM onupdate does not fire for ON CONFLICT DO UPDATE
+    update_columns["updated_at"] = func.now()
+    if kind == "repositories":
+        # A delivery without an organization does not unlink the repository from it
+        update_columns["organization_id"] = func.coalesce(
+            statement.excluded.organization_id, model.__table__.c.organization_id
+        )
+    statement = statement.on_conflict_do_update(index_elements=["github_id"], set_=update_columns)
+    statement = statement.returning(model.__table__.c.github_id, model.__table__.c.id)
+    return {github_id: entity_id for github_id, entity_id in connection.execute(statement)}
+
+
+def event_values(event: Dict[str, Any], ids: Dict[str, Dict[int, int]], now: datetime) -> Dict[str, Any]:
+    references = event["references"]
+
+    def resolve(kind: str) -> Optional[int]:
+        github_id = references.get(kind)
+        return ids[kind].get(github_id) if github_id is not None else None
+
+    received_at = event["received_at"] or now
+    return {
+        "delivery_id": event["delivery_id"],
+        "event_type": event["event_type"],
+        "event_action": event["event_action"],
+        "organization_id": resolve("organizations"),
+        "repository_id": resolve("repositories"),
+        "sender_id": resolve("users"),
+        "installation_id": resolve("installations"),
+        "event_timestamp": received_at,
+        "received_at": received_at,
+        "payload": event["payload"],
+        "headers": event["headers"],
+    }
+
+
+def copy_events(connection, rows: List[Dict[str, Any]]) -> int:
+    """
+    COPY event rows into the staging table and move the new deliveries into webhook_events.
+
+    Returns:
+        Number of events inserted (deliveries already stored are skipped)
+    """
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write("\t".join(
+            NULL if row[column] is None
+            else row[column].isoformat() if isinstance(row[column], datetime)
+            else copy_text(str(row[column]))
+            for column in EVENT_COLUMNS
+        ) + "\n")
+    buffer.seek(0)
+
+    columns = ", ".join(EVENT_COLUMNS)
+    connection.exec_driver_sql(f"TRUNCATE {STAGING_TABLE}")
+    cursor = connection.connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {STAGING_TABLE} ({columns}) FROM STDIN", buffer)
+    finally:
+        cursor.close()
+    # ORDER BY keeps webhook_events ids in archive order
+    result = connection.exec_driver_sql(
+        f"INSERT INTO webhook_events ({columns}) SELECT {columns} FROM {STAGING_TABLE} "
+        f"ORDER BY line ON CONFLICT (delivery_id) DO NOTHING"
+    )
+    return result.rowcount
+
+
+def insert_events(connection, rows: List[Dict[str, Any]]) -> int:
+    """Multi-row INSERT fallback for databases without COPY."""
+    for row in rows:
+        row["payload"] = json.loads(row["payload"])
+        row["headers"] = json.loads(row["headers"])
+    statement = dialect_insert(connection, WebhookEvent.__table__).values(rows)
+    statement = statement.on_conflict_do_nothing(index_elements=["delivery_id"])
+    return len(connection.execute(statement.returning(WebhookEvent.__table__.c.id)).all())
+
+
+def create_staging_table(connection):
+    """Session-local staging table with the event columns and an archive order column."""
+    connection.exec_driver_sql(
+        f"CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} AS "
+        f"SELECT {', '.join(EVENT_COLUMNS)} FROM webhook_events WITH NO DATA"
+    )
+    connection.exec_driver_sql(
+        f"ALTER TABLE {STAGING_TABLE} ADD COLUMN IF NOT EXISTS line BIGSERIAL"
+    )
+
+
+def write_batch(connection, prepared: Dict[str, Any]) -> int:
+    """
+    Upsert a prepared batch's entities and insert its events in one transaction.
+
+    Returns:
+        Number of events inserted
+    """
+    counts = prepared["counts"]
+    entities = prepared["entities"]
+
+    with connection.begin():
+        ids: Dict[str, Dict[int, int]] = {}
+        ids["users"] = upsert_entities(connection, "users", entity_rows("users", entities["users"], counts))
+        ids["organizations"] = upsert_entities(
+            connection, "organizations", entity_rows("organizations", entities["organizations"], counts)
+        )
+        repositories = entity_rows("repositories", entities["repositories"], counts)
+        for row in repositories:
+            owner = entities["repositories"][row["github_id"]].get("owner") or {}
+            row["owner_id"] = ids["users"].get(owner.get("id"))
+            row["organization_id"] = ids["organizations"].get(
+                entities["repository_organizations"].get(row["github_id"])
+            )
+        ids["repositories"] = upsert_entities(connection, "repositories", repositories)
+        ids["installations"] = upsert_entities(
+            connection, "installations", entity_rows("installations", entities["installations"], counts)
+        )
+
+        if not prepared["events"]:
+            return 0
+        now = datetime.now(timezone.utc)
+        rows = [event_values(event, ids, now) for event in prepared["events"]]
+        if connection.dialect.name == "postgresql":
+            return copy_events(connection, rows)
+        return insert_events(connection, rows)
+
+
+def prepared_batches(args) -> Iterator[Dict[str, Any]]:
+    """
+    Parse batches in order, in a process pool when --workers > 1.
+
+    At most two batches per worker are in flight, so a slow database does not
+    let parsed batches pile up in memory.
+    """
+    batches = read_batches(args.paths, args.batch_size)
+    if args.workers == 1:
+        for lines in batches:
+            yield prepare_batch(lines, args.verify_signatures)
+        return
+
+    with multiprocessing.get_context("spawn").Pool(args.workers) as pool:
+        pending = deque()
+        for lines in batches:
+            pending.append(pool.apply_async(prepare_batch, (lines, args.verify_signatures)))
+            if len(pending) >= args.workers * 2:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+
+
+async def import_deliveries(args):
+    """Import delivery archives into webhook_events and process them."""
+    engine = create_database_engine()
+    if engine is None:
+        print("❌ DATABASE_URL is not configured")
+        return
+
+    if args.verify_signatures and not signature_service.validation_enabled:
+        print("❌ --verify-signatures needs GITHUB_WEBHOOK_SECRET or GITHUB_WEBHOOK_SECRETS")
+        return
+
+    # Per-entity logging would drown the progress output
+    logging.disable(logging.INFO)
+
+    print("📥 Importing Webhook Deliveries")
+    print("=" * 40)
+    print(f"  📂 {len(args.paths)} archive(s), batches of {args.batch_size}, {args.workers} parser(s)")
+
+    totals = Counter()
+    rejects = open(args.rejects, "wb") if args.rejects else None
+    started = time.perf_counter()
+    try:
+        with engine.connect() as connection:
+            if connection.dialect.name == "postgresql":
+                with connection.begin():
+                    create_staging_table(connection)
+
+            for prepared in prepared_batches(args):
+                totals.update(prepared["counts"])
+                totals["inserted"] += write_batch(connection, prepared)
+                # Shared with the API when it uses Redis; a no-op for its in-process cache
+                response_cache.invalidate_all()
+                if rejects:
+                    rejects.writelines(prepared["rejected"])
+
+                elapsed = time.perf_counter() - started
+                read = totals["parsed"] + totals["invalid"] + totals["unsupported"] + totals["bad_signature"]
+                read += totals["duplicates"]
+                print(
+                    f"  ⏱️  {read:,} read - {totals['inserted']:,} imported - "
+                    f"{read / elapsed:,.0f} deliveries/s    ",
+                    end="\r",
+                    flush=True
+                )
+    except Exception as e:
+        print(f"\n❌ Error during import: {e} - rerun to continue (stored deliveries are skipped)")
+        import traceback
+        traceback.print_exc()
+        return
+    finally:
+        if rejects:
+            rejects.close()
+        engine.dispose()
+
+    elapsed = time.perf_counter() - started
+    already_stored = totals["parsed"] - totals["inserted"]
+    print(f"\n\n📈 Import Results:")
+    print("-" * 20)
+    print(f"  ✅ Imported: {totals['inserted']}")
+    print(f"  🔁 Duplicates skipped: {totals['duplicates'] + already_stored}")
+    print(f"  ⚠️  Invalid records: {totals['invalid']}")
+    print(f"  🚫 Unsupported event types: {totals['unsupported']}")
+    if args.verify_signatures:
+        print(f"  🔐 Bad signatures: {totals['bad_signature']}")
+    invalid_entities = {kind: count for kind, count in totals.items() if kind.startswith("invalid_")}
+    if invalid_entities:
+        print(f"  🧩 Unparseable entities (left unlinked): {invalid_entities}")
+    if rejects:
+        print(f"  📝 Rejected records written to {args.rejects}")
+    print(f"  ⏱️  Elapsed: {elapsed:.1f}s ({totals['inserted'] / elapsed if elapsed else 0:,.0f} events/s)")
+
+    if args.no_process:
+        print("\n💡 Run reprocess_events.py to process the imported events")
+        return
+
+    from reprocess_events import parse_args as parse_reprocess_args, reprocess_webhook_events
+
+    print()
+    await reprocess_webhook_events(parse_reprocess_args([
+        "--workers", str(args.process_workers), "--chunk-size", str(args.chunk_size), "--reset",
+    ]))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk import GitHub webhook deliveries from NDJSON archives")
+    parser.add_argument("paths", nargs="+", help="NDJSON archives, optionally gzipped (- for stdin)")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Deliveries per batch and transaction (default 5000)")
+    parser.add_argument("--workers", type=int, default=1, help="Processes parsing the archives (default 1)")
+    parser.add_argument("--verify-signatures", action="store_true",
+                        help="Reject deliveries whose X-Hub-Signature-256 does not match a configured secret")
+    parser.add_argument("--rejects", help="Write rejected archive lines to this file")
+    parser.add_argument("--no-process", action="store_true", help="Only store the events, do not process them")
+    parser.add_argument("--process-workers", type=int, default=1,
+                        help="Worker processes for the processing step (default 1)")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Events per chunk in the processing step (default 500)")
+    args = parser.parse_args(argv)
+    if args.batch_size < 1 or args.workers < 1 or args.process_workers < 1 or args.chunk_size < 1:
+        parser.error("--batch-size, --workers, --process-workers and --chunk-size must be at least 1")
+    return args
+
+
+if __name__ == "__main__":
+    asyncio.run(import_deliveries(parse_args()))
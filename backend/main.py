@@ -6,9 +6,11 @@ Includes real-time capabilities, audit trail, and analytics.
 """
 
 from fastapi import FastAPI, Request, HTTPException, Depends, BackgroundTasks
+from fastapi.responses import Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.security import HTTPBearer
+from sqlalchemy.orm import Session
 import uvicorn
 import os
 from pathlib import Path
@@ -17,12 +19,20 @@ from pathlib import Path
 import sys
 sys.path.append(str(Path(__file__).parent.parent))
 
+from app.core.cache import GLOBAL_SCOPE, organization_scope, response_cache
 from app.core.config import get_settings
 from app.core.database import get_database
+from app.core.metrics import CONTENT_TYPE_LATEST, registry
 from app.core.logging_config import setup_logging
 from app.api import api_router
 from app.middleware.logging import LoggingMiddleware
 from app.middleware.timing import TimingMiddleware
+from app.middleware.profiling import ProfilingMiddleware
+from app.services.event_bus import event_bus
+from app.services.event_processing_service import event_processing_service
+from app.services.leaderboard_service import leaderboard_service
+from app.services.payload_executor import payload_executor
+from app.services.realtime_hub import realtime_hub
 
 # Get settings
 settings = get_settings()
@@ -66,9 +76,47 @@ app.add_middleware(
 app.add_middleware(TimingMiddleware)
 app.add_middleware(LoggingMiddleware)
 
+# Sampling profiler (opt-in; not installed at all when disabled)
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+    logger.info(f"📈 Request profiling enabled for {settings.PROFILING_SAMPLE_RATE:.2%} of {settings.PROFILING_PATHS}")
+
 # Add API routes
 app.include_router(api_router, prefix="/api/v1")
 
+def invalidate_cached_responses(events):
+    """Drop this worker's cached responses for events stored by other workers."""
+    response_cache.invalidate({GLOBAL_SCOPE} | {organization_scope(event["organization_id"]) for event in events})
+
+@app.on_event("startup")
+def start_event_bus():
+    """Fan stored events out to every worker's real-time hub (and in-process caches)."""
+    event_bus.subscribe(realtime_hub.publish_many)
+    if not response_cache.shared:
+        event_bus.subscribe(invalidate_cached_responses, include_local=False)
+    event_bus.start()
+
+@app.on_event("shutdown")
+def stop_event_bus():
+    event_bus.stop()
+
+@app.on_event("shutdown")
+async def shutdown_executors():
+    """Release worker pools used for payload decoding."""
+    payload_executor.shutdown()
+
+@app.on_event("shutdown")
+def checkpoint_sketches():
+    """Save the leaderboard sketches changed since the last checkpoint."""
+    db_gen = get_database()
+    db = next(db_gen)
+    try:
+        leaderboard_service.checkpoint(db)
+    except Exception as e:
+        logger.warning(f"⚠️ Failed to checkpoint leaderboard sketches on shutdown: {e}")
+    finally:
+        db.close()
+
 # Health check endpoint
 @app.get("/health")
 async def health_check():
@@ -87,6 +135,28 @@ async def health_check():
     except Exception as e:
         raise HTTPException(status_code=503, detail=f"Service unavailable: {str(e)}")
 
+# Scraped at request time so the backlog reflects the database, not this worker
+EVENT_BACKLOG = registry.gauge(
+    "webhook_events_unprocessed",
+    "Stored webhook events not yet processed (processed = false)",
+    ("event_type",),
+)
+
+# Prometheus metrics endpoint
+@app.get("/metrics", include_in_schema=False)
+async def metrics(db: Session = Depends(get_database)):
+    """Prometheus metrics in the text exposition format."""
+    try:
+        backlog = event_processing_service.count_unprocessed(db)
+        for (event_type,) in EVENT_BACKLOG.values():
+            EVENT_BACKLOG.labels(event_type).set(backlog.pop(event_type, 0))
+        for event_type, count in backlog.items():
+            EVENT_BACKLOG.labels(event_type).set(count)
+    except Exception as e:
+        logger.warning(f"Could not compute event backlog for metrics: {e}")
+    
+    return Response(content=registry.render(), media_type=CONTENT_TYPE_LATEST)
+
 # Root endpoint
 @app.get("/")
 async def root():
@@ -95,7 +165,8 @@ async def root():
         "message": "GitHub Audit Platform API",
         "version": "1.0.0",
         "docs": "/docs",
-        "health": "/health"
+        "health": "/health",
+        "metrics": "/metrics"
     }
 
 if __name__ == "__main__":
@@ -1,99 +1,357 @@
 #!/usr/bin/env python3
 """
 Script to reprocess existing webhook events into specialized event tables.
-Run this to process webhook events that were stored before the event processing service was added.
+Run this to process webhook events that were stored before the event processing service was added,
+or to drain a backlog of unprocessed events.
+
+Unprocessed events are split into disjoint id ranges, one per worker process. Each worker
+streams its range in id-ordered keyset chunks, hands each chunk to the event processors as
+one batch and commits once per chunk (a failing batch is retried event by event, so a failing
+event only rolls back itself). Progress is checkpointed after every committed chunk, so an
+interrupted run resumes where it stopped.
+
+Usage:
+    python reprocess_events.py --workers 4
+    python reprocess_events.py --workers 4 --chunk-size 500 --event-types push,member
+    python reprocess_events.py --reset   # ignore the checkpoint and re-plan
 """
 
 import sys
 import asyncio
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import time
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
 
 # Add backend to path
 backend_path = Path(__file__).parent
 sys.path.insert(0, str(backend_path))
 
-from app.core.database import get_database
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.database import create_database_engine
+from app.core.logging_config import LOGS_DIR
 from app.models.core import WebhookEvent
 from app.services.event_processing_service import event_processing_service
 
+DEFAULT_CHECKPOINT = LOGS_DIR / "reprocess_checkpoint.json"
+
+
+def unprocessed_filter(event_types: Optional[List[str]]):
+    """WHERE clause for the events this run reprocesses."""
+    condition = WebhookEvent.processed == False
+    if event_types:
+        condition = condition & WebhookEvent.event_type.in_(event_types)
+    return condition
+
+
+def plan_ranges(engine, workers: int, event_types: Optional[List[str]]) -> List[Dict[str, Any]]:
+    """
+    Split the unprocessed events into `workers` id ranges with about the same number of rows.
+
+    Returns:
+        Ranges as {"start", "end", "last_id", "total", "processed", "failed"} (inclusive bounds)
+    """
+    numbered = (
+        select(
+            WebhookEvent.id.label("id"),
+            func.ntile(workers).over(order_by=WebhookEvent.id).label("bucket"),
+        )
+        .where(unprocessed_filter(event_types))
+        .subquery()
+    )
+    query = (
+        select(func.min(numbered.c.id), func.max(numbered.c.id), func.count())
+        .group_by(numbered.c.bucket)
+        .order_by(func.min(numbered.c.id))
+    )
+    with Session(engine) as db:
+        rows = db.execute(query).all()
+
+    return [
+        {"start": start, "end": end, "last_id": start - 1, "total": total, "processed": 0, "failed": 0}
+        for start, end, total in rows
+    ]
+
+
+def load_checkpoint(path: Path, event_types: Optional[List[str]]) -> Optional[Dict[str, Any]]:
+    """Load a checkpoint written by an earlier run with the same event type filter."""
+    if not path.exists():
+        return None
+    try:
+        checkpoint = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as e:
+        print(f"⚠️  Ignoring unreadable checkpoint {path}: {e}")
+        return None
+    if checkpoint.get("event_types") != (event_types or None):
+        print(f"⚠️  Ignoring checkpoint {path}: it was written for a different --event-types filter")
+        return None
+    return checkpoint
+
+
+def save_checkpoint(path: Path, checkpoint: Dict[str, Any]):
+    """Write the checkpoint atomically (write a temp file, then rename over the old one)."""
+    checkpoint["updated_at"] = datetime.now(timezone.utc).isoformat()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_suffix(path.suffix + ".tmp")
+    temp_path.write_text(json.dumps(checkpoint, indent=2), encoding="utf-8")
+    os.replace(temp_path, path)
+
+
+async def process_range(
+    engine,
+    range_index: int,
+    after_id: int,
+    end_id: int,
+    chunk_size: int,
+    event_types: Optional[List[str]],
+    report: Callable[[Dict[str, Any]], None]
+):
+    """
+    Reprocess the unprocessed events with after_id < id <= end_id, chunk by chunk.
+
+    Each chunk is processed as one batch (EventProcessingService.process_batch)
+    in one connection-level transaction. The session joins it with
+    join_transaction_mode="create_savepoint", so the commit inside the service
+    only releases a savepoint, and the chunk is made durable by a single
+    commit at the end.
+
+    Args:
+        engine: Worker's own database engine
+        range_index: Index of the range in the checkpoint
+        after_id: Last id already handled in this range
+        end_id: Inclusive upper bound of the range
+        chunk_size: Events per chunk
+        event_types: Only reprocess these event types (all if None)
+        report: Called with {"range", "last_id", "processed", "failed"} after each committed chunk
+    """
+    condition = unprocessed_filter(event_types)
+    while True:
+        with engine.connect() as connection:
+            transaction = connection.begin()
+            db = Session(bind=connection, join_transaction_mode="create_savepoint", expire_on_commit=False)
+            try:
+                events = (
+                    db.query(WebhookEvent)
+                    .filter(condition, WebhookEvent.id > after_id, WebhookEvent.id <= end_id)
+                    .order_by(WebhookEvent.id)
+                    .limit(chunk_size)
+                    .all()
+                )
+                if not events:
+                    transaction.rollback()
+                    return
+
+                errors = await event_processing_service.process_batch(db, events)
+                processed, failed = len(events) - len(errors), len(errors)
+
+                transaction.commit()
+                after_id = events[-1].id
+            finally:
+                db.close()
+
+        report({"range": range_index, "last_id": after_id, "processed": processed, "failed": failed})
+
+
+def run_worker(
+    range_index: int,
+    after_id: int,
+    end_id: int,
+    chunk_size: int,
+    event_types: Optional[List[str]],
+    progress_queue
+):
+    """Worker process entry point: own engine, own event loop, progress sent to the parent."""
+    logging.disable(logging.INFO)
+    engine = create_database_engine()
+    try:
+        asyncio.run(process_range(
+            engine, range_index, after_id, end_id, chunk_size, event_types, progress_queue.put
+        ))
+    finally:
+        engine.dispose()
+        progress_queue.put({"range": range_index, "done": True})
+
+
+class ProgressPrinter:
+    """Prints a single live line with throughput and ETA."""
+
+    def __init__(self, total: int, interval: float = 1.0):
+        self.total = total
+        self.done = 0
+        self.failed = 0
+        self.interval = interval
+        self.started = time.perf_counter()
+        self.last_print = 0.0
+
+    def add(self, processed: int, failed: int):
+        self.done += processed + failed
+        self.failed += failed
+        now = time.perf_counter()
+        if now - self.last_print >= self.interval:
+            self.last_print = now
+            self.print_line()
+
+    def print_line(self, end: str = "\r"):
+        elapsed = time.perf_counter() - self.started
+        rate = self.done / elapsed if elapsed else 0.0
+        remaining = max(self.total - self.done, 0)
+        eta = f"{remaining / rate:,.0f}s" if rate else "?"
+        percent = self.done / self.total * 100 if self.total else 100.0
+        print(
+            f"  ⏱️  {self.done:,}/{self.total:,} ({percent:5.1f}%) - {rate:,.0f} events/s - "
+            f"{self.failed:,} failed - ETA {eta}    ",
+            end=end,
+            flush=True
+        )
+
+
+async def reprocess_webhook_events(args):
+    """Reprocess unprocessed webhook events into specialized tables."""
+    event_types = [value.strip() for value in args.event_types.split(",")] if args.event_types else None
+    checkpoint_path = Path(args.checkpoint)
+
+    engine = create_database_engine()
+    if engine is None:
+        print("❌ DATABASE_URL is not configured")
+        return
 
-async def reprocess_webhook_events():
-    """Reprocess existing webhook events into specialized tables."""
-    
-    db_gen = get_database()
-    db = next(db_gen)
-    
     try:
         print("🔄 Reprocessing Webhook Events")
         print("=" * 40)
-        
-        # Get all unprocessed webhook events
-        unprocessed_events = db.query(WebhookEvent).filter(
-            WebhookEvent.processed == False
-        ).all()
-        
-        print(f"\n📊 Found {len(unprocessed_events)} unprocessed webhook events")
-        
-        if not unprocessed_events:
+
+        with Session(engine) as db:
+            backlog = event_processing_service.count_unprocessed(db)
+        if event_types:
+            backlog = {event_type: count for event_type, count in backlog.items() if event_type in event_types}
+
+        print(f"\n📊 Found {sum(backlog.values())} unprocessed webhook events")
+        if not backlog:
             print("✅ All webhook events are already processed!")
+            if checkpoint_path.exists() and not args.keep_checkpoint:
+                checkpoint_path.unlink()
             return
-        
-        # Group by event type
-        event_types = {}
-        for event in unprocessed_events:
-            event_type = event.event_type
-            if event_type not in event_types:
-                event_types[event_type] = []
-            event_types[event_type].append(event)
-        
+
         print(f"\n📋 Event Types to Process:")
-        for event_type, events in event_types.items():
-            print(f"  • {event_type}: {len(events)} events")
-        
-        # Process events
-        processed_count = 0
-        error_count = 0
-        
-        print(f"\n🚀 Starting Event Processing:")
-        print("-" * 30)
-        
-        for i, webhook_event in enumerate(unprocessed_events, 1):
+        for event_type, count in sorted(backlog.items(), key=lambda item: -item[1]):
+            print(f"  • {event_type}: {count} events")
+
+        checkpoint = None if args.reset else load_checkpoint(checkpoint_path, event_types)
+        if checkpoint:
+            print(f"\n♻️  Resuming from checkpoint {checkpoint_path} ({len(checkpoint['ranges'])} ranges)")
+        else:
+            checkpoint = {
+                "event_types": event_types or None,
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "ranges": plan_ranges(engine, args.workers, event_types),
+            }
+            save_checkpoint(checkpoint_path, checkpoint)
+        ranges = checkpoint["ranges"]
+    finally:
+        # Workers open their own connections
+        engine.dispose()
+
+    pending = [index for index, id_range in enumerate(ranges) if id_range["last_id"] < id_range["end"]]
+    remaining = sum(max(id_range["total"] - id_range["processed"] - id_range["failed"], 0) for id_range in ranges)
+    progress = ProgressPrinter(remaining)
+
+    def apply(message: Dict[str, Any]):
+        id_range = ranges[message["range"]]
+        id_range["last_id"] = message["last_id"]
+        id_range["processed"] += message["processed"]
+        id_range["failed"] += message["failed"]
+        save_checkpoint(checkpoint_path, checkpoint)
+        progress.add(message["processed"], message["failed"])
+
+    print(f"\n🚀 Starting Event Processing: {len(pending)} range(s), chunks of {args.chunk_size}")
+    print("-" * 30)
+
+    if len(pending) == 1 or args.workers == 1:
+        logging.disable(logging.INFO)
+        worker_engine = create_database_engine()
+        try:
+            for index in pending:
+                await process_range(
+                    worker_engine, index, ranges[index]["last_id"], ranges[index]["end"],
+                    args.chunk_size, event_types, apply
+                )
+        finally:
+            worker_engine.dispose()
+    else:
+        context = multiprocessing.get_context("spawn")
+        progress_queue = context.Queue()
+        processes = [
+            context.Process(
+                target=run_worker,
+                args=(index, ranges[index]["last_id"], ranges[index]["end"], args.chunk_size, event_types, progress_queue),
+                name=f"reprocess-{index}",
+            )
+            for index in pending
+        ]
+        for process in processes:
+            process.start()
+
+        running = len(processes)
+        while running:
             try:
-                print(f"Processing {i}/{len(unprocessed_events)}: {webhook_event.event_type} (ID: {webhook_event.id})", end=" ... ")
-                
-                success = await event_processing_service.process_webhook_event(db, webhook_event)
-                
-                if success:
-                    print("✅")
-                    processed_count += 1
-                else:
-                    print("❌")
-                    error_count += 1
-                    
-            except Exception as e:
-                print(f"💥 Error: {e}")
-                error_count += 1
-        
-        print(f"\n📈 Processing Summary:")
-        print("-" * 20)
-        print(f"  ✅ Successfully processed: {processed_count}")
-        print(f"  ❌ Errors: {error_count}")
-        print(f"  📊 Total events: {len(unprocessed_events)}")
-        
-        if processed_count > 0:
-            print(f"\n🎉 Successfully processed {processed_count} webhook events!")
-            print("💡 Run 'python inspect_test_data.py --tables' to see the updated counts")
-        
+                message = progress_queue.get(timeout=1.0)
+            except queue.Empty:
+                if not any(process.is_alive() for process in processes):
+                    break
+                continue
+            if message.get("done"):
+                running -= 1
+            else:
+                apply(message)
+
+        for process in processes:
+            process.join()
+        crashed = [process.name for process in processes if process.exitcode]
+        if crashed:
+            print(f"\n💥 Worker(s) exited with errors: {', '.join(crashed)} - rerun to resume from the checkpoint")
+
+    progress.print_line(end="\n")
+
+    processed_count = sum(id_range["processed"] for id_range in ranges)
+    error_count = sum(id_range["failed"] for id_range in ranges)
+    print(f"\n📈 Processing Summary:")
+    print("-" * 20)
+    print(f"  ✅ Successfully processed: {processed_count}")
+    print(f"  ❌ Errors: {error_count}")
+    print(f"  ⏱️  Elapsed: {time.perf_counter() - progress.started:.1f}s")
+
+    if all(id_range["last_id"] >= id_range["end"] for id_range in ranges):
+        if not args.keep_checkpoint:
+            checkpoint_path.unlink(missing_ok=True)
         print("\n" + "=" * 40)
         print("✅ Reprocessing complete!")
-        
-    except Exception as e:
-        print(f"❌ Error during reprocessing: {e}")
-        import traceback
-        traceback.print_exc()
-    finally:
-        db.close()
+        if error_count:
+            print("💡 Failed events keep processed = false with processing_error set; rerun with --reset to retry them")
+    else:
+        print(f"\n⏸️  Stopped early - progress saved to {checkpoint_path}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Reprocess unprocessed webhook events into specialized tables")
+    parser.add_argument("--workers", type=int, default=1, help="Parallel worker processes (default 1)")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Events per chunk and commit (default 500)")
+    parser.add_argument("--event-types", help="Comma-separated event types to reprocess (default: all)")
+    parser.add_argument("--checkpoint", default=str(DEFAULT_CHECKPOINT),
+                        help=f"Checkpoint file (default: {DEFAULT_CHECKPOINT})")
+    parser.add_argument("--reset", action="store_true", help="Ignore an existing checkpoint and re-plan the ranges")
+    parser.add_argument("--keep-checkpoint", action="store_true", help="Keep the checkpoint file after a complete run")
+    args = parser.parse_args(argv)
+    if args.workers < 1 or args.chunk_size < 1:
+        parser.error("--workers and --chunk-size must be at least 1")
+    return args
 
 
 if __name__ == "__main__":
-    asyncio.run(reprocess_webhook_events())
\ No newline at end of file
+    asyncio.run(reprocess_webhook_events(parse_args()))
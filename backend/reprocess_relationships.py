@@ -1,107 +1,104 @@
 #!/usr/bin/env python3
 """
-Script to reprocess member and organization events to populate relationship tables.
+Script to rebuild the relationship tables (organization_memberships, repository_collaborators)
+and their validity-period history tables from stored member events.
+
+By default only member events newer than the stored "relationships" watermark are replayed.
+With --full, all four tables are recomputed into shadow tables with set-based SQL and swapped in
+atomically (PostgreSQL only), then the events that arrived meanwhile are replayed incrementally.
+The live tables keep answering audit queries throughout.
+
+To regenerate member_events themselves from webhook events, use reprocess_events.py.
+
+Usage:
+    python reprocess_relationships.py
+    python reprocess_relationships.py --full
 """
 
 import sys
 import asyncio
+import argparse
+import logging
+import time
 from pathlib import Path
 
 # Add backend to path
 backend_path = Path(__file__).parent
 sys.path.insert(0, str(backend_path))
 
+from sqlalchemy import func
+
 from app.core.database import get_database
-from app.models.core import WebhookEvent
-from app.models.events import MemberEvent, OrganizationMembership, RepositoryCollaborator
-from app.services.event_processing_service import event_processing_service
+from app.models.events import (
+    MemberEvent, OrganizationMembership, RepositoryCollaborator,
+    OrganizationMembershipHistory, RepositoryCollaboratorHistory
+)
+from app.services.relationship_service import relationship_service
 
 
-async def reprocess_relationships():
-    """Reprocess member/organization events to populate relationship tables."""
-    
+async def reprocess_relationships(args):
+    """Rebuild the relationship tables incrementally or in full."""
+    # Per-event relationship logging would drown the progress output
+    logging.disable(logging.INFO)
+
     db_gen = get_database()
     db = next(db_gen)
-    
+
     try:
-        print("👥 Reprocessing Member/Organization Events")
+        print("👥 Rebuilding Organization Memberships and Repository Collaborators")
         print("=" * 45)
-        
-        # Get member and organization webhook events
-        member_events = db.query(WebhookEvent).filter(
-            WebhookEvent.event_type.in_(['member', 'organization'])
-        ).all()
-        
-        print(f"\n📊 Found {len(member_events)} member/organization webhook events")
-        
-        # Clear existing member events to reprocess them
-        print("🧹 Clearing existing member events for reprocessing...")
-        db.query(MemberEvent).delete()
-        db.query(OrganizationMembership).delete()
-        db.query(RepositoryCollaborator).delete()
+
+        watermark = relationship_service.get_watermark(db)
         db.commit()
-        
-        # Process events
-        processed_count = 0
-        error_count = 0
-        memberships_created = 0
-        collaborators_created = 0
-        
-        print(f"\n🚀 Reprocessing Events:")
+        pending = db.query(func.count(MemberEvent.id)).filter(MemberEvent.id > watermark.last_event_id).scalar()
+        print(f"\n📍 Watermark: member event {watermark.last_event_id} ({pending} newer member events)")
+
+        started = time.perf_counter()
+        if args.full:
+            print("\n🧮 Computing shadow tables from all member events...")
+            result = relationship_service.rebuild_full(db)
+            print(f"  🔀 Swapped in at watermark {result['watermark']} ({time.perf_counter() - started:.1f}s)")
+            for table, rows in result["rows"].items():
+                print(f"  • {table}: {rows} rows")
+
+        print(f"\n🔁 Replaying member events past the watermark:")
         print("-" * 25)
-        
-        for i, webhook_event in enumerate(member_events, 1):
-            try:
-                print(f"Processing {i}/{len(member_events)}: {webhook_event.event_type} - {webhook_event.payload.get('action', 'unknown')} (ID: {webhook_event.id})", end=" ... ")
-                
-                # Mark as unprocessed to allow reprocessing
-                webhook_event.processed = False
-                webhook_event.processed_at = None
-                webhook_event.processing_error = None
-                
-                success = await event_processing_service.process_webhook_event(db, webhook_event)
-                
-                if success:
-                    print("✅")
-                    processed_count += 1
-                else:
-                    print("❌")
-                    error_count += 1
-                    
-            except Exception as e:
-                print(f"💥 Error: {e}")
-                error_count += 1
-        
-        # Check results
-        memberships_created = db.query(OrganizationMembership).count()
-        collaborators_created = db.query(RepositoryCollaborator).count()
-        member_events_created = db.query(MemberEvent).count()
-        
-        print(f"\n📈 Reprocessing Results:")
+
+        def progress(replayed: int, last_event_id: int):
+            elapsed = time.perf_counter() - started
+            print(f"  {replayed} events replayed (watermark {last_event_id}) - {replayed / elapsed:,.0f} events/s", end="\r")
+
+        result = await relationship_service.rebuild_incremental(db, chunk_size=args.chunk_size, progress=progress)
+
+        print(f"\n\n📈 Rebuild Results:")
         print("-" * 25)
-        print(f"  ✅ Events processed: {processed_count}")
-        print(f"  ❌ Errors: {error_count}")
-        print(f"  👥 Member events created: {member_events_created}")
-        print(f"  🏢 Organization memberships: {memberships_created}")
-        print(f"  📁 Repository collaborators: {collaborators_created}")
-        
-        if memberships_created > 0 or collaborators_created > 0:
-            print(f"\n🎉 Successfully created {memberships_created} memberships and {collaborators_created} collaborators!")
-            print("💡 Run 'python inspect_test_data.py --tables' to see the updated counts")
-        else:
-            print(f"\n⚠️ No relationships were created. This might be expected if test data doesn't include membership changes.")
-            print("💡 Run 'python analyze_relationships.py' to see what data is available")
-        
+        print(f"  🔁 Events replayed: {result['replayed']}")
+        print(f"  📍 Watermark: {result['watermark']}")
+        print(f"  🏢 Organization memberships: {db.query(OrganizationMembership).count()}")
+        print(f"  📁 Repository collaborators: {db.query(RepositoryCollaborator).count()}")
+        print(f"  🕰️  Membership history periods: {db.query(OrganizationMembershipHistory).count()}")
+        print(f"  🕰️  Collaborator history periods: {db.query(RepositoryCollaboratorHistory).count()}")
+        print(f"  ⏱️  Elapsed: {time.perf_counter() - started:.1f}s")
+
         print("\n" + "=" * 45)
-        print("✅ Relationship reprocessing complete!")
-        
+        print("✅ Relationship rebuild complete!")
+
     except Exception as e:
-        print(f"❌ Error during reprocessing: {e}")
+        db.rollback()
+        print(f"❌ Error during relationship rebuild: {e}")
         import traceback
         traceback.print_exc()
     finally:
         db.close()
 
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild relationship tables from member events")
+    parser.add_argument("--full", action="store_true",
+                        help="Recompute the tables into shadow tables and swap them in (PostgreSQL only)")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Member events per transaction (default 1000)")
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
-    asyncio.run(reprocess_relationships())
\ No newline at end of file
+    asyncio.run(reprocess_relationships(parse_args()))
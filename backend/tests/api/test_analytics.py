@@ -0,0 +1,77 @@
+"""
+Tests for the DuckDB query endpoint over Parquet snapshots.
+"""
+
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import analytics
+from app.core.config import get_settings
+from app.services.snapshot_service import snapshot_schema
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+pytest.importorskip("duckdb")
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "SNAPSHOT_DIR", str(tmp_path / "snapshots"))
+    monkeypatch.setattr(settings, "ANALYTICS_QUERY_ENABLED", True)
+    monkeypatch.setattr(settings, "ANALYTICS_QUERY_MAX_ROWS", 2)
+
+    for event_type, ids in (("push", [1, 3, 4]), ("member", [2])):
+        partition = tmp_path / "snapshots" / "event_date=2024-01-01" / f"event_type={event_type}"
+        partition.mkdir(parents=True)
+        rows = [
+            {"id": event_id, "sender_login": "octocat", "event_timestamp": datetime(2024, 1, 1, tzinfo=timezone.utc)}
+            for event_id in ids
+        ]
+        pq.write_table(pa.Table.from_pylist(rows, schema=snapshot_schema()), partition / "part-000000000001.parquet")
+    (tmp_path / "secret.csv").write_text("a\n1\n")
+
+    app = FastAPI()
+    app.include_router(analytics.router)
+    return TestClient(app)
+
+
+def test_query_over_partitions(client):
+    """Test that partition columns are queryable and results are capped."""
+    response = client.post("/analytics/query", json={
+        "sql": "SELECT event_type, count(*) AS events FROM events GROUP BY 1 ORDER BY 1"
+    })
+    assert response.status_code == 200
+    data = response.json()
+    assert data["columns"] == ["event_type", "events"]
+    assert data["rows"] == [["member", 1], ["push", 3]]
+    assert data["truncated"] is False
+
+    data = client.post("/analytics/query", json={"sql": "SELECT id FROM events ORDER BY id"}).json()
+    assert data["rows"] == [[1], [2]]
+    assert data["truncated"] is True
+
+
+def test_rejects_writes_and_outside_files(client, tmp_path):
+    """Test that only single SELECTs over the snapshot directory run."""
+    assert client.post("/analytics/query", json={"sql": "DROP VIEW events"}).status_code == 400
+    assert client.post("/analytics/query", json={"sql": "SELECT 1; SELECT 2"}).status_code == 400
+    response = client.post("/analytics/query", json={"sql": f"SELECT * FROM read_csv('{tmp_path}/secret.csv')"})
+    assert response.status_code == 400
+
+
+def test_snapshot_status(client):
+    """Test the snapshot summary."""
+    data = client.get("/analytics/snapshots").json()
+    assert data["files"] == 2
+    assert data["event_types"] == ["member", "push"]
+    assert data["first_date"] == data["last_date"] == "2024-01-01"
+
+
+def test_disabled_by_default(client, monkeypatch):
+    """Test that queries need ANALYTICS_QUERY_ENABLED."""
+    monkeypatch.setattr(get_settings(), "ANALYTICS_QUERY_ENABLED", False)
+    assert client.post("/analytics/query", json={"sql": "SELECT 1"}).status_code == 403
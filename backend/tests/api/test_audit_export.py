@@ -0,0 +1,117 @@
+"""
+Tests for the streaming audit trail export.
+"""
+
+import csv
+import io
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.api import audit
+from app.core.database import get_database
+
+# Minimal SQLite version of webhook_events (the model uses PostgreSQL types)
+SCHEMA = """CREATE TABLE webhook_events (
+    id INTEGER PRIMARY KEY, event_id VARCHAR(36), delivery_id VARCHAR(255), event_type VARCHAR(100) NOT NULL,
+    event_action VARCHAR(100), organization_id INTEGER, repository_id INTEGER, sender_id INTEGER,
+    installation_id INTEGER, event_timestamp TIMESTAMP NOT NULL, received_at TIMESTAMP, processed BOOLEAN,
+    processed_at TIMESTAMP, processing_error TEXT, retry_count INTEGER, payload TEXT NOT NULL, headers TEXT,
+    sender_login VARCHAR(255), repository_name VARCHAR(255), organization_login VARCHAR(255),
+    created_at TIMESTAMP)"""
+
+EVENTS = 2500
+
+
+@pytest.fixture
+def client(monkeypatch):
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    with engine.begin() as connection:
+        connection.execute(text(SCHEMA))
+        connection.execute(
+            text(
+                "INSERT INTO webhook_events (id, delivery_id, event_type, event_action, event_timestamp, "
+                "received_at, processed, payload, sender_login) VALUES (:id, :delivery_id, :event_type, "
+                "'created', '2024-01-01 00:00:00', '2024-01-01 00:00:00', 1, :payload, 'octocat')"
+            ),
+            [
+                {
+                    "id": i, "delivery_id": f"d-{i}", "event_type": "push" if i % 2 else "member",
+                    "payload": json.dumps({"n": i, "note": 'comma, "quote"'})
+                }
+                for i in range(1, EVENTS + 1)
+            ]
+        )
+    sessions = sessionmaker(bind=engine)
+
+    def database():
+        db = sessions()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    monkeypatch.setattr(audit, "EXPORT_BATCH_SIZE", 100)
+    app = FastAPI()
+    app.include_router(audit.router)
+    app.dependency_overrides[get_database] = database
+    return TestClient(app)
+
+
+def test_ndjson_export_with_payloads(client):
+    """Test that every filtered event is exported in ID order with its payload."""
+    response = client.get(
+        "/audit/events/export",
+        params={"event_type": "push", "include_payload": "true"},
+        headers={"Accept-Encoding": "identity"}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert "content-encoding" not in response.headers
+
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert len(records) == EVENTS // 2
+    assert [record["id"] for record in records] == list(range(1, EVENTS + 1, 2))
+    assert records[0]["delivery_id"] == "d-1"
+    assert records[0]["payload"] == {"n": 1, "note": 'comma, "quote"'}
+
+
+def test_csv_export(client):
+    """Test the CSV header, quoting and that payloads are left out by default."""
+    response = client.get("/audit/events/export", params={"format": "csv"}, headers={"Accept-Encoding": "identity"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert 'filename="audit-events.csv"' in response.headers["content-disposition"]
+
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == EVENTS
+    assert "payload" not in rows[0]
+    assert rows[1]["event_type"] == "member"
+
+    response = client.get(
+        "/audit/events/export", params={"format": "csv", "include_payload": "true", "event_type": "member"},
+        headers={"Accept-Encoding": "identity"}
+    )
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert json.loads(rows[0]["payload"]) == {"n": 2, "note": 'comma, "quote"'}
+
+
+def test_gzip_when_accepted(client):
+    """Test that the stream is gzip-compressed for clients that accept it."""
+    response = client.get("/audit/events/export", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    # The client decodes the body transparently
+    assert len(response.text.splitlines()) == EVENTS
+
+    response = client.get("/audit/events/export", headers={"Accept-Encoding": "gzip;q=0"})
+    assert "content-encoding" not in response.headers
+
+
+def test_rejects_unknown_format(client):
+    """Test that only NDJSON and CSV are accepted."""
+    assert client.get("/audit/events/export", params={"format": "xml"}).status_code == 422
@@ -0,0 +1,157 @@
+"""
+Tests for the point-in-time and range access history endpoints.
+"""
+
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.elements import BinaryExpression
+
+from app.api import audit
+from app.core.database import get_database
+
+# The history filters use PostgreSQL range operators; on SQLite they become
+# functions over the "valid_from,valid_to" text of valid_during
+RANGE_OPERATORS = {"@>": "range_contains", "&&": "range_overlaps"}
+
+ORG, ALICE, BOB, API = 1, 1, 2, 10
+
+
+@compiles(BinaryExpression, "sqlite")
+def compile_range_operators_for_sqlite(element, compiler, **kw):
+    function = RANGE_OPERATORS.get(getattr(element.operator, "opstring", None))
+    if function is None:
+        return compiler.visit_binary(element, **kw)
+    return f"{function}({compiler.process(element.left, **kw)}, {compiler.process(element.right, **kw)})"
+
+
+def timestamp(value):
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(str(value))
+    return parsed.astimezone(timezone.utc).replace(tzinfo=None) if parsed.tzinfo else parsed
+
+
+def bounds(value):
+    lower, upper = value.split(",")
+    return timestamp(lower), timestamp(upper)
+
+
+def range_contains(during, at):
+    lower, upper = bounds(during)
+    at = timestamp(at)
+    return lower <= at and (upper is None or at < upper)
+
+
+def range_overlaps(during, other):
+    lower, upper = bounds(during)
+    start, end = bounds(other)
+    return (upper is None or start is None or start < upper) and (end is None or lower < end)
+
+
+@pytest.fixture
+def client(sqlite_db):
+    db = sqlite_db(
+        "organizations", "users", "repositories",
+        "organization_membership_history", "repository_collaborator_history"
+    )
+    connection = db.connection().connection.driver_connection
+    connection.create_function("range_contains", 2, range_contains)
+    connection.create_function("range_overlaps", 2, range_overlaps)
+    connection.create_function("tstzrange", 3, lambda lower, upper, _: f"{lower or ''},{upper or ''}")
+
+    urls = ("url", "repos_url", "events_url", "hooks_url", "issues_url", "members_url",
+            "public_members_url", "avatar_url")
+    db.execute(
+        text(
+            f"INSERT INTO organizations (id, github_id, login, node_id, {', '.join(urls)}) "
+            f"VALUES ({ORG}, 100, 'octo-org', 'o', {', '.join(repr(name) for name in urls)})"
+        )
+    )
+    for user_id, login in ((ALICE, "alice"), (BOB, "bob")):
+        db.execute(text(
+            "INSERT INTO users (id, github_id, login, node_id, url, html_url) "
+            f"VALUES ({user_id}, {user_id * 100}, '{login}', 'n{user_id}', 'u', 'h')"
+        ))
+    db.execute(text(
+        "INSERT INTO repositories (id, github_id, node_id, name, full_name, html_url, url, organization_id) "
+        f"VALUES ({API}, 1000, 'r', 'api', 'octo-org/api', 'h', 'u', {ORG})"
+    ))
+    db.execute(
+        text(
+            "INSERT INTO organization_membership_history (organization_id, user_id, role, valid_from, valid_to) "
+            "VALUES (:org, :user, :role, :start, :end)"
+        ),
+        [
+            {"org": ORG, "user": ALICE, "role": "member", "start": "2024-01-01 00:00:00.000000",
+             "end": "2024-03-01 00:00:00.000000"},
+            {"org": ORG, "user": ALICE, "role": "admin", "start": "2024-03-01 00:00:00.000000", "end": None},
+            {"org": ORG, "user": BOB, "role": "member", "start": "2024-02-01 00:00:00.000000",
+             "end": "2024-02-15 00:00:00.000000"},
+        ]
+    )
+    db.execute(text(
+        "INSERT INTO repository_collaborator_history (repository_id, user_id, permission, valid_from) "
+        f"VALUES ({API}, {BOB}, 'write', '2024-01-10 00:00:00.000000')"
+    ))
+    db.commit()
+
+    app = FastAPI()
+    app.include_router(audit.router)
+    app.dependency_overrides[get_database] = lambda: db
+    return TestClient(app)
+
+
+def test_point_in_time(client):
+    """Test that each endpoint returns the periods valid at 'at' (naive timestamps are UTC)."""
+    response = client.get("/audit/organizations/octo-org/members/history", params={"at": "2024-02-10T00:00:00"})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["at"].startswith("2024-02-10T00:00:00")
+    assert [(member["login"], member["role"]) for member in body["members"]] == [
+        ("alice", "member"), ("bob", "member")
+    ]
+
+    response = client.get("/audit/repositories/octo-org/api/collaborators/history", params={"at": "2024-01-05T00:00:00"})
+    assert response.json()["collaborators"] == []
+
+    body = client.get("/audit/users/bob/access/history", params={"at": "2024-02-10T00:00:00Z"}).json()
+    assert [organization["login"] for organization in body["organizations"]] == ["octo-org"]
+    assert [(repository["full_name"], repository["permission"], repository["current"])
+            for repository in body["repositories"]] == [("octo-org/api", "write", True)]
+
+
+def test_range_mixing_naive_and_aware_timestamps(client):
+    """Test that a range returns every overlapping period, with a naive start and an aware end."""
+    params = {"start": "2024-02-20T00:00:00", "end": "2024-03-10T00:00:00+00:00"}
+    response = client.get("/audit/organizations/octo-org/members/history", params=params)
+    assert response.status_code == 200
+    assert [(member["login"], member["role"], member["current"]) for member in response.json()["members"]] == [
+        ("alice", "member", False), ("alice", "admin", True)
+    ]
+
+    response = client.get("/audit/repositories/octo-org/api/collaborators/history", params=params)
+    assert [collaborator["login"] for collaborator in response.json()["collaborators"]] == ["bob"]
+
+    body = client.get("/audit/users/alice/access/history", params={"start": "2024-03-05T00:00:00"}).json()
+    assert [organization["role"] for organization in body["organizations"]] == ["admin"]
+    assert body["repositories"] == []
+
+
+@pytest.mark.parametrize("path", [
+    "/audit/organizations/octo-org/members/history",
+    "/audit/repositories/octo-org/api/collaborators/history",
+    "/audit/users/alice/access/history",
+])
+def test_invalid_windows_rejected(client, path):
+    """Test that 'at' with a range, and an end not after its start, are client errors."""
+    response = client.get(path, params={"at": "2024-02-01T00:00:00", "start": "2024-01-01T00:00:00Z"})
+    assert response.status_code == 400
+    # The same instant, once naive and once aware
+    response = client.get(path, params={"start": "2024-02-01T00:00:00", "end": "2024-02-01T00:00:00+00:00"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "'end' must be after 'start'"
@@ -0,0 +1,45 @@
+"""
+Tests for the real-time SSE and WebSocket endpoints.
+"""
+
+import asyncio
+import json
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import realtime
+from app.services.realtime_hub import realtime_hub
+
+
+def client():
+    app = FastAPI()
+    app.include_router(realtime.router)
+    return TestClient(app)
+
+
+def test_websocket_receives_matching_events():
+    """Test that a WebSocket gets the events of its repository only."""
+    with client().websocket_connect("/realtime/ws?repository=octo/api") as websocket:
+        assert realtime_hub.get_stats()["subscribers"] == 1
+        realtime_hub.publish({"id": 1, "repository_name": "octo/web", "organization_login": "octo"})
+        realtime_hub.publish({"id": 2, "repository_name": "octo/api", "organization_login": "octo"})
+        message = json.loads(websocket.receive_text())
+        assert message == {
+            "type": "event", "event": {"id": 2, "repository_name": "octo/api", "organization_login": "octo"}
+        }
+    assert realtime_hub.get_stats()["subscribers"] == 0
+
+
+def test_sse_subscribes_when_streaming_starts():
+    """Test that an SSE response never streamed (client gone early) leaves no subscriber behind."""
+    response = asyncio.run(realtime.stream_events(repository=["octo/api"], organization=None))
+    assert response.media_type == "text/event-stream"
+    assert realtime_hub.get_stats()["subscribers"] == 0
+
+
+def test_stats():
+    """Test the hub statistics endpoint."""
+    data = client().get("/realtime/stats").json()
+    assert data["subscribers"] == 0
+    assert "queue_size" in data
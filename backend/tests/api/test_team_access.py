@@ -0,0 +1,72 @@
+"""
+Tests for team access from real team and membership deliveries to the effective permission endpoints.
+"""
+
+import asyncio
+import copy
+import json
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import audit
+from app.core.database import get_database
+from app.services.event_processing_service import event_processing_service
+from app.services.webhook_service import webhook_receiver_service
+from app.webhook_models.utils import parse_webhook_payload
+
+PAYLOADS_DIR = Path(__file__).parent.parent / "payloads"
+
+
+def load_payload(name):
+    return json.loads((PAYLOADS_DIR / name).read_text())
+
+
+@pytest.fixture
+def db(sqlite_db):
+    return sqlite_db(
+        "organizations", "repositories", "users", "installations", "webhook_events", "teams",
+        "team_memberships", "team_repositories", "organization_memberships", "repository_collaborators",
+        "effective_permissions", "analytics_sketches"
+    )
+
+
+def deliver(db, event_type, payload, delivery_id):
+    """Parse, store and process a delivery the way the webhook endpoint and worker do."""
+    webhook_event = parse_webhook_payload(payload, event_type)
+    stored = asyncio.run(webhook_receiver_service.store_webhook_event(
+        db, webhook_event, payload, {"x-github-event": event_type}, delivery_id, event_type
+    ))
+    errors = asyncio.run(event_processing_service.process_batch(db, [stored]))
+    assert errors == {}
+    return stored
+
+
+def test_team_deliveries_fill_effective_permissions(db):
+    """Test that a team added to a repository, then a member added to it, grant the member access."""
+    team_event = load_payload("04_TeamAddedToRepositoryEvent.json")
+    stored = deliver(db, "team", team_event, "d-team")
+    # The installation is only a stub ({id, node_id}) and was never stored
+    assert stored.repository_id and stored.installation_id is None
+
+    # GitHub sends team member changes as membership events; the member here
+    # is the sender of the team event, so the user is already known
+    membership_event = copy.deepcopy(load_payload("05_TeamMemberAddedEvent.json"))
+    membership_event["member"] = team_event["sender"]
+    deliver(db, "membership", membership_event, "d-membership")
+
+    app = FastAPI()
+    app.include_router(audit.router)
+    app.dependency_overrides[get_database] = lambda: db
+    client = TestClient(app)
+
+    body = client.get("/audit/users/Codertocat/repositories").json()
+    assert [(item["full_name"], item["permission"], item["via"]) for item in body["repositories"]] == [
+        ("Octocoders/Hello-World", "write", ["team"])
+    ]
+    body = client.get("/audit/repositories/Octocoders/Hello-World/users", params={"permission": "write"}).json()
+    assert [(item["login"], item["permission"]) for item in body["users"]] == [("Codertocat", "write")]
+    body = client.get("/audit/repositories/Octocoders/Hello-World/users", params={"permission": "admin"}).json()
+    assert body["users"] == []
@@ -5,8 +5,10 @@ Test configuration and shared utilities for the test suite.
 import os
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import ARRAY, create_engine, event, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.pool import StaticPool
 
 # Import the app and database dependencies
@@ -70,4 +72,75 @@ def sample_headers():
         "X-GitHub-Delivery": "test-delivery-id",
         "X-Hub-Signature-256": "sha256=test-signature",
         "User-Agent": "GitHub-Hookshot/test"
-    }
\ No newline at end of file
+    }
+
+
+@compiles(ARRAY, "sqlite")
+@compiles(JSONB, "sqlite")
+def compile_as_json_for_sqlite(type_, compiler, **kw):
+    """Store ARRAY and JSONB columns as JSON so their models compile on SQLite."""
+    return "JSON"
+
+
+# SQLite versions of the tables whose models use other PostgreSQL-only column
+# types (UUID, TSTZRANGE), or that tests fill with partial rows; every other
+# table is created from its model
+SQLITE_TABLES = {
+    "webhook_events": """CREATE TABLE webhook_events (
+        id INTEGER PRIMARY KEY, event_id VARCHAR(36), delivery_id VARCHAR(255) UNIQUE, event_type VARCHAR(100) NOT NULL,
+        event_action VARCHAR(100), organization_id INTEGER, repository_id INTEGER, sender_id INTEGER,
+        installation_id INTEGER, event_timestamp TIMESTAMP, received_at TIMESTAMP, processed BOOLEAN,
+        processed_at TIMESTAMP, processing_error TEXT, retry_count INTEGER, payload JSON, headers JSON,
+        sender_login VARCHAR(255), repository_name VARCHAR(255), organization_login VARCHAR(255),
+        created_at TIMESTAMP)""",
+    "repository_events": """CREATE TABLE repository_events (
+        id INTEGER PRIMARY KEY, webhook_event_id INTEGER, repository_id INTEGER, action VARCHAR(100) NOT NULL,
+        changes JSON, event_timestamp TIMESTAMP, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)""",
+    "member_events": """CREATE TABLE member_events (
+        id INTEGER PRIMARY KEY, webhook_event_id INTEGER, repository_id INTEGER, organization_id INTEGER,
+        member_id INTEGER, action VARCHAR(100) NOT NULL, permission_level VARCHAR(50), changes JSON,
+        event_timestamp TIMESTAMP, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)""",
+    "organization_membership_history": """CREATE TABLE organization_membership_history (
+        id INTEGER PRIMARY KEY, organization_id INTEGER NOT NULL, user_id INTEGER NOT NULL,
+        role VARCHAR(50) NOT NULL, valid_from TIMESTAMP NOT NULL, valid_to TIMESTAMP,
+        valid_during TEXT GENERATED ALWAYS AS (valid_from || ',' || COALESCE(valid_to, '')) VIRTUAL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)""",
+    "repository_collaborator_history": """CREATE TABLE repository_collaborator_history (
+        id INTEGER PRIMARY KEY, repository_id INTEGER NOT NULL, user_id INTEGER NOT NULL,
+        permission VARCHAR(50) NOT NULL, valid_from TIMESTAMP NOT NULL, valid_to TIMESTAMP,
+        valid_during TEXT GENERATED ALWAYS AS (valid_from || ',' || COALESCE(valid_to, '')) VIRTUAL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)""",
+}
+
+
+@pytest.fixture
+def sqlite_db():
+    """
+    Factory for in-memory SQLite sessions holding only the named tables.
+
+    Usage: db = sqlite_db("webhook_events", "users"). Savepoints behave as on
+    PostgreSQL. Sessions and their engines are closed after the test.
+    """
+    sessions = []
+
+    def create(*tables: str) -> Session:
+        engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+        # Let SQLAlchemy emit BEGIN itself, so savepoints nest inside the
+        # transaction instead of pysqlite committing when one is released
+        event.listen(engine, "connect", lambda connection, _: setattr(connection, "isolation_level", None))
+        event.listen(engine, "begin", lambda connection: connection.exec_driver_sql("BEGIN"))
+        with engine.begin() as connection:
+            for name in tables:
+                if name in SQLITE_TABLES:
+                    connection.execute(text(SQLITE_TABLES[name]))
+                else:
+                    Base.metadata.tables[name].create(connection)
+        session = Session(engine)
+        sessions.append(session)
+        return session
+
+    yield create
+    for session in sessions:
+        engine = session.get_bind()
+        session.close()
+        engine.dispose()
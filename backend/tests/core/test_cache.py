@@ -0,0 +1,177 @@
+"""
+Tests for the read-through response cache.
+"""
+
+import shutil
+import socket
+import subprocess
+import threading
+import time
+
+import pytest
+
+from app.core.cache import GLOBAL_SCOPE, MemoryBackend, RedisBackend, ResponseCache, organization_scope
+
+
+def counting(value):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return value
+
+    return compute, calls
+
+
+class TestMemoryBackend:
+    """Test the in-process LRU."""
+
+    def test_evicts_least_recently_used(self):
+        """Test that reads refresh recency and the oldest entry is evicted."""
+        backend = MemoryBackend(max_entries=2)
+        backend.set("a", "1", ttl=60)
+        backend.set("b", "2", ttl=60)
+        backend.get("a")
+        backend.set("c", "3", ttl=60)
+        assert backend.get("a") == "1"
+        assert backend.get("b") is None
+        assert backend.get("c") == "3"
+
+    def test_entries_expire(self):
+        """Test that expired entries are misses."""
+        backend = MemoryBackend()
+        backend.set("a", "1", ttl=0)
+        assert backend.get("a") is None
+
+
+class TestResponseCache:
+    """Test read-through caching, invalidation and request coalescing."""
+
+    def test_caches_by_endpoint_and_parameters(self):
+        """Test that repeated calls hit and other parameters miss."""
+        cache = ResponseCache(MemoryBackend(), ttl=60)
+        compute, calls = counting({"total": 1})
+
+        assert cache.get_or_compute("summary", {"days": 30}, compute) == {"total": 1}
+        assert cache.get_or_compute("summary", {"days": 30}, compute) == {"total": 1}
+        assert len(calls) == 1
+        cache.get_or_compute("summary", {"days": 7}, compute)
+        cache.get_or_compute("other", {"days": 30}, compute)
+        assert len(calls) == 3
+
+    def test_invalidates_by_scope(self):
+        """Test that new events only invalidate responses of their scopes."""
+        cache = ResponseCache(MemoryBackend(), ttl=60)
+        compute, calls = counting({})
+        org_1, org_2 = organization_scope(1), organization_scope(2)
+
+        for scope in (org_1, org_2, GLOBAL_SCOPE):
+            cache.get_or_compute("summary", {"scope": scope}, compute, scopes=[scope])
+        cache.invalidate({GLOBAL_SCOPE, org_1})
+        for scope in (org_1, org_2, GLOBAL_SCOPE):
+            cache.get_or_compute("summary", {"scope": scope}, compute, scopes=[scope])
+        assert len(calls) == 5
+
+        cache.invalidate_all()
+        cache.get_or_compute("summary", {"scope": org_2}, compute, scopes=[org_2])
+        assert len(calls) == 6
+
+    def test_coalesces_concurrent_misses(self):
+        """Test that concurrent identical requests share one computation."""
+        cache = ResponseCache(MemoryBackend(), ttl=60)
+        calls = []
+        started = threading.Event()
+
+        def slow():
+            calls.append(1)
+            started.set()
+            time.sleep(0.2)
+            return {"total": 42}
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.get_or_compute("summary", {}, slow)))
+            for _ in range(8)
+        ]
+        threads[0].start()
+        started.wait(1)
+        for thread in threads[1:]:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert results == [{"total": 42}] * 8
+
+    def test_errors_reach_waiters_and_are_not_cached(self):
+        """Test that a failed computation fails its waiters and is retried next time."""
+        cache = ResponseCache(MemoryBackend(), ttl=60)
+
+        def failing():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError):
+            cache.get_or_compute("summary", {}, failing)
+        compute, calls = counting({"ok": True})
+        assert cache.get_or_compute("summary", {}, compute) == {"ok": True}
+
+    def test_results_are_json_encoded(self):
+        """Test that cached values are the JSON form of the response."""
+        from datetime import datetime, timezone
+
+        cache = ResponseCache(MemoryBackend(), ttl=60)
+        when = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        assert cache.get_or_compute("summary", {}, lambda: {"at": when}) == {"at": "2024-01-01T00:00:00+00:00"}
+
+
+@pytest.fixture
+def redis_url():
+    server = shutil.which("redis-server")
+    if not server:
+        pytest.skip("redis-server is not installed")
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    process = subprocess.Popen(
+        [server, "--port", str(port), "--save", "", "--appendonly", "no"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        for _ in range(50):
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+                break
+            except OSError:
+                time.sleep(0.05)
+        yield f"redis://127.0.0.1:{port}/0"
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def test_redis_backend_is_shared_between_caches(redis_url):
+    """Test that workers share entries, invalidation and in-flight computations."""
+    worker_1 = ResponseCache(RedisBackend(redis_url), ttl=60)
+    worker_2 = ResponseCache(RedisBackend(redis_url), ttl=60)
+    compute, calls = counting({"total": 1})
+
+    worker_1.get_or_compute("summary", {}, compute)
+    assert worker_2.get_or_compute("summary", {}, compute) == {"total": 1}
+    assert len(calls) == 1
+
+    worker_2.invalidate([GLOBAL_SCOPE])
+    worker_1.get_or_compute("summary", {}, compute)
+    assert len(calls) == 2
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.3)
+        return {"total": 2}
+
+    worker_1.invalidate_all()
+    thread = threading.Thread(target=worker_1.get_or_compute, args=("summary", {}, slow))
+    thread.start()
+    time.sleep(0.1)
+    assert worker_2.get_or_compute("summary", {}, slow) == {"total": 2}
+    thread.join()
+    assert len(calls) == 3
@@ -0,0 +1,96 @@
+"""
+Tests for SQL statement instrumentation.
+"""
+
+import threading
+import time
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from app.core import db_instrumentation
+from app.core.db_instrumentation import (
+    DB_EXPLAINS_DROPPED, EXPLAIN_QUEUE_SIZE, begin_request_tracking, fingerprint, instrument_engine, statement_stats
+)
+
+
+class TestFingerprint:
+    """Test statement normalization."""
+
+    def test_literals_and_placeholders(self):
+        """Test that literals and bind parameters are normalized."""
+        assert fingerprint("SELECT * FROM users WHERE login = 'octocat' AND id = 42") == \
+            "SELECT * FROM users WHERE login = ? AND id = ?"
+        assert fingerprint("SELECT * FROM users WHERE id = %(id_1)s") == "SELECT * FROM users WHERE id = ?"
+
+    def test_in_lists_collapse(self):
+        """Test that IN-lists of different lengths share a fingerprint."""
+        assert fingerprint("SELECT 1 FROM t WHERE id IN (1, 2, 3)") == \
+            fingerprint("SELECT 1 FROM t WHERE id IN (%s, %s)")
+
+    def test_identifiers_untouched(self):
+        """Test that digits inside identifiers are kept."""
+        assert "table1" in fingerprint("SELECT col2 FROM table1")
+
+
+class TestStatementInstrumentation:
+    """Test the engine event hooks."""
+
+    def test_statements_recorded(self):
+        """Test per-fingerprint aggregation and per-request counting."""
+        engine = create_engine("sqlite://")
+        instrument_engine(engine)
+        instrument_engine(engine)
+        statement_stats.reset()
+        request_stats = begin_request_tracking()
+
+        with engine.connect() as conn:
+            for value in range(3):
+                conn.execute(text(f"SELECT {value}"))
+
+        assert request_stats.statements == 3
+        entry = next(row for row in statement_stats.top() if row["fingerprint"] == "SELECT ?")
+        assert entry["calls"] == 3
+        assert entry["total_seconds"] >= entry["max_seconds"] > 0
+
+    def test_admin_endpoint_and_header(self, test_client: TestClient):
+        """Test the statements endpoint and the per-request header."""
+        response = test_client.get("/api/v1/admin/db/statements", params={"order_by": "calls"})
+        assert response.status_code == 200
+        assert "statements" in response.json()
+        assert response.headers["X-DB-Statements"] == "0"
+
+        assert test_client.get("/api/v1/admin/db/statements", params={"order_by": "bogus"}).status_code == 422
+
+
+class TestExplainer:
+    """Test the slow-query EXPLAIN worker."""
+
+    def test_one_thread_and_bounded_queue(self, monkeypatch):
+        """Test that a storm of slow SELECTs is explained one at a time and the overflow is dropped."""
+        started, release = threading.Event(), threading.Event()
+        explained = []
+
+        def explain(engine, statement, parameters):
+            started.set()
+            release.wait(5)
+            explained.append(statement)
+
+        monkeypatch.setattr(db_instrumentation, "_explain", explain)
+        explainer = db_instrumentation._Explainer()
+        dropped = DB_EXPLAINS_DROPPED._default().value
+
+        explainer.submit(None, "SELECT 0", None)
+        assert started.wait(5)
+        threads = {thread for thread in threading.enumerate() if thread.name == "slow-query-explain"}
+        for value in range(1, EXPLAIN_QUEUE_SIZE + 6):
+            explainer.submit(None, f"SELECT {value}", None)
+        assert {thread for thread in threading.enumerate() if thread.name == "slow-query-explain"} == threads
+        assert DB_EXPLAINS_DROPPED._default().value - dropped == 5
+
+        release.set()
+        for _ in range(500):
+            if len(explained) == EXPLAIN_QUEUE_SIZE + 1:
+                break
+            time.sleep(0.01)
+        assert explained == [f"SELECT {value}" for value in range(EXPLAIN_QUEUE_SIZE + 1)]
@@ -0,0 +1,104 @@
+"""
+Tests for ETag-based conditional GET support.
+"""
+
+from fastapi import FastAPI, Request, Response
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.core.http_cache import (
+    conditional_response, etag_matches, event_watermark, make_etag, unprocessed_watermark
+)
+
+
+def make_client(state):
+    app = FastAPI()
+
+    @app.get("/items")
+    def items(request: Request, response: Response):
+        not_modified = conditional_response(request, response, make_etag(state["watermark"], request.url.query))
+        if not_modified:
+            return not_modified
+        state["queries"] += 1
+        return {"watermark": state["watermark"]}
+
+    return TestClient(app)
+
+
+class TestEtags:
+    """Test ETag construction and comparison."""
+
+    def test_etag_depends_on_all_parts(self):
+        """Test that the watermark and parameters both change the ETag."""
+        assert make_etag(5, "limit=10") == make_etag(5, "limit=10")
+        assert make_etag(5, "limit=10") != make_etag(6, "limit=10")
+        assert make_etag(5, "limit=10") != make_etag(5, "limit=20")
+        assert make_etag(5).startswith('W/"')
+
+    def test_weak_comparison(self):
+        """Test If-None-Match lists, wildcards and strong/weak forms."""
+        etag = make_etag(1)
+        assert etag_matches(etag, etag)
+        assert etag_matches(f'"other", {etag}', etag)
+        assert etag_matches(etag[2:], etag)
+        assert etag_matches("*", etag)
+        assert not etag_matches('"other"', etag)
+        assert not etag_matches(None, etag)
+
+
+class TestConditionalResponse:
+    """Test 304 handling in an endpoint."""
+
+    def test_not_modified_skips_the_query(self):
+        """Test that a current ETag returns 304 without running the endpoint's query."""
+        state = {"watermark": 1, "queries": 0}
+        client = make_client(state)
+
+        first = client.get("/items?limit=10")
+        assert first.status_code == 200
+        assert first.headers["cache-control"].startswith("private, max-age=")
+        etag = first.headers["etag"]
+
+        second = client.get("/items?limit=10", headers={"If-None-Match": etag})
+        assert second.status_code == 304
+        assert second.headers["etag"] == etag
+        assert second.content == b""
+        assert state["queries"] == 1
+
+    def test_new_events_change_the_etag(self):
+        """Test that a moved watermark or other parameters return a full response."""
+        state = {"watermark": 1, "queries": 0}
+        client = make_client(state)
+        etag = client.get("/items").headers["etag"]
+
+        assert client.get("/items?limit=5", headers={"If-None-Match": etag}).status_code == 200
+        state["watermark"] = 2
+        response = client.get("/items", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.json() == {"watermark": 2}
+        assert response.headers["etag"] != etag
+
+
+class TestWatermarks:
+    """Test the watermarks ETags are built from."""
+
+    def test_processing_moves_the_unprocessed_watermark(self, sqlite_db):
+        """Test that processing an event changes the watermarks without a new event."""
+        db = sqlite_db("webhook_events")
+        for event_id, organization_id in ((1, 1), (2, 1), (3, 2)):
+            db.execute(
+                text(
+                    "INSERT INTO webhook_events (id, event_type, organization_id, processed) "
+                    "VALUES (:id, 'push', :org, 0)"
+                ),
+                {"id": event_id, "org": organization_id}
+            )
+        before = (event_watermark(db, 1), unprocessed_watermark(db, 1))
+        assert before == (2, 2)
+        assert unprocessed_watermark(db) == 3
+
+        db.execute(text("UPDATE webhook_events SET processed = 1 WHERE id = 2"))
+        after = (event_watermark(db, 1), unprocessed_watermark(db, 1))
+        assert after == (2, 1)
+        assert make_etag(before, "limit=10") != make_etag(after, "limit=10")
+        assert unprocessed_watermark(db, 2) == 1
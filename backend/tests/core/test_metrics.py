@@ -0,0 +1,69 @@
+"""
+Tests for the metrics registry and the /metrics endpoint.
+"""
+
+import uuid
+from pathlib import Path
+from fastapi.testclient import TestClient
+
+from app.core.metrics import MetricsRegistry
+
+
+class TestMetricsRegistry:
+    """Test metric families and text rendering."""
+
+    def test_counter_and_gauge(self):
+        """Test labelled counters and gauges."""
+        registry = MetricsRegistry()
+        counter = registry.counter("deliveries_total", "Deliveries", ("event_type",))
+        counter.labels("push").inc()
+        counter.labels("push").inc(2)
+        gauge = registry.gauge("backlog", "Backlog")
+        gauge.set(7)
+
+        output = registry.render()
+        assert "# TYPE deliveries_total counter" in output
+        assert 'deliveries_total{event_type="push"} 3' in output
+        assert "backlog 7" in output
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test that histogram buckets render cumulatively with +Inf, sum and count."""
+        registry = MetricsRegistry()
+        histogram = registry.histogram("stage_seconds", "Stage", ("stage",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 5.0):
+            histogram.labels("decode").observe(value)
+
+        output = registry.render()
+        assert 'stage_seconds_bucket{stage="decode",le="0.1"} 1' in output
+        assert 'stage_seconds_bucket{stage="decode",le="1"} 2' in output
+        assert 'stage_seconds_bucket{stage="decode",le="+Inf"} 3' in output
+        assert 'stage_seconds_count{stage="decode"} 3' in output
+
+    def test_register_returns_existing_family(self):
+        """Test that registering a name twice shares one family."""
+        registry = MetricsRegistry()
+        first = registry.counter("events_total", "Events")
+        assert registry.counter("events_total", "Events") is first
+
+
+class TestMetricsEndpoint:
+    """Test the Prometheus endpoint."""
+
+    def test_metrics_endpoint(self, test_client: TestClient):
+        """Test that ingest stages appear after a webhook is received."""
+        headers = {
+            "X-GitHub-Event": "ping",
+            "X-GitHub-Delivery": f"metrics-{uuid.uuid4()}",
+            "X-GitHub-Hook-ID": "metrics-test",
+            "User-Agent": "GitHub-Hookshot/test"
+        }
+        payload = (Path(__file__).parent.parent / "payloads" / "23_PingEvent.json").read_bytes()
+        test_client.post("/api/v1/webhooks/github", content=payload, headers=headers)
+
+        response = test_client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert 'webhook_ingest_stage_seconds_count{stage="decode",event_type="ping"}' in response.text
+        assert 'webhook_ingest_stage_seconds_count{stage="parse",event_type="ping"}' in response.text
+        # Hooks without their own secrets are counted under the shared bucket
+        assert 'webhook_requests_admitted_total{hook="other"}' in response.text
@@ -0,0 +1,100 @@
+"""
+Tests for the sampling profiler and the profiling middleware.
+"""
+
+import json
+import time
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core import profiler as profiler_module
+from app.core.config import get_settings
+from app.core.profiler import SamplingProfiler, write_profile
+from app.middleware.profiling import ProfilingMiddleware
+
+
+def busy_work(seconds: float):
+    """Spin the CPU so the sampler has something to see."""
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        sum(range(1000))
+
+
+@pytest.fixture
+def profiles_dir(monkeypatch, tmp_path):
+    """Write profiles into a temporary directory."""
+    monkeypatch.setattr(profiler_module, "PROFILES_DIR", tmp_path)
+    return tmp_path
+
+
+class TestSamplingProfiler:
+    """Test sampling and output formats."""
+
+    def test_samples_running_thread(self, profiles_dir):
+        """Test that the busy function appears in collapsed and speedscope output."""
+        profiler = SamplingProfiler(0.001)
+        profiler.start()
+        busy_work(0.1)
+        profiler.stop()
+
+        assert profiler.sample_count > 0
+        assert "busy_work (test_profiler.py" in profiler.to_collapsed()
+
+        path = write_profile(profiler, "GET /test push", "speedscope", max_files=10)
+        document = json.loads(path.read_text())
+        frame_names = {frame["name"] for frame in document["shared"]["frames"]}
+        assert "busy_work" in frame_names
+        assert document["profiles"][0]["type"] == "sampled"
+
+    def test_old_profiles_pruned(self, profiles_dir):
+        """Test that only the newest profiles are kept."""
+        for index in range(3):
+            profiler = SamplingProfiler(0.001)
+            profiler.start()
+            profiler.stop()
+            write_profile(profiler, f"GET /test/{index}", "collapsed", max_files=2)
+            time.sleep(0.001)
+        assert len(list(profiles_dir.iterdir())) == 2
+
+
+class TestProfilingMiddleware:
+    """Test request selection and the admin endpoints."""
+
+    def test_profiles_matching_requests(self, profiles_dir, monkeypatch):
+        """Test that only requests matching the path and event type filters are profiled."""
+        settings = get_settings()
+        monkeypatch.setattr(settings, "PROFILING_SAMPLE_RATE", 1.0)
+        monkeypatch.setattr(settings, "PROFILING_PATHS", ["/profiled"])
+        monkeypatch.setattr(settings, "PROFILING_EVENT_TYPES", ["push"])
+        monkeypatch.setattr(settings, "PROFILING_FORMAT", "collapsed")
+
+        app = FastAPI()
+        app.add_middleware(ProfilingMiddleware)
+
+        @app.get("/profiled")
+        def profiled():
+            busy_work(0.02)
+            return {"ok": True}
+
+        client = TestClient(app)
+        response = client.get("/profiled", headers={"X-GitHub-Event": "push"})
+        assert response.headers["X-Profile"].endswith(".collapsed.txt")
+        assert "X-Profile" not in client.get("/profiled", headers={"X-GitHub-Event": "issues"}).headers
+        assert len(list(profiles_dir.iterdir())) == 1
+
+    def test_admin_profile_endpoints(self, profiles_dir, test_client: TestClient):
+        """Test listing and downloading profiles, and rejecting other paths."""
+        profiler = SamplingProfiler(0.001)
+        profiler.start()
+        profiler.stop()
+        path = write_profile(profiler, "POST /api/v1/webhooks/github push", "speedscope", max_files=10)
+
+        listing = test_client.get("/api/v1/admin/profiles").json()
+        assert listing["profiles"][0]["name"] == path.name
+
+        download = test_client.get(f"/api/v1/admin/profiles/{path.name}")
+        assert download.status_code == 200
+        assert download.json()["exporter"] == "github-audit-platform"
+
+        assert test_client.get("/api/v1/admin/profiles/..%2F.env").status_code == 404
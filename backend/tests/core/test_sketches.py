@@ -0,0 +1,72 @@
+"""
+Tests for the Space-Saving and HyperLogLog sketches.
+"""
+
+import random
+from collections import Counter
+
+import pytest
+
+from app.core.sketches import HyperLogLog, SpaceSaving
+
+
+def zipf_stream(count, items, seed):
+    rng = random.Random(seed)
+    weights = [1 / rank for rank in range(1, items + 1)]
+    return [f"item-{index}" for index in rng.choices(range(items), weights=weights, k=count)]
+
+
+def test_space_saving_error_bounds():
+    """Test that estimates bracket the true counts and heavy hitters are kept."""
+    stream = zipf_stream(20_000, 2_000, seed=1)
+    exact = Counter(stream)
+    sketch = SpaceSaving(100)
+    for item in stream:
+        sketch.add(item)
+
+    assert sketch.total == len(stream)
+    for item, count, error in sketch.top(100):
+        assert count - error <= exact[item] <= count
+        assert error <= len(stream) / 100
+    assert [item for item, _, _ in sketch.top(5)] == [item for item, _ in exact.most_common(5)]
+
+
+def test_space_saving_merge():
+    """Test that merged summaries keep the error bounds of the combined stream."""
+    first, second = zipf_stream(10_000, 1_000, seed=2), zipf_stream(10_000, 1_000, seed=3)
+    exact = Counter(first + second)
+    sketches = [SpaceSaving(50), SpaceSaving(50)]
+    for sketch, stream in zip(sketches, (first, second)):
+        for item in stream:
+            sketch.add(item)
+
+    merged = SpaceSaving.from_dict(sketches[0].to_dict()).merge(sketches[1])
+    assert merged.total == 20_000
+    assert len(merged.counters) == 50
+    for item, count, error in merged.top(50):
+        assert count - error <= exact[item] <= count
+    assert merged.top(1)[0][0] == exact.most_common(1)[0][0]
+
+
+@pytest.mark.parametrize("distinct", [10, 1_000, 50_000])
+def test_hyperloglog_estimate(distinct):
+    """Test distinct count estimates within a few standard errors."""
+    sketch = HyperLogLog(12)
+    for index in range(distinct):
+        sketch.add(f"user-{index}")
+        sketch.add(f"user-{index}")
+    assert abs(sketch.estimate() - distinct) <= max(1, 4 * sketch.relative_error * distinct)
+
+
+def test_hyperloglog_merge_is_union():
+    """Test that merging estimates the union and survives serialization."""
+    first, second = HyperLogLog(10), HyperLogLog(10)
+    for index in range(3_000):
+        first.add(str(index))
+    for index in range(2_000, 5_000):
+        second.add(str(index))
+
+    merged = HyperLogLog.from_dict(first.to_dict()).merge(second)
+    assert abs(merged.estimate() - 5_000) <= 4 * merged.relative_error * 5_000
+    with pytest.raises(ValueError):
+        first.merge(HyperLogLog(12))
@@ -0,0 +1,146 @@
+"""
+Tests for the effective permission index and its incremental maintenance.
+"""
+
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import text
+
+from app.models.core import Team
+from app.models.events import EffectivePermission, TeamMembership
+from app.services.access_service import access_service, permissions_at_least, team_repository_permission
+from app.services.event_processing_service import event_processing_service
+
+ORG = 1
+ALICE, BOB = 1, 2
+API, WEB, OTHER = 10, 11, 20
+AT = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def db(sqlite_db):
+    db = sqlite_db(
+        "repositories", "users", "teams", "organization_memberships", "repository_collaborators",
+        "organization_membership_history", "repository_collaborator_history",
+        "team_memberships", "team_repositories", "effective_permissions"
+    )
+    for repository_id, organization_id in ((API, ORG), (WEB, ORG), (OTHER, None)):
+        db.execute(
+            text(
+                "INSERT INTO repositories (id, github_id, node_id, name, full_name, html_url, url, organization_id) "
+                "VALUES (:id, :id, 'n', 'r', 'o/r' || :id, 'h', 'u', :org)"
+            ),
+            {"id": repository_id, "org": organization_id}
+        )
+    for user_id, login in ((ALICE, "alice"), (BOB, "bob")):
+        db.execute(text(
+            "INSERT INTO users (id, github_id, login, node_id, url, html_url) "
+            f"VALUES ({user_id}, {user_id * 100}, '{login}', 'n{user_id}', 'u', 'h')"
+        ))
+    db.commit()
+    return db
+
+
+def effective(db):
+    return {
+        (row.user_id, row.repository_id): (
+            row.permission, bool(row.via_collaborator), bool(row.via_team), bool(row.via_organization)
+        )
+        for row in db.query(EffectivePermission)
+    }
+
+
+def member_event(db, action, user_id, permission, organization_id=None, repository_id=None):
+    asyncio.run(event_processing_service._apply_membership_relationships(
+        db, action, organization_id, repository_id, user_id, permission, AT
+    ))
+
+
+def team_event(db, action, repository_id=None, member=None, repository_permissions=None):
+    payload = {"action": action, "team": {"id": 7, "name": "Core", "slug": "core", "permission": "pull"}}
+    if member:
+        payload["member"] = {"id": member * 100}
+    if repository_permissions is not None:
+        payload["repository"] = {"id": repository_id, "permissions": repository_permissions}
+    webhook_event = SimpleNamespace(organization_id=ORG, repository_id=repository_id)
+    asyncio.run(event_processing_service._process_team_event(db, webhook_event, payload))
+
+
+def test_team_repository_permission():
+    assert team_repository_permission({"permission": "push"}) == "write"
+    assert team_repository_permission({"permission": "pull"}, {"permissions": {"pull": True, "triage": True}}) == "triage"
+    assert team_repository_permission({}, {"permissions": {"admin": True, "push": True, "pull": True}}) == "admin"
+    assert team_repository_permission({}) == "read"
+    assert permissions_at_least("maintain") == ["maintain", "admin"]
+
+
+def test_combines_grant_sources(db):
+    member_event(db, "added", ALICE, "write", repository_id=API)
+    team_event(db, "added_to_repository", API, repository_permissions={"pull": True, "triage": True})
+    team_event(db, "added", member=ALICE)
+    team_event(db, "added", member=BOB)
+    assert effective(db) == {
+        (ALICE, API): ("write", True, True, False),
+        (BOB, API): ("triage", False, True, False),
+    }
+
+    # Organization owners get admin on every repository of the organization
+    member_event(db, "member_added", BOB, "admin", organization_id=ORG)
+    assert effective(db) == {
+        (ALICE, API): ("write", True, True, False),
+        (BOB, API): ("admin", False, True, True),
+        (BOB, WEB): ("admin", False, False, True),
+    }
+
+
+def test_revocations_fall_back_to_remaining_grants(db):
+    team_event(db, "added_to_repository", API, repository_permissions={"pull": True})
+    team_event(db, "added", member=ALICE)
+    member_event(db, "added", ALICE, "admin", repository_id=API)
+    assert effective(db)[(ALICE, API)] == ("admin", True, True, False)
+
+    member_event(db, "removed", ALICE, None, repository_id=API)
+    assert effective(db) == {(ALICE, API): ("read", False, True, False)}
+
+    team_event(db, "edited", API, repository_permissions={"pull": True, "push": True})
+    assert effective(db) == {(ALICE, API): ("write", False, True, False)}
+
+    team_event(db, "removed", member=ALICE)
+    assert effective(db) == {}
+
+
+def test_team_deletion_revokes_team_grants(db):
+    team_event(db, "added_to_repository", API, repository_permissions={"push": True})
+    team_event(db, "added_to_repository", WEB, repository_permissions={"pull": True})
+    team_event(db, "added", member=ALICE)
+    team_event(db, "added", member=BOB)
+    assert len(effective(db)) == 4
+
+    team_event(db, "removed_from_repository", WEB)
+    assert set(effective(db)) == {(ALICE, API), (BOB, API)}
+
+    team_event(db, "deleted")
+    assert effective(db) == {}
+    assert db.query(Team).count() == 0
+    assert db.query(TeamMembership).count() == 0
+
+
+def test_rebuild_all_matches_incremental_maintenance(db):
+    member_event(db, "added", ALICE, "maintain", repository_id=OTHER)
+    member_event(db, "member_added", ALICE, "admin", organization_id=ORG)
+    member_event(db, "member_added", BOB, "member", organization_id=ORG)
+    team_event(db, "added_to_repository", WEB, repository_permissions={"push": True})
+    team_event(db, "added", member=BOB)
+    member_event(db, "member_removed", ALICE, None, organization_id=ORG)
+    db.commit()
+    incremental = effective(db)
+
+    access_service.rebuild_all(db)
+    db.commit()
+    assert effective(db) == incremental == {
+        (ALICE, OTHER): ("maintain", True, False, False),
+        (BOB, WEB): ("write", False, True, False),
+    }
@@ -0,0 +1,142 @@
+"""
+Tests for webhook admission control and load shedding.
+"""
+
+import hashlib
+import hmac
+import json
+import uuid
+import pytest
+from fastapi.testclient import TestClient
+
+from app.services.admission_service import AdmissionController, TokenBucket, admission_controller
+
+
+def hook_headers(hook_id: str) -> dict:
+    """Create webhook headers for a given hook."""
+    return {
+        "X-GitHub-Event": "ping",
+        "X-GitHub-Delivery": f"admission-{uuid.uuid4()}",
+        "X-GitHub-Hook-ID": hook_id,
+        "User-Agent": "GitHub-Hookshot/test"
+    }
+
+
+class TestAdmissionController:
+    """Test admission decisions."""
+
+    def test_token_bucket(self):
+        """Test that a bucket admits its capacity and then reports a wait."""
+        bucket = TokenBucket(capacity=2, rate=1.0)
+        assert bucket.try_acquire() == 0.0
+        assert bucket.try_acquire() == 0.0
+        assert 0 < bucket.try_acquire() <= 1.0
+
+    def test_per_hook_buckets(self, monkeypatch):
+        """Test that one configured hook exhausting its bucket does not affect another."""
+        controller = AdmissionController()
+        monkeypatch.setattr(controller.settings, "RATE_LIMIT_REQUESTS", 1)
+        monkeypatch.setattr(controller.settings, "GITHUB_WEBHOOK_SECRETS", {"1": ["one"], "2": ["two"]})
+        first = controller.try_admit({"x-github-hook-id": "1"})
+        assert first.admitted
+        controller.release()
+
+        limited = controller.try_admit({"x-github-hook-id": "1"})
+        assert not limited.admitted
+        assert limited.status_code == 429
+        assert limited.retry_after >= 1
+
+        assert controller.try_admit({"x-github-hook-id": "2"}).admitted
+        assert controller.get_stats()["shed"] == {"rate_limited": 1}
+
+    def test_unconfigured_hooks_share_bucket(self, monkeypatch):
+        """Test that hooks without their own secrets share one bucket, whatever ID they send."""
+        controller = AdmissionController()
+        monkeypatch.setattr(controller.settings, "RATE_LIMIT_REQUESTS", 2)
+        monkeypatch.setattr(controller.settings, "GITHUB_WEBHOOK_SECRETS", {"1": ["one"]})
+        decisions = []
+        for hook_id in range(4):
+            decisions.append(controller.try_admit({"x-github-hook-id": f"forged-{hook_id}"}).admitted)
+            controller.release()
+        assert decisions == [True, True, False, False]
+        assert controller.get_stats()["admitted"] == {"other": 2}
+        assert controller.try_admit({"x-github-hook-id": "1"}).admitted
+
+    def test_refund(self, monkeypatch):
+        """Test that a refunded request gives its token back to its bucket."""
+        controller = AdmissionController()
+        monkeypatch.setattr(controller.settings, "RATE_LIMIT_REQUESTS", 1)
+        decision = controller.try_admit({"x-github-hook-id": "1"})
+        assert decision.bucket == "other"
+        controller.refund(decision)
+        controller.release()
+        assert controller.try_admit({"x-github-hook-id": "1"}).admitted
+
+    def test_in_flight_limit(self, monkeypatch):
+        """Test the global concurrency limit."""
+        controller = AdmissionController()
+        monkeypatch.setattr(controller.settings, "WEBHOOK_MAX_IN_FLIGHT", 1)
+        assert controller.try_admit({"x-github-hook-id": "a"}).admitted
+        overloaded = controller.try_admit({"x-github-hook-id": "b"})
+        assert overloaded.status_code == 503
+        controller.release()
+        assert controller.try_admit({"x-github-hook-id": "b"}).admitted
+
+
+class TestWebhookShedding:
+    """Test shedding on the webhook endpoint."""
+
+    @pytest.fixture(autouse=True)
+    def single_request_limit(self, monkeypatch):
+        """Allow one request per bucket per window, starting from fresh buckets."""
+        monkeypatch.setattr(admission_controller.settings, "RATE_LIMIT_REQUESTS", 1)
+        monkeypatch.setattr(admission_controller, "_buckets", {})
+
+    def test_rate_limited_with_retry_after(self, test_client: TestClient):
+        """Test that a hook over its rate limit gets 429 and Retry-After."""
+        hook_id = str(uuid.uuid4())
+        test_client.post("/api/v1/webhooks/github", json={"zen": "test"}, headers=hook_headers(hook_id))
+        response = test_client.post("/api/v1/webhooks/github", json={"zen": "test"}, headers=hook_headers(hook_id))
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) >= 1
+
+    def test_shed_delivery_spooled(self, test_client: TestClient, monkeypatch, tmp_path):
+        """Test that shed deliveries are spooled to disk when configured."""
+        monkeypatch.setattr(admission_controller.settings, "WEBHOOK_SPOOL_DIR", str(tmp_path))
+        hook_id = str(uuid.uuid4())
+        test_client.post("/api/v1/webhooks/github", json={"zen": "test"}, headers=hook_headers(hook_id))
+        response = test_client.post("/api/v1/webhooks/github", json={"zen": "spooled"}, headers=hook_headers(hook_id))
+        assert response.status_code == 202
+        assert response.json()["status"] == "spooled"
+
+        spool_files = list(tmp_path.glob("*.ndjson"))
+        assert len(spool_files) == 1
+        record = json.loads(spool_files[0].read_text().splitlines()[0])
+        assert json.loads(record["body"]) == {"zen": "spooled"}
+        assert record["headers"]["x-github-hook-id"] == hook_id
+
+    def test_non_utf8_spool_rejected(self, test_client: TestClient, monkeypatch, tmp_path):
+        """Test that a shed delivery whose body is not UTF-8 gets 400 instead of a server error."""
+        monkeypatch.setattr(admission_controller.settings, "WEBHOOK_SPOOL_DIR", str(tmp_path))
+        hook_id = str(uuid.uuid4())
+        test_client.post("/api/v1/webhooks/github", json={"zen": "test"}, headers=hook_headers(hook_id))
+        response = test_client.post("/api/v1/webhooks/github", content=b"\xff\xfe", headers=hook_headers(hook_id))
+        assert response.status_code == 400
+
+    def test_forged_signatures_do_not_shed_configured_hook(self, test_client: TestClient, monkeypatch):
+        """Test that deliveries with a configured hook's ID but a forged signature leave its bucket alone."""
+        monkeypatch.setattr(admission_controller.settings, "GITHUB_WEBHOOK_SECRETS", {"1001": ["hook-secret"]})
+        body = json.dumps({"zen": "test"}).encode()
+
+        def signed(secret):
+            signature = "sha256=" + hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+            return {**hook_headers("1001"), "X-Hub-Signature-256": signature, "Content-Type": "application/json"}
+
+        for _ in range(3):
+            response = test_client.post("/api/v1/webhooks/github", content=body, headers=signed("forged"))
+            assert response.status_code == 401
+        # Admitted and verified; the bare ping then fails payload validation
+        response = test_client.post("/api/v1/webhooks/github", content=body, headers=signed("hook-secret"))
+        assert response.status_code == 422
+        response = test_client.post("/api/v1/webhooks/github", content=body, headers=signed("hook-secret"))
+        assert response.status_code == 429
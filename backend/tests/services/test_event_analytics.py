@@ -0,0 +1,117 @@
+"""
+Tests for the in-memory columnar analytics engine.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import text
+
+from app.services.event_analytics import EventAnalytics
+
+NOW = datetime.now(timezone.utc).replace(hour=12, minute=0, second=0, microsecond=0)
+
+
+@pytest.fixture
+def db(sqlite_db):
+    return sqlite_db("webhook_events")
+
+
+def add_event(db, event_id, event_type="push", days_ago=0, organization_id=1, repository_id=10, sender_id=100):
+    db.execute(
+        text(
+            "INSERT INTO webhook_events (id, event_type, organization_id, repository_id, sender_id, received_at, "
+            "sender_login, repository_name) VALUES (:id, :type, :org, :repo, :sender, :at, :login, :name)"
+        ),
+        {"id": event_id, "type": event_type, "org": organization_id, "repo": repository_id, "sender": sender_id,
+         "at": (NOW - timedelta(days=days_ago)).replace(tzinfo=None),
+         "login": f"user-{sender_id}" if sender_id else None, "name": f"org/repo-{repository_id}" if repository_id else None}
+    )
+
+
+def test_summary(db):
+    """Test totals, distinct counts, histograms and top-K from memory."""
+    add_event(db, 1, days_ago=0)
+    add_event(db, 2, days_ago=1, repository_id=11)
+    add_event(db, 3, "member", days_ago=1, repository_id=None, sender_id=101)
+    add_event(db, 4, days_ago=3, repository_id=11, organization_id=2)
+    add_event(db, 5, days_ago=20, repository_id=11)
+    add_event(db, 6, days_ago=200)
+    db.commit()
+
+    engine = EventAnalytics(window_days=90)
+    engine.refresh(db)
+    assert engine.size == 5
+
+    summary = engine.summary(30, now=NOW)
+    assert summary["summary"] == {
+        "total_events": 5, "unique_repositories": 2, "unique_users": 2, "avg_events_per_day": 0.17
+    }
+    assert summary["event_types"] == {"push": 4, "member": 1}
+    assert summary["top_repositories"] == [{"name": "org/repo-11", "events": 3}, {"name": "org/repo-10", "events": 1}]
+    assert summary["top_users"] == [{"login": "user-100", "events": 4}, {"login": "user-101", "events": 1}]
+
+    daily = summary["daily_activity"]
+    assert len(daily) == 7
+    assert daily[NOW.strftime('%Y-%m-%d')] == 1
+    assert daily[(NOW - timedelta(days=1)).strftime('%Y-%m-%d')] == 2
+    assert daily[(NOW - timedelta(days=3)).strftime('%Y-%m-%d')] == 1
+
+    organization = engine.summary(7, organization_id=2, organization_login="other", now=NOW)
+    assert organization["summary"]["total_events"] == 1
+    assert organization["period"]["organization"] == "other"
+
+
+def test_incremental_updates(db):
+    """Test that refreshes and ingest appends merge in ID order without duplicates."""
+    add_event(db, 1)
+    add_event(db, 2)
+    db.commit()
+    engine = EventAnalytics(window_days=90)
+    engine.refresh(db)
+
+    # Stored by this worker
+    add_event(db, 5)
+    db.commit()
+    engine.record(_row(db, 5))
+    # Committed late by another worker, below an ID already held
+    add_event(db, 3, "member")
+    add_event(db, 4)
+    db.commit()
+    engine.refresh(db)
+    engine.refresh(db)
+
+    assert engine.size == 5
+    assert list(engine._columns["id"][:engine.size]) == [1, 2, 3, 4, 5]
+    assert engine.summary(1, now=NOW)["event_types"] == {"push": 4, "member": 1}
+
+
+def test_window(db):
+    """Test the database fallback boundary and pruning of old events."""
+    engine = EventAnalytics(window_days=30)
+    assert engine.covers(30)
+    assert not engine.covers(31)
+
+    add_event(db, 1, days_ago=1)
+    add_event(db, 2, days_ago=1, repository_id=20, sender_id=200)
+    db.commit()
+    engine.refresh(db)
+    engine._columns["received_at"][0] -= 40 * 86_400
+    engine._pruned_at = 0
+    engine.refresh(db)
+    assert engine.size == 1
+    # Names of entities only the dropped event referenced go with it
+    assert engine._repository_names == {20: "org/repo-20"}
+    assert engine._user_logins == {200: "user-200"}
+
+
+class _Event:
+    def __init__(self, **values):
+        self.__dict__.update(values)
+
+
+def _row(db, event_id):
+    row = db.execute(text("SELECT * FROM webhook_events WHERE id = :id"), {"id": event_id}).mappings().one()
+    values = dict(row)
+    values["received_at"] = datetime.fromisoformat(values["received_at"])
+    return _Event(**values)
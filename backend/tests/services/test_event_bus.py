@@ -0,0 +1,77 @@
+"""
+Tests for the LISTEN/NOTIFY event bus (notification handling and catch-up).
+"""
+
+import json
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from app.services.event_bus import MAX_PAYLOAD_BYTES, EventBus, compact
+
+
+def event(event_id, organization_id=1):
+    return {"id": event_id, "event_type": "push", "event_action": None, "organization_id": organization_id,
+            "organization_login": "octo", "repository_name": "octo/api", "sender_login": "octocat",
+            "event_timestamp": "2024-01-01T00:00:00+00:00"}
+
+
+@pytest.fixture
+def buses():
+    first, second = EventBus(), EventBus()
+    received = {"local": [], "remote": []}
+    second.subscribe(lambda events: received["local"].extend(e["id"] for e in events))
+    second.subscribe(lambda events: received["remote"].extend(e["id"] for e in events), include_local=False)
+    return first, second, received
+
+
+def test_local_dispatch_and_remote_notifications(buses):
+    """Test that other workers' notifications reach all handlers, and own ones are ignored."""
+    first, second, received = buses
+    second.publish(event(1))
+    assert received == {"local": [1], "remote": []}
+
+    for payload in first.payloads([compact(event(2)), compact(event(3))]):
+        second.receive(payload)
+    for payload in second.payloads([compact(event(1))]):
+        second.receive(payload)
+    assert received == {"local": [1, 2, 3], "remote": [2, 3]}
+
+
+def test_payloads_fit_notify_limit():
+    """Test that large bursts are split into payloads under the NOTIFY size limit."""
+    bus = EventBus()
+    payloads = bus.payloads([compact(event(event_id)) for event_id in range(1, 501)])
+    assert len(payloads) > 1
+    assert all(len(payload.encode("utf-8")) <= MAX_PAYLOAD_BYTES for payload in payloads)
+    ids = [values[0] for payload in payloads for values in json.loads(payload)["e"]]
+    assert ids == list(range(1, 501))
+
+
+def test_catch_up_delivers_missed_events_once(buses):
+    """Test the catch-up read and its deduplication against notifications."""
+    first, second, received = buses
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    with engine.begin() as connection:
+        connection.execute(text(
+            "CREATE TABLE webhook_events (id INTEGER PRIMARY KEY, event_type VARCHAR(100), event_action VARCHAR(100), "
+            "organization_id INTEGER, organization_login VARCHAR(255), repository_name VARCHAR(255), "
+            "sender_login VARCHAR(255), event_timestamp TIMESTAMP)"
+        ))
+        connection.execute(text("INSERT INTO webhook_events (id, event_type, event_timestamp) VALUES (1, 'push', :at)"),
+                           {"at": datetime(2024, 1, 1)})
+
+    with engine.connect() as connection:
+        # The first catch-up only records where the stream starts
+        assert second.catch_up(connection) == 0
+        for event_id in (2, 3, 4):
+            connection.execute(text("INSERT INTO webhook_events (id, event_type, event_timestamp) "
+                                    "VALUES (:id, 'member', :at)"), {"id": event_id, "at": datetime(2024, 1, 2)})
+        second.receive(first.payloads([compact(event(3))])[0])
+        assert second.catch_up(connection) == 2
+        assert second.catch_up(connection) == 0
+
+    assert received["remote"] == [3, 2, 4]
+    assert second.get_stats()["last_event_id"] == 4
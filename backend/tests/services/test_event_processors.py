@@ -0,0 +1,168 @@
+"""
+Tests for the event processor registry and batch event processing.
+"""
+
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import text
+
+from app.models.core import WebhookEvent
+from app.models.events import CodeEvent, CollaborationEvent, MemberEvent, RepositoryEvent, SecurityEvent
+from app.services.event_processing_service import event_processing_service
+from app.services.processors import EventProcessor, ProcessorRegistry, processor_registry
+
+AT = datetime(2024, 1, 1, tzinfo=timezone.utc)
+OCTOCAT = 1
+
+
+@pytest.fixture
+def db(sqlite_db):
+    session = sqlite_db(
+        "webhook_events", "repository_events", "member_events", "installations",
+        "users", "security_events", "code_events", "collaboration_events"
+    )
+    session.execute(text(
+        "INSERT INTO users (id, github_id, login, node_id, url, html_url) "
+        f"VALUES ({OCTOCAT}, 583231, 'octocat', 'n1', 'u', 'h')"
+    ))
+    session.execute(text("INSERT INTO installations (id, github_id, app_id) VALUES (1, 100, 7)"))
+    session.commit()
+    return session
+
+
+def store(db, event_type, action, payload, **columns):
+    event = WebhookEvent(
+        event_type=event_type, event_action=action, payload={"action": action, **payload},
+        event_timestamp=AT, repository_id=10, retry_count=0, processed=False, **columns
+    )
+    db.add(event)
+    db.flush()
+    return event
+
+
+def test_registry_routes_by_event_type_and_action():
+    """Test that each event type and action is routed to the processor declaring it."""
+    route = processor_registry.processor_for
+    assert type(route("repository", "created")).__name__ == "RepositoryEventProcessor"
+    assert type(route("organization", "member_added")).__name__ == "MembershipEventProcessor"
+    assert type(route("pull_request_review", "submitted")).__name__ == "CollaborationEventProcessor"
+    assert type(route("installation", "suspend")).__name__ == "InstallationEventProcessor"
+    # Actions outside the table constraints and unknown types have no processor
+    assert route("repository", "renamed") is None
+    assert route("installation", "created") is None
+    assert route("ping", None) is None
+
+
+def test_registry_rejects_overlapping_processors():
+    """Test that a new event type registers without touching the others, and overlaps are refused."""
+    registry = ProcessorRegistry()
+
+    @registry.register
+    class ReleaseProcessor(EventProcessor):
+        event_types = ("release",)
+        actions = ("published",)
+
+    @registry.register
+    class DraftProcessor(EventProcessor):
+        event_types = ("release",)
+        actions = ("created",)
+
+    assert isinstance(registry.processor_for("release", "created"), DraftProcessor)
+    assert registry.event_types == ["release"]
+
+    with pytest.raises(ValueError):
+        @registry.register
+        class AnyReleaseProcessor(EventProcessor):
+            event_types = ("release",)
+
+
+def test_batch_bulk_inserts_and_marks_processed(db):
+    """Test that a mixed batch creates the specialized records and marks every event processed."""
+    events = [
+        store(db, "push", None, {"ref": "refs/tags/v1", "commits": [{"id": "a"}, {"id": "a"}], "forced": True}),
+        store(db, "create", None, {"ref": "main", "ref_type": "branch"}),
+        store(db, "repository", "archived", {}),
+        store(db, "dependabot_alert", "created",
+              {"alert": {"number": 3, "state": "open", "security_advisory": {"severity": "high"}}}),
+        store(db, "pull_request", "closed",
+              {"pull_request": {"number": 7, "state": "closed", "merged": True, "user": {"id": 583231}}}),
+        store(db, "issue_comment", "created",
+              {"issue": {"number": 8, "state": "open", "user": {"id": 1}}, "comment": {"user": {"id": 583231}}}),
+        store(db, "member", "edited", {"member": {"id": 999}, "permission": "write"}, organization_id=5),
+        store(db, "ping", None, {}),
+    ]
+
+    errors = asyncio.run(event_processing_service.process_batch(db, events))
+
+    assert errors == {}
+    assert all(event.processed and event.processed_at for event in events)
+    push, create = sorted(db.query(CodeEvent), key=lambda row: row.webhook_event_id)
+    assert (push.ref_name, push.ref_type, push.commits_count, push.distinct_commits_count, push.forced) == \
+        ("v1", "tag", 2, 1, True)
+    assert (create.ref_name, create.ref_type) == ("main", "branch")
+    assert [row.action for row in db.query(RepositoryEvent)] == ["archived"]
+    assert [(row.alert_number, row.severity) for row in db.query(SecurityEvent)] == [(3, "high")]
+    assert sorted((row.event_type, row.number, row.state, row.author_id, row.merged)
+                  for row in db.query(CollaborationEvent)) == [
+        ("issue_comment", 8, "open", OCTOCAT, None),
+        ("pull_request", 7, "closed", OCTOCAT, True),
+    ]
+    member = db.query(MemberEvent).one()
+    assert (member.organization_id, member.member_id, member.permission_level) == (5, None, "write")
+
+
+def test_failing_event_only_fails_itself(db):
+    """Test that a failing event is isolated from the rest of its batch and kept for retry."""
+    good = store(db, "issues", "opened", {"issue": {"number": 1, "state": "open"}})
+    bad = store(db, "issues", None, {"issue": {"number": 2, "state": "open"}})  # action is NOT NULL
+    other = store(db, "issues", "closed", {"issue": {"number": 3, "state": "closed"}})
+
+    errors = asyncio.run(event_processing_service.process_batch(db, [good, bad, other]))
+
+    assert list(errors) == [bad.id]
+    assert sorted(row.number for row in db.query(CollaborationEvent)) == [1, 3]
+    assert (good.processed, other.processed) == (True, True)
+    assert not bad.processed and bad.retry_count == 1 and bad.processing_error
+
+
+def test_failed_commit_keeps_batch_for_retry(db, monkeypatch):
+    """Test that a failing commit rolls the batch back and records the error on every event."""
+    events = [
+        store(db, "push", None, {"ref": "refs/heads/main", "commits": []}),
+        store(db, "issues", "opened", {"issue": {"number": 1, "state": "open"}}),
+    ]
+    db.commit()
+    commit = db.commit
+
+    def failing_commit():
+        monkeypatch.setattr(db, "commit", commit)
+        raise RuntimeError("connection lost")
+
+    monkeypatch.setattr(db, "commit", failing_commit)
+    errors = asyncio.run(event_processing_service.process_batch(db, events))
+
+    assert errors == {event.id: "connection lost" for event in events}
+    assert db.query(CodeEvent).count() == db.query(CollaborationEvent).count() == 0
+    db.expire_all()
+    assert all(not event.processed and event.retry_count == 1 for event in events)
+    assert {event.processing_error for event in events} == {"connection lost"}
+
+
+def test_installation_suspension_follows_latest_event(db):
+    """Test that suspend/unsuspend events update the installation."""
+    def suspension():
+        return tuple(db.execute(text("SELECT suspended_by_id, suspended_at FROM installations WHERE id = 1")).one())
+
+    suspend = store(db, "installation", "suspend", {}, installation_id=1, sender_id=OCTOCAT)
+    asyncio.run(event_processing_service.process_batch(db, [suspend]))
+    suspended_by_id, suspended_at = suspension()
+    assert suspended_by_id == OCTOCAT and suspended_at is not None
+
+    events = [
+        store(db, "installation", "suspend", {}, installation_id=1, sender_id=OCTOCAT),
+        store(db, "installation", "unsuspend", {}, installation_id=1, sender_id=OCTOCAT),
+    ]
+    asyncio.run(event_processing_service.process_batch(db, events))
+    assert suspension() == (None, None)
@@ -0,0 +1,62 @@
+"""
+Tests for delivery-ID idempotency.
+"""
+
+import uuid
+from fastapi.testclient import TestClient
+
+from app.services.idempotency_service import (
+    DeliveryIdempotencyService, idempotency_service, CLAIMED, DUPLICATE, IN_PROGRESS
+)
+
+
+class TestDeliveryIdempotencyService:
+    """Test the bounded recent-delivery set."""
+
+    def test_claim_lifecycle(self):
+        """Test claim, in-progress detection and completion."""
+        service = DeliveryIdempotencyService(max_size=10)
+        assert service.claim("d1") == CLAIMED
+        assert service.claim("d1") == IN_PROGRESS
+        service.complete("d1")
+        assert service.claim("d1") == DUPLICATE
+        assert service.get_stats()["duplicates_cached"] == 1
+
+    def test_release_allows_retry(self):
+        """Test that a failed delivery can be claimed again."""
+        service = DeliveryIdempotencyService(max_size=10)
+        assert service.claim("d1") == CLAIMED
+        service.release("d1")
+        assert service.claim("d1") == CLAIMED
+
+    def test_bounded_size(self):
+        """Test that the oldest delivery IDs are evicted first."""
+        service = DeliveryIdempotencyService(max_size=3)
+        for delivery_id in ["a", "b", "c", "d"]:
+            service.claim(delivery_id)
+            service.complete(delivery_id)
+        assert service.get_stats()["cached_delivery_ids"] == 3
+        assert service.claim("a") == CLAIMED
+        assert service.claim("d") == DUPLICATE
+
+
+class TestDuplicateDeliveries:
+    """Test duplicate acknowledgement on the webhook endpoint."""
+
+    def test_redelivery_acknowledged(self, test_client: TestClient):
+        """Test that a known delivery returns 200 without being processed again."""
+        delivery_id = f"redelivery-{uuid.uuid4()}"
+        idempotency_service.claim(delivery_id)
+        idempotency_service.complete(delivery_id)
+
+        response = test_client.post(
+            "/api/v1/webhooks/github",
+            content=b"not even json",
+            headers={
+                "X-GitHub-Event": "ping",
+                "X-GitHub-Delivery": delivery_id,
+                "User-Agent": "GitHub-Hookshot/test"
+            }
+        )
+        assert response.status_code == 200
+        assert response.json()["status"] == "duplicate"
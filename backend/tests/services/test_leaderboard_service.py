@@ -0,0 +1,75 @@
+"""
+Tests for the streaming leaderboard sketches and their checkpoints.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select
+
+from app.core.config import get_settings
+from app.models.system import AnalyticsSketch
+from app.services.leaderboard_service import LeaderboardService
+
+
+@pytest.fixture
+def db(sqlite_db):
+    return sqlite_db("analytics_sketches")
+
+
+NOW = datetime.now(timezone.utc)
+
+
+def test_leaderboard_from_live_sketches(db):
+    """Test global and organization scopes over a window of days."""
+    service = LeaderboardService()
+    for _ in range(3):
+        service.add(1, "org/api", "octocat", NOW)
+    service.add(1, "org/web", "hubot", NOW - timedelta(days=2))
+    service.add(2, "other/api", "octocat", NOW)
+    service.add(None, None, "ghost", NOW)
+
+    result = service.leaderboard(db, days=7)
+    assert result["total_events"] == 6
+    assert result["top_repositories"][0] == {"name": "org/api", "events": 3, "error": 0}
+    assert [user["login"] for user in result["top_users"]] == ["octocat", "ghost", "hubot"]
+    assert result["unique_repositories"]["estimate"] == 3
+    assert result["unique_users"]["estimate"] == 3
+
+    organization = service.leaderboard(db, organization_id=1, days=1)
+    assert organization["total_events"] == 3
+    assert organization["top_users"] == [{"login": "octocat", "events": 3, "error": 0}]
+
+
+def test_checkpoints_merge_across_workers(db):
+    """Test that other workers' checkpoints (and ones of exited workers) are merged."""
+    first, second = LeaderboardService(), LeaderboardService()
+    first.add(1, "org/api", "octocat", NOW)
+    first.add(1, "org/api", "octocat", NOW - timedelta(days=1))
+    assert first.checkpoint(db) == 4
+    assert first.checkpoint(db) == 0
+
+    second.add(1, "org/api", "hubot", NOW)
+    result = second.leaderboard(db, organization_id=1, days=2)
+    assert result["total_events"] == 3
+    assert result["top_repositories"] == [{"name": "org/api", "events": 3, "error": 0}]
+    assert result["unique_users"]["estimate"] == 2
+
+    # Rewriting a checkpoint replaces this worker's rows
+    first.add(1, "org/api", "octocat", NOW)
+    first.checkpoint(db)
+    rows = db.execute(select(AnalyticsSketch.scope, AnalyticsSketch.events)).all()
+    assert sorted(rows) == [("all", 1), ("all", 2), ("org:1", 1), ("org:1", 2)]
+
+
+def test_expired_days_are_dropped(db, monkeypatch):
+    """Test that events and checkpoints past the retention window are discarded."""
+    monkeypatch.setattr(get_settings(), "SKETCH_RETENTION_DAYS", 3)
+    service = LeaderboardService()
+    service.add(1, "org/api", "octocat", NOW - timedelta(days=5))
+    assert service.checkpoint(db) == 0
+
+    db.add(AnalyticsSketch(worker_id="gone", scope="all", day=(NOW - timedelta(days=4)).date(), events=1, state="{}"))
+    db.commit()
+    service.checkpoint(db)
+    assert db.execute(select(AnalyticsSketch)).first() is None
@@ -0,0 +1,53 @@
+"""
+Tests for the payload decode/validation executor stage.
+"""
+
+import json
+import pytest
+from pathlib import Path
+
+from app.services.payload_executor import PayloadExecutor, decode_and_parse
+from app.webhook_models import PushEvent
+
+
+def load_push_payload() -> bytes:
+    """Load the push event fixture as raw bytes."""
+    payload_path = Path(__file__).parent.parent / "payloads" / "15_PushEvent.json"
+    return payload_path.read_bytes()
+
+
+class TestPayloadExecutor:
+    """Test inline and pooled decoding paths."""
+
+    def test_decode_and_parse(self):
+        """Test the module-level worker function."""
+        payload, event = decode_and_parse(load_push_payload(), "push")
+        assert isinstance(event, PushEvent)
+        assert payload["ref"] == event.ref
+
+    def test_invalid_json_raises(self):
+        """Test that invalid JSON surfaces as a decode error."""
+        with pytest.raises(json.JSONDecodeError):
+            decode_and_parse(b"invalid json", "push")
+
+    @pytest.mark.parametrize("executor_type", ["none", "thread", "process"])
+    @pytest.mark.asyncio
+    async def test_executor_types(self, executor_type):
+        """Test that every executor type returns the same parsed event."""
+        executor = PayloadExecutor()
+        executor.executor_type = executor_type
+        executor.threshold = 0
+        try:
+            payload, event = await executor.decode_and_parse(load_push_payload(), "push")
+            assert isinstance(event, PushEvent)
+            assert payload["after"] == event.after
+        finally:
+            executor.shutdown()
+
+    def test_small_payloads_stay_inline(self):
+        """Test that payloads under the threshold are not offloaded."""
+        executor = PayloadExecutor()
+        executor.executor_type = "thread"
+        executor.threshold = 1024
+        assert not executor.should_offload(b"{}")
+        assert executor.should_offload(b" " * 1024)
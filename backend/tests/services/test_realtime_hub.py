@@ -0,0 +1,78 @@
+"""
+Tests for the in-process real-time pub/sub hub.
+"""
+
+import json
+import threading
+
+import pytest
+
+from app.core.config import get_settings
+from app.services.realtime_hub import (
+    HubFullError, RealtimeHub, organization_channel, repository_channel
+)
+
+
+def event(event_id, repository="octo/api", organization="octo"):
+    return {"id": event_id, "repository_name": repository, "organization_login": organization}
+
+
+@pytest.mark.asyncio
+async def test_routes_only_to_matching_channels():
+    """Test that publishing reaches the event's channels once per subscriber."""
+    hub = RealtimeHub()
+    everything = hub.subscribe([])
+    repository = hub.subscribe([repository_channel("Octo/API")])
+    both = hub.subscribe([repository_channel("octo/api"), organization_channel("octo")])
+    other = hub.subscribe([organization_channel("other")])
+
+    assert hub.publish(event(1)) == 3
+    assert hub.publish(event(2, repository="other/web", organization="other")) == 2
+
+    assert [event_id for event_id, _ in await everything.next_batch(1)] == [1, 2]
+    assert [event_id for event_id, _ in await repository.next_batch(1)] == [1]
+    assert [event_id for event_id, _ in await both.next_batch(1)] == [1]
+    assert [event_id for event_id, _ in await other.next_batch(1)] == [2]
+    assert await other.next_batch(0.01) == []
+
+    for subscription in (everything, repository, both, other):
+        hub.unsubscribe(subscription)
+    assert hub.get_stats()["channels"] == 0
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_drops_oldest(monkeypatch):
+    """Test bounded queues and the coalesced lagged notice."""
+    monkeypatch.setattr(get_settings(), "REALTIME_QUEUE_SIZE", 3)
+    hub = RealtimeHub()
+    subscription = hub.subscribe([])
+    for event_id in range(1, 11):
+        hub.publish(event(event_id))
+    assert hub.get_stats()["lagging_subscribers"] == 1
+
+    batch = await subscription.next_batch(1)
+    assert json.loads(batch[0][1]) == {"type": "lagged", "dropped": 7}
+    assert [event_id for event_id, _ in batch[1:]] == [8, 9, 10]
+    assert json.loads(batch[1][1])["event"]["repository_name"] == "octo/api"
+
+
+@pytest.mark.asyncio
+async def test_publish_from_another_thread():
+    """Test that a publisher thread wakes subscribers on their event loop."""
+    hub = RealtimeHub()
+    subscription = hub.subscribe([organization_channel("octo")])
+    threading.Thread(target=hub.publish, args=(event(1),)).start()
+    assert [event_id for event_id, _ in await subscription.next_batch(2)] == [1]
+
+
+@pytest.mark.asyncio
+async def test_subscriber_limit(monkeypatch):
+    """Test that a worker refuses subscribers beyond REALTIME_MAX_SUBSCRIBERS."""
+    monkeypatch.setattr(get_settings(), "REALTIME_MAX_SUBSCRIBERS", 2)
+    hub = RealtimeHub()
+    first = hub.subscribe([])
+    hub.subscribe([])
+    with pytest.raises(HubFullError):
+        hub.subscribe([])
+    hub.unsubscribe(first)
+    hub.subscribe([])
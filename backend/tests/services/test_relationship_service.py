@@ -0,0 +1,176 @@
+"""
+Tests for the incremental and full relationship rebuilds.
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.models.events import (
+    MemberEvent, OrganizationMembership, RepositoryCollaborator,
+    OrganizationMembershipHistory, RepositoryCollaboratorHistory
+)
+from app.services.event_processing_service import event_processing_service
+from app.services.relationship_service import REBUILD_QUERIES, relationship_service
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def db(sqlite_db):
+    return sqlite_db(
+        "member_events", "organization_memberships", "repository_collaborators",
+        "organization_membership_history", "repository_collaborator_history", "repositories",
+        "team_memberships", "team_repositories", "effective_permissions", "processing_watermarks"
+    )
+
+
+def add_events(db: Session, *events):
+    """Add member events as (action, organization_id, repository_id, member_id, permission_level)."""
+    next_id = (db.query(MemberEvent.id).order_by(MemberEvent.id.desc()).limit(1).scalar() or 0) + 1
+    for offset, (action, organization_id, repository_id, member_id, permission_level) in enumerate(events):
+        db.add(MemberEvent(
+            id=next_id + offset,
+            action=action,
+            organization_id=organization_id,
+            repository_id=repository_id,
+            member_id=member_id,
+            permission_level=permission_level,
+            event_timestamp=START + timedelta(minutes=next_id + offset),
+        ))
+    db.commit()
+
+
+def memberships(db: Session):
+    return sorted(
+        (row.organization_id, row.user_id, row.role)
+        for row in db.query(OrganizationMembership).all()
+    )
+
+
+def collaborators(db: Session):
+    return sorted(
+        (row.repository_id, row.user_id, row.permission)
+        for row in db.query(RepositoryCollaborator).all()
+    )
+
+
+def history(db: Session):
+    """Membership and collaborator periods as (scope, user, value, from, to) in minutes after START."""
+    def minutes(value):
+        return None if value is None else int((value.replace(tzinfo=timezone.utc) - START).total_seconds() // 60)
+
+    return (
+        sorted(
+            (row.organization_id, row.user_id, row.role, minutes(row.valid_from), minutes(row.valid_to))
+            for row in db.query(OrganizationMembershipHistory).all()
+        ),
+        sorted(
+            (row.repository_id, row.user_id, row.permission, minutes(row.valid_from), minutes(row.valid_to))
+            for row in db.query(RepositoryCollaboratorHistory).all()
+        ),
+    )
+
+
+EVENTS = [
+    ("member_added", 1, None, 10, "admin"),
+    ("added", 1, 5, 11, "write"),
+    ("added", 1, 6, 12, None),
+    ("removed", 1, 6, 12, None),
+    ("member_added", 2, None, 10, None),
+    ("edited", 1, 5, 11, "admin"),
+    ("member_removed", 2, None, 10, None),
+    ("member_added", 2, None, 10, "billing_manager"),
+]
+
+
+class TestIncrementalRebuild:
+    """Test watermark-based replay of member events."""
+
+    def test_replays_only_new_events(self, db: Session):
+        """Test that a second run only applies events past the watermark."""
+        add_events(db, *EVENTS)
+        result = asyncio.run(relationship_service.rebuild_incremental(db, chunk_size=3))
+        assert result == {"replayed": len(EVENTS), "watermark": len(EVENTS)}
+        assert memberships(db) == [(1, 10, "admin"), (1, 11, "member"), (2, 10, "billing_manager")]
+        assert collaborators(db) == [(5, 11, "write")]
+
+        assert asyncio.run(relationship_service.rebuild_incremental(db))["replayed"] == 0
+
+        add_events(db, ("removed", 1, 5, 11, None))
+        result = asyncio.run(relationship_service.rebuild_incremental(db))
+        assert result == {"replayed": 1, "watermark": len(EVENTS) + 1}
+        assert memberships(db) == [(1, 10, "admin"), (2, 10, "billing_manager")]
+        assert collaborators(db) == []
+
+    def test_records_validity_periods(self, db: Session):
+        """Test that replay closes and opens history periods at the event timestamps."""
+        add_events(db, *EVENTS, ("removed", 1, 5, 11, None))
+        asyncio.run(relationship_service.rebuild_incremental(db))
+
+        membership_history, collaborator_history = history(db)
+        assert membership_history == [
+            (1, 10, "admin", 1, None),
+            (1, 11, "member", 2, 9),
+            (1, 12, "member", 3, 4),
+            (2, 10, "billing_manager", 8, None),
+            (2, 10, "member", 5, 7),
+        ]
+        assert collaborator_history == [(5, 11, "write", 2, 9), (6, 12, "read", 3, 4)]
+
+
+class TestHistoryPeriods:
+    """Test history maintenance for redeliveries and out-of-order timestamps."""
+
+    def apply(self, db: Session, action: str, permission: str, minute: int):
+        asyncio.run(event_processing_service._apply_membership_relationships(
+            db, action, None, 5, 11, permission, START + timedelta(minutes=minute)
+        ))
+        db.commit()
+
+    def test_repeated_change_keeps_period(self, db: Session):
+        """Test that a redelivered add does not split the open period."""
+        self.apply(db, "added", "write", 1)
+        self.apply(db, "added", "write", 5)
+        assert history(db)[1] == [(5, 11, "write", 1, None)]
+
+    def test_older_event_applies_at_latest_boundary(self, db: Session):
+        """Test that an out-of-order timestamp never moves a boundary backwards."""
+        self.apply(db, "added", "write", 10)
+        self.apply(db, "added", "admin", 20)
+        self.apply(db, "removed", None, 15)
+        # The removal is applied at 20, where the admin period starts, so that period never existed
+        assert history(db)[1] == [(5, 11, "write", 10, 20)]
+
+    def test_change_at_period_start_replaces_period(self, db: Session):
+        """Test that a change at the same instant replaces the period instead of leaving an empty one."""
+        self.apply(db, "added", "write", 10)
+        self.apply(db, "added", "admin", 10)
+        assert history(db)[1] == [(5, 11, "admin", 10, None)]
+
+
+class TestFullRebuildQueries:
+    """Test that the set-based rebuild matches replaying the events in order."""
+
+    def test_matches_incremental_replay(self, db: Session):
+        """Test the window-function queries against the incremental result."""
+        add_events(db, *EVENTS, ("removed", 1, 5, 11, None), ("added", 3, 7, 13, "maintain"))
+        add_events(db, ("added", 3, 7, 13, "maintain"), ("added", 3, 7, 13, "admin"))
+        asyncio.run(relationship_service.rebuild_incremental(db))
+        expected = (memberships(db), collaborators(db), history(db))
+
+        for table in REBUILD_QUERIES:
+            db.execute(text(f"DELETE FROM {table}"))
+        for table, build_query in REBUILD_QUERIES.items():
+            db.execute(text(build_query(table)), {"high_water": 10 ** 9})
+        db.commit()
+
+        assert (memberships(db), collaborators(db), history(db)) == expected
+
+    def test_requires_postgresql(self, db: Session):
+        """Test that the shadow-table swap refuses other databases."""
+        with pytest.raises(RuntimeError):
+            relationship_service.rebuild_full(db)
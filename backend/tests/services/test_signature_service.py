@@ -0,0 +1,150 @@
+"""
+Tests for streaming webhook signature verification.
+"""
+
+import hashlib
+import hmac
+import json
+import pytest
+from fastapi.testclient import TestClient
+
+from app.services.signature_service import (
+    SignatureService, StreamingSignatureVerifier, get_keyed_hmac,
+    is_well_formed_signature, verify_signature
+)
+from app.services import signature_service as signature_service_module
+from app.services.webhook_service import webhook_receiver_service
+
+SECRET = "test-webhook-secret"
+
+
+def sign(body: bytes, secret: str = SECRET) -> str:
+    """Compute a GitHub-style signature header."""
+    return "sha256=" + hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+
+
+class TestStreamingSignatureVerifier:
+    """Test the incremental verifier."""
+
+    def test_chunked_matches_single_pass(self):
+        """Test that feeding chunks gives the same result as one update."""
+        body = b'{"zen": "Keep it logically awesome."}' * 100
+        verifier = StreamingSignatureVerifier(SECRET)
+        for i in range(0, len(body), 7):
+            verifier.update(body[i:i + 7])
+        assert verifier.bytes_received == len(body)
+        assert verifier.verify(sign(body))
+        assert verify_signature(body, sign(body), SECRET)
+
+    def test_rejects_wrong_secret(self):
+        """Test that a signature made with another secret is rejected."""
+        body = b"{}"
+        assert not verify_signature(body, sign(body, "other-secret"), SECRET)
+
+    def test_keyed_hmac_is_not_mutated(self):
+        """Test that verifiers copy the cached keyed state."""
+        before = get_keyed_hmac(SECRET).hexdigest()
+        verify_signature(b"payload", sign(b"payload"), SECRET)
+        assert get_keyed_hmac(SECRET).hexdigest() == before
+
+    def test_signature_format(self):
+        """Test detection of malformed signature headers."""
+        assert is_well_formed_signature(sign(b"x"))
+        assert not is_well_formed_signature(None)
+        assert not is_well_formed_signature("sha256=test")
+        assert not is_well_formed_signature("sha1=" + "0" * 64)
+
+
+class TestPerHookSecrets:
+    """Test per-hook secret lookup and rotation."""
+
+    @pytest.fixture
+    def service(self, monkeypatch):
+        """Signature service with per-hook secrets configured."""
+        service = SignatureService()
+        monkeypatch.setattr(service.settings, "GITHUB_WEBHOOK_SECRET", "default-secret")
+        monkeypatch.setattr(service.settings, "GITHUB_WEBHOOK_SECRETS", {
+            "1001": ["new-secret", "old-secret"],
+            "organization:42": ["org-secret"],
+        })
+        return service
+
+    def test_lookup_order(self, service):
+        """Test hook ID, then installation target, then default secret."""
+        assert service.candidate_secrets({"x-github-hook-id": "1001"}) == ["new-secret", "old-secret"]
+        assert service.candidate_secrets({
+            "x-github-hook-id": "2002",
+            "x-github-hook-installation-target-type": "organization",
+            "x-github-hook-installation-target-id": "42",
+        }) == ["org-secret"]
+        assert service.candidate_secrets({"x-github-hook-id": "2002"}) == ["default-secret"]
+
+    def test_rotation_secret_accepted(self, service):
+        """Test that any active secret for the hook verifies, and rotation use is counted."""
+        headers = {"x-github-hook-id": "1001"}
+        body = b'{"zen": "rotate"}'
+        verifier = service.create_verifier(headers)
+        verifier.update(body)
+        assert verifier.verify(sign(body, "old-secret"))
+        assert verifier.matched_index == 1
+        service.record_result(headers, True, verifier)
+        assert service.get_stats()["rotation_matches"] == {"1001": 1}
+
+    def test_failures_counted_per_hook(self, service):
+        """Test that verification failures are counted by hook."""
+        headers = {"x-github-hook-id": "1001"}
+        verifier = service.create_verifier(headers)
+        verifier.update(b"{}")
+        assert not verifier.verify(sign(b"{}", "default-secret"))
+        service.record_result(headers, False, verifier)
+        assert service.get_stats()["failures"] == {"1001": 1}
+
+    def test_forged_hook_ids_are_capped(self, service, monkeypatch):
+        """Test that failures from rotating hook headers collapse into "other" past the cap."""
+        monkeypatch.setattr(signature_service_module, "MAX_LABEL_SETS", 3)
+        for hook_id in range(10):
+            service.record_result({"x-github-hook-id": f"forged-{hook_id}"}, False)
+        failures = service.get_stats()["failures"]
+        assert len(failures) == 4 and failures["other"] == 7
+
+
+class TestWebhookEndpointSignature:
+    """Test early rejection on the webhook endpoint."""
+
+    @pytest.fixture(autouse=True)
+    def configure_secret(self, monkeypatch):
+        """Enable signature validation for these tests."""
+        monkeypatch.setattr(webhook_receiver_service.settings, "GITHUB_WEBHOOK_SECRET", SECRET)
+        monkeypatch.setattr(webhook_receiver_service.settings, "WEBHOOK_MAX_BODY_BYTES", 1024)
+
+    def headers(self, signature):
+        """Create webhook headers with the given signature."""
+        return {
+            "X-GitHub-Event": "ping",
+            "X-GitHub-Delivery": "signature-test",
+            "X-Hub-Signature-256": signature,
+            "Content-Type": "application/json",
+        }
+
+    def test_invalid_signature_rejected(self, test_client: TestClient):
+        """Test that a forged signature returns 401."""
+        body = json.dumps({"zen": "test"}).encode()
+        response = test_client.post(
+            "/api/v1/webhooks/github", content=body, headers=self.headers(sign(body, "forged"))
+        )
+        assert response.status_code == 401
+
+    def test_malformed_signature_rejected(self, test_client: TestClient):
+        """Test that an unsigned request is rejected before the body is read."""
+        response = test_client.post(
+            "/api/v1/webhooks/github", content=b"{}", headers=self.headers("sha256=test")
+        )
+        assert response.status_code == 401
+
+    def test_oversized_body_rejected(self, test_client: TestClient):
+        """Test that bodies over WEBHOOK_MAX_BODY_BYTES return 413."""
+        body = json.dumps({"zen": "x" * 2048}).encode()
+        response = test_client.post(
+            "/api/v1/webhooks/github", content=body, headers=self.headers(sign(body))
+        )
+        assert response.status_code == 413
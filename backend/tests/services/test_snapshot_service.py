@@ -0,0 +1,118 @@
+"""
+Tests for the incremental Parquet snapshot export.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+
+from app.services.snapshot_service import SNAPSHOTS_WATERMARK, snapshot_service
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+# Minimal SQLite versions of the tables involved (the models use PostgreSQL types)
+START = datetime(2024, 1, 1, 22, 0)
+
+
+@pytest.fixture
+def db(sqlite_db):
+    return sqlite_db(
+        "webhook_events", "repository_events", "member_events", "security_events", "code_events",
+        "processing_watermarks"
+    )
+
+
+def add_events(db, first_id, count, processed=True, retry_count=0):
+    for event_id in range(first_id, first_id + count):
+        event_type = "push" if event_id % 2 else "member"
+        db.execute(
+            text(
+                "INSERT INTO webhook_events (id, delivery_id, event_type, event_action, event_timestamp, "
+                "processed, retry_count, sender_login) VALUES (:id, :delivery, :type, 'added', :at, :processed, "
+                ":retries, 'octocat')"
+            ),
+            {"id": event_id, "delivery": f"d-{event_id}", "type": event_type,
+             "at": START + timedelta(hours=event_id), "processed": processed, "retries": retry_count}
+        )
+        if event_type == "push":
+            db.execute(
+                text(
+                    "INSERT INTO code_events (webhook_event_id, event_type, ref_name, commits_count, forced, "
+                    "event_timestamp) VALUES (:id, 'push', 'main', :id, 0, :at)"
+                ),
+                {"id": event_id, "at": START + timedelta(hours=event_id)}
+            )
+        else:
+            db.execute(text(
+                f"INSERT INTO member_events (webhook_event_id, member_id, action, permission_level) "
+                f"VALUES ({event_id}, 7, 'added', 'write')"
+            ))
+    db.commit()
+
+
+def read(directory):
+    partitions = {}
+    for path in sorted(directory.rglob("*.parquet")):
+        partitions.setdefault(str(path.relative_to(directory).parent), []).extend(pq.read_table(path).to_pylist())
+    return partitions
+
+
+def watermark(db):
+    return db.execute(
+        text("SELECT last_event_id FROM processing_watermarks WHERE name = :name"), {"name": SNAPSHOTS_WATERMARK}
+    ).scalar()
+
+
+def test_writes_flattened_partitions(db, tmp_path):
+    """Test one file per date and event type with the specialized event columns."""
+    add_events(db, 1, 4)
+    result = snapshot_service.export_incremental(db, str(tmp_path))
+    assert result == {"exported": 4, "files": 3, "watermark": 4}
+
+    files = read(tmp_path)
+    assert sorted(files) == [
+        "event_date=2024-01-01/event_type=push",
+        "event_date=2024-01-02/event_type=member",
+        "event_date=2024-01-02/event_type=push",
+    ]
+    push = files["event_date=2024-01-01/event_type=push"][0]
+    assert push["id"] == 1
+    assert push["code_ref_name"] == "main" and push["code_commits_count"] == 1
+    assert push["member_action"] is None
+    member = files["event_date=2024-01-02/event_type=member"]
+    assert [row["member_permission_level"] for row in member] == ["write", "write"]
+    assert "event_type" not in push
+
+
+def test_stops_before_pending_events_and_resumes(db, tmp_path):
+    """Test that unprocessed events hold the watermark back until they are done."""
+    add_events(db, 1, 3)
+    add_events(db, 4, 1, processed=False)
+    add_events(db, 5, 2)
+    result = snapshot_service.export_incremental(db, str(tmp_path), batch_size=2)
+    assert result["exported"] == 3
+    assert watermark(db) == 3
+
+    # Failed for good: no longer holds the export back
+    db.execute(text("UPDATE webhook_events SET retry_count = 99 WHERE id = 4"))
+    db.commit()
+    result = snapshot_service.export_incremental(db, str(tmp_path), batch_size=2)
+    assert result["exported"] == 3
+    assert watermark(db) == 6
+
+    ids = sorted(row["id"] for rows in read(tmp_path).values() for row in rows)
+    assert ids == [1, 2, 3, 4, 5, 6]
+
+
+def test_reexport_from_same_watermark_replaces_files(db, tmp_path):
+    """Test that an export repeated after a lost watermark update does not duplicate rows."""
+    add_events(db, 1, 3)
+    snapshot_service.export_incremental(db, str(tmp_path))
+    db.execute(text("UPDATE processing_watermarks SET last_event_id = 0"))
+    db.commit()
+
+    snapshot_service.export_incremental(db, str(tmp_path))
+    ids = sorted(row["id"] for rows in read(tmp_path).values() for row in rows)
+    assert ids == [1, 2, 3]
+    assert not list(tmp_path.rglob("*.tmp"))